@@ -14,7 +14,9 @@ def getVersion():
     return (pathlib.Path(__file__).parent/"VERSION").read_text(encoding="utf-8").strip()
 
 __version__ = getVersion()
-__git_sha__ = (pathlib.Path(__file__).parent/"GIT_SHA").read_text(encoding="utf-8").strip()
+_gitSha = (pathlib.Path(__file__).parent/"GIT_SHA").read_text(encoding="utf-8").strip()
+if _gitSha != 'n/a':
+    __git_sha__ = _gitSha
 __license__ = 'GPL v3'
 __author__ = 'Open Science Tools Ltd'
 __author_email__ = 'support@opensciencetools.org'
@@ -26,9 +28,9 @@ __build_platform__ = 'n/a'
 __all__ = ["gui", "misc", "visual", "core",
            "event", "data", "sound", "microphone"]
 
-# for developers the following allows access to the current git sha from
-# their repository
-if __git_sha__ == 'n/a':
+
+def _getGitSha():
+    """For developers, get the current git sha from their repository."""
     from subprocess import check_output, PIPE
     # see if we're in a git repo and fetch from there
     try:
@@ -38,7 +40,24 @@ if __git_sha__ == 'n/a':
     except Exception:
         output = False
     if output:
-        __git_sha__ = output.strip()  # remove final linefeed
+        return output.strip()  # remove final linefeed
+
+    return _gitSha
+
+
+def __getattr__(name):
+    # things which are slow to get are only got when they are first used
+    global __git_sha__
+    if name == '__git_sha__':
+        __git_sha__ = _getGitSha()
+        return __git_sha__
+    if name in ('useVersion', 'ensureMinimal') and 'installing' not in globals():
+        from psychopy.tools import versionchooser
+        return getattr(versionchooser, name)
+
+    raise AttributeError(
+        "module {!r} has no attribute {!r}".format(__name__, name))
+
 
 # update preferences and the user paths
 if 'installing' not in locals():
@@ -129,7 +148,12 @@ if 'installing' not in locals():
         if _pathName.is_dir():
             sys.path.append(str(_pathName))
 
-    from psychopy.tools.versionchooser import useVersion, ensureMinimal
+    # logging (and the clock it uses) must be imported before other modules,
+    # which can't import them the other way round
+    from psychopy import logging
+
+    # `useVersion` and `ensureMinimal` are imported from
+    # psychopy.tools.versionchooser when they are first used, see `__getattr__`
 
 
 if sys.version_info.major < 3:
@@ -151,7 +151,18 @@ def alert(code=None, obj=object, strFields=None, trace=None):
     """
 
     msg = AlertEntry(code, obj, strFields, trace)
+    sendAlert(msg)
 
+
+def sendAlert(msg):
+    """Send an alert to the active alert handlers, or to the standard error
+    stream if there are none.
+
+    Parameters
+    ----------
+    msg : AlertEntry
+        The alert to send.
+    """
     # format the warning into a string for console and logging targets
     msgAsStr = ("Alert {code}: {msg}\n"
                 "For more info see https://docs.psychopy.org/alerts/{code}.html"
@@ -1,13 +1,33 @@
 import ast
 
 from numpy import array
-from esprima import parseScript
 
 from psychopy.tools import monitorunittools
 from psychopy.alerts._alerts import alert
 from psychopy.tools.fontmanager import FontManager
 
-fontMGR = FontManager()
+# finding the fonts on the system is slow, so it's only done when the first
+# font is checked
+_fontMGR = None
+
+
+def getFontManager():
+    """Get the font manager used to check fonts, creating it the first time."""
+    global _fontMGR
+    if _fontMGR is None:
+        _fontMGR = FontManager()
+
+    return _fontMGR
+
+
+def __getattr__(name):
+    # `fontMGR` is created when it is first used
+    if name == 'fontMGR':
+        return getFontManager()
+
+    raise AttributeError(
+        "module {!r} has no attribute {!r}".format(__name__, name))
+
 
 class TestWin:
     """
@@ -271,7 +291,7 @@ def testFont(component):
         The component used for testing
     """
     if 'font' in component.params:
-        fontInfo = fontMGR.getFontsMatching(component.params['font'].val, fallback=False)
+        fontInfo = getFontManager().getFontsMatching(component.params['font'].val, fallback=False)
         if not fontInfo:
             alert(4320, strFields={'param': component.params['font']})
 
@@ -330,6 +350,7 @@ def checkJavaScriptSyntax(component, tab):
     tab: str
         The name of the code component tab being tested
     """
+    from esprima import parseScript  # slow to import
     try:
         parseScript(str(component.params[tab].val))
     except Exception as err:
@@ -3,7 +3,6 @@
 
 import sys
 
-from packaging.version import Version
 
 from .base import DataHandler
 from .routine import Routine
@@ -25,18 +24,14 @@ from .utils import (checkValidFilePath, isValidVariableName, importTrialTypes,
 from .fit import (FitFunction, FitCumNormal, FitLogistic, FitNakaRushton,
                   FitWeibull)
 
-try:
-    # import openpyxl
-    import openpyxl
-    if Version(openpyxl.__version__) >= Version('2.4.0'):
-        # openpyxl moved get_column_letter to utils.cell
-        from openpyxl.utils.cell import get_column_letter
-    else:
-        from openpyxl.cell import get_column_letter
-    from openpyxl.reader.excel import load_workbook
-    haveOpenpyxl = True
-except ImportError:
-    haveOpenpyxl = False
+# openpyxl is slow to import, so it's only imported when it's used
+from .utils import haveOpenpyxl
+from psychopy.tools.lazytools import lazyImport
+lazyImport(globals(), """
+import openpyxl
+from openpyxl.utils.cell import get_column_letter
+from openpyxl.reader.excel import load_workbook
+""")
 
 try:
     import xlrd
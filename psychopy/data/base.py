@@ -11,7 +11,6 @@ import codecs
 import numpy as np
 import pandas as pd
 import json_tricks
-from packaging.version import Version
 
 import psychopy
 from psychopy import logging
@@ -19,19 +18,7 @@ from psychopy.tools.filetools import (openOutputFile, genDelimiter,
                                       genFilenameFromDelimiter, pathToString)
 from psychopy.tools.fileerrortools import handleFileCollision
 from psychopy.tools.arraytools import extendArr
-from .utils import _getExcelCellName
-
-try:
-    import openpyxl
-    if Version(openpyxl.__version__) >= Version('2.4.0'):
-        # openpyxl moved get_column_letter to utils.cell
-        from openpyxl.utils.cell import get_column_letter
-    else:
-        from openpyxl.cell import get_column_letter
-    from openpyxl import load_workbook, Workbook
-    haveOpenpyxl = True
-except ImportError:
-    haveOpenpyxl = False
+from .utils import _getExcelCellName, haveOpenpyxl
 
 _experiments = weakref.WeakValueDictionary()
 
@@ -319,6 +306,7 @@ class _BaseTrialHandler(_ComparisonMixin):
             raise ImportError('openpyxl is required for saving files in'
                               ' Excel (xlsx) format, but was not found.')
             # return -1
+        from openpyxl import load_workbook, Workbook
 
         # create the data array to be sent to the Excel file
         dataArray = self._createOutputArray(stimOut=stimOut,
@@ -7,7 +7,6 @@ import pickle
 import copy
 import warnings
 import numpy as np
-from packaging.version import Version
 
 import psychopy
 from psychopy import logging
@@ -23,18 +22,7 @@ try:
 except ImportError:
     from collections import Iterable
 
-try:
-    # import openpyxl
-    import openpyxl
-    if Version(openpyxl.__version__) >= Version('2.4.0'):
-        # openpyxl moved get_column_letter to utils.cell
-        from openpyxl.utils.cell import get_column_letter
-    else:
-        from openpyxl.cell import get_column_letter
-    from openpyxl.reader.excel import load_workbook
-    haveOpenpyxl = True
-except ImportError:
-    haveOpenpyxl = False
+from .utils import haveOpenpyxl
 
 
 class StairHandler(_BaseTrialHandler):
@@ -5,10 +5,14 @@
 # Copyright (C) 2002-2018 Jonathan Peirce (C) 2019-2024 Open Science Tools Ltd.
 # Distributed under the terms of the GNU General Public License (GPL).
 
+import io
 import os
+import importlib.util
 import re
 import ast
 import pickle
+import hashlib
+import threading
 import time, datetime
 import numpy as np
 import pandas as pd
@@ -16,21 +20,13 @@ import pandas as pd
 from collections import OrderedDict
 from packaging.version import Version
 
-from psychopy import logging, exceptions
+from psychopy import logging, exceptions, __version__
 from psychopy.tools.filetools import pathToString
 from psychopy.localization import _translate
 
-try:
-    import openpyxl
-    if Version(openpyxl.__version__) >= Version('2.4.0'):
-        # openpyxl moved get_column_letter to utils.cell
-        from openpyxl.utils.cell import get_column_letter
-    else:
-        from openpyxl.cell import get_column_letter
-    from openpyxl.reader.excel import load_workbook
-    haveOpenpyxl = True
-except ImportError:
-    haveOpenpyxl = False
+# openpyxl is slow to import, so it's only imported to read or write Excel
+# files
+haveOpenpyxl = importlib.util.find_spec('openpyxl') is not None
 
 haveXlrd = False
 
@@ -123,6 +119,7 @@ def _getExcelCellName(col, row):
     >>> _getExcelCellName(2,1)
     'C2'
     """
+    from openpyxl.utils.cell import get_column_letter
     # BEWARE - openpyxl uses indexing at 1, to fit with Excel
     return "%s%i" % (get_column_letter(col + 1), row + 1)
 
@@ -213,6 +210,162 @@ def listFromString(val, excludeEmpties=False):
     return asList
 
 
+# number of parsed conditions files kept, in memory and in the user cache
+# folder
+CONDITIONS_CACHE_SIZE = 64
+
+# parsed conditions files, keyed by absolute path, least recently used first
+_parsedConditions = OrderedDict()
+_parsedConditionsLock = threading.Lock()
+
+
+def _conditionsStamp(fileName):
+    """Identifies the version of a conditions file (and of PsychoPy, which
+    parses it)."""
+    stat = os.stat(fileName)
+    return __version__, stat.st_mtime_ns, stat.st_size
+
+
+def _getConditionsCacheFile(fileName):
+    from psychopy import prefs
+    name = hashlib.sha1(os.path.abspath(fileName).encode('utf-8')).hexdigest()
+    return os.path.join(prefs.paths['userCacheDir'], 'conditions',
+                        name + '.pickle')
+
+
+def _keepParsedConditions(key, cached):
+    """Keep parsed conditions in memory, forgetting the least recently used
+    files beyond `CONDITIONS_CACHE_SIZE`."""
+    with _parsedConditionsLock:
+        _parsedConditions[key] = cached
+        _parsedConditions.move_to_end(key)
+        while len(_parsedConditions) > CONDITIONS_CACHE_SIZE:
+            _parsedConditions.popitem(last=False)
+
+
+def _pruneConditionsCache(folder):
+    """Remove the least recently used files from the conditions cache folder,
+    so it holds at most `CONDITIONS_CACHE_SIZE` files."""
+    try:
+        entries = [entry for entry in os.scandir(folder)
+                   if entry.name.endswith('.pickle')]
+        if len(entries) <= CONDITIONS_CACHE_SIZE:
+            return
+        entries.sort(key=lambda entry: entry.stat().st_mtime_ns)
+        for entry in entries[:len(entries) - CONDITIONS_CACHE_SIZE]:
+            os.remove(entry.path)
+    except OSError as err:
+        logging.debug(u"Could not prune conditions cache {}: {}".format(
+            folder, err))
+
+
+def _loadParsedConditions(fileName, stamp):
+    """Get the trial list and field names parsed from a conditions file
+    before, from memory or the user cache folder.
+
+    Returns None if the file hasn't been parsed or has changed since.
+    """
+    key = os.path.abspath(fileName)
+    with _parsedConditionsLock:
+        cached = _parsedConditions.get(key)
+    if cached is None:
+        cacheFile = _getConditionsCacheFile(fileName)
+        try:
+            with open(cacheFile, 'rb') as f:
+                cached = pickle.load(f)
+            # mark the file as recently used, so it isn't pruned
+            os.utime(cacheFile)
+        except Exception:
+            return None
+    if cached[0] != stamp:
+        return None
+
+    _keepParsedConditions(key, cached)
+    # unpickle, so every caller gets its own copy of the conditions
+    return pickle.loads(cached[1])
+
+
+def _saveParsedConditions(fileName, stamp, trialList, fieldNames):
+    """Keep the trial list and field names parsed from a conditions file, in
+    memory and in the user cache folder."""
+    try:
+        parsed = pickle.dumps((trialList, fieldNames),
+                              protocol=pickle.HIGHEST_PROTOCOL)
+    except Exception:
+        return  # conditions which can't be pickled are parsed every time
+    cached = (stamp, parsed)
+    _keepParsedConditions(os.path.abspath(fileName), cached)
+
+    cacheFile = _getConditionsCacheFile(fileName)
+    try:
+        os.makedirs(os.path.dirname(cacheFile), exist_ok=True)
+        tmpFile = '{}.{}.tmp'.format(cacheFile, os.getpid())
+        with open(tmpFile, 'wb') as f:
+            pickle.dump(cached, f, protocol=pickle.HIGHEST_PROTOCOL)
+        os.replace(tmpFile, cacheFile)
+    except OSError as err:
+        logging.debug(u"Could not cache conditions from {}: {}".format(
+            fileName, err))
+        return
+    _pruneConditionsCache(os.path.dirname(cacheFile))
+
+
+def _strCells(values):
+    """Boolean mask of the cells of an object array which are strings."""
+    return np.fromiter((isinstance(val, str) for val in values), dtype=bool,
+                       count=len(values))
+
+
+def _stringsToFloats(column):
+    """Convert the cells of a column which are numbers written as strings
+    (with either `.` or `,` as decimal separator) to floats, leaving the
+    other cells as they are.
+
+    Parameters
+    ----------
+    column : pandas.Series
+        Column read from a conditions file.
+
+    Returns
+    -------
+    pandas.Series or numpy.ndarray
+        The column, as an array of objects if any cell was converted.
+    """
+    values = column.to_numpy(dtype=object).copy()
+    converted = False
+    for i, val in enumerate(values):
+        if not isinstance(val, str):
+            continue
+        try:
+            # float() rather than pandas.to_numeric, which rounds differently
+            values[i] = float(val.replace(",", "."))
+        except ValueError:
+            continue
+        converted = True
+    if not converted:
+        return column
+
+    return values
+
+
+def _unescapeNewlines(dataframe):
+    """Replace escaped line breaks (`\\n`) in the strings of a dataframe with
+    line breaks."""
+    for col in dataframe.columns:
+        values = dataframe[col].to_numpy()
+        if values.dtype != object:
+            continue
+        isStr = _strCells(values)
+        if not isStr.any():
+            continue
+        values = values.copy()
+        values[isStr] = pd.Series(values[isStr], dtype=object).str.replace(
+            '\\n', '\n', regex=False).to_numpy(dtype=object)
+        dataframe[col] = values
+
+    return dataframe
+
+
 def importConditions(fileName, returnFieldNames=False, selection=""):
     """Imports a list of conditions from an .xlsx, .csv, or .pkl file
 
@@ -248,6 +401,9 @@ def importConditions(fileName, returnFieldNames=False, selection=""):
     - slice(-10, 2, None)  # the same as above
     - random(5) * 8  # five random vals 0-7
 
+    Parsed files are cached (in memory and in the user cache folder), so
+    importing a file again is quick until it is modified.
+
     """
 
     def _attemptImport(fileName):
@@ -262,36 +418,46 @@ def importConditions(fileName, returnFieldNames=False, selection=""):
             errs = []
             # list of possible delimiters
             delims = (",", ".", ";", "\t")
+            # read the file once, every attempt parses the same text
+            try:
+                with io.open(fileName, encoding='utf-8-sig', newline='') as f:
+                    text = f.read()
+                attempts = [
+                    # most common in US, EU
+                    (',', '.'),
+                    (';', ','),
+                    # other possible formats
+                    ('\t', '.'),
+                    ('\t', ','),
+                    (';', '.')
+                ]
+            except UnicodeDecodeError:
+                attempts = []  # pandas can't read it either
+            # separator / decimal pairs that read the header wrongly
+            rejected = []
             # try a variety of separator / decimal pairs
-            for sep, dec in [
-                # most common in US, EU
-                (',', '.'), 
-                (';', ','),
-                # other possible formats
-                ('\t', '.'), 
-                ('\t', ','), 
-                (';', '.')
-            ]:
+            for sep, dec in attempts:
                 # try to load
                 try:
-                    thisAttempt = pd.read_csv(
-                        fileName, encoding='utf-8-sig', sep=sep, decimal=dec
-                    )
+                    # check the header before parsing the whole file
+                    columns = pd.read_csv(
+                        io.StringIO(text), sep=sep, decimal=dec, nrows=0
+                    ).columns
                     # if there's only one header, check that it doesn't contain delimiters
                     # (one column with delims probably means it's parsed without error but not
                     # recognised columns correctly)
-                    if len(thisAttempt.columns) == 1:
+                    if len(columns) == 1:
                         for delim in delims:
-                            if delim in thisAttempt.columns[0]:
+                            if delim in columns[0]:
                                 msg = _translate(
                                     "Could not load {}. \n"
                                     "Delimiter in heading: {} in {}."
-                                ).format(fileName, delim, thisAttempt.columns[0])
-                                err = exceptions.ConditionsImportError(msg)
-                                errs.append(err)
-                                raise err
+                                ).format(fileName, delim, columns[0])
+                                rejected.append(
+                                    (sep, dec, exceptions.ConditionsImportError(msg)))
+                                raise rejected[-1][2]
                     # if it's all good, use received array
-                    trialsArr = thisAttempt
+                    trialsArr = pd.read_csv(io.StringIO(text), sep=sep, decimal=dec)
                 except:
                     continue
                 else:
@@ -299,6 +465,15 @@ def importConditions(fileName, returnFieldNames=False, selection=""):
                     _assertValidVarNames(trialsArr.columns, fileName)
                     # skip other pairs now we've got it
                     break
+            if trialsArr is None:
+                # a delimiter in the heading is only the problem if the file
+                # can otherwise be read
+                for sep, dec, err in rejected:
+                    try:
+                        pd.read_csv(io.StringIO(text), sep=sep, decimal=dec)
+                    except:
+                        continue
+                    errs.append(err)
             # if all options failed, raise last error
             if errs and trialsArr is None:
                 raise errs[-1]
@@ -308,13 +483,8 @@ def importConditions(fileName, returnFieldNames=False, selection=""):
                 )
             # if we made it herre, we successfully loaded the file
             for col in trialsArr.columns:
-                for row, cell in enumerate(trialsArr[col]):
-                    if isinstance(cell, str):
-                        tryVal = cell.replace(",", ".")
-                        try:
-                            trialsArr[col][row] = float(tryVal)
-                        except ValueError:
-                            pass
+                if trialsArr[col].dtype == object:
+                    trialsArr[col] = _stringsToFloats(trialsArr[col])
             logging.debug(u"Read csv file with pandas: {}".format(fileName))
         elif fileName.endswith(('.xlsx', '.xlsm')):
             trialsArr = pd.read_excel(fileName, engine='openpyxl')
@@ -365,13 +535,10 @@ def importConditions(fileName, returnFieldNames=False, selection=""):
         """Convert a pandas dataframe to a list of dicts.
         This helper function is used by csv or excel imports via pandas
         """
+        # Check for new line characters in strings, and replace escaped characters
+        dataframe = _unescapeNewlines(dataframe.copy())
         # convert the resulting dataframe to a numpy recarray
         trialsArr = dataframe.to_records(index=False)
-        # Check for new line characters in strings, and replace escaped characters
-        for record in trialsArr:
-            for idx, element in enumerate(record):
-                if isinstance(element, str):
-                    record[idx] = element.replace('\\n', '\n')
         if trialsArr.shape == ():
             # convert 0-D to 1-D with one element:
             trialsArr = trialsArr[np.newaxis]
@@ -401,7 +568,18 @@ def importConditions(fileName, returnFieldNames=False, selection=""):
             trialList.append(thisTrial)
         return trialList, fieldNames
 
-    if (fileName.endswith(('.csv', '.tsv'))
+    # files which haven't changed since they were last imported are not
+    # parsed again
+    stamp = _conditionsStamp(fileName)
+    parsed = None
+    if fileName.endswith(('.csv', '.tsv', '.xlsx', '.xls', '.xlsm')):
+        parsed = _loadParsedConditions(fileName, stamp)
+
+    if parsed is not None:
+        trialList, fieldNames = parsed
+        logging.debug(u"Read cached conditions for {}".format(fileName))
+
+    elif (fileName.endswith(('.csv', '.tsv'))
             or (fileName.endswith(('.xlsx', '.xls', '.xlsm')) and haveXlrd)):
         trialList, fieldNames = _attemptImport(fileName=fileName)
 
@@ -411,6 +589,8 @@ def importConditions(fileName, returnFieldNames=False, selection=""):
                 "openpyxl or xlrd is required for loading excel files, but neither was found.",
                 _translate("openpyxl or xlrd is required for loading excel files, but neither was found.")
             )
+        import openpyxl
+        from openpyxl.reader.excel import load_workbook
 
         # data_only was added in 1.8
         if Version(openpyxl.__version__) < Version('1.8'):
@@ -506,6 +686,10 @@ def importConditions(fileName, returnFieldNames=False, selection=""):
             translated=_translate('Your conditions file should be an xlsx, csv, dlm, tsv or pkl file')
         )
 
+    if parsed is None and fileName.endswith(
+            ('.csv', '.tsv', '.xlsx', '.xls', '.xlsm')):
+        _saveParsedConditions(fileName, stamp, trialList, fieldNames)
+
     # if we have a selection then try to parse it
     if isinstance(selection, str) and len(selection) > 0:
         selection = indicesFromString(selection)
@@ -17,8 +17,10 @@ The code that writes out a *_lastrun.py experiment file is (in order):
 """
 
 from .params import getCodeFromParamStr, Param
-from .components import getInitVals, getComponents, getAllComponents
-from .routines import getAllStandaloneRoutines
+from .components import getInitVals, getComponents, getAllComponents, \
+    getComponentCatalogue, getComponentClass
+from .routines import getAllStandaloneRoutines, \
+    getStandaloneRoutineCatalogue, getStandaloneRoutineClass
 from ._experiment import Experiment
 from .utils import unescapedDollarSign_re, valid_var_re, nonalphanumeric_re
 from psychopy.experiment.utils import CodeGenerationException
@@ -19,7 +19,7 @@ import collections
 import os
 import codecs
 import xml.etree.ElementTree as xml
-from xml.dom import minidom
+from contextlib import contextmanager
 from copy import deepcopy, copy
 from pathlib import Path
 from packaging.version import Version
@@ -34,10 +34,15 @@ from .flow import Flow
 from .loops import TrialHandler, LoopInitiator, \
     LoopTerminator, StairHandler, MultiStairHandler
 from .params import _findParam, Param, legacyParams
+from .resourceindex import ResourceIndex
+from .scriptcache import ScriptCache, writeEntryCode
+from .xmltools import parseExperimentFile, getSettingFromFile, prettyXML
 from psychopy.experiment.routines._base import Routine, BaseStandaloneRoutine
-from psychopy.experiment.routines import getAllStandaloneRoutines
+from psychopy.experiment.routines import getStandaloneRoutineCatalogue
+from psychopy.experiment.catalogue import importElement
 from . import utils, py2js
-from .components import getComponents, getAllComponents, getInitVals
+from .components import getComponentCatalogue, getInitVals
+from .components.settings import SettingsComponent
 
 from psychopy.localization import _translate
 import locale
@@ -93,6 +98,21 @@ pluginComponents = {
     'NoiseStimComponent': "psychopy-visionscience",
 }
 
+# params which need converting from older versions when loaded, any others
+# just take their value from the file. Every name given a conversion in
+# `Experiment._getXMLparam` must be listed (test_legacyXMLParams_complete)
+_legacyXMLParams = frozenset([
+    'storeResponseTime', 'nVertices', 'startTime', 'forceEndTrial',
+    'forceEndTrialOnPress', 'forceEndRoutineOnPress', 'trialList',
+    'trialListFile', 'duration', 'allowedKeys', 'correctIf', 'times',
+    'Before Experiment', 'Begin Experiment', 'Begin Routine', 'Each Frame',
+    'End Routine', 'End Experiment', 'Before JS Experiment',
+    'Begin JS Experiment', 'Begin JS Routine', 'Each JS Frame',
+    'End JS Routine', 'End JS Experiment', 'Saved data folder', 'channel',
+    'choiceLabelsAboveLine', 'lowAnchorText', 'highAnchorText',
+    'customize_everything', 'Resources',
+])
+
 # # Code to generate force list
 # comps = experiment.components.getAllComponents()
 # exp = experiment._experiment.Experiment()
@@ -146,8 +166,7 @@ class Experiment:
         self.requireImport(importName='keyboard',
                            importFrom='psychopy.hardware')
 
-        _settingsComp = getComponents(fetchIcons=False)['SettingsComponent']
-        self.settings = _settingsComp(parentName='', exp=self)
+        self.settings = SettingsComponent(parentName='', exp=self)
         # this will be the xml.dom.minidom.doc object for saving
         self._doc = xml.ElementTree()
         self.namespace = NameSpace(self)  # manage variable names
@@ -162,6 +181,9 @@ class Experiment:
         self._expHandler = TrialHandler(exp=self, name='thisExp')
         self._expHandler.type = 'ExperimentHandler'  # true at run-time
 
+        # code generated for routines, reused when compiling again
+        self._scriptCache = None
+
     def __eq__(self, other):
         if isinstance(other, Experiment):
             # if another experiment, compare filenames
@@ -260,8 +282,109 @@ class Experiment:
         # then check the contents 1-by-1 from the Flow
         self.flow.integrityCheck()
 
-    def writeScript(self, expPath=None, target="PsychoPy", modular=True):
+    @property
+    def scriptCache(self):
+        """Cache of the code generated for the routines of this experiment
+        (`ScriptCache`). It is kept in memory, so compiling the experiment
+        again only generates code for routines which changed.
+        """
+        if self._scriptCache is None:
+            self._scriptCache = ScriptCache()
+
+        return self._scriptCache
+
+    @scriptCache.setter
+    def scriptCache(self, value):
+        self._scriptCache = value
+
+    @contextmanager
+    def _filteredForTarget(self, target):
+        """Remove disabled routines and components, and those not implemented
+        in the target library, until the context exits.
+
+        Writing code changes some params in place, so the state of every
+        param is restored too. This is much cheaper than writing code from a
+        deep copy of the experiment.
+        """
+        # everything with params code is written for
+        elements = [self.settings, self._expHandler]
+        for routine in self.routines.values():
+            if isinstance(routine, Routine):
+                elements.extend(routine)
+            else:
+                elements.append(routine)
+        for entry in self.flow:
+            if isinstance(entry, LoopInitiator):
+                elements.append(entry.loop)
+
+        # keep everything removing routines and components, or writing code,
+        # changes
+        flow = list(self.flow)
+        routines = [(routine, list(routine))
+                    for routine in self.routines.values()
+                    if isinstance(routine, Routine)]
+        params = []
+        statics = []
+        for element in elements:
+            params.append((element.params, dict(element.params)))
+            for param in element.params.values():
+                if hasattr(param, '__dict__'):
+                    params.append((param.__dict__, dict(param.__dict__)))
+            if hasattr(element, 'updatesList'):
+                statics.append((element, list(element.updatesList)))
+
+        try:
+            for key, routine in list(self.routines.items()):
+                # Remove disabled / unimplemented routines
+                if routine.disabled or target not in routine.targets:
+                    for node in self.flow:
+                        if node == routine:
+                            self.flow.removeComponent(node)
+                            if target not in routine.targets:
+                                # If this routine isn't implemented in target library, print alert and mute it
+                                alertCode = 4335 if target == "PsychoPy" else 4340
+                                alert(alertCode, strFields={'comp': type(routine).__name__})
+                # Remove disabled / unimplemented components within routine
+                if isinstance(routine, Routine):
+                    for component in [comp for comp in routine]:
+                        if component.disabled or target not in component.targets:
+                            routine.removeComponent(component)
+                            if component.targets and target not in component.targets:
+                                # If this component isn't implemented in target library, print alert and mute it
+                                alertCode = 4335 if target == "PsychoPy" else 4340
+                                alert(alertCode, strFields={'comp': type(component).__name__})
+            yield
+        finally:
+            self.flow[:] = flow
+            for routine, components in routines:
+                routine[:] = components
+            for attributes, values in params:
+                attributes.clear()
+                attributes.update(values)
+            for component, updatesList in statics:
+                component.updatesList[:] = updatesList
+
+    def writeScript(self, expPath=None, target="PsychoPy", modular=True,
+                    cache=True):
         """Write a PsychoPy script for the experiment
+
+        Parameters
+        ----------
+        expPath : str or None
+            Path the script will be written to.
+        target : str
+            Library to write the script for, 'PsychoPy' or 'PsychoJS'.
+        modular : bool
+            Write JS code as a module.
+        cache : bool or ScriptCache
+            Reuse code generated for routines which have not changed since
+            the last compile. If `True`, the experiment's own `scriptCache` is
+            used.
+
+        Returns
+        -------
+        str
+            The script.
         """
         # self.integrityCheck()
 
@@ -269,6 +392,27 @@ class Experiment:
         # set this so that params write for approp target
         utils.scriptTarget = target
         self.expPath = expPath
+
+        if cache is True:
+            cache = self.scriptCache
+        elif cache is False:
+            cache = None
+
+        # Remove disabled components while writing, but leave the experiment
+        # unchanged afterwards.
+        with self._filteredForTarget(target):
+            if cache is not None:
+                cache.beginCompile(self, target, modular)
+            try:
+                return self._writeScript(target, modular, cache)
+            finally:
+                if cache is not None:
+                    cache.endCompile()
+                # Reset loop state ready for next call to writeScript
+                self.flow._loopList = []
+                self.flow._resetLoopController()
+
+    def _writeScript(self, target, modular, cache):
         script = IndentingBuffer(target=target)  # a string buffer object
 
         # get date info, in format preferred by current locale as set by app:
@@ -278,57 +422,35 @@ class Experiment:
         else:
             localDateTime = data.getDateStr(format="%B %d, %Y, at %H:%M")
 
-        # Remove disabled components, but leave original experiment unchanged.
-        self_copy = deepcopy(self)
-        for key, routine in list(self_copy.routines.items()):  # PY2/3 compat
-            # Remove disabled / unimplemented routines
-            if routine.disabled or target not in routine.targets:
-                for node in self_copy.flow:
-                    if node == routine:
-                        self_copy.flow.removeComponent(node)
-                        if target not in routine.targets:
-                            # If this routine isn't implemented in target library, print alert and mute it
-                            alertCode = 4335 if target == "PsychoPy" else 4340
-                            alert(alertCode, strFields={'comp': type(routine).__name__})
-            # Remove disabled / unimplemented components within routine
-            if isinstance(routine, Routine):
-                for component in [comp for comp in routine]:
-                    if component.disabled or target not in component.targets:
-                        routine.removeComponent(component)
-                        if component.targets and target not in component.targets:
-                            # If this component isn't implemented in target library, print alert and mute it
-                            alertCode = 4335 if target == "PsychoPy" else 4340
-                            alert(alertCode, strFields={'comp': type(component).__name__})
-
         if target == "PsychoPy":
             # Imports
-            self_copy.settings.writeInitCode(script, self_copy.psychopyVersion, localDateTime)
+            self.settings.writeInitCode(script, self.psychopyVersion, localDateTime)
             # Write "run once" code sections
-            for entry in self_copy.flow:
+            for entry in self.flow:
                 # NB each entry is a routine or LoopInitiator/Terminator
-                self_copy._currentRoutine = entry
+                self._currentRoutine = entry
                 if hasattr(entry, 'writePreCode'):
-                    entry.writePreCode(script)
+                    writeEntryCode(entry, 'writePreCode', script, cache=cache)
             # global variables
-            self_copy.settings.writeGlobals(script, version=self_copy.psychopyVersion)
+            self.settings.writeGlobals(script, version=self.psychopyVersion)
             # present info
-            self_copy.settings.writeExpInfoDlgCode(script)
+            self.settings.writeExpInfoDlgCode(script)
             # setup data and saving
-            self_copy.settings.writeDataCode(script)
+            self.settings.writeDataCode(script)
             # make logfile
-            self_copy.settings.writeLoggingCode(script)
+            self.settings.writeLoggingCode(script)
             # setup window
-            self_copy.settings.writeWindowCode(script)  # create our visual.Window()
+            self.settings.writeWindowCode(script)  # create our visual.Window()
             # setup devices
-            self_copy.settings.writeDevicesCode(script)
+            self.settings.writeDevicesCode(script)
             # pause experiment
-            self_copy.settings.writePauseCode(script)
+            self.settings.writePauseCode(script)
             # write the bulk of the experiment code
-            self_copy.flow.writeBody(script)
+            self.flow.writeBody(script, cache=cache)
             # save data
-            self_copy.settings.writeSaveDataCode(script)
+            self.settings.writeSaveDataCode(script)
             # end experiment
-            self_copy.settings.writeEndCode(script)
+            self.settings.writeEndCode(script)
 
             # to do if running as main
             code = (
@@ -337,7 +459,7 @@ class Experiment:
                 "if __name__ == '__main__':\n"
                 "    # call all functions in order\n"
             )
-            if self_copy.settings.params['Show info dlg'].val:
+            if self.settings.params['Show info dlg'].val:
                 # Only show exp info dlg if indicated to by settings
                 code += (
                 "    expInfo = showExpInfoDlg(expInfo=expInfo)\n"
@@ -363,38 +485,38 @@ class Experiment:
         elif target == "PsychoJS":
             script.oneIndent = "  "  # use 2 spaces rather than python 4
 
-            self_copy.settings.writeInitCodeJS(script, self_copy.psychopyVersion,
+            self.settings.writeInitCodeJS(script, self.psychopyVersion,
                                                localDateTime, modular)
 
             script.writeIndentedLines("// Start code blocks for 'Before Experiment'")
-            toWrite = list(self_copy.routines)
-            toWrite.extend(list(self_copy.flow))
-            for entry in self_copy.flow:
+            toWrite = list(self.routines)
+            toWrite.extend(list(self.flow))
+            for entry in self.flow:
                 # NB each entry is a routine or LoopInitiator/Terminator
-                self_copy._currentRoutine = entry
+                self._currentRoutine = entry
                 if hasattr(entry, 'writePreCodeJS') and entry.name in toWrite:
-                    entry.writePreCodeJS(script)
+                    writeEntryCode(entry, 'writePreCodeJS', script, cache=cache)
                     toWrite.remove(entry.name)  # this one's done
 
             # Write window code
-            self_copy.settings.writeWindowCodeJS(script)
+            self.settings.writeWindowCodeJS(script)
 
-            self_copy.flow.writeFlowSchedulerJS(script)
-            self_copy.settings.writeExpSetupCodeJS(script,
-                                                   self_copy.psychopyVersion)
+            self.flow.writeFlowSchedulerJS(script)
+            self.settings.writeExpSetupCodeJS(script,
+                                                   self.psychopyVersion)
 
             # initialise the components for all Routines in a single function
             script.writeIndentedLines("\nasync function experimentInit() {")
             script.setIndentLevel(1, relative=True)
 
             # routine init sections
-            toWrite = list(self_copy.routines)
-            toWrite.extend(list(self_copy.flow))
-            for entry in self_copy.flow:
+            toWrite = list(self.routines)
+            toWrite.extend(list(self.flow))
+            for entry in self.flow:
                 # NB each entry is a routine or LoopInitiator/Terminator
-                self_copy._currentRoutine = entry
+                self._currentRoutine = entry
                 if hasattr(entry, 'writeInitCodeJS') and entry.name in toWrite:
-                    entry.writeInitCodeJS(script)
+                    writeEntryCode(entry, 'writeInitCodeJS', script, cache=cache)
                     toWrite.remove(entry.name)  # this one's done
 
             # create globalClock etc
@@ -412,24 +534,23 @@ class Experiment:
             # Routines once (whether or not they get used) because we're using
             # functions that may or may not get called later.
             # Do the Routines of the experiment first
-            toWrite = list(self_copy.routines)
-            for thisItem in self_copy.flow:
+            toWrite = list(self.routines)
+            for thisItem in self.flow:
                 if thisItem.getType() in ['LoopInitiator', 'LoopTerminator']:
-                    self_copy.flow.writeLoopHandlerJS(script, modular)
+                    self.flow.writeLoopHandlerJS(script, modular)
                 elif thisItem.name in toWrite:
-                    self_copy._currentRoutine = self_copy.routines[thisItem.name]
-                    self_copy._currentRoutine.writeRoutineBeginCodeJS(script, modular)
-                    self_copy._currentRoutine.writeEachFrameCodeJS(script, modular)
-                    self_copy._currentRoutine.writeRoutineEndCodeJS(script, modular)
+                    self._currentRoutine = self.routines[thisItem.name]
+                    for methodName in ('writeRoutineBeginCodeJS',
+                                       'writeEachFrameCodeJS',
+                                       'writeRoutineEndCodeJS'):
+                        writeEntryCode(self._currentRoutine, methodName,
+                                       script, modular, cache=cache)
                     toWrite.remove(thisItem.name)
-            self_copy.settings.writeEndCodeJS(script)
+            self.settings.writeEndCodeJS(script)
 
             # Add JS variable declarations e.g., var msg;
             script = py2js.addVariableDeclarations(script.getvalue(), fileName=self.expPath)
 
-            # Reset loop controller ready for next call to writeScript
-            self_copy.flow._resetLoopController()
-
         return script
 
     @property
@@ -513,9 +634,8 @@ class Experiment:
         self.xmlRoot = self._xml
         # update our document to use the new root
         self._doc._setroot(self.xmlRoot)
-        simpleString = xml.tostring(self.xmlRoot, 'utf-8')
         # convert to a pretty string
-        pretty = minidom.parseString(simpleString).toprettyxml(indent="  ")
+        pretty = prettyXML(self.xmlRoot, indent="  ")
         # make sure we have the correct extension
         if filename.suffix != ".psyexp":
             filename = filename.parent / (filename.stem + ".psyexp")
@@ -558,7 +678,12 @@ class Experiment:
             val = val.replace("&#10;", "\n")
 
         # custom settings (to be used when
-        if valType == 'fixedList':  # convert the string to a list
+        if (name in params and name not in _legacyXMLParams
+                and valType != 'fixedList' and 'olour' not in name
+                and val is not None and val != 'window units'):
+            # most params just take the value from the file
+            params[name].val = val
+        elif valType == 'fixedList':  # convert the string to a list
             try:
                 params[name].val = eval('list({})'.format(val))
             except NameError:  # if val is a single string it will look like variable
@@ -731,8 +856,8 @@ class Experiment:
                         recognised = False
 
         # get the value type and update rate
-        if 'valType' in list(paramNode.keys()):
-            params[name].valType = paramNode.get('valType')
+        if valType is not None:
+            params[name].valType = valType
             # compatibility checks:
             if name in ['allowedKeys'] and paramNode.get('valType') == 'str':
                 # these components were changed in v1.70.00
@@ -742,9 +867,13 @@ class Experiment:
                 params[name].valType = 'str'
             # conversions based on valType
             if params[name].valType == 'bool':
-                params[name].val = eval("%s" % params[name].val)
-        if 'updates' in list(paramNode.keys()):
-            params[name].updates = paramNode.get('updates')
+                if params[name].val in ('True', 'False'):
+                    params[name].val = params[name].val == 'True'
+                else:
+                    params[name].val = eval("%s" % params[name].val)
+        updates = paramNode.get('updates')
+        if updates is not None:
+            params[name].updates = updates
 
         return recognised
 
@@ -773,8 +902,9 @@ class Experiment:
     def loadFromXML(self, filename):
         """Loads an xml file and parses the builder Experiment from it
         """
-        self._doc.parse(filename)
-        root = self._doc.getroot()
+        # files loaded already aren't parsed again unless they've changed
+        root = parseExperimentFile(filename)
+        self._doc._setroot(root)
 
         # some error checking on the version (and report that this isn't valid
         # .psyexp)?
@@ -820,9 +950,10 @@ class Experiment:
             self.setExpName(shortName)
         # fetch routines
         routinesNode = root.find('Routines')
-        allCompons = getAllComponents(
-            self.prefsBuilder['componentsFolders'], fetchIcons=False)
-        allRoutines = getAllStandaloneRoutines(fetchIcons=False)
+        # only the modules of the elements this experiment uses are imported
+        allCompons = getComponentCatalogue(
+            self.prefsBuilder['componentsFolders'])
+        allRoutines = getStandaloneRoutineCatalogue()
         # get each routine node from the list of routines
         for routineNode in routinesNode:
             if routineNode.tag == "Routine":
@@ -847,18 +978,20 @@ class Experiment:
                         component = routine.settings
                     elif componentType in allCompons:
                         # create an actual component of that type
-                        component = allCompons[componentType](
+                        component = importElement(allCompons[componentType])(
                             name=componentNode.get('name'),
                             parentName=routineNode.get('name'), exp=self)
                     elif plugin:
                         # create UnknownPluginComponent instead
-                        component = allCompons['UnknownPluginComponent'](
+                        component = importElement(
+                            allCompons['UnknownPluginComponent'])(
                             name=componentNode.get('name'), compType=componentType,
                             parentName=routineNode.get('name'), exp=self)
                         alert(7105, strFields={'name': componentNode.get('name'), 'plugin': plugin})
                     else:
                         # create UnknownComponent instead
-                        component = allCompons['UnknownComponent'](
+                        component = importElement(
+                            allCompons['UnknownComponent'])(
                             name=componentNode.get('name'), compType=componentType,
                             parentName=routineNode.get('name'), exp=self)
                     component.plugin = plugin
@@ -900,10 +1033,12 @@ class Experiment:
             else:
                 if routineNode.tag in allRoutines:
                     # If not a routine, may be a standalone routine
-                    routine = allRoutines[routineNode.tag](exp=self, name=routineNode.get('name'))
+                    routine = importElement(allRoutines[routineNode.tag])(
+                        exp=self, name=routineNode.get('name'))
                 else:
                     # Otherwise treat as unknown
-                    routine = allRoutines['UnknownRoutine'](exp=self, name=routineNode.get('name'))
+                    routine = importElement(allRoutines['UnknownRoutine'])(
+                        exp=self, name=routineNode.get('name'))
                 # Apply all params
                 for paramNode in routineNode:
                     if paramNode.tag == "Param":
@@ -1058,21 +1193,12 @@ class Experiment:
         int
             0 for piloting mode, 1 for running mode
         """
-        file = str(file)
-        # make and populate xml root element
-        tree = xml.ElementTree()
-        tree.parse(file)
-        # get root
-        root = tree.getroot()
-        # find settings node
-        settings = root.find("Settings")
-        # find param for runMode
-        for child in settings:
-            if child.attrib['name'] == "runMode":
-                # get value
-                return int(child.attrib['val'])
-
-        return 1
+        # only read the file as far as the runMode param
+        runMode = getSettingFromFile(str(file), "runMode")
+        if runMode is None:
+            return 1
+
+        return int(runMode)
 
     def setExpName(self, name):
         self.settings.params['expName'].val = name
@@ -1117,6 +1243,13 @@ class Experiment:
         join = os.path.join
         abspath = os.path.abspath
         srcRoot = os.path.split(self.filename)[0]
+        # look up each path once, read conditions files only when changed
+        index = ResourceIndex()
+        foundInFiles = {}
+
+        def resourceKey(thisFile):
+            """Hashable equivalent of a resource dict, to find duplicates"""
+            return tuple(sorted(thisFile.items()))
 
         def getPaths(filePath):
             """Helper to return absolute and relative paths (or None)
@@ -1134,13 +1267,13 @@ class Experiment:
             #    Path('C:/test/test.xlsx').is_absolute() returns False
             #    Path('/folder/file.xlsx').relative_to('/Applications') gives error
             #    but os.path.relpath('/folder/file.xlsx', '/Applications') correctly uses ../
-            if filePath in list(ft.defaultStim):
+            if filePath in ft.defaultStim:
                 # Default/asset stim are a special case as the file doesn't exist in the usual path
                 thisFile['rel'] = thisFile['abs'] = "https://pavlovia.org/assets/default/" + ft.defaultStim[filePath]
                 thisFile['name'] = filePath
                 return thisFile
             if len(filePath) > 2 and (filePath[0] == "/" or filePath[1] == ":")\
-                    and os.path.isfile(filePath):
+                    and index.isfile(filePath):
                 thisFile['abs'] = filePath
                 thisFile['rel'] = os.path.relpath(filePath, srcRoot)
                 thisFile['name'] = Path(filePath).name
@@ -1152,7 +1285,7 @@ class Experiment:
                     thisFile['name'] = filePath.split("/")[-1]
                 else:
                     thisFile['name'] = filePath
-                if len(thisFile['abs']) <= 256 and os.path.isfile(thisFile['abs']):
+                if len(thisFile['abs']) <= 256 and index.isfile(thisFile['abs']):
                     return thisFile
 
         def findPathsInFile(filePath):
@@ -1162,6 +1295,16 @@ class Experiment:
             :param filePath: str to a potential file path (rel or abs)
             :return: list of dicts{'rel','abs'} of valid file paths
             """
+            # the same file is often referred to many times
+            if not isinstance(filePath, str):
+                return searchFile(filePath)
+            if filePath not in foundInFiles:
+                foundInFiles[filePath] = searchFile(filePath)
+            return [dict(thisFile) for thisFile in foundInFiles[filePath]]
+
+        def searchFile(filePath):
+            """Search a conditions file for file paths, see findPathsInFile
+            """
             # Clean up filePath that cannot be eval'd
             if filePath.startswith('$'):
                 try:
@@ -1177,6 +1320,8 @@ class Experiment:
                             # NB potentially make this search recursive with
                             # '**/*.xlsx' but then need to exclude 'data/*.xlsx'
                             spreadsheets.extend(expFolder.glob(pattern))
+                        index.prefetchConditions(
+                            [str(condFile) for condFile in spreadsheets])
                         files = []
                         for condFile in spreadsheets:
                             # call the function recursively for each excel file
@@ -1190,27 +1335,35 @@ class Experiment:
             if not thisFile:
                 return paths
             # OK, this file itself is valid so add to resources
-            if thisFile not in paths:
-                paths.append(thisFile)
+            paths.append(thisFile)
             # does it look at all like an excel file?
             if (not isinstance(filePath, str)
                     or not os.path.splitext(filePath)[1] in ['.csv', '.xlsx',
                                                              '.xls']):
                 return paths
-            conds = data.importConditions(thisFile['abs'])  # load the abs path
-            for thisCond in conds:  # thisCond is a dict
-                for param, val in list(thisCond.items()):
-                    if isinstance(val, str) and len(val):
-                        # only add unique entries (can't use set() on a dict)
-                        for thisFile in findPathsInFile(val):
-                            if thisFile not in paths:
-                                paths.append(thisFile)
+            # only add unique entries (can't use set() on a dict)
+            found = {resourceKey(thisFile)}
+            # load the abs path
+            for val in index.getConditionsStrings(thisFile['abs']):
+                for thisFile in findPathsInFile(val):
+                    key = resourceKey(thisFile)
+                    if key not in found:
+                        found.add(key)
+                        paths.append(thisFile)
 
             return paths
 
         # Get resources for components
         compResources = []
+        compResourceKeys = set()
         handled = False
+
+        def addCompResource(thisFile):
+            """Add a valid path to compResources if not yet included"""
+            if thisFile and resourceKey(thisFile) not in compResourceKeys:
+                compResourceKeys.add(resourceKey(thisFile))
+                compResources.append(thisFile)
+
         for thisEntry in self.flow.getUniqueEntries():
             if thisEntry.getType() == 'Routine':
                 # find all params of all compons and check if valid filename
@@ -1229,15 +1382,11 @@ class Experiment:
                             # Survey IDs are a special case, they need adding verbatim, no path sanitizing
                             thisFile = {'surveyId': thisParam.val}
                         # then check if it's a valid path and not yet included
-                        if thisFile and thisFile not in compResources:
-                            compResources.append(thisFile)
+                        addCompResource(thisFile)
                         # if param updates on frame/repeat, check its init val too
                         if hasattr(thisParam, "updates") and thisParam.updates != "constant":
                             inits = getInitVals({paramName: thisParam})
-                            thisFile = getPaths(inits[paramName].val)
-                            # then check if it's a valid path and not yet included
-                            if thisFile and thisFile not in compResources:
-                                compResources.append(thisFile)
+                            addCompResource(getPaths(inits[paramName].val))
             elif isinstance(thisEntry, BaseStandaloneRoutine):
                 for paramName in thisEntry.params:
                     thisParam = thisEntry.params[paramName]
@@ -1250,15 +1399,11 @@ class Experiment:
                         # Survey IDs are a special case, they need adding verbatim, no path sanitizing
                         thisFile = {'surveyId': thisParam.val}
                     # then check if it's a valid path and not yet included
-                    if thisFile and thisFile not in compResources:
-                        compResources.append(thisFile)
+                    addCompResource(thisFile)
                     # if param updates on frame/repeat, check its init val too
                     if hasattr(thisParam, "updates") and thisParam.updates != "constant":
                         inits = getInitVals({paramName: thisParam})
-                        thisFile = getPaths(inits[paramName].val)
-                        # then check if it's a valid path and not yet included
-                        if thisFile and thisFile not in compResources:
-                            compResources.append(thisFile)
+                        addCompResource(getPaths(inits[paramName].val))
             elif thisEntry.getType() == 'LoopInitiator' and "Stair" in thisEntry.loop.type:
                 url = 'https://lib.pavlovia.org/vendors/jsQUEST.min.js'
                 compResources.append({
@@ -1279,6 +1424,15 @@ class Experiment:
 
         # Get resources for loops
         loopResources = []
+        # read all the conditions files at once
+        condsFiles = []
+        for thisEntry in self.flow:
+            if thisEntry.getType() == 'LoopInitiator' \
+                    and 'conditionsFile' in thisEntry.loop.params:
+                thisFile = getPaths(thisEntry.loop.params['conditionsFile'].val)
+                if thisFile:
+                    condsFiles.append(thisFile['abs'])
+        index.prefetchConditions(condsFiles)
         for thisEntry in self.flow:
             if thisEntry.getType() == 'LoopInitiator':
                 # find all loops and check for conditions filename
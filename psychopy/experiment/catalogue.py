@@ -0,0 +1,315 @@
+#!/usr/bin/env python
+# -*- coding: utf-8 -*-
+
+# Part of the PsychoPy library
+# Copyright (C) 2002-2018 Jonathan Peirce (C) 2019-2024 Open Science Tools Ltd.
+# Distributed under the terms of the GNU General Public License (GPL).
+"""Catalogue of the components and standalone routines available to Builder.
+
+Finding the elements in a folder means importing every module in it, which
+takes about a second for the built-in components and routines. The catalogue
+keeps what was found in each folder (the class names, their modules,
+categories, targets, icons and parameters), in memory and in the user cache
+folder, so modules only need to be imported when an experiment actually uses
+one of their elements. A folder is imported again when any of its modules is
+modified, or when PsychoPy is updated.
+"""
+
+__all__ = [
+    'ElementCatalogue',
+    'CATALOGUE_VERSION',
+    'getCatalogue',
+    'describeElement',
+    'importElement'
+]
+
+import os
+import pickle
+import threading
+from importlib import import_module
+
+from psychopy import logging, prefs, __version__
+
+# version of the saved catalogue format, catalogues saved in another format
+# are ignored
+CATALOGUE_VERSION = 1
+
+# catalogue shared by the components and routines packages, created by
+# `getCatalogue`
+_catalogue_ = None
+
+# types of parameter values which are kept in the catalogue as they are
+_plainTypes = (str, int, float, bool, type(None))
+
+
+def _getStamp(path):
+    """Modification time of a file or folder, or None if it doesn't exist."""
+    try:
+        return os.stat(path).st_mtime_ns
+    except OSError:
+        return None
+
+
+def _getFolderStamp(folder):
+    """Modification times of the folder and of the modules in it (and in its
+    packages), along with the version of PsychoPy."""
+    stamps = [_getStamp(folder)]
+    try:
+        entries = sorted(os.scandir(folder), key=lambda entry: entry.name)
+    except OSError:
+        return None
+    for entry in entries:
+        if entry.name.endswith('.py'):
+            stamps.append((entry.name, _getStamp(entry.path)))
+        elif entry.is_dir() and not entry.name.startswith(('_', '.')):
+            subStamps = []
+            try:
+                for subEntry in os.scandir(entry.path):
+                    if subEntry.name.endswith('.py'):
+                        subStamps.append(
+                            (subEntry.name, _getStamp(subEntry.path)))
+            except OSError:
+                pass
+            stamps.append((entry.name, tuple(sorted(subStamps))))
+
+    return __version__, tuple(stamps)
+
+
+def _plainValue(val):
+    """Parameter value as something which can be saved in the catalogue."""
+    if isinstance(val, _plainTypes):
+        return val
+    if isinstance(val, (list, tuple)) and all(
+            isinstance(item, _plainTypes) for item in val):
+        return type(val)(val)
+
+    return str(val)
+
+
+def _getParamsSchema(cls, exp):
+    """Names, value types, input types, categories and default values of the
+    parameters of an element, or None if it can't be created without more
+    arguments."""
+    try:
+        try:
+            element = cls(exp=exp, parentName='')
+        except TypeError:
+            element = cls(exp=exp)
+        params = element.params
+    except Exception as err:
+        logging.debug("Cannot get the parameters of `{}`: {}".format(
+            cls.__name__, err))
+        return None
+
+    schema = {}
+    for name, param in params.items():
+        schema[name] = {
+            'valType': getattr(param, 'valType', None),
+            'inputType': getattr(param, 'inputType', None),
+            'categ': getattr(param, 'categ', None),
+            'val': _plainValue(getattr(param, 'val', None)),
+        }
+
+    return schema
+
+
+def describeElement(cls, exp=None):
+    """Describe a component or standalone routine class for the catalogue.
+
+    Parameters
+    ----------
+    cls : type
+        Component or standalone routine class.
+    exp : :class:`~psychopy.experiment.Experiment` or None
+        Experiment to create an instance of the class in, to find its
+        parameters. If `None`, the parameters aren't described.
+
+    Returns
+    -------
+    dict
+        The module and name of the class (`module`, `className`), its
+        `categories`, `targets` and `iconFile`, the parameters it has
+        (`params`, names mapped to their `valType`, `inputType`, `categ` and
+        default `val`, or `None`) and the class itself (`class`, which is not
+        saved).
+
+    """
+    iconFile = getattr(cls, 'iconFile', None)
+
+    return {
+        'module': cls.__module__,
+        'className': cls.__name__,
+        'categories': list(getattr(cls, 'categories', ['Custom'])),
+        'targets': list(getattr(cls, 'targets', [])),
+        'iconFile': None if iconFile is None else str(iconFile),
+        'params': None if exp is None else _getParamsSchema(cls, exp),
+        'class': cls,
+    }
+
+
+def importElement(entry):
+    """Get the class described by an entry of the catalogue, importing its
+    module if needed.
+
+    Parameters
+    ----------
+    entry : dict
+        Entry of the catalogue, as made by :func:`describeElement`.
+
+    Returns
+    -------
+    type
+        The component or standalone routine class.
+
+    """
+    cls = entry.get('class')
+    if cls is None:
+        module = import_module(entry['module'])
+        cls = entry['class'] = getattr(module, entry['className'])
+
+    return cls
+
+
+class ElementCatalogue:
+    """Components or standalone routines found in each folder, without the
+    modules they are defined in needing to be imported.
+
+    Parameters
+    ----------
+    filename : str or None
+        File the catalogue is loaded from and saved to. If `None`, the
+        catalogue is kept in memory only.
+
+    """
+    def __init__(self, filename=None):
+        self.filename = filename
+        # (folder, package) -> (stamp, entries), entries map class names to
+        # the descriptions made by `describeElement`
+        self._folders = {}
+        self._modified = False
+        self._lock = threading.RLock()
+        # number of folders read from the catalogue and imported, for
+        # profiling
+        self.hits = 0
+        self.misses = 0
+        if filename is not None:
+            self.load()
+
+    def load(self):
+        """Load the folders saved by an earlier session."""
+        try:
+            with open(self.filename, 'rb') as f:
+                version, folders = pickle.load(f)
+        except FileNotFoundError:
+            return
+        except Exception:
+            logging.warning(
+                "Ignoring unreadable Builder catalogue '{}'.".format(
+                    self.filename))
+            return
+
+        if version == CATALOGUE_VERSION:
+            with self._lock:
+                for key, record in folders.items():
+                    self._folders.setdefault(key, record)
+
+    def save(self):
+        """Save the catalogue, if any folder has been imported since it was
+        loaded."""
+        if self.filename is None or not self._modified:
+            return
+        with self._lock:
+            # the classes themselves are only kept in memory
+            folders = {}
+            for key, (stamp, entries) in self._folders.items():
+                folders[key] = (stamp, {
+                    name: {field: value for field, value in entry.items()
+                           if field != 'class'}
+                    for name, entry in entries.items()})
+            self._modified = False
+        try:
+            os.makedirs(os.path.dirname(self.filename), exist_ok=True)
+            tmpFile = '{}.{}.tmp'.format(self.filename, os.getpid())
+            with open(tmpFile, 'wb') as f:
+                pickle.dump((CATALOGUE_VERSION, folders), f,
+                            protocol=pickle.HIGHEST_PROTOCOL)
+            os.replace(tmpFile, self.filename)
+        except OSError as err:
+            logging.warning("Cannot write Builder catalogue '{}': {}".format(
+                self.filename, err))
+
+    def clear(self):
+        """Forget all folders found so far."""
+        with self._lock:
+            self._folders.clear()
+            self._modified = True
+
+    def getFolder(self, folder, package, scan):
+        """Get the elements in a folder, importing its modules only if they
+        have changed since they were last imported.
+
+        Parameters
+        ----------
+        folder : str
+            Folder of the package the elements are in.
+        package : str
+            Name of the package.
+        scan : callable
+            Called with the folder and package when the modules need to be
+            imported, returning a dict of the element classes found by name.
+
+        Returns
+        -------
+        dict
+            Entries describing each element (see :func:`describeElement`), by
+            class name.
+
+        """
+        key = (os.path.abspath(folder), package)
+        stamp = _getFolderStamp(folder)
+        with self._lock:
+            record = self._folders.get(key)
+        if stamp is not None and record is not None and record[0] == stamp:
+            self.hits += 1
+            return dict(record[1])
+
+        self.misses += 1
+        logging.debug("Importing Builder elements from '{}'.".format(folder))
+        classes = scan(folder, package)
+        # parameters are found by creating each element in a new experiment
+        from psychopy.experiment._experiment import Experiment
+        exp = Experiment()
+        entries = {name: describeElement(cls, exp)
+                   for name, cls in classes.items()}
+        if stamp is not None:
+            with self._lock:
+                self._folders[key] = (stamp, entries)
+                self._modified = True
+            self.save()
+
+        return dict(entries)
+
+
+def getCatalogue():
+    """Get the catalogue of Builder elements for this session.
+
+    The catalogue is saved in the user cache folder whenever a folder of
+    elements is imported, so later sessions only import the folders which
+    have changed.
+
+    Returns
+    -------
+    :class:`ElementCatalogue`
+        The catalogue for this session.
+
+    """
+    global _catalogue_
+    if _catalogue_ is None:
+        _catalogue_ = ElementCatalogue(
+            os.path.join(prefs.paths['userCacheDir'], 'builderCatalogue.pickle'))
+
+    return _catalogue_
+
+
+if __name__ == "__main__":
+    pass
@@ -162,13 +162,94 @@ def getComponents(folder=None, fetchIcons=True):
        `from psychopy.experiment.components import BaseComponent, Param`
     """
 
+    located = _locateFolder(folder)
+    if located is None:
+        return {}
+    pth, folder, pkg = located
+    if pth not in sys.path:
+        sys.path.insert(0, pth)
+
+    return _importComponents(folder, pkg)
+
+
+def getComponentCatalogue(folderList=()):
+    """Get a description of every available component, from the builtins,
+    plugins and folders, without importing the modules they are defined in.
+
+    Components are only imported when a folder has changed since it was last
+    catalogued (see :mod:`psychopy.experiment.catalogue`), use
+    :func:`getComponentClass` to get the class of a component.
+
+    Parameters
+    ----------
+    folderList : list or tuple
+        List of directories to search for components.
+
+    Returns
+    -------
+    dict
+        Entries describing each component (its module, class name,
+        categories, targets, icon and parameters), by class name.
+
+    """
+    from psychopy.experiment.catalogue import getCatalogue, describeElement
+
+    if isinstance(folderList, str):
+        raise TypeError('folderList should be iterable, not a string')
+    catalogue = getCatalogue()
+    entries = {}
+    for folder in [None] + list(folderList):
+        located = _locateFolder(folder)
+        if located is None:
+            continue
+        pth, folder, pkg = located
+        if pth not in sys.path:
+            sys.path.insert(0, pth)
+        entries.update(catalogue.getFolder(folder, pkg, _importComponents))
+
+    # components registered by plugins are imported already
+    for name, compClass in pluginComponents.items():
+        entries[name] = describeElement(compClass)
+
+    return entries
+
+
+def getComponentClass(name, folderList=()):
+    """Get the class of a component, importing only the module it is defined
+    in.
+
+    Parameters
+    ----------
+    name : str
+        Class name of the component, e.g. `'TextComponent'`.
+    folderList : list or tuple
+        List of directories to search for components.
+
+    Returns
+    -------
+    type or None
+        The component class, or `None` if there is no such component.
+
+    """
+    from psychopy.experiment.catalogue import importElement
+
+    entry = getComponentCatalogue(folderList).get(name)
+    if entry is None:
+        return None
+
+    return importElement(entry)
+
+
+def _locateFolder(folder=None):
+    """Get the path to add to `sys.path`, the folder the components are in
+    and the name of their package, or None if there is no such folder."""
     if folder is None:
         pth = folder = dirname(__file__)
         pkg = 'psychopy.experiment.components'
     else:
         # default shared location is often not actually a folder
         if not os.path.isdir(folder):
-            return {}
+            return None
         pth = folder = folder.rstrip(os.sep)
         pkg = os.path.basename(folder)
         if not folder.endswith(join(pkg, pkg)):
@@ -190,9 +271,11 @@ def getComponents(folder=None, fetchIcons=True):
                         continue
                     shutil.copy(f, folder)
 
-    if pth not in sys.path:
-        sys.path.insert(0, pth)
+    return pth, folder, pkg
+
 
+def _importComponents(folder, pkg):
+    """Import the components defined in each module of a folder."""
     components = {}
 
     # go through components in directory
@@ -10,9 +10,10 @@
 
 from xml.etree.ElementTree import Element
 
-from psychopy.experiment import getAllStandaloneRoutines
+from psychopy.experiment import getStandaloneRoutineCatalogue
 from psychopy.experiment.routines._base import Routine, BaseStandaloneRoutine
 from psychopy.experiment.loops import LoopTerminator, LoopInitiator
+from psychopy.experiment.scriptcache import writeEntryCode
 from psychopy.tools import filetools as ft
 from psychopy.preferences import prefs
 
@@ -121,7 +122,7 @@ class Flow(list):
                         toBeRemoved.append(comp)
             for comp in toBeRemoved:
                 self.remove(comp)
-        elif component.getType() in ['Routine'] + list(getAllStandaloneRoutines()):
+        elif component.getType() in ['Routine'] + list(getStandaloneRoutineCatalogue()):
             if id is None:
                 # a Routine may come up multiple times - remove them all
                 # self.remove(component)  # can't do this - two empty routines
@@ -227,8 +228,16 @@ class Flow(list):
             if hasattr(entry, 'writeStartCode'):
                 entry.writeStartCode(script)
 
-    def writeBody(self, script):
+    def writeBody(self, script, cache=None):
         """Write the rest of the code
+
+        Parameters
+        ----------
+        script : IndentingBuffer
+            Buffer to write the code to.
+        cache : ScriptCache or None
+            Cache of code generated for routines, if `None` all code is
+            generated.
         """
         # Open function def
         code = (
@@ -312,8 +321,9 @@ class Flow(list):
             # NB each entry is a routine or LoopInitiator/Terminator
             self._currentRoutine = entry
             if hasattr(entry, 'writeRunOnceInitCode'):
-                entry.writeRunOnceInitCode(script)
-            entry.writeInitCode(script)
+                writeEntryCode(
+                    entry, 'writeRunOnceInitCode', script, cache=cache)
+            writeEntryCode(entry, 'writeInitCode', script, cache=cache)
         # create clocks (after initialising stimuli)
         code = ("\n"
                 "# create some handy timers\n"
@@ -348,13 +358,15 @@ class Flow(list):
         # run-time code
         for entry in self:
             self._currentRoutine = entry
-            entry.writeMainCode(script)
+            writeEntryCode(entry, 'writeMainCode', script, cache=cache)
             if hasattr(entry, "writeRoutineEndCode"):
-                entry.writeRoutineEndCode(script)
+                writeEntryCode(
+                    entry, 'writeRoutineEndCode', script, cache=cache)
         # tear-down code (very few components need this)
         for entry in self:
             self._currentRoutine = entry
-            entry.writeExperimentEndCode(script)
+            writeEntryCode(
+                entry, 'writeExperimentEndCode', script, cache=cache)
 
         # Mark as finished
         code = (
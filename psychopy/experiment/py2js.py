@@ -10,15 +10,17 @@ to JS (ES6/PsychoJS)
 """
 
 import ast
+import functools
+import re
 from pathlib import Path
 
 import astunparse
-import esprima
 from os import path
 from psychopy import logging
 
 from io import StringIO
-from psychopy.experiment.py2js_transpiler import translatePythonToJavaScript
+from psychopy.experiment.py2js_transpiler import translatePythonToJavaScript, \
+    getCachedTranslation, cacheTranslation
 
 
 class TupleTransformer(ast.NodeTransformer):
@@ -54,7 +56,15 @@ def unparse(tree):
 
 
 def expression2js(expr):
-    """Convert a short expression (e.g. a Component Parameter) Python to JS"""
+    """Convert a short expression (e.g. a Component Parameter) Python to JS
+
+    Conversions are cached, so converting the same expression again costs
+    (almost) nothing.
+    """
+    if isinstance(expr, str):
+        jsStr = getCachedTranslation(('expression', expr))
+        if jsStr is not None:
+            return jsStr
 
     # if the code contains a tuple (anywhere), convert parenths to be list.
     # This now works for compounds like `(2*(4, 5))` where the inner
@@ -68,7 +78,7 @@ def expression2js(expr):
             syntaxTree = ast.parse(str(expr))
         except Exception as err:
             logging.error(err)
-            return str(expr)
+            return str(expr)  # not cached, so the error is logged every time
 
     for node in ast.walk(syntaxTree):
         TupleTransformer().visit(node)  # Transform tuples to list
@@ -89,6 +99,8 @@ def expression2js(expr):
         except:
             # If translation fails, just use old translation
             pass
+    if isinstance(expr, str):
+        cacheTranslation(('expression', expr), jsStr)
     return jsStr
 
 
@@ -100,43 +112,110 @@ def snippet2js(expr):
     return expr
 
 
-def findUndeclaredVariables(ast, allUndeclaredVariables):
-    """Detect undeclared variables
+def _findAssignedVariables(ast):
+    """Find the variables assigned to in a function body, in order and
+    including repeats
     """
-    undeclaredVariables = []
+    assignedVariables = []
 
     for expression in ast:
         if expression.type == 'ExpressionStatement':
             expression = expression.expression
             if expression.type == 'AssignmentExpression' and expression.operator == '=' and expression.left.type == 'Identifier':
-                variableName = expression.left.name
-                if variableName not in allUndeclaredVariables:
-                    undeclaredVariables.append(variableName)
-                    allUndeclaredVariables.append(variableName)
+                assignedVariables.append(expression.left.name)
         elif expression.type == 'IfStatement':
             if expression.consequent.body is None:
-                consequentVariables = findUndeclaredVariables(
-                        [expression.consequent], allUndeclaredVariables)
+                assignedVariables.extend(
+                    _findAssignedVariables([expression.consequent]))
             else:
-                consequentVariables = findUndeclaredVariables(
-                    expression.consequent.body, allUndeclaredVariables)
-            undeclaredVariables.extend(consequentVariables)
+                assignedVariables.extend(
+                    _findAssignedVariables(expression.consequent.body))
         elif expression.type == "ReturnStatement":
             if expression.argument.type == "FunctionExpression":
-                consequentVariables = findUndeclaredVariables(
-                    expression.argument.body.body, allUndeclaredVariables)
-                undeclaredVariables.extend(consequentVariables)
-    return undeclaredVariables
+                assignedVariables.extend(
+                    _findAssignedVariables(expression.argument.body.body))
+    return assignedVariables
 
 
-def addVariableDeclarations(inputProgram, fileName):
-    """Transform the input program by adding just before each function
-    a declaration for its undeclared variables
+def findUndeclaredVariables(ast, allUndeclaredVariables):
+    """Detect undeclared variables
     """
+    undeclaredVariables = []
+
+    for variableName in _findAssignedVariables(ast):
+        if variableName not in allUndeclaredVariables:
+            undeclaredVariables.append(variableName)
+            allUndeclaredVariables.append(variableName)
+    return undeclaredVariables
+
+
+# top-level functions of the generated code start at the start of a line
+_functionStart = re.compile(r'^(?:async\s+)?function\b', re.MULTILINE)
 
-    # parse Javascript code into abstract syntax tree:
+
+@functools.lru_cache(maxsize=4096)
+def _scanFunctions(code):
+    """Parse a chunk of JS code and find the top-level functions in it.
+
+    Parameters
+    ----------
+    code : str
+        Code of one or more whole top-level statements.
+
+    Returns
+    -------
+    tuple or None
+        For each function declared, its start within `code` and the variables
+        assigned to in it. None if the code cannot be parsed on its own.
+    """
+    import esprima  # slow to import, so only imported when needed
+    tree = None
+    for parse in (esprima.parseScript, esprima.parseModule):
+        try:
+            tree = parse(code, {'range': True})
+            break
+        except Exception:
+            continue
+    if tree is None:
+        return None
+
+    return tuple(
+        (expression.range[0], tuple(_findAssignedVariables(expression.body.body)))
+        for expression in tree.body
+        if expression.type == 'FunctionDeclaration')
+
+
+def _scanProgram(inputProgram, fileName):
+    """Find the top-level functions of a program and the variables assigned
+    to in each.
+
+    The program is parsed one top-level function at a time, so the functions
+    of code that has not changed since the last compile are not parsed
+    again. If a chunk can't be parsed on its own the whole program is parsed.
+
+    Returns
+    -------
+    list or None
+        Start of each function in the program and the variables assigned to
+        in it. None if the program cannot be parsed.
+    """
+    starts = [match.start() for match in _functionStart.finditer(inputProgram)]
+    bounds = list(zip([0] + starts, starts + [len(inputProgram)]))
+    functions = []
+    for chunkStart, chunkEnd in bounds:
+        if chunkStart == chunkEnd:
+            continue
+        chunkFunctions = _scanFunctions(inputProgram[chunkStart:chunkEnd])
+        if chunkFunctions is None:
+            break
+        functions.extend((chunkStart + start, assigned)
+                         for start, assigned in chunkFunctions)
+    else:
+        return functions
+
+    # parse javascript code into abstract syntax tree:
     # NB: esprima: https://media.readthedocs.org/pdf/esprima/4.0/esprima.pdf
-    fileName = Path(str(fileName))
+    import esprima
     try:
         ast = esprima.parseScript(inputProgram, {'range': True, 'tolerant': True})
     except esprima.error_handler.Error as err:
@@ -145,30 +224,44 @@ def addVariableDeclarations(inputProgram, fileName):
         else:
             logging.error(f"Error parsing JS: {err}")
         logging.flush()
+        return None
+
+    return [(expression.range[0], _findAssignedVariables(expression.body.body))
+            for expression in ast.body
+            if expression.type == 'FunctionDeclaration']
+
+
+def addVariableDeclarations(inputProgram, fileName):
+    """Transform the input program by adding just before each function
+    a declaration for its undeclared variables
+    """
+    fileName = Path(str(fileName))
+    functions = _scanProgram(inputProgram, fileName)
+    if functions is None:
         return inputProgram  # So JS can be written to file
 
     # find undeclared vars in functions and declare them before the function
-    outputProgram = inputProgram
-    offset = 0
-    allUndeclaredVariables = []
-
-    for expression in ast.body:
-        if expression.type == 'FunctionDeclaration':
-            # find all undeclared variables:
-            undeclaredVariables = findUndeclaredVariables(expression.body.body,
-                                                          allUndeclaredVariables)
-
-            # add declarations (var) just before the function:
-            funSpacing = ['', '\n'][len(undeclaredVariables) > 0]  # for consistent function spacing
-            declaration = funSpacing + '\n'.join(['var ' + variable + ';' for variable in
-                                     undeclaredVariables]) + '\n'
-            startIndex = expression.range[0] + offset
-            outputProgram = outputProgram[
-                            :startIndex] + declaration + outputProgram[
-                                                         startIndex:]
-            offset += len(declaration)
-
-    return outputProgram
+    chunks = []
+    lastIndex = 0
+    allUndeclaredVariables = set()
+
+    for startIndex, assignedVariables in functions:
+        undeclaredVariables = []
+        for variable in assignedVariables:
+            if variable not in allUndeclaredVariables:
+                undeclaredVariables.append(variable)
+                allUndeclaredVariables.add(variable)
+
+        # add declarations (var) just before the function:
+        funSpacing = ['', '\n'][len(undeclaredVariables) > 0]  # for consistent function spacing
+        declaration = funSpacing + '\n'.join(['var ' + variable + ';' for variable in
+                                 undeclaredVariables]) + '\n'
+        chunks.append(inputProgram[lastIndex:startIndex])
+        chunks.append(declaration)
+        lastIndex = startIndex
+    chunks.append(inputProgram[lastIndex:])
+
+    return ''.join(chunks)
 
 
 if __name__ == '__main__':
@@ -6,8 +6,11 @@
 # Distributed under the terms of the GNU General Public License (GPL).
 
 import ast
+import os
+import pickle
 import sys
 import re
+import time
 
 try:
     from metapensiero.pj.api import translates
@@ -16,6 +19,22 @@ except ImportError:
 
 import astunparse
 
+import psychopy
+from psychopy import logging
+
+# translations made already, keyed by what was translated
+_translationCache = {}
+
+# most translations kept, the oldest are forgotten first
+TRANSLATION_CACHE_SIZE = 20000
+
+# whether translations were made since the cache was last loaded or saved
+_translationCacheChanged = False
+
+# seconds to wait for another process saving the cache file, after which its
+# lock is taken to be left over from a process which crashed
+TRANSLATION_CACHE_LOCK_TIMEOUT = 10
+
 
 namesJS = {
     'sin': 'Math.sin',
@@ -542,15 +561,170 @@ def transformPsychoJsCode(psychoJsCode, addons, namespace=[]):
     return transformedPsychoJSCode
 
 
-def translatePythonToJavaScript(psychoPyCode, namespace=[]):
-    """Translate PsychoPy python code into PsychoJS JavaScript code.
+def getCachedTranslation(key):
+    """Get a translation made already.
+
+    Args:
+        key (tuple): what was translated, e.g. `('python', code)`
+
+    Returns:
+        the translation, or None if there is none
+    """
+    return _translationCache.get(key)
+
+
+def cacheTranslation(key, translation):
+    """Keep a translation, so the same code need not be translated again.
+
+    Args:
+        key (tuple): what was translated, e.g. `('python', code)`
+        translation: the result of translating it
+    """
+    global _translationCacheChanged
+    _translationCacheChanged = True
+    if key not in _translationCache and \
+            len(_translationCache) >= TRANSLATION_CACHE_SIZE:
+        # forget the oldest translation
+        _translationCache.pop(next(iter(_translationCache), None), None)
+    _translationCache[key] = translation
+
+
+def clearTranslationCache():
+    """Forget all translations made so far."""
+    global _translationCacheChanged
+    _translationCache.clear()
+    _translationCacheChanged = False
+
+
+def _getTranslationCacheFile(filename=None):
+    if filename is None:
+        from psychopy import prefs
+        filename = os.path.join(prefs.paths['userCacheDir'], 'py2js.pickle')
+    return str(filename)
+
+
+def _readTranslationCache(filename):
+    """Read the translations saved in a file by this version of PsychoPy."""
+    try:
+        with open(filename, 'rb') as f:
+            version, translations = pickle.load(f)
+    except FileNotFoundError:
+        return {}
+    except Exception:
+        logging.warning(
+            "Ignoring unreadable translation cache '{}'.".format(filename))
+        return {}
+
+    if version != psychopy.__version__:
+        return {}
+    return translations
+
+
+def _mergeTranslations(translations):
+    """Keep the translations read from a file which aren't cached already."""
+    for key, translation in translations.items():
+        if key not in _translationCache:
+            cacheTranslation(key, translation)
+
+
+def _lockTranslationCache(filename):
+    """Take the lock file of a translation cache file, so that processes
+    saving it at the same time don't lose each other's translations.
+
+    Returns:
+        str or None: the lock file, to remove when done, or None if it could
+            not be taken
+    """
+    lockFile = filename + '.lock'
+    t0 = time.time()
+    while True:
+        try:
+            os.close(os.open(lockFile, os.O_CREAT | os.O_EXCL | os.O_WRONLY))
+            return lockFile
+        except FileExistsError:
+            try:
+                age = time.time() - os.path.getmtime(lockFile)
+            except OSError:
+                continue  # just removed by its owner
+            if time.time() - t0 > TRANSLATION_CACHE_LOCK_TIMEOUT:
+                return None
+            elif age > TRANSLATION_CACHE_LOCK_TIMEOUT:
+                # left over by a process which crashed while saving
+                try:
+                    os.remove(lockFile)
+                except OSError:
+                    pass
+            else:
+                time.sleep(0.01)
+        except OSError:
+            return None
+
+
+def loadTranslationCache(filename=None):
+    """Load translations saved by `saveTranslationCache`, e.g. by an earlier
+    session. Translations saved by another version of PsychoPy are ignored.
+
+    Args:
+        filename (str, None): file to load from, defaults to a file in the
+            user cache folder
+    """
+    global _translationCacheChanged
+    changed = _translationCacheChanged
+    _mergeTranslations(_readTranslationCache(_getTranslationCacheFile(filename)))
+    _translationCacheChanged = changed
+
+
+def saveTranslationCache(filename=None):
+    """Save the translations made so far to a file, along with those saved in
+    it already. Nothing is written if no translations were made since the
+    cache was last loaded or saved, so this is best called once, when a
+    session or process ends, rather than after every translation.
+
+    Args:
+        filename (str, None): file to save to, defaults to a file in the user
+            cache folder
+    """
+    global _translationCacheChanged
+    if not _translationCacheChanged:
+        return
+    filename = _getTranslationCacheFile(filename)
+    try:
+        os.makedirs(os.path.dirname(filename), exist_ok=True)
+    except OSError as err:
+        logging.warning("Cannot write translation cache '{}': {}".format(
+            filename, err))
+        return
+    lockFile = _lockTranslationCache(filename)
+    if lockFile is None:
+        logging.warning(
+            "Not saving translation cache '{}', it is locked by another "
+            "process.".format(filename))
+        return
+    try:
+        # keep translations saved by other processes since it was loaded
+        _mergeTranslations(_readTranslationCache(filename))
+        tmpFile = '{}.{}.tmp'.format(filename, os.getpid())
+        with open(tmpFile, 'wb') as f:
+            pickle.dump((psychopy.__version__, dict(_translationCache)), f,
+                        protocol=pickle.HIGHEST_PROTOCOL)
+        os.replace(tmpFile, filename)
+        _translationCacheChanged = False
+    except OSError as err:
+        logging.warning("Cannot write translation cache '{}': {}".format(
+            filename, err))
+    finally:
+        os.remove(lockFile)
+
+
+def _translatePythonCode(psychoPyCode):
+    """Translate PsychoPy python code into PsychoJS JavaScript code, before
+    removing the declarations of variables already defined.
 
     Args:
         psychoPyCode (str): the input PsychoPy python code
-        namespace (list, None): list of varnames which are already defined
 
     Returns:
-        str: the PsychoJS JavaScript code
+        (str, list): the PsychoJS JavaScript code and the addons it needs
 
     Raises:
         (Exception): whenever a step of the translation process failed
@@ -587,6 +761,36 @@ def translatePythonToJavaScript(psychoPyCode, namespace=[]):
         raise Exception(
             'unable to translate the transformed PsychoPy code into PsychoJS JavaScript code: ' + str(error))
 
+    return psychoJsCode, addons
+
+
+def translatePythonToJavaScript(psychoPyCode, namespace=[]):
+    """Translate PsychoPy python code into PsychoJS JavaScript code.
+
+    Translations are cached, so translating the same code again (e.g. when
+    an experiment is compiled again) only has to remove the declarations of
+    variables in `namespace`.
+
+    Args:
+        psychoPyCode (str): the input PsychoPy python code
+        namespace (list, None): list of varnames which are already defined
+
+    Returns:
+        str: the PsychoJS JavaScript code
+
+    Raises:
+        (Exception): whenever a step of the translation process failed
+    """
+    key = ('python', psychoPyCode)
+    translation = getCachedTranslation(key)
+    if translation is None:
+        # failures raise before being cached, so they are tried again
+        psychoJsCode, addons = _translatePythonCode(psychoPyCode)
+        translation = (psychoJsCode, tuple(addons))
+        cacheTranslation(key, translation)
+
+    psychoJsCode, addons = translation
+
     # transform the JavaScript code:
     try:
         transformedPsychoJsCode = transformPsychoJsCode(psychoJsCode, addons, namespace=namespace)
@@ -0,0 +1,167 @@
+#!/usr/bin/env python
+# -*- coding: utf-8 -*-
+
+# Part of the PsychoPy library
+# Copyright (C) 2002-2018 Jonathan Peirce (C) 2019-2024 Open Science Tools Ltd.
+# Distributed under the terms of the GNU General Public License (GPL).
+
+"""Index of the files an experiment may use, for finding its resources.
+
+Finding the resources of an experiment looks up many candidate paths (every
+string param of every component, every cell of every conditions file) and
+reads the conditions files, often more than once. :class:`ResourceIndex`
+remembers which paths are files for the duration of a search, and the
+contents of the most recently used conditions files are kept between searches
+until the file changes.
+"""
+
+__all__ = [
+    'ResourceIndex',
+    'clearConditionsCache'
+]
+
+import os
+import threading
+from collections import OrderedDict
+from concurrent.futures import ThreadPoolExecutor
+
+from psychopy import data
+from psychopy.data import utils as dataUtils
+
+# strings in each conditions file, keyed by absolute path, least recently used
+# first, as many files are kept as `data.utils.CONDITIONS_CACHE_SIZE`
+_conditionsCache = OrderedDict()
+_conditionsLock = threading.Lock()
+
+
+def clearConditionsCache():
+    """Forget the contents of all conditions files read so far."""
+    with _conditionsLock:
+        _conditionsCache.clear()
+
+
+def _fileStamp(filename):
+    """Modification time and size of a file, which change when it is
+    edited."""
+    stat = os.stat(filename)
+    return stat.st_mtime_ns, stat.st_size
+
+
+def _readConditionsStrings(filename):
+    """Read the non-empty strings from the cells of a conditions file."""
+    strings = []
+    for thisCond in data.importConditions(filename):
+        for val in thisCond.values():
+            if isinstance(val, str) and len(val):
+                strings.append(val)
+
+    return tuple(strings)
+
+
+class ResourceIndex:
+    """Memoised file system lookups for finding the resources of an
+    experiment.
+
+    Whether a path is a file is looked up once per index, so an index should
+    only be used for one search. The strings in the most recently used
+    conditions files are kept between indexes, until the file is modified.
+
+    Parameters
+    ----------
+    nThreads : int or None
+        Number of threads reading conditions files in `prefetchConditions`.
+        Defaults to the number of CPUs (at most 8).
+
+    """
+    def __init__(self, nThreads=None):
+        if nThreads is None:
+            nThreads = min(8, os.cpu_count() or 1)
+        self.nThreads = max(1, int(nThreads))
+        self._isFile = {}
+
+    def isfile(self, path):
+        """Whether a path is an existing file, like `os.path.isfile`.
+
+        Parameters
+        ----------
+        path : str
+            Path to check.
+
+        Returns
+        -------
+        bool
+            `True` if the path is a file.
+
+        """
+        isFile = self._isFile.get(path)
+        if isFile is None:
+            isFile = self._isFile[path] = os.path.isfile(path)
+
+        return isFile
+
+    def getConditionsStrings(self, filename):
+        """Get the non-empty strings in the cells of a conditions file.
+
+        Parameters
+        ----------
+        filename : str
+            Absolute path to the conditions file.
+
+        Returns
+        -------
+        tuple
+            The strings, row by row.
+
+        Raises
+        ------
+        Exception
+            Whatever `psychopy.data.importConditions` raises for the file.
+
+        """
+        stamp = _fileStamp(filename)
+        with _conditionsLock:
+            cached = _conditionsCache.get(filename)
+            if cached is not None and cached[0] == stamp:
+                _conditionsCache.move_to_end(filename)
+                return cached[1]
+
+        strings = _readConditionsStrings(filename)
+        with _conditionsLock:
+            _conditionsCache[filename] = (stamp, strings)
+            _conditionsCache.move_to_end(filename)
+            while len(_conditionsCache) > dataUtils.CONDITIONS_CACHE_SIZE:
+                _conditionsCache.popitem(last=False)
+
+        return strings
+
+    def prefetchConditions(self, filenames):
+        """Read conditions files in parallel, ready for
+        `getConditionsStrings`.
+
+        Files which cannot be read are skipped here, the error is raised when
+        the file is asked for.
+
+        Parameters
+        ----------
+        filenames : list of str
+            Absolute paths to the conditions files.
+
+        """
+        filenames = [filename for filename in dict.fromkeys(filenames)
+                     if self.isfile(filename)]
+        if len(filenames) < 2 or self.nThreads < 2:
+            return  # nothing to gain, read as they are asked for
+
+        def _prefetch(filename):
+            try:
+                self.getConditionsStrings(filename)
+            except Exception:
+                pass
+
+        with ThreadPoolExecutor(
+                max_workers=min(self.nThreads, len(filenames))) as pool:
+            list(pool.map(_prefetch, filenames))
+
+
+if __name__ == "__main__":
+    pass
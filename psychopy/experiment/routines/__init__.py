@@ -52,6 +52,32 @@ def addStandaloneRoutine(routineClass):
     pluginRoutines[routineName] = routineClass
 
 
+def _getSubclasses(cls, classList=None):
+    """Get a class and all of its subclasses, recursively."""
+    # create list if needed
+    if classList is None:
+        classList = []
+    # add to class list
+    classList.append(cls)
+    # recur for subclasses
+    for subcls in cls.__subclasses__():
+        _getSubclasses(subcls, classList)
+
+    return classList
+
+
+def _importRoutines(folder, pkg):
+    """Import each package in a folder, getting the standalone routines
+    defined in them."""
+    # Safe import all modules within this folder (apart from protected ones with a _)
+    for loc in Path(folder).glob("*"):
+        if loc.is_dir() and not loc.name.startswith("_"):
+            import_module("." + loc.name, package=pkg)
+
+    return {c.__name__: c for c in _getSubclasses(BaseStandaloneRoutine)
+            if c.__module__.startswith(pkg + ".")}
+
+
 def getAllStandaloneRoutines(fetchIcons=True):
     """Get a mapping of all standalone routines.
 
@@ -71,24 +97,10 @@ def getAllStandaloneRoutines(fetchIcons=True):
         those added by plugins.
 
     """
-    # Safe import all modules within this folder (apart from protected ones with a _)
-    for loc in Path(__file__).parent.glob("*"):
-        if loc.is_dir() and not loc.name.startswith("_"):
-            import_module("." + loc.name, package="psychopy.experiment.routines")
+    _importRoutines(Path(__file__).parent, "psychopy.experiment.routines")
 
     # Get list of subclasses of BaseStandalone
-    def getSubclasses(cls, classList=None):
-        # create list if needed
-        if classList is None:
-            classList = []
-        # add to class list
-        classList.append(cls)
-        # recur for subclasses
-        for subcls in cls.__subclasses__():
-            getSubclasses(subcls, classList)
-
-        return classList
-    classList = getSubclasses(BaseStandaloneRoutine)
+    classList = _getSubclasses(BaseStandaloneRoutine)
     # Remove unknown
     #if UnknownRoutine in classList:
     #    classList.remove(UnknownRoutine)
@@ -104,5 +116,60 @@ def getAllStandaloneRoutines(fetchIcons=True):
     return classDict
 
 
+def getStandaloneRoutineCatalogue():
+    """Get a description of every available standalone routine, without
+    importing the modules they are defined in.
+
+    The builtin routines are only imported when they have changed since they
+    were last catalogued (see :mod:`psychopy.experiment.catalogue`), use
+    :func:`getStandaloneRoutineClass` to get the class of a routine.
+
+    Returns
+    -------
+    dict
+        Entries describing each standalone routine (its module, class name,
+        categories, targets, icon and parameters), by class name, including
+        those added by plugins.
+
+    """
+    from psychopy.experiment.catalogue import getCatalogue, describeElement
+
+    entries = getCatalogue().getFolder(
+        str(Path(__file__).parent), "psychopy.experiment.routines",
+        _importRoutines)
+    # routines defined elsewhere which have been imported already
+    for cls in _getSubclasses(BaseStandaloneRoutine):
+        if cls.__name__ not in entries:
+            entries[cls.__name__] = describeElement(cls)
+    for name, cls in pluginRoutines.items():
+        entries[name] = describeElement(cls)
+
+    return entries
+
+
+def getStandaloneRoutineClass(name):
+    """Get the class of a standalone routine, importing only the module it is
+    defined in.
+
+    Parameters
+    ----------
+    name : str
+        Class name of the routine, e.g. `'CounterbalanceRoutine'`.
+
+    Returns
+    -------
+    type or None
+        The routine class, or `None` if there is no such routine.
+
+    """
+    from psychopy.experiment.catalogue import importElement
+
+    entry = getStandaloneRoutineCatalogue().get(name)
+    if entry is None:
+        return None
+
+    return importElement(entry)
+
+
 if __name__ == "__main__":
     pass
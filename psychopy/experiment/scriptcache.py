@@ -0,0 +1,354 @@
+#!/usr/bin/env python
+# -*- coding: utf-8 -*-
+
+# Part of the PsychoPy library
+# Copyright (C) 2002-2018 Jonathan Peirce (C) 2019-2024 Open Science Tools Ltd.
+# Distributed under the terms of the GNU General Public License (GPL).
+
+"""Cache of the code generated for the Routines of an experiment.
+
+Compiling an experiment writes the code for every Routine in the Flow in
+several sections (before the experiment, initialisation, the Routine itself,
+etc.). :class:`ScriptCache` keeps the code written for each section, keyed by
+a fingerprint of the Routine's components and their params, along with
+everything outside the Routine the code can depend on (experiment settings, the
+Flow and its loops, the enclosing loops and the target language). When an
+experiment is compiled again, only the sections of Routines which changed are
+generated, the rest are copied from the cache.
+"""
+
+__all__ = [
+    'ScriptCache',
+    'writeEntryCode'
+]
+
+import hashlib
+import os
+import pickle
+import sys
+import threading
+import xml.etree.ElementTree as xml
+
+import psychopy
+from psychopy import logging
+from psychopy.alerts import addAlertHandler, removeAlertHandler
+from psychopy.alerts._alerts import sendAlert
+from .routines._base import Routine, BaseStandaloneRoutine
+
+# change this when the cache file format changes
+CACHE_FORMAT = 1
+
+# number of compiles a fragment is kept for after it was last used
+DEFAULT_MAX_AGE = 8
+
+
+def _digest(*values):
+    """Fingerprint of the `repr` of some values."""
+    return hashlib.sha1(repr(values).encode('utf-8')).hexdigest()
+
+
+class _AlertRecorder:
+    """Alert handler which keeps the alerts raised while writing code."""
+    def __init__(self):
+        self.alerts = []
+
+    def receiveAlert(self, alert):
+        self.alerts.append(alert)
+
+
+class ScriptCache:
+    """Cache of the code fragments generated for the Routines of an
+    experiment.
+
+    Code is cached for each section of each Routine in the Flow. Fragments
+    which raised alerts are always generated again, so their alerts are shown
+    on every compile. Loops and experiment settings are cheap to write and are
+    always generated.
+
+    Parameters
+    ----------
+    filename : str or None
+        File to keep the cache in between sessions. If `None`, the cache is only
+        kept in memory.
+    maxAge : int
+        Number of compiles a fragment is kept for after it was last used.
+
+    Examples
+    --------
+    Compile an experiment twice, the second time from the cache::
+
+        cache = ScriptCache()
+        script = exp.writeScript(target="PsychoPy", cache=cache)
+        script = exp.writeScript(target="PsychoPy", cache=cache)
+        print(cache.hits, cache.misses)
+
+    """
+    def __init__(self, filename=None, maxAge=DEFAULT_MAX_AGE):
+        self.filename = filename
+        self.maxAge = int(maxAge)
+        self.hits = 0
+        self.misses = 0
+        # key: (code, indentLevel, writtenOnce, attributes, lastUsed)
+        self._fragments = {}
+        self._nCompiles = 0
+        self._context = None
+        self._routineDigests = {}
+        self._classDigests = {}
+        self._dirty = False
+        self._lock = threading.RLock()
+        if filename is not None:
+            self._read()
+
+    @classmethod
+    def forExperimentFile(cls, filename, maxAge=DEFAULT_MAX_AGE):
+        """Get a cache kept on disk for an experiment file.
+
+        Parameters
+        ----------
+        filename : str
+            Path to the `.psyexp` file.
+        maxAge : int
+            Number of compiles a fragment is kept for after it was last used.
+
+        Returns
+        -------
+        ScriptCache
+            Cache kept in the user cache directory.
+
+        """
+        from psychopy import prefs
+        name = hashlib.sha1(
+            os.path.abspath(str(filename)).encode('utf-8')).hexdigest()
+        return cls(
+            os.path.join(prefs.paths['userCacheDir'], 'scriptCache',
+                         name + '.pickle'),
+            maxAge=maxAge)
+
+    def __deepcopy__(self, memo):
+        # copies of an experiment share its cache
+        return self
+
+    def __len__(self):
+        return len(self._fragments)
+
+    def _read(self):
+        try:
+            with open(self.filename, 'rb') as f:
+                version, nCompiles, fragments = pickle.load(f)
+        except FileNotFoundError:
+            return
+        except Exception:
+            # a damaged cache is simply built again
+            logging.warning(
+                "Ignoring unreadable script cache '{}'.".format(self.filename))
+            return
+
+        if version == (CACHE_FORMAT, psychopy.__version__):
+            self._nCompiles = nCompiles
+            self._fragments = fragments
+
+    def save(self):
+        """Write the cache to its file, if it has one and has changed."""
+        if self.filename is None or not self._dirty:
+            return
+
+        with self._lock:
+            data = ((CACHE_FORMAT, psychopy.__version__), self._nCompiles,
+                    self._fragments)
+            try:
+                os.makedirs(os.path.dirname(self.filename), exist_ok=True)
+                tmpFile = self.filename + '.tmp'
+                with open(tmpFile, 'wb') as f:
+                    pickle.dump(data, f, protocol=pickle.HIGHEST_PROTOCOL)
+                os.replace(tmpFile, self.filename)
+            except OSError as err:
+                logging.warning("Cannot write script cache '{}': {}".format(
+                    self.filename, err))
+                return
+            self._dirty = False
+
+    def clear(self):
+        """Remove all fragments from the cache."""
+        with self._lock:
+            self._fragments.clear()
+            self._dirty = True
+
+    def beginCompile(self, exp, target, modular=True):
+        """Start compiling an experiment.
+
+        This takes the fingerprint of everything outside the Routines which
+        generated code can depend on. Call this after disabled Routines and
+        Components have been removed.
+
+        Parameters
+        ----------
+        exp : Experiment
+            Experiment being compiled.
+        target : str
+            Target language, 'PsychoPy' or 'PsychoJS'.
+        modular : bool
+            Whether JS code is written as a module.
+
+        """
+        from psychopy import prefs
+
+        # static periods get updates from components in other routines
+        staticUpdates = []
+        for routine in exp.routines.values():
+            if not isinstance(routine, Routine):
+                continue
+            for comp in routine:
+                if hasattr(comp, 'updatesList'):
+                    staticUpdates.append(
+                        (routine.name, comp.name, comp.updatesList))
+
+        with self._lock:
+            self._nCompiles += 1
+            self._routineDigests = {}
+            self._context = _digest(
+                CACHE_FORMAT, psychopy.__version__, target, bool(modular),
+                str(exp.filename), str(exp.expPath),
+                xml.tostring(exp.settings._xml), xml.tostring(exp.flow._xml),
+                staticUpdates, prefs.userPrefsCfg)
+
+    def endCompile(self):
+        """Finish compiling, dropping old fragments and saving the cache."""
+        with self._lock:
+            oldest = self._nCompiles - self.maxAge
+            stale = [key for key, fragment in self._fragments.items()
+                     if fragment[-1] < oldest]
+            for key in stale:
+                del self._fragments[key]
+            self._dirty = self._dirty or bool(stale)
+            self._context = None
+            self._routineDigests = {}
+
+        self.save()
+
+    def _classDigest(self, cls):
+        """Fingerprint of the source file of a class, so editing the code of
+        a component invalidates it."""
+        digest = self._classDigests.get(cls)
+        if digest is None:
+            module = sys.modules.get(cls.__module__)
+            try:
+                stat = os.stat(module.__file__)
+                digest = (cls.__module__, cls.__name__, stat.st_mtime_ns)
+            except (AttributeError, TypeError, OSError):
+                digest = (cls.__module__, cls.__name__)
+            self._classDigests[cls] = digest
+
+        return digest
+
+    def _routineDigest(self, routine):
+        digest = self._routineDigests.get(id(routine))
+        if digest is None:
+            classes = [self._classDigest(type(routine))]
+            if isinstance(routine, Routine):
+                classes.extend(self._classDigest(type(comp)) for comp in routine)
+            digest = _digest(xml.tostring(routine._xml), classes)
+            self._routineDigests[id(routine)] = digest
+
+        return digest
+
+    def writeCode(self, entry, methodName, buff, *args):
+        """Write the code for a section of a Flow entry, from the cache if
+        possible.
+
+        Parameters
+        ----------
+        entry : Routine, BaseStandaloneRoutine, LoopInitiator or LoopTerminator
+            Entry in the Flow.
+        methodName : str
+            Name of the method of `entry` writing the section, e.g.
+            'writeMainCode'.
+        buff : IndentingBuffer
+            Buffer to write the code to.
+        *args
+            Further arguments for the method.
+
+        """
+        writer = getattr(entry, methodName)
+        if self._context is None or \
+                not isinstance(entry, (Routine, BaseStandaloneRoutine)):
+            writer(buff, *args)
+            return
+
+        exp = entry.exp
+        loops = [loop.params['name'].val for loop in exp.flow._loopList]
+        key = _digest(
+            self._context, self._routineDigest(entry), methodName, args,
+            loops, buff.indentLevel, buff.oneIndent, buff._writtenOnce)
+
+        with self._lock:
+            fragment = self._fragments.get(key)
+            if fragment is not None:
+                code, indentLevel, writtenOnce, attributes, _ = fragment
+                self._fragments[key] = (
+                    code, indentLevel, writtenOnce, attributes,
+                    self._nCompiles)
+                self._dirty = True
+                self.hits += 1
+
+        if fragment is not None:
+            buff.write(code)
+            buff.setIndentLevel(indentLevel)
+            buff._writtenOnce.extend(writtenOnce)
+            for name, value in attributes.items():
+                setattr(entry, name, value)
+            return
+
+        # write into the buffer, noting where the fragment starts
+        start = buff.tell()
+        nWrittenOnce = len(buff._writtenOnce)
+        recorder = _AlertRecorder()
+        addAlertHandler(recorder)
+        try:
+            writer(buff, *args)
+        finally:
+            removeAlertHandler(recorder)
+            # pass on alerts as if they were never intercepted
+            for alert in recorder.alerts:
+                sendAlert(alert)
+
+        with self._lock:
+            self.misses += 1
+            if recorder.alerts:
+                return  # alerts must be raised every compile
+
+            buff.seek(start)
+            code = buff.read()
+            attributes = {}
+            if hasattr(entry, '_clockName'):
+                attributes['_clockName'] = entry._clockName
+            self._fragments[key] = (
+                code, buff.indentLevel, tuple(buff._writtenOnce[nWrittenOnce:]),
+                attributes, self._nCompiles)
+            self._dirty = True
+
+
+def writeEntryCode(entry, methodName, buff, *args, cache=None):
+    """Write the code for a section of a Flow entry.
+
+    Parameters
+    ----------
+    entry : Routine, BaseStandaloneRoutine, LoopInitiator or LoopTerminator
+        Entry in the Flow.
+    methodName : str
+        Name of the method of `entry` writing the section.
+    buff : IndentingBuffer
+        Buffer to write the code to.
+    *args
+        Further arguments for the method.
+    cache : ScriptCache or None
+        Cache to get the code from. If `None`, the code is always generated.
+
+    """
+    if cache is None:
+        getattr(entry, methodName)(buff, *args)
+    else:
+        cache.writeCode(entry, methodName, buff, *args)
+
+
+if __name__ == "__main__":
+    pass
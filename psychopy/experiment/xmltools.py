@@ -0,0 +1,186 @@
+#!/usr/bin/env python
+# -*- coding: utf-8 -*-
+
+# Part of the PsychoPy library
+# Copyright (C) 2002-2018 Jonathan Peirce (C) 2019-2024 Open Science Tools Ltd.
+# Distributed under the terms of the GNU General Public License (GPL).
+"""Reading and writing the XML of .psyexp files.
+
+Experiments are often loaded several times in a session (e.g. the Runner
+reads the run mode of each experiment in its list, then loads the experiment
+to compile it), so parsed files are kept in memory, by the hash of their
+contents. Settings can be read from a file without parsing all of it, and
+experiments are written with the same layout as
+:meth:`xml.dom.minidom.Node.toprettyxml` without building a DOM.
+"""
+
+__all__ = [
+    'parseExperimentFile',
+    'getSettingFromFile',
+    'prettyXML',
+    'clearParseCache'
+]
+
+import re
+import hashlib
+import threading
+import collections
+import xml.etree.ElementTree as xml
+from xml.dom import minidom
+
+# number of parsed files kept in memory
+PARSE_CACHE_SIZE = 16
+
+# file hash -> root element of the parsed file
+_parsedFiles = collections.OrderedDict()
+_parsedFilesLock = threading.Lock()
+
+# characters which can't be written in XML 1.0, files containing them are left
+# to minidom to report
+_invalidXMLChars_re = re.compile(
+    '[\x00-\x08\x0b\x0c\x0e-\x1f\ud800-\udfff\ufffe\uffff]')
+
+
+def parseExperimentFile(filename):
+    """Parse an experiment file, or get it from the files parsed already if
+    its contents haven't changed.
+
+    Parameters
+    ----------
+    filename : str or Path
+        The `.psyexp` file.
+
+    Returns
+    -------
+    :class:`xml.etree.ElementTree.Element`
+        Root element of the file. This may be shared with other experiments
+        loaded from the same file, so it must not be modified.
+
+    """
+    with open(filename, 'rb') as f:
+        contents = f.read()
+    key = hashlib.sha1(contents).hexdigest()
+    with _parsedFilesLock:
+        root = _parsedFiles.get(key)
+        if root is not None:
+            _parsedFiles.move_to_end(key)
+            return root
+
+    parser = xml.XMLParser()
+    parser.feed(contents)
+    root = parser.close()
+    with _parsedFilesLock:
+        _parsedFiles[key] = root
+        while len(_parsedFiles) > PARSE_CACHE_SIZE:
+            _parsedFiles.popitem(last=False)
+
+    return root
+
+
+def clearParseCache():
+    """Forget the files parsed so far."""
+    with _parsedFilesLock:
+        _parsedFiles.clear()
+
+
+def getSettingFromFile(filename, name, default=None):
+    """Get the value of an experiment setting from a file, reading the file
+    only as far as that setting.
+
+    Parameters
+    ----------
+    filename : str or Path
+        The `.psyexp` file.
+    name : str
+        Name of the setting, e.g. `'runMode'`.
+    default : str or None
+        Value to return if the file doesn't have the setting.
+
+    Returns
+    -------
+    str or None
+        The value of the setting, as it is written in the file.
+
+    """
+    inSettings = False
+    with open(filename, 'rb') as f:
+        for event, element in xml.iterparse(f, events=('start', 'end')):
+            if event == 'start':
+                if element.tag == 'Settings':
+                    inSettings = True
+                elif inSettings and element.tag == 'Param' and \
+                        element.get('name') == name:
+                    return element.get('val')
+            elif element.tag == 'Settings':
+                break  # setting isn't in the file
+
+    return default
+
+
+def _writeElement(write, element, indent, addIndent):
+    """Write an element (with no text) and its children, as minidom does."""
+    write(indent + "<" + element.tag)
+    for attrName, value in element.items():
+        if not isinstance(value, str):
+            raise TypeError("cannot serialize {!r} (type {})".format(
+                value, type(value).__name__))
+        value = value.replace("&", "&amp;").replace("<", "&lt;").replace(
+            "\"", "&quot;").replace(">", "&gt;")
+        write(" " + attrName + "=\"" + value + "\"")
+    if len(element):
+        write(">\n")
+        for child in element:
+            _writeElement(write, child, indent + addIndent, addIndent)
+        write(indent + "</" + element.tag + ">\n")
+    else:
+        write("/>\n")
+
+
+def _isPlain(root):
+    """Whether a tree only has elements with attributes, which can be written
+    without minidom."""
+    for element in root.iter():
+        if not isinstance(element.tag, str) or '{' in element.tag or \
+                element.text or element.tail:
+            return False
+        for attrName, value in element.items():
+            if isinstance(value, str) and _invalidXMLChars_re.search(value):
+                return False
+
+    return True
+
+
+def prettyXML(root, indent="  "):
+    """Write an element tree as indented XML.
+
+    The result is the same as writing the tree with
+    :func:`xml.etree.ElementTree.tostring`, parsing it with
+    :mod:`xml.dom.minidom` and writing it again with `toprettyxml`, which is
+    how experiments used to be saved, but takes a fraction of the time.
+
+    Parameters
+    ----------
+    root : :class:`xml.etree.ElementTree.Element`
+        Root element.
+    indent : str
+        Indentation added for each level of the tree.
+
+    Returns
+    -------
+    str
+        The document, starting with the XML declaration.
+
+    """
+    if not _isPlain(root):
+        # text, namespaces and invalid characters are handled by minidom
+        simpleString = xml.tostring(root, 'utf-8')
+        return minidom.parseString(simpleString).toprettyxml(indent=indent)
+
+    parts = ['<?xml version="1.0" ?>\n']
+    _writeElement(parts.append, root, "", indent)
+
+    return "".join(parts)
+
+
+if __name__ == "__main__":
+    pass
@@ -56,8 +56,9 @@ import os.path
 import sys
 import math
 import uuid
+import shutil
+import tempfile
 import threading
-import queue
 import time
 import numpy as np
 
@@ -107,6 +108,10 @@ CAMERA_LIB_NULL = u'Null'
 CAMERA_FRAMERATE_NOMINAL_NTSC = '30.000030'
 CAMERA_FRAMERATE_NTSC = 30.000030
 
+# frames waiting to be encoded in `liveEncode` mode, frames captured while the
+# encoder is this far behind are dropped by default
+DEFAULT_ENCODER_QUEUE_SIZE = 60
+
 # FourCC and pixel format mappings, mostly used with AVFoundation to determine
 # the FFMPEG decoder which is most suitable for it. Please expand this if you
 # know any more!
@@ -429,6 +434,9 @@ class CameraInterface:
     _device = None
     _lastFrame = None
     _isReady = False  # `True` if the camera is 'hot' and yielding frames
+    _framePool = None
+    _movieWriter = None  # encodes frames as they are recorded
+    _writerError = None  # raised by the movie writer in the capture thread
 
     def __init__(self, device):
         self._device = device
@@ -467,11 +475,64 @@ class CameraInterface:
         """
         return self._streamTime
 
+    @property
+    def framePool(self):
+        """Pool of frame buffers shared with the capture thread
+        (`~psychopy.tools.movietools.FramePool` or `None`). This is `None`
+        until the stream is opened.
+        """
+        return self._framePool
+
     def lastFrame(self):
         """The last frame read from the camera. If `None`, no frames have been
         read yet.
         """
         return self._lastFrame
+
+    @property
+    def movieWriter(self):
+        """Movie writer recorded frames are passed to by the capture thread
+        (`~psychopy.tools.movietools.MovieFileWriter` or `None`).
+        """
+        return self._movieWriter
+
+    def setMovieWriter(self, writer):
+        """Set the movie writer to pass recorded frames to.
+
+        Frames are passed to the writer by the capture thread as they arrive,
+        so they are encoded while recording rather than kept in memory. The
+        writer is picked up by the capture thread when recording starts, so
+        this must be called before `enable()`.
+
+        Parameters
+        ----------
+        writer : MovieFileWriter or None
+            Open movie writer, or `None` to stop passing frames to a writer.
+
+        """
+        self._movieWriter = writer
+
+    def _getMovieWriter(self):
+        return self._movieWriter
+
+    def _setWriterError(self, err):
+        self._writerError = err
+
+    def takeWriterError(self):
+        """Get the error raised by the movie writer while the capture thread
+        was passing frames to it, if any.
+
+        Frames stop being passed to a writer once it raises an error. The
+        error is cleared by calling this.
+
+        Returns
+        -------
+        Exception or None
+            The error, or `None` if the writer hasn't raised one.
+
+        """
+        err, self._writerError = self._writerError, None
+        return err
     
     def _assertMediaPlayer(self):
         """Assert that the media player is available.
@@ -549,6 +610,47 @@ class CameraInterface:
         """
         return NULL_MOVIE_FRAME_INFO
 
+    def _takeFrame(self):
+        """Take the next frame to process from the frame pool.
+
+        In 'latest frame only' mode this is the most recent frame, otherwise
+        frames are taken in the order they were captured. Frames taken in the
+        latter mode are held until `releaseFrames()` is called.
+
+        Returns
+        -------
+        tuple or None
+            `(colorData, absTime, metadata)` of the frame, where `colorData` is
+            a view of the pool buffer, or `None` if no frame is waiting.
+
+        """
+        if self._framePool is None:
+            return None
+
+        if self._framePool.latestOnly:
+            frame = self._framePool.getLatest()
+        else:
+            frame = self._framePool.getNext()
+
+        if frame is None:
+            return None
+
+        index, absTime, metadata = frame
+        self._frameIndex += 1
+
+        return self._framePool.getBuffer(index), absTime, metadata
+
+    def releaseFrames(self):
+        """Return the buffers of all frames taken from the stream to the
+        frame pool so they can be reused.
+
+        Any `MovieFrame` previously returned by this interface refers to
+        memory which may be overwritten after this is called.
+
+        """
+        if self._framePool is not None:
+            self._framePool.clear()
+
 
 class CameraInterfaceFFmpeg(CameraInterface):
     """Camera interface using FFmpeg (ffpyplayer) to open and read camera 
@@ -563,17 +665,21 @@ class CameraInterfaceFFmpeg(CameraInterface):
     mic : MicrophoneInterface or None
         Microphone interface to use for audio recording. If `None`, no audio
         recording is performed.
+    latestFrameOnly : bool
+        Keep only the most recent frame captured, dropping frames which were
+        not taken in time without copying them. Frames are captured into a
+        fixed ring of preallocated buffers.
 
     """
     _cameraLib = u'ffpyplayer'
 
-    def __init__(self, device, mic=None):
+    def __init__(self, device, mic=None, latestFrameOnly=False):
         super().__init__(device=device)
 
         self._bufferSecs = 0.5  # number of seconds to buffer
         self._cameraInfo = device
         self._mic = mic  # microphone interface
-        self._frameQueue = queue.Queue()
+        self._latestFrameOnly = latestFrameOnly
         self._enableEvent = threading.Event()
         self._enableEvent.clear()
         self._exitEvent = threading.Event()
@@ -633,7 +739,10 @@ class CameraInterfaceFFmpeg(CameraInterface):
         `_enqueueFrame()`.
 
         """
-        return self._frameQueue.qsize()
+        if self._framePool is None:
+            return 0
+
+        return self._framePool.framesWaiting
 
     def isOpen(self):
         """Check if the camera stream is open (`bool`).
@@ -655,8 +764,9 @@ class CameraInterfaceFFmpeg(CameraInterface):
         
         self._exitEvent.clear()  # signal the thread to stop
         
-        def _frameGetterAsync(videoCapture, frameQueue, exitEvent, recordEvent, 
-                              warmUpBarrier, recordingBarrier, audioCapture):
+        def _frameGetterAsync(videoCapture, framePool, exitEvent, recordEvent, 
+                              warmUpBarrier, recordingBarrier, audioCapture,
+                              getMovieWriter, writerFailed):
             """Get frames from the camera stream asynchronously.
 
             Parameters
@@ -664,10 +774,10 @@ class CameraInterfaceFFmpeg(CameraInterface):
             videoCapture : ffpyplayer.player.MediaPlayer
                 FFmpeg media player object. This object will be under direct 
                 control of this function.
-            frameQueue : queue.Queue
-                Queue to put frames into. The queue has an unlimited size, so 
-                be careful with memory use. This queue should be flushed when
-                camera thread is paused.
+            framePool : psychopy.tools.movietools.FramePool
+                Pool of buffers to copy frames into. Unless the pool only keeps
+                the latest frame, it grows while frames are not released, up
+                to its `maxBuffers`, after which new frames are dropped.
             exitEvent : threading.Event
                 Event used to signal the thread to stop.
             recordEvent : threading.Event
@@ -683,6 +793,12 @@ class CameraInterfaceFFmpeg(CameraInterface):
                 Microphone object to use for audio capture. This will be used to
                 synchronize the audio and video streams. If `None`, no audio
                 will be captured.
+            getMovieWriter : callable
+                Returns the movie writer to pass frames to while recording, or
+                `None`. Called when recording starts.
+            writerFailed : callable
+                Called with the error raised by the movie writer, if any. No
+                more frames are passed to the writer after that.
 
             """           
             # warmup the stream, wait for metadata
@@ -710,6 +826,7 @@ class CameraInterfaceFFmpeg(CameraInterface):
 
             # start capturing frames in background thread
             isRecording = False
+            movieWriter = None
             lastAbsTime = -1.0  # presentation timestamp of the last frame
             while not exitEvent.is_set():  # quit if signaled
                 # pull a frame from the stream, we keep this running 'hot' so
@@ -728,17 +845,41 @@ class CameraInterfaceFFmpeg(CameraInterface):
                     if isRecording:
                         thisFrameAbsTime = videoCapture.get_pts()
                         if lastAbsTime < thisFrameAbsTime:
-                            frameQueue.put((frame, val, metadata))
+                            frameImage, pts = frame
+                            # copy straight from the decoder into a pool buffer
+                            planeData = np.frombuffer(
+                                frameImage.to_memoryview()[0], dtype=np.uint8)
+                            if planeData.nbytes != framePool.bufferSize:
+                                framePool.resize(frameImage.get_size())
+                            # `None` if the pool is full, dropping the frame
+                            index = framePool.acquire()
+                            if index is not None:
+                                buffer = framePool.getBuffer(index)
+                                np.copyto(buffer, planeData)
+                                # copied by the writer, then encoded in its
+                                # thread
+                                try:
+                                    if movieWriter is not None:
+                                        movieWriter.addFrame(buffer)
+                                except Exception as err:
+                                    logging.error(
+                                        "Movie writer failed while "
+                                        "recording: {}".format(err))
+                                    writerFailed(err)
+                                    movieWriter = None
+                                framePool.publish(index, pts, metadata)
                             lastAbsTime = thisFrameAbsTime
 
                 if recordEvent.is_set() and not isRecording:
                     if audioCapture is not None:
                         audioCapture.start(waitForStart=1)
+                    movieWriter = getMovieWriter()
                     recordingBarrier.wait()
                     isRecording = True
                 elif not recordEvent.is_set() and isRecording:
                     if audioCapture is not None:
                         audioCapture.stop(blockUntilStopped=1)
+                    movieWriter = None
                     recordingBarrier.wait()
                     isRecording = False
 
@@ -826,6 +967,12 @@ class CameraInterfaceFFmpeg(CameraInterface):
         self._warmupBarrier = threading.Barrier(2)
         self._recordBarrier = threading.Barrier(2)
 
+        # buffers for frames passed from the stream thread, recorded frames
+        # are held until saved so the pool grows rather than dropping them
+        self._framePool = movietools.FramePool(
+            _cameraInfo.frameSize, latestOnly=self._latestFrameOnly,
+            policyWhenFull='drop' if self._latestFrameOnly else 'grow')
+
         # open the media player
         from ffpyplayer.player import MediaPlayer
         cap = MediaPlayer(_camera, ff_opts=ff_opts, lib_opts=lib_opts)
@@ -834,12 +981,14 @@ class CameraInterfaceFFmpeg(CameraInterface):
         self._playerThread = threading.Thread(
             target=_frameGetterAsync,
             args=(cap, 
-                  self._frameQueue, 
+                  self._framePool, 
                   self._exitEvent,
                   self._enableEvent,
                   self._warmupBarrier,
                   self._recordBarrier,
-                  self._mic))
+                  self._mic,
+                  self._getMovieWriter,
+                  self._setWriterError))
         self._playerThread.daemon=True
         self._playerThread.start()
 
@@ -860,32 +1009,20 @@ class CameraInterfaceFFmpeg(CameraInterface):
         """
         self._assertMediaPlayer()
 
-        try:
-            frameData = self._frameQueue.get_nowait()
-        except queue.Empty:
-            return False
-
-        frame, val, metadata = frameData  # update the frame
-
-        if val == CAMERA_STATUS_EOF:  # handle end of stream
-            return False
-        elif val == CAMERA_STATUS_PAUSED:  # handle when paused
+        frame = self._takeFrame()
+        if frame is None:  # handle when no frame is available
             return False
-        elif frame is None:  # handle when no frame is available
-            return False
-        
-        frameImage, pts = frame  # otherwise, unpack the frame
 
-        # if we have a new frame, update the frame information
-        videoBuffer = frameImage.to_bytearray()[0]
-        videoFrameArray = np.frombuffer(videoBuffer, dtype=np.uint8)
+        # frames are only published by the stream thread while it is running,
+        # so there is no need to check the stream status here
+        videoFrameArray, pts, metadata = frame
 
-        # provide the last frame
+        # provide the last frame, color data is a view of the pool buffer
         self._lastFrame = MovieFrame(
             frameIndex=self._frameIndex,
             absTime=pts,
             # displayTime=self._recentMetadata['frame_size'],
-            size=frameImage.get_size(),
+            size=self._framePool.frameSize,
             colorData=videoFrameArray,
             audioChannels=0,
             audioSamples=None,
@@ -989,11 +1126,15 @@ class CameraInterfaceOpenCV(CameraInterface):
     mic : MicrophoneInterface or None
         Microphone interface to use for audio recording. If `None`, no audio
         recording is performed.
+    latestFrameOnly : bool
+        Keep only the most recent frame captured, dropping frames which were
+        not taken in time without copying them. Frames are captured into a
+        fixed ring of preallocated buffers.
 
     """
     _cameraLib = u'opencv'
 
-    def __init__(self, device, mic=None):
+    def __init__(self, device, mic=None, latestFrameOnly=False):
         super().__init__(device)
         try:
             import cv2   # just import to check if it's available
@@ -1004,7 +1145,7 @@ class CameraInterfaceOpenCV(CameraInterface):
         
         self._cameraInfo = device
         self._mic = mic  # microphone interface
-        self._frameQueue = queue.Queue()
+        self._latestFrameOnly = latestFrameOnly
         self._enableEvent = threading.Event()
         self._exitEvent = threading.Event()
         self._warmUpBarrier = None
@@ -1098,7 +1239,10 @@ class CameraInterfaceOpenCV(CameraInterface):
         `_enqueueFrame()`.
 
         """
-        return self._frameQueue.qsize()
+        if self._framePool is None:
+            return 0
+
+        return self._framePool.framesWaiting
     
     @property
     def frameRate(self):
@@ -1131,8 +1275,9 @@ class CameraInterfaceOpenCV(CameraInterface):
         """
         import cv2
         
-        def _frameGetterAsync(videoCapture, frameQueue, exitEvent, recordEvent, 
-                              warmUpBarrier, recordingBarrier, audioCapture):
+        def _frameGetterAsync(videoCapture, framePool, exitEvent, recordEvent, 
+                              warmUpBarrier, recordingBarrier, audioCapture,
+                              getMovieWriter, writerFailed):
             """Get frames asynchronously from the camera stream.
 
             Parameters
@@ -1140,8 +1285,8 @@ class CameraInterfaceOpenCV(CameraInterface):
             videoCapture : cv2.VideoCapture
                 Handle for the video capture object. This is opened outside the
                 thread and passed in.
-            frameQueue : queue.Queue
-                Queue to store frames in.
+            framePool : psychopy.tools.movietools.FramePool
+                Pool of buffers to store frames in.
             exitEvent : threading.Event
                 Event to signal when the thread should stop.
             recordEvent : threading.Event
@@ -1157,6 +1302,12 @@ class CameraInterfaceOpenCV(CameraInterface):
                 Microphone object to use for audio capture. This will be used to
                 synchronize the audio and video streams. If `None`, no audio
                 will be captured.
+            getMovieWriter : callable
+                Returns the movie writer to pass frames to while recording, or
+                `None`. Called when recording starts.
+            writerFailed : callable
+                Called with the error raised by the movie writer, if any. No
+                more frames are passed to the writer after that.
 
             """
             # poll interval is half the frame period, this makes sure we don't
@@ -1173,9 +1324,11 @@ class CameraInterfaceOpenCV(CameraInterface):
 
             # start capturing frames
             isRecording = False
+            movieWriter = None
+            frame = None  # reused for every frame once allocated by `read()`
             while not exitEvent.is_set():
                 # Capture frame-by-frame
-                ret, frame = videoCapture.read()
+                ret, frame = videoCapture.read(frame)
 
                 # if frame is read correctly ret is True
                 if not ret:  # eol or something else
@@ -1184,20 +1337,39 @@ class CameraInterfaceOpenCV(CameraInterface):
                 else:
                     # don't queue frames unless they are newer than the last
                     if isRecording:
-                        # color conversion is done in the thread here
-                        colorData = cv2.cvtColor(frame, cv2.COLOR_BGR2RGB)
-                        # colorData = frame
-                        frameQueue.put((colorData, 0.0, None))
+                        if frame.nbytes != framePool.bufferSize:
+                            framePool.resize(frame.shape[1::-1])
+                        # `None` if the pool is full, dropping the frame
+                        index = framePool.acquire()
+                    if isRecording and index is not None:
+                        # color conversion is done in the thread here, writing
+                        # straight into a pool buffer
+                        cv2.cvtColor(
+                            frame, cv2.COLOR_BGR2RGB,
+                            dst=framePool.getBuffer(index).reshape(frame.shape))
+                        if movieWriter is not None:
+                            # copied by the writer, then encoded in its thread
+                            try:
+                                movieWriter.addFrame(framePool.getBuffer(index))
+                            except Exception as err:
+                                logging.error(
+                                    "Movie writer failed while recording: "
+                                    "{}".format(err))
+                                writerFailed(err)
+                                movieWriter = None
+                        framePool.publish(index, 0.0, None)
 
                 # check if we should start or stop recording
                 if recordEvent.is_set() and not isRecording:
                     if audioCapture is not None:
                         audioCapture.start(waitForStart=1)
+                    movieWriter = getMovieWriter()
                     recordingBarrier.wait()
                     isRecording = True
                 elif not recordEvent.is_set() and isRecording:
                     if audioCapture is not None:
                         audioCapture.stop(blockUntilStopped=1)
+                    movieWriter = None
                     recordingBarrier.wait()
                     isRecording = False
 
@@ -1272,16 +1444,24 @@ class CameraInterfaceOpenCV(CameraInterface):
                 raise CameraFormatNotSupportedError(
                     "Unsupported frame size: %s" % str(_cameraInfo.frameSize))
             
+        # buffers for frames passed from the stream thread, recorded frames
+        # are held until saved so the pool grows rather than dropping them
+        self._framePool = movietools.FramePool(
+            _cameraInfo.frameSize, latestOnly=self._latestFrameOnly,
+            policyWhenFull='drop' if self._latestFrameOnly else 'grow')
+
         # open a stream and pause it until ready
         self._playerThread = threading.Thread(
             target=_frameGetterAsync,
             args=(cap, 
-                  self._frameQueue, 
+                  self._framePool, 
                   self._exitEvent,
                   self._enableEvent,
                   self._warmUpBarrier,
                   self._recordBarrier,
-                  self._mic))
+                  self._mic,
+                  self._getMovieWriter,
+                  self._setWriterError))
         self._playerThread.daemon=True
         self._playerThread.start()
 
@@ -1302,33 +1482,19 @@ class CameraInterfaceOpenCV(CameraInterface):
         """
         self._assertMediaPlayer()
 
-        try:
-            frameData = self._frameQueue.get_nowait()
-        except queue.Empty:
-            return False
-
-        frame, val, _ = frameData  # update the frame
-
-        if val == 'eof':  # handle end of stream
-            return False
-        elif val == 'paused':  # handle when paused, not used for OpenCV yet
-            return False
-        elif frame is None:  # handle when no frame is available
+        frame = self._takeFrame()
+        if frame is None:  # handle when no frame is available
             return False
-        
-        frameImage = frame  # otherwise, unpack the frame
 
-        # if we have a new frame, update the frame information
-        # videoBuffer = frameImage.to_bytearray()[0]
-        videoFrameArray = np.ascontiguousarray(
-            frameImage.flatten(), dtype=np.uint8)
+        # color data is a view of the pool buffer, already flat and contiguous
+        videoFrameArray, _, _ = frame
 
         # provide the last frame
         self._lastFrame = MovieFrame(
             frameIndex=self._frameIndex,
             absTime=0.0,
             # displayTime=self._recentMetadata['frame_size'],
-            size=self._cameraInfo.frameSize,
+            size=self._framePool.frameSize,
             colorFormat='rgb24',  # converted in thread
             colorData=videoFrameArray,
             audioChannels=0,
@@ -1480,6 +1646,38 @@ class Camera:
         safely ignored.
     name : str
         Label for the camera for logging purposes.
+    latestFrameOnly : bool
+        Keep only the most recent frame from the camera, e.g., for a live 
+        display which does not need to be saved. Frames which are not shown in 
+        time are dropped without being copied, and memory use stays constant 
+        however long the camera records. Recordings cannot be saved in this
+        mode. Default is `False`.
+    liveEncode : bool
+        Encode frames to a movie file while recording instead of keeping them
+        in memory until `save()` is called. Memory use stays constant however
+        long the recording, and `save()` returns immediately, moving the file
+        into place (and adding the audio track) in the background. Only the 
+        most recent frame is kept for display, as with `latestFrameOnly`. For 
+        long recordings with audio, create the microphone with 
+        `streamToDisk=True` so the audio track is not kept in memory either.
+        Default is `False`.
+    encoderLib : str or None
+        Encoder library to use when `liveEncode` is `True`, either 
+        `'ffpyplayer'` or `'opencv'`. If `None`, the same library as 
+        `cameraLib` is used.
+    encoderOpts : dict or None
+        Options to pass to the encoder when `liveEncode` is `True`. See the 
+        documentation for `~psychopy.tools.movietools.MovieFileWriter` for 
+        more details.
+    encoderQueueSize : int
+        Maximum number of frames waiting to be encoded when `liveEncode` is
+        `True`, which bounds the memory used if the encoder falls behind. If 0,
+        the queue is unbounded. Default is `DEFAULT_ENCODER_QUEUE_SIZE`.
+    encoderPolicyWhenFull : str
+        What happens to frames captured while `encoderQueueSize` frames are
+        waiting to be encoded, either 'drop' to leave them out of the movie or
+        'block' to hold up capturing until the encoder takes a frame. Default
+        is 'drop'.
 
     Examples
     --------
@@ -1513,10 +1711,23 @@ class Camera:
 
         cam = Camera(0, frameRate=30, frameSize=(640, 480), cameraLib=u'opencv')
 
+    Encoding a long recording while it is made, so saving it is instant::
+
+        cam = Camera(0, liveEncode=True)
+        cam.open()
+        cam.record()
+        core.wait(600.0)
+        cam.stop()
+        cam.save('myVideo.mp4')  # returns immediately
+        cam.close()
+
     """
     def __init__(self, device=0, mic=None, cameraLib=u'ffpyplayer',
                  frameRate=None, frameSize=None, bufferSecs=4, win=None,
-                 name='cam'):
+                 name='cam', latestFrameOnly=False, liveEncode=False,
+                 encoderLib=None, encoderOpts=None,
+                 encoderQueueSize=DEFAULT_ENCODER_QUEUE_SIZE,
+                 encoderPolicyWhenFull='drop'):
         # add attributes for setters
         self.__dict__.update(
             {'_device': None,
@@ -1729,6 +1940,23 @@ class Camera:
         self._isRecording = False
         self._bufferSecs = float(bufferSecs)
         self._lastFrame = None  # use None to avoid imports for ImageStim
+        self._latestFrameOnly = bool(latestFrameOnly)
+        self._liveEncode = bool(liveEncode)
+        self._encoderLib = encoderLib
+        self._encoderOpts = encoderOpts
+        self._encoderQueueSize = max(int(encoderQueueSize), 0)
+        if encoderPolicyWhenFull not in ('block', 'drop'):
+            raise ValueError(
+                "Invalid value for parameter `encoderPolicyWhenFull`, expected "
+                "'block' or 'drop'.")
+        self._encoderPolicyWhenFull = encoderPolicyWhenFull
+        if self._liveEncode:
+            encoderLib = self._cameraLib if encoderLib is None else encoderLib
+            if encoderLib not in ('ffpyplayer', 'opencv'):
+                raise ValueError(
+                    "Invalid value for parameter `encoderLib`, expected one of "
+                    "`'ffpyplayer'` or `'opencv'`.")
+            self._encoderLib = encoderLib
 
         # microphone instance, this is controlled by the camera interface and
         # is not meant to be used by the user
@@ -1742,6 +1970,10 @@ class Camera:
         
         # movie writer instance, this runs in a separate thread
         self._movieWriter = None
+        # thread finishing the last recording saved in `liveEncode` mode, and
+        # the error it raised (if any)
+        self._saveThread = None
+        self._saveError = None
         # if we begin receiving frames, change this flag to `True`
         self._captureThread = None
         # self._audioThread = None
@@ -2002,6 +2234,35 @@ class Camera:
     def win(self, value):
         self._win = value
 
+    @property
+    def latestFrameOnly(self):
+        """`True` if only the most recent frame from the camera is kept 
+        (`bool`).
+        """
+        return self._latestFrameOnly
+
+    @property
+    def liveEncode(self):
+        """`True` if frames are encoded to file while recording (`bool`).
+        """
+        return self._liveEncode
+
+    @property
+    def isSaving(self):
+        """`True` if a recording saved in `liveEncode` mode is still being 
+        written to file (`bool`). If writing the file fails, the error is 
+        raised by the next call of `stop()` or `save()`.
+        """
+        return self._saveThread is not None and self._saveThread.is_alive()
+
+    def _raiseSaveError(self):
+        """Raise the error of the last recording saved in the background, if
+        writing it failed."""
+        err, self._saveError = self._saveError, None
+        if err is not None:
+            raise CameraError(
+                "Failed to save the last recording: {}".format(err)) from err
+
     @property
     def frameCount(self):
         """Number of frames captured in the present recording (`int`).
@@ -2009,11 +2270,32 @@ class Camera:
         if not self._isRecording:
             return 0
 
+        if self._liveEncode:  # every frame is passed to the writer
+            return self._movieWriter.totalFrames
+
+        if self._latestFrameOnly:  # includes frames that were dropped
+            return self._captureThread.framePool.framesPublished
+
         totalFramesBuffered = (
             len(self._captureFrames) + self._captureThread.framesWaiting)
         
         return totalFramesBuffered
 
+    @property
+    def framesDropped(self):
+        """Number of frames dropped from the present or last recording 
+        because the frame pool was full (`int`). Frames skipped for display in
+        `latestFrameOnly` or `liveEncode` mode are not counted.
+        """
+        if self._captureThread is None or \
+                self._captureThread.framePool is None:
+            return 0
+
+        if self._latestFrameOnly or self._liveEncode:
+            return 0
+
+        return self._captureThread.framePool.framesDropped
+
     @property
     def streamTime(self):
         """Current stream time in seconds (`float`). This time increases
@@ -2088,11 +2370,13 @@ class Camera:
         if not newFrames:
             return False
         
-        # add frames the the buffer
-        self._captureFrames.extend(newFrames)
+        # add frames the the buffer, in 'latest frame only' mode their buffers
+        # are reused so only the most recent frame is valid
+        if not (self._latestFrameOnly or self._liveEncode):
+            self._captureFrames.extend(newFrames)
         
         # set the last frame in the buffer as the most recent
-        self._lastFrame = self._captureFrames[-1]
+        self._lastFrame = newFrames[-1]
 
         return True
 
@@ -2117,13 +2401,15 @@ class Camera:
                 "Opening camera stream using FFmpeg. (device={})".format(desc))
             self._captureThread = CameraInterfaceFFmpeg(
                 device=self._cameraInfo, 
-                mic=self._mic)
+                mic=self._mic,
+                latestFrameOnly=self._latestFrameOnly or self._liveEncode)
         elif self._cameraLib == u'opencv':
             logging.debug(
                 "Opening camera stream using OpenCV. (device={})".format(desc))
             self._captureThread = CameraInterfaceOpenCV(
                 device=self._cameraInfo, 
-                mic=self._mic)
+                mic=self._mic,
+                latestFrameOnly=self._latestFrameOnly or self._liveEncode)
         else:
             raise ValueError(
                 "Invalid value for parameter `cameraLib`, expected one of "
@@ -2149,6 +2435,9 @@ class Camera:
         automatically. This is not recommended as it may incur a longer than
         expected delay in the recording start time.
 
+        In `liveEncode` mode, a movie file is opened here and frames are
+        encoded to it as they arrive.
+
         Warnings
         --------
         If a recording has been previously made without calling `save()` it will
@@ -2166,6 +2455,14 @@ class Camera:
         self._audioTrack = None
         self._lastFrame = None
 
+        # discard the previous recording, returning its frame buffers
+        self._captureFrames = []
+        self._captureThread.releaseFrames()
+        self._discardLiveRecording()
+
+        if self._liveEncode:
+            self._openLiveRecording()
+
         # start recording audio if available
         if self._mic is not None:
             logging.debug(
@@ -2181,6 +2478,11 @@ class Camera:
 
     def stop(self):
         """Stop recording frames and audio (if available).
+
+        Raises `CameraError` if the movie writer failed while recording in 
+        `liveEncode` mode, or if saving the previous recording in the 
+        background failed.
+
         """
         if self._captureThread is None:  # do nothing if not open
             return
@@ -2189,6 +2491,7 @@ class Camera:
             raise RuntimeError("Cannot stop recording, stream is not open.")
 
         self._captureThread.disable()  # stop passing frames to queue
+        self._captureThread.setMovieWriter(None)
         self._enqueueFrame()
 
         # # stop audio recording if `mic` is available
@@ -2197,6 +2500,21 @@ class Camera:
 
         self._isRecording = False
 
+        framesDropped = self.framesDropped
+        if framesDropped:
+            logging.warning(
+                "{} frames were dropped from the recording, the frame pool "
+                "was full.".format(framesDropped))
+
+        # frames which couldn't be encoded while recording can't be saved
+        writerError = self._captureThread.takeWriterError()
+        if writerError is not None:
+            self._discardLiveRecording()
+            raise CameraError(
+                "Failed to encode the recording: {}".format(
+                    writerError)) from writerError
+        self._raiseSaveError()
+
     def close(self):
         """Close the camera.
 
@@ -2221,6 +2539,98 @@ class Camera:
         self._captureThread.close()
         self._captureThread = None
 
+    def _openLiveRecording(self):
+        """Open a movie writer to encode frames to while recording.
+
+        Frames are written to a temporary file which is moved into place by
+        `save()`.
+
+        """
+        tempPrefix = (uuid.uuid4().hex)[:16]   # 16 char prefix
+        videoFileName = os.path.join(
+            tempfile.gettempdir(), "{}_video.mp4".format(tempPrefix))
+
+        logging.debug(
+            "Encoding recording to file while recording: {}".format(
+                videoFileName))
+        self._movieWriter = movietools.MovieFileWriter(
+            filename=videoFileName,
+            size=self._cameraInfo.frameSize,  # match camera params
+            fps=self._cameraInfo.frameRate,
+            codec=None,  # mp4
+            pixelFormat='rgb24',
+            encoderLib=self._encoderLib,
+            encoderOpts=self._encoderOpts,
+            maxQueueSize=self._encoderQueueSize,
+            policyWhenFull=self._encoderPolicyWhenFull)
+        self._movieWriter.open()
+        self._captureThread.setMovieWriter(self._movieWriter)
+
+    def _discardLiveRecording(self):
+        """Close and delete the file of a live recording which was not saved.
+        """
+        if not self._liveEncode or self._movieWriter is None:
+            return
+
+        logging.warning("Discarding camera recording which was not saved.")
+        self._movieWriter.close()
+        try:
+            os.remove(self._movieWriter.filename)
+        except OSError:
+            pass
+        self._movieWriter = None
+
+    def _saveLive(self, filename, useThreads=True, mergeAudio=True):
+        """Save a recording encoded while recording.
+
+        This finishes encoding the frames still waiting to be written, moves
+        the movie file to `filename` and adds the audio track (if any). The
+        video track is not encoded again.
+
+        """
+        if self._movieWriter is None:
+            raise CameraError("No recording to save, call `record()` first.")
+
+        movieWriter = self._movieWriter
+        self._movieWriter = None
+        videoFileName = movieWriter.filename
+        audioTrack = self._audioTrack
+
+        def _finishRecording():
+            movieWriter.close()  # blocks until queued frames are written
+            if audioTrack is None:
+                shutil.move(videoFileName, filename)
+            elif mergeAudio:
+                # sidecar audio file next to the video, combined without 
+                # encoding the video again
+                audioFileName = os.path.splitext(videoFileName)[0] + '.wav'
+                audioTrack.save(audioFileName, 'wav')
+                movietools.muxAudioToMovie(
+                    filename,
+                    videoFileName,
+                    audioFileName,
+                    useThreads=False,
+                    removeFiles=True)
+            else:
+                shutil.move(videoFileName, filename)
+                audioTrack.save(filename + '.wav', 'wav')
+
+        if not useThreads:
+            _finishRecording()
+            return
+
+        def _finishRecordingAsync():
+            try:
+                _finishRecording()
+            except Exception as err:
+                logging.error("Failed to save recording to '{}': {}".format(
+                    filename, err))
+                self._saveError = err
+
+        # not a daemon thread, so the interpreter waits for the file
+        self._saveThread = threading.Thread(target=_finishRecordingAsync)
+        self._saveThread.start()
+
     def save(self, filename, useThreads=True, mergeAudio=True, 
              encoderLib=None, encoderOpts=None):
         """Save the last recording to file.
@@ -2231,6 +2641,9 @@ class Camera:
 
         This is a slow operation and will block for some time depending on the 
         length of the video. This can be sped up by setting `useThreads=True`.
+        If the camera was created with `liveEncode=True`, frames have been 
+        encoded while recording, so this only finishes the file, in the
+        background if `useThreads=True` (see `isSaving`).
 
         Parameters
         ----------
@@ -2249,17 +2662,33 @@ class Camera:
         encoderLib : str or None
             Encoder library to use for saving the video. This can be either
             `'ffpyplayer'` or `'opencv'`. If `None`, the same library that was
-            used to open the camera stream. Default is `None`.
+            used to open the camera stream. Default is `None`. Ignored in 
+            `liveEncode` mode, where the encoder is given when creating the 
+            camera.
         encoderOpts : dict
             Options to pass to the encoder. This is a dictionary of options
             specific to the encoder library being used. See the documentation
             for `~psychopy.tools.movietools.MovieFileWriter` for more details.
+            Ignored in `liveEncode` mode.
+
+        Raises
+        ------
+        CameraError
+            If the previous recording saved in the background (in `liveEncode`
+            mode) could not be written.
 
         """
         if self._isRecording:
             raise RuntimeError(
                 "Attempting to call `save()` before calling `stop()`.")
 
+        self._raiseSaveError()  # from saving the previous recording
+
+        if self._latestFrameOnly and not self._liveEncode:
+            raise CameraError(
+                "Cannot save recordings from a camera which keeps only the "
+                "latest frame (`latestFrameOnly=True`).")
+
         # check if a file exists at the given path, if so, delete it
         if os.path.exists(filename):
             msg = (
@@ -2267,6 +2696,15 @@ class Camera:
             logging.warning(msg)
             os.remove(filename)
 
+        # frames were encoded while recording, just finish the file
+        if self._liveEncode:
+            self._saveLive(
+                os.path.abspath(filename), 
+                useThreads=useThreads, 
+                mergeAudio=mergeAudio)
+            self._lastVideoFile = filename
+            return
+
         # determine if the `encoderLib` to use
         if encoderLib is None:
             encoderLib = self._cameraLib
@@ -2304,6 +2742,11 @@ class Camera:
         # flush outstanding frames from the camera queue
         self._enqueueFrame()
 
+        if self.framesDropped:
+            logging.warning(
+                "Saving recording to '{}' with {} frames missing, the frame "
+                "pool was full.".format(filename, self.framesDropped))
+
         # contain video and not audio
         logging.debug("Saving video to file: {}".format(videoFileName))
         self._movieWriter = movietools.MovieFileWriter(
@@ -1,14 +1,22 @@
+import os
+import queue
+import shutil
 import sys
+import tempfile
+import threading
 import time
+import weakref
 
 import numpy as np
+import soundfile as sf
 from psychtoolbox import audio as audio
 from psychopy import logging as logging, prefs
 from psychopy.localization import _translate
 from psychopy.constants import NOT_STARTED
 from psychopy.hardware import BaseDevice, BaseResponse, BaseResponseDevice
 from psychopy.sound.audiodevice import AudioDeviceInfo, AudioDeviceStatus
-from psychopy.sound.audioclip import AudioClip
+from psychopy.sound.audioclip import AudioClip, _wavDataOffset
+from psychopy.sound.voiceonset import VoiceOnsetDetector
 from psychopy.sound.exceptions import AudioInvalidCaptureDeviceError, AudioInvalidDeviceError, \
     AudioStreamError, AudioRecordingBufferFullError
 from psychopy.tools import systemtools as st
@@ -31,6 +39,21 @@ class MicrophoneResponse(BaseResponse):
     pass
 
 
+class MicrophoneVoiceResponse(MicrophoneResponse):
+    """Voice onset or offset detected while polling a microphone.
+
+    `t` is the time of the first sample of the onset or offset, `value` is its
+    level relative to the background, `onset` is `True` for onsets and `False`
+    for offsets, and `sample` is the index of the sample in the recording.
+    """
+    fields = ["t", "value", "onset", "sample"]
+
+    def __init__(self, t, value, onset, sample, device=None):
+        MicrophoneResponse.__init__(self, t, value, device=device)
+        self.onset = onset
+        self.sample = sample
+
+
 class MicrophoneDevice(BaseDevice, aliases=["mic", "microphone"]):
     """Class for recording audio from a microphone or input stream.
 
@@ -75,6 +98,18 @@ class MicrophoneDevice(BaseDevice, aliases=["mic", "microphone"]):
         of `1` will keep the microphone running (or 'hot') with reduces latency
         when th recording is started. Cannot be set when after initialization at
         this time.
+    streamToDisk : bool or str
+        Write recordings to disk as they are polled, for long recordings which
+        would not fit in memory. If `True`, recordings are written to a
+        temporary folder which is deleted when the program exits, or a folder
+        can be given as a `str`. Each recording is written to a new file. Only
+        the last `maxRecordingSize` kilobytes of samples are kept in memory and
+        `policyWhenFull` is ignored. Clips returned by `getRecording()` are
+        read from the file as they are used.
+    recordingCodec : str
+        Format of the files written when `streamToDisk` is set, either 'wav'
+        (default) or 'flac' (lossless compression, but clips are read into
+        memory).
 
     Examples
     --------
@@ -122,7 +157,9 @@ class MicrophoneDevice(BaseDevice, aliases=["mic", "microphone"]):
                  maxRecordingSize=24000,
                  policyWhenFull='roll',
                  audioLatencyMode=None,
-                 audioRunMode=0):
+                 audioRunMode=0,
+                 streamToDisk=False,
+                 recordingCodec='wav'):
 
         if not _hasPTB:  # fail if PTB is not installed
             raise ModuleNotFoundError(
@@ -260,12 +297,21 @@ class MicrophoneDevice(BaseDevice, aliases=["mic", "microphone"]):
         self._statusFlag = NOT_STARTED
 
         # setup recording buffer
-        self._recording = RecordingBuffer(
-            sampleRateHz=self._sampleRateHz,
-            channels=self._channels,
-            maxRecordingSize=maxRecordingSize,
-            policyWhenFull=policyWhenFull
-        )
+        if streamToDisk:
+            self._recording = StreamingRecordingBuffer(
+                sampleRateHz=self._sampleRateHz,
+                channels=self._channels,
+                maxRecordingSize=maxRecordingSize,
+                folder=None if streamToDisk is True else streamToDisk,
+                codec=recordingCodec
+            )
+        else:
+            self._recording = RecordingBuffer(
+                sampleRateHz=self._sampleRateHz,
+                channels=self._channels,
+                maxRecordingSize=maxRecordingSize,
+                policyWhenFull=policyWhenFull
+            )
         self._possiblyAsleep = False
         self._isStarted = False  # internal state
 
@@ -274,6 +320,10 @@ class MicrophoneDevice(BaseDevice, aliases=["mic", "microphone"]):
 
         # list to store listeners in
         self.listeners = []
+
+        # voice onset detection, see `enableVoiceDetection`
+        self._voiceDetector = None
+        self._voiceResponses = []
     
     @property
     def maxRecordingSize(self):
@@ -666,6 +716,8 @@ class MicrophoneDevice(BaseDevice, aliases=["mic", "microphone"]):
 
         # reset the writing 'head'
         self._recording.seek(0, absolute=True)
+        if self._voiceDetector is not None:
+            self._voiceDetector.reset()
 
         # reset warnings
         # self._warnedRecBufferFull = False
@@ -751,6 +803,8 @@ class MicrophoneDevice(BaseDevice, aliases=["mic", "microphone"]):
             block_until_stopped=int(blockUntilStopped),
             stopTime=stopTime)
         self._isStarted = False
+        # finish writing the recording if streaming it to disk
+        self._recording.flush()
 
         logging.debug(
             ('Device #{} stopped capturing audio samples at estimated time '
@@ -832,6 +886,16 @@ class MicrophoneDevice(BaseDevice, aliases=["mic", "microphone"]):
     def close(self):
         """
         Close the audio stream.
+
+        If recordings are streamed to disk, the file of the current recording
+        is finished, and recordings written to a temporary folder are deleted.
+        """
+        self._closeStream()
+        self._recording.close()
+
+    def _closeStream(self):
+        """
+        Close the audio stream, keeping the recording buffer.
         """
         # clear any attached listeners
         self.clearListeners()
@@ -857,8 +921,8 @@ class MicrophoneDevice(BaseDevice, aliases=["mic", "microphone"]):
         status = self.isStarted
         # start timer
         start = time.time()
-        # close then open
-        self.close()
+        # close then open, keeping recordings
+        self._closeStream()
         self.open()
         # log time it took
         logging.info(
@@ -937,8 +1001,100 @@ class MicrophoneDevice(BaseDevice, aliases=["mic", "microphone"]):
 
         overruns = self._recording.write(audioData)
 
+        if self._voiceDetector is not None and len(audioData):
+            self._detectVoice(audioData, absRecPosition, cStartTime)
+
         return overruns
 
+    def enableVoiceDetection(self, threshold=4.0, method='rms',
+                             minOnsetSecs=0.03, minOffsetSecs=0.25,
+                             **kwargs):
+        """Detect voice onsets and offsets as samples are polled.
+
+        Each block of samples polled from the stream is passed to a
+        :class:`~psychopy.sound.voiceonset.VoiceOnsetDetector`. Onsets and
+        offsets are sent to any attached listeners as they are found, and can
+        be collected with `getVoiceResponses()`. Their times are those of the
+        first sample of the onset or offset, so vocal response times do not
+        depend on how often `poll()` is called.
+
+        Parameters
+        ----------
+        threshold : float
+            Level relative to the background a frame must exceed to be voiced.
+        method : str
+            Level to compute for each frame of samples, either 'rms' or 'flux'
+            (spectral flux).
+        minOnsetSecs : float
+            Minimum duration of voicing before an onset is reported.
+        minOffsetSecs : float
+            Minimum duration of silence before an offset is reported.
+        **kwargs
+            Other arguments for `VoiceOnsetDetector`.
+
+        """
+        self._voiceDetector = VoiceOnsetDetector(
+            self._sampleRateHz,
+            threshold=threshold,
+            method=method,
+            minOnsetSecs=minOnsetSecs,
+            minOffsetSecs=minOffsetSecs,
+            **kwargs)
+        self._voiceResponses = []
+
+    def disableVoiceDetection(self):
+        """Stop detecting voice onsets and offsets while polling."""
+        self._voiceDetector = None
+
+    @property
+    def isVoiced(self):
+        """`True` if voice detection is enabled and the microphone is
+        currently picking up speech (`bool`)."""
+        return self._voiceDetector is not None and self._voiceDetector.isVoiced
+
+    def getVoiceResponses(self, clear=True):
+        """Get voice onsets and offsets detected since voice detection was
+        enabled or this was last called.
+
+        Parameters
+        ----------
+        clear : bool
+            Remove the returned responses.
+
+        Returns
+        -------
+        list of MicrophoneVoiceResponse
+            Detected onsets and offsets, in order.
+
+        """
+        responses = self._voiceResponses
+        if clear:
+            self._voiceResponses = []
+        else:
+            responses = list(responses)
+
+        return responses
+
+    def _detectVoice(self, audioData, absRecPosition, cStartTime):
+        """Run voice detection on a block of polled samples and dispatch
+        any onsets or offsets."""
+        events = self._voiceDetector.process(
+            audioData, startSample=int(absRecPosition))
+        if not events:
+            return
+        # stream times are in the PTB timebase, convert to the logging clock
+        zeroTime = logging.defaultClock.getLastResetTime()
+        for event in events:
+            message = MicrophoneVoiceResponse(
+                cStartTime + event.sample / self._sampleRateHz - zeroTime,
+                event.level,
+                event.onset,
+                event.sample,
+                device=self)
+            self._voiceResponses.append(message)
+            for listener in self.listeners:
+                listener.receiveMessage(message)
+
     def getRecording(self):
         """Get audio data from the last microphone recording.
 
@@ -1229,7 +1385,7 @@ class RecordingBuffer:
         if not absolute:
             self._offset += offset
         else:
-            self._offset = absolute
+            self._offset = offset
 
         assert 0 <= self._offset < self._totalSamples
         self._spaceRemaining = self._totalSamples - self._offset
@@ -1311,6 +1467,19 @@ class RecordingBuffer:
         d = nSamples - self._spaceRemaining
         return 0 if d < 0 else d
 
+    def flush(self):
+        """Finish storing the samples written so far. Called when recording
+        stops. Samples are stored as they are written for recordings kept in
+        memory, so this does nothing.
+        """
+        pass
+
+    def close(self):
+        """Release any resources used by the recording buffer. Called when
+        the microphone stream is closed.
+        """
+        pass
+
     def clear(self):
         # reset all live attributes
         self._samples = None
@@ -1350,4 +1519,335 @@ class RecordingBuffer:
         return AudioClip(
             np.array(self._samples[idxStart:idxEnd, :],
                      dtype=np.float32, order='C'),
-            sampleRateHz=self._sampleRateHz)
\ No newline at end of file
+            sampleRateHz=self._sampleRateHz)
+
+
+class StreamingRecordingBuffer(RecordingBuffer):
+    """Recording buffer which streams samples to a sound file on disk.
+
+    Samples passed to `write()` are encoded to file by a background thread, so
+    the length of a recording is limited by disk space rather than memory. Only
+    the most recent `maxRecordingSize` kilobytes of samples are kept in memory,
+    which is enough for measuring the current volume. Each recording (started
+    by seeking to the beginning of the buffer) is written to a new file.
+
+    Used internally by the `MicrophoneDevice` class when created with
+    `streamToDisk` set, users usually do not create instances of this class
+    themselves.
+
+    Parameters
+    ----------
+    sampleRateHz : int
+        Sampling rate for audio recording in Hertz (Hz).
+    channels : int
+        Number of channels to record samples to `1=Mono` and `2=Stereo`.
+    maxRecordingSize : int
+        Size of the window of recent samples kept in memory in kilobytes (Kb).
+    folder : str or None
+        Folder to write recordings to. If `None`, a temporary folder is
+        created, which is deleted along with its recordings when the buffer is
+        closed.
+    codec : str
+        Format of the recording files, either 'wav' (32-bit float samples) or
+        'flac' (24-bit lossless compression). Recordings in WAV files are
+        returned by `getSegment()` as memory-mapped clips, so they are not read
+        into memory until they are used.
+
+    """
+    def __init__(self, sampleRateHz=SAMPLE_RATE_48kHz, channels=2,
+                 maxRecordingSize=24000, folder=None, codec='wav'):
+        codec = codec.lower()
+        if codec not in ('wav', 'flac'):
+            raise ValueError(
+                "Recording codec must be 'wav' or 'flac', not {!r}".format(
+                    codec))
+        self._codec = codec
+
+        if folder is None:
+            self._makeTempFolder()
+        else:
+            os.makedirs(folder, exist_ok=True)
+            self._removeFolder = None
+            self._folder = folder
+
+        self._filename = None  # file of the current recording
+        self._file = None  # `SoundFile` being written to
+        self._queue = None  # blocks of samples waiting to be written
+        self._writer = None  # thread writing samples to `_file`
+        self._framesWritten = 0  # samples in the current recording
+        self._writeErrors = []  # errors writing the current recording
+        self._windowStart = 0  # index in the recording of the first sample
+                               # in the memory window
+        self._dataOffset = None  # byte offset of the samples in a WAV file
+
+        RecordingBuffer.__init__(
+            self,
+            sampleRateHz=sampleRateHz,
+            channels=channels,
+            maxRecordingSize=maxRecordingSize,
+            policyWhenFull='ignore')
+
+    @property
+    def filename(self):
+        """Path of the file the current or last recording is written to
+        (`str` or `None`)."""
+        return self._filename
+
+    @property
+    def isFull(self):
+        """Is the recording buffer full (`bool`). Always `False`, old samples
+        are dropped from memory to make room for new ones."""
+        return False
+
+    @property
+    def lastSample(self):
+        """Index in the recording of the last sample recorded (`int`)."""
+        return self._windowStart + self._lastSample
+
+    @property
+    def recordingSecs(self):
+        """Duration of the current or last recording in seconds (`float`)."""
+        return self._framesWritten / self._sampleRateHz
+
+    def _allocRecBuffer(self):
+        RecordingBuffer._allocRecBuffer(self)
+        # the new window starts empty, recording to file continues
+        self._windowStart = self._framesWritten
+        self._offset = self._lastSample = 0
+
+    def _makeTempFolder(self):
+        """Create a temporary folder to write recordings to, deleted when the
+        buffer is closed or garbage collected."""
+        self._folder = tempfile.mkdtemp(prefix='psychopy-recording-')
+        self._removeFolder = weakref.finalize(
+            self, shutil.rmtree, self._folder, ignore_errors=True)
+
+    def _openFile(self):
+        """Start writing a new recording file."""
+        if self._removeFolder is not None and not self._removeFolder.alive:
+            self._makeTempFolder()  # recording again after `close()`
+        fd, self._filename = tempfile.mkstemp(
+            suffix='.' + self._codec, prefix='recording_', dir=self._folder)
+        os.close(fd)
+        self._file = sf.SoundFile(
+            self._filename,
+            mode='w',
+            samplerate=self._sampleRateHz,
+            channels=self._channels,
+            format=self._codec.upper(),
+            subtype='FLOAT' if self._codec == 'wav' else 'PCM_24')
+        self._dataOffset = None
+        self._queue = queue.Queue()
+        self._writer = threading.Thread(
+            target=self._writeLoop,
+            args=(self._file, self._queue, self._writeErrors),
+            daemon=True)
+        self._writer.start()
+
+    @staticmethod
+    def _writeLoop(soundFile, blocks, errors):
+        """Write blocks of samples from a queue to a file until `None` is
+        received. Runs in the writer thread. Errors are appended to `errors`
+        to be raised by `flush()` and `getSegment()`."""
+        while True:
+            block = blocks.get()
+            try:
+                if block is None:
+                    soundFile.close()
+                elif isinstance(block, str):  # 'flush'
+                    soundFile.flush()
+                else:
+                    soundFile.write(block)
+            except Exception as err:
+                logging.error(
+                    "Failed to write samples to recording file '{}': "
+                    "{}".format(soundFile.name, err))
+                errors.append(err)
+            finally:
+                blocks.task_done()
+            if block is None:  # finished, even if closing the file failed
+                return
+
+    def _raiseWriteError(self):
+        """Raise the error writing the current recording to file, if any."""
+        if self._writeErrors:
+            err = self._writeErrors[0]
+            raise AudioStreamError(
+                "Failed to write recording to file '{}': {}".format(
+                    self._filename, err)) from err
+
+    def _sync(self):
+        """Wait until all samples written so far are in the file."""
+        if self._writer is not None:
+            self._queue.put('flush')
+            self._queue.join()
+
+    def _finishFile(self):
+        """Wait for the writer thread to finish the current recording file.
+        """
+        if self._writer is None:
+            return
+        self._queue.put(None)
+        self._writer.join()
+        self._writer = None
+        self._file = None
+        self._queue = None
+
+    def flush(self):
+        """Finish writing the current recording file. Called when recording
+        stops, samples written after this are added to a new file.
+
+        Raises `AudioStreamError` if writing the recording to file failed, in
+        which case the file is incomplete.
+        """
+        self._finishFile()
+        self._raiseWriteError()
+
+    def close(self):
+        """Finish writing the current recording file. If recordings are
+        written to a temporary folder, the folder and all recordings in it are
+        deleted, so save any clips you want to keep first. This also happens
+        when the buffer is garbage collected.
+        """
+        self._finishFile()
+        if self._removeFolder is not None:
+            self._removeFolder()
+
+    def _resetWindow(self):
+        self._finishFile()
+        self._writeErrors = []
+        self._filename = None
+        self._framesWritten = 0
+        self._windowStart = 0
+        self._offset = self._lastSample = 0
+        self._spaceRemaining = self._totalSamples
+
+    def seek(self, offset, absolute=False):
+        """Start a new recording.
+
+        Only seeking to the beginning of the buffer (``seek(0,
+        absolute=True)``) is supported, which finishes the file of the last
+        recording. Samples from the next `write` are written to a new file.
+
+        """
+        if not (absolute and offset == 0):
+            raise ValueError(
+                "Streaming recording buffers can only seek to the start of a "
+                "new recording.")
+        self._resetWindow()
+
+    def write(self, samples):
+        """Write samples to the recording file and the window of recent
+        samples in memory.
+
+        Parameters
+        ----------
+        samples : ArrayLike
+            Samples to write to the recording buffer, usually of a stream. Must
+            have the same number of dimensions as the internal array.
+
+        Returns
+        -------
+        int
+            Number of samples overflowed. Always zero since samples are never
+            rejected.
+
+        """
+        nSamples = len(samples)
+        if not nSamples:
+            return 0
+
+        samples = np.array(samples, dtype=np.float32, order='C')
+        if self._writer is None:
+            self._openFile()
+        self._queue.put(samples)
+        self._framesWritten += nSamples
+
+        # update the window of recent samples kept in memory
+        if nSamples >= self._totalSamples:
+            self._windowStart = self._framesWritten - self._totalSamples
+            self._samples[:, :] = samples[-self._totalSamples:, :]
+            self._offset = self._totalSamples
+        else:
+            if self._offset + nSamples > self._totalSamples:
+                # drop old samples so at least half the window is free, which
+                # keeps copying infrequent
+                drop = max(self._offset - self._totalSamples // 2,
+                           self._offset + nSamples - self._totalSamples)
+                keep = self._offset - drop
+                self._samples[:keep, :] = self._samples[drop:self._offset, :]
+                self._windowStart += drop
+                self._offset = keep
+            self._samples[self._offset:self._offset + nSamples, :] = samples
+            self._offset += nSamples
+
+        self._lastSample = self._offset
+        self._spaceRemaining = self._totalSamples - self._offset
+
+        return 0
+
+    def clear(self):
+        self._resetWindow()
+        self._allocRecBuffer()
+
+    def _fileSamples(self):
+        """Get all samples in the recording file."""
+        if self._filename is None:
+            raise AudioStreamError(
+                "Could not access recording as microphone has sent no samples."
+            )
+        self._sync()
+        if self._codec == 'wav':
+            # map the samples in the file rather than reading them
+            if self._dataOffset is None:
+                try:
+                    self._dataOffset = _wavDataOffset(self._filename)
+                except ValueError as err:
+                    raise AudioStreamError(str(err))
+            return np.memmap(
+                self._filename, dtype=np.float32, mode='r',
+                offset=self._dataOffset,
+                shape=(self._framesWritten, self._channels))
+        if self._writer is not None:
+            raise AudioStreamError(
+                "Samples before the last {} seconds of a FLAC recording can "
+                "only be accessed after recording stops.".format(
+                    round(self.bufferSecs, 3)))
+        samples, _ = sf.read(self._filename, dtype='float32', always_2d=True)
+        return samples
+
+    def getSegment(self, start=0, end=None):
+        """Get a segment of recording data as an `AudioClip`.
+
+        Segments within the window of recent samples are copied from memory,
+        others are taken from the recording file.
+
+        Parameters
+        ----------
+        start : float or int
+            Absolute time in seconds for the start of the clip.
+        end : float or int
+            Absolute time in seconds for the end of the clip. If `None` the time
+            at the last sample is used.
+
+        Returns
+        -------
+        AudioClip
+            Audio clip object with samples between `start` and `end`.
+
+        """
+        self._raiseWriteError()  # the recording file is incomplete
+
+        idxStart = int(start * self._sampleRateHz)
+        idxEnd = self._framesWritten if end is None else int(
+            end * self._sampleRateHz)
+
+        if idxStart >= self._windowStart:
+            samples = np.array(
+                self._samples[idxStart - self._windowStart:
+                              max(idxEnd - self._windowStart, 0), :],
+                dtype=np.float32, order='C')
+        else:
+            samples = self._fileSamples()[idxStart:idxEnd, :]
+
+        return AudioClip(samples, sampleRateHz=self._sampleRateHz)
@@ -291,6 +291,8 @@ class ioHubConnection():
         self._iohub_server_config = None
         self._shutdown_attempted = False
         self._cv_order = None
+        self._cv_batch_size = 1
+        self._cv_record_cache = []
         self._message_cache = []
         self.iohub_status = self._startServer(ioHubConfig, ioHubConfigAbsPath)
         if self.iohub_status != 'OK':
@@ -598,7 +600,8 @@ class ioHubConnection():
 
         return Computer.getTime() - stime
 
-    def createTrialHandlerRecordTable(self, trials, cv_order=None):
+    def createTrialHandlerRecordTable(self, trials, cv_order=None,
+                                      batch_size=1):
         """
         Create a condition variable table in the ioHub data file based on
         the a psychopy TrialHandler. By doing so, the iohub data file
@@ -638,8 +641,23 @@ class ioHubConnection():
             #
             io.addTrialHandlerRecord(trial)
 
+        If batch_size is greater than 1, trial records are cached by
+        addTrialHandlerRecord and sent to iohub batch_size records at a time,
+        without waiting for the iohub server to reply. This avoids an iohub
+        request round trip at the end of each trial. Any cached records are
+        sent by flushTrialHandlerRecords(), which is also called when the
+        ioHubConnection is shut down, or when another record table is
+        created.
+
         """
+        # records cached for the previous table are saved to it
+        if not self.flushTrialHandlerRecords():
+            raise ioHubError('Could not save the trial records cached for '
+                             'the previous trial handler record table.')
+
         trial = trials.trialList[0]
+        self._cv_batch_size = max(1, int(batch_size))
+        self._cv_record_cache = []
         self._cv_order = cv_order
         if cv_order is None:
             self._cv_order = trial.keys()
@@ -669,6 +687,9 @@ class ioHubConnection():
         """Adds the values from a TriaHandler row / record to the iohub data
         file for future data analysis use.
 
+        If the record table was created with a batch_size greater than 1, the
+        record is cached and sent to iohub with the rest of its batch.
+
         :param cv_row:
         :return: None
 
@@ -686,10 +707,51 @@ class ioHubConnection():
             if isinstance(d, str):
                 data[i] = d.encode('utf-8')
 
-        cvt_rpc = ('RPC', 'extendConditionVariableTable',
-                   (self.experimentID, self.experimentSessionID, data))
-        r = self._sendToHubServer(cvt_rpc)
-        return r[2]
+        if self._cv_batch_size <= 1:
+            cvt_rpc = ('RPC', 'extendConditionVariableTable',
+                       (self.experimentID, self.experimentSessionID, data))
+            r = self._sendToHubServer(cvt_rpc)
+            return r[2]
+
+        self._cv_record_cache.append(data)
+        if len(self._cv_record_cache) >= self._cv_batch_size:
+            self.flushTrialHandlerRecords(wait=False)
+        return True
+
+    def flushTrialHandlerRecords(self, wait=True):
+        """Send any trial records cached by addTrialHandlerRecord to iohub.
+
+        If wait is False, the records are sent without waiting for the
+        iohub server to save them, which takes a few usec. Otherwise the
+        call blocks until the server has saved the records and the save
+        result is returned; records sent earlier without waiting which the
+        server could not save are logged as an error and also make the
+        result False.
+        """
+        rows = self._cv_record_cache
+        self._cv_record_cache = []
+        if not wait:
+            if rows:
+                self.udp_client.sendTo(('EXP_CV_ROWS', self.experimentID,
+                                        self.experimentSessionID, rows))
+            return True
+
+        saved = True
+        if rows:
+            cvt_rpc = ('RPC', 'extendConditionVariableTableRows',
+                       (self.experimentID, self.experimentSessionID, rows))
+            saved = self._sendToHubServer(cvt_rpc)[2]
+        if self._cv_batch_size > 1:
+            failed = self._sendToHubServer(
+                ('RPC', 'getConditionVariableRowErrors'))[2]
+            if failed:
+                msg = 'ioHub could not save {} trial records.'.format(failed)
+                if psycho_logging:
+                    psycho_logging.error(msg)
+                else:
+                    print2err(msg)
+                saved = False
+        return saved
 
     def registerWindowHandles(self, *winHandles):
         """
@@ -849,6 +911,39 @@ class ioHubConnection():
         r = self._sendToHubServer(('RPC', 'flushIODataStoreFile'))
         return r
 
+    def getDeviceStats(self, reset=False):
+        """Returns the ioHub Server's polling and event processing statistics
+        for each monitored device, as a dict of dicts keyed by device name.
+
+        Statistics for every device:
+
+            * queue_depth: native events waiting to be processed.
+            * process_count: times new events were processed for the device.
+            * skipped_count: event processing passes with nothing to do.
+            * processed_event_count / filtered_event_count: events processed.
+            * mean_process_time / max_process_time: sec.msec per pass.
+            * max_queue_depth: most native events waiting for one pass.
+
+        Devices that use a device_timer also report:
+
+            * poll_count: number of _poll calls.
+            * poll_interval: the current polling interval.
+            * polled_event_count: events received by _poll calls.
+            * idle_polls: polls in a row that received no events.
+            * mean_poll_time / max_poll_time: sec.msec per _poll call.
+
+        These can be used to choose a device_timer interval and the
+        event_processing_interval / device_timer_max_scale server settings.
+
+        Args:
+            reset (bool): If True, the statistics are reset after being read.
+
+        Returns:
+            dict: Statistics for each device.
+        """
+        r = self._sendToHubServer(('RPC', 'getDeviceStats', [reset, ]))
+        return r[2]
+
     def startCustomTasklet(self, task_name, task_class_path, **class_kwargs):
         """
         Instruct the iohub server to start running a custom tasklet given
@@ -1058,7 +1153,8 @@ class ioHubConnection():
             r = self._sendToHubServer(['GET_IOHUB_STATUS', ])
             if r:
                 hubonline = r[1] == 'RUNNING'
-            time.sleep(0.1)
+            if not hubonline:
+                time.sleep(0.01)
         return hubonline
 
         # # <<<< Finished wait for iohub server ready signal ....
@@ -1303,8 +1399,12 @@ class ioHubConnection():
 
     def _shutDownServer(self):
         if self._shutdown_attempted is False:
-            # send any cached experiment messages
+            # send any cached experiment messages and trial records
             self.sendMessageEvents()
+            try:
+                self.flushTrialHandlerRecords()
+            except Exception:  # pylint: disable=broad-except
+                printExceptionDetailsToStdErr()
 
             try:
                 from psychopy.visual import window
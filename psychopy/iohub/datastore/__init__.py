@@ -269,20 +269,29 @@ class DataStoreFile():
         return True
 
     def extendConditionVariableTable(self, experiment_id, session_id, data):
+        return self.extendConditionVariableTableRows(experiment_id,
+                                                     session_id, [data, ])
+
+    def extendConditionVariableTableRows(self, experiment_id, session_id,
+                                         rows):
+        """Append one or more condition variable rows to the table with a
+        single table append."""
         if self._EXP_COND_DTYPE is None:
             return False
         if self.emrtFile and 'EXP_CV' in self.TABLES:
-            temp = [experiment_id, session_id]
-            temp.extend(data)
-            data = temp
             try:
                 etable = self.TABLES['EXP_CV']
-                for i, d in enumerate(data):
-                    if isinstance(d, (list, tuple)):
-                        data[i] = tuple(d)
-                np_array = np.array([tuple(data), ], dtype=self._EXP_COND_DTYPE)
+                np_rows = []
+                for data in rows:
+                    temp = [experiment_id, session_id]
+                    for d in data:
+                        if isinstance(d, (list, tuple)):
+                            d = tuple(d)
+                        temp.append(d)
+                    np_rows.append(tuple(temp))
+                np_array = np.array(np_rows, dtype=self._EXP_COND_DTYPE)
                 etable.append(np_array)
-                self.bufferedFlush()
+                self.bufferedFlush(len(np_rows))
                 return True
             except Exception:
                 printExceptionDetailsToStdErr()
@@ -9,7 +9,8 @@ import numbers  # numbers.Integral is like (int, long) but supports Py3
 from psychopy import colors
 from psychopy.iohub.devices import importDeviceModule
 from psychopy.tools import arraytools
-from ..util import yload, yLoader, module_directory, getSupportedConfigSettings
+from ..util import module_directory, getSupportedConfigSettings
+from ..util.configcache import getConfigCache
 from ..errors import print2err
 
 # Takes a device configuration yaml dict and processes it based on the devices
@@ -500,8 +501,20 @@ def validateDeviceConfiguration(
                 '.', os.path.sep),
         'supported_config_settings.yaml')
 
-    device_settings_validation_dict = yload(
-        open(validation_file_path, 'r'), Loader=yLoader)
+    # Validation results for unchanged configs are reused from the config
+    # cache, including the normalised config values set by validation.
+    config_cache = getConfigCache()
+    cache_key = config_cache.validationKey(validation_file_path,
+                                           current_device_config)
+    cached = config_cache.getValidation(cache_key)
+    if cached is not None:
+        validation_results, validated_config = cached
+        current_device_config.clear()
+        current_device_config.update(validated_config)
+        return validation_results
+
+    device_settings_validation_dict = config_cache.loadYAML(
+        validation_file_path)
     device_settings_validation_dict = device_settings_validation_dict[
         list(device_settings_validation_dict.keys())[0]]
 
@@ -515,4 +528,6 @@ def validateDeviceConfiguration(
     validation_results = validateConfigDictToFuncMapping(
         param_validation_func_mapping, current_device_config, None)
 
+    config_cache.setValidation(cache_key, validation_results,
+                               current_device_config)
     return validation_results
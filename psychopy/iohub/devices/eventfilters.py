@@ -4,6 +4,7 @@
 # Distributed under the terms of the GNU General Public License (GPL).
 
 import numpy as np
+from bisect import bisect_left, insort
 from collections import deque
 
 from ..util import NumPyRingBuffer
@@ -138,9 +139,18 @@ class MovingWindowFilter():
     value is added to the MovingWindow using MovingWindow.add.
     None is returned until the MovingWindow is full.
 
+    Blocks of samples can be filtered with a single call using
+    MovingWindow.filterBlock (field values) or MovingWindow.addBlock (iohub
+    events). The window state is carried over between calls, so splitting a
+    sample stream into blocks of any size gives the same filtered values as
+    adding the samples one at a time with add().
+
     The base class implements a moving window averaging filter, no weights.
     To change the filter used, extend this class and replace the filteredValue
-    method.
+    method. Sub classes can also implement _filterWindows to provide a
+    vectorised version of the filter used by filterBlock; if only
+    filteredValue is replaced, filterBlock falls back to evaluating it once
+    per sample.
 
     """
 
@@ -169,6 +179,12 @@ class MovingWindowFilter():
                     'MovingWindow knot_pos must be between 0 and length-1.')
             self._active_index = knot_pos
 
+        self._length = length
+        # Number of input samples covered by a filtered value, and the number
+        # of samples between the filtered (knot) sample and the latest one.
+        self._span = length
+        self._delay = length - 1 - self._active_index
+
         self._event_field_index = None
         self._events = None
         if event_type and event_field_name:
@@ -176,7 +192,7 @@ class MovingWindowFilter():
                 event_type).CLASS_ATTRIBUTE_NAMES.index(event_field_name)
             self._events = deque(maxlen=length)
 
-        self._filtering_buffer = NumPyRingBuffer(length)
+        self._filtering_buffer = NumPyRingBuffer(length, dtype=np.float64)
 
     def filteredValue(self):
         """Returns a filtered value based on the data in the window.
@@ -189,6 +205,81 @@ class MovingWindowFilter():
         """
         return self._filtering_buffer.mean()
 
+    def _filterWindows(self, data):
+        """Returns the filtered value of every full window in the 1D float64
+        array data, i.e. len(data) - length + 1 values.
+
+        The base implementation uses a running sum to average each window.
+
+        """
+        n = self._length
+        csum = np.cumsum(data)
+        csum[n:] = csum[n:] - csum[:-n]
+        return csum[n - 1:] / n
+
+    def _hasWindowFilter(self):
+        # _filterWindows can only be used if it was implemented by the same
+        # class, or a sub class of, the one that implements filteredValue.
+        for cls in type(self).__mro__:
+            if '_filterWindows' in vars(cls):
+                return True
+            if 'filteredValue' in vars(cls):
+                return False
+        return False
+
+    def filterBlock(self, values):
+        """Add a block of field values to the moving window and return the
+        filtered values as a numpy array.
+
+        One filtered value is returned for each added value that completes a
+        full window, so the returned array is shorter than values until the
+        window has been filled.
+
+        """
+        values = np.asarray(values, dtype=np.float64).ravel()
+        if not self._hasWindowFilter():
+            filtered = [self._filterValue(v) for v in values]
+            return np.asarray(
+                [v for v in filtered if v is not None], dtype=np.float64)
+
+        fbuffer = self._filtering_buffer
+        history_length = min(len(fbuffer), self._length - 1)
+        if history_length:
+            data = np.concatenate(
+                (fbuffer.getElements()[-history_length:], values))
+        else:
+            data = values
+        fbuffer.extend(values)
+        if len(data) < self._length:
+            return np.empty(0, dtype=np.float64)
+        return self._filterWindows(data)
+
+    def addBlock(self, events):
+        """Add a block of iohub events ( in list form ) to the moving window.
+
+        Returns a list of (event, filtered_value) tuples, one for each
+        event that the filter has produced a filtered value for. If the
+        filter was created with inplace=True, the filtered field of each
+        returned event is updated with the filtered value.
+
+        """
+        field_index = self._event_field_index
+        filtered = self.filterBlock([e[field_index] for e in events])
+        window_events = list(self._events)
+        window_events.extend(events)
+        self._events.extend(events)
+
+        filtered_count = len(filtered)
+        if filtered_count == 0:
+            return []
+        first = len(window_events) - filtered_count - self._delay
+        knot_events = window_events[first:first + filtered_count]
+        filtered = filtered.tolist()
+        if self._inplace:
+            for e, v in zip(knot_events, filtered):
+                e[field_index] = v
+        return list(zip(knot_events, filtered))
+
     def add(self, event):
         """Add the given iohub event ( in list form ) to the moving window. The
         value of the specified event attribute when the filter was created is
@@ -200,18 +291,24 @@ class MovingWindowFilter():
 
         """
         if isinstance(event, (list, tuple)):
-            self._filtering_buffer.append(event[self._event_field_index])
+            value = self._filterValue(event[self._event_field_index])
             self._events.append(event)
-            if self.isFull():
+            if value is not None:
+                knot_event = self._events[-1 - self._delay]
                 if self._inplace:
-                    self._events[
-                        self._active_index][
-                        self._event_field_index] = self.filteredValue()
-                return self._events[self._active_index], self.filteredValue()
+                    knot_event[self._event_field_index] = value
+                return knot_event, value
         else:
-            self._filtering_buffer.append(event)
-            if self.isFull():
-                return None, self.filteredValue()
+            value = self._filterValue(event)
+            if value is not None:
+                return None, value
+
+    def _filterValue(self, value):
+        """Add a single value to the moving window, returning the filtered
+        value if the window is full, otherwise None."""
+        self._filtering_buffer.append(value)
+        if self._filtering_buffer.isFull():
+            return self.filteredValue()
 
     def isFull(self):
         return self._filtering_buffer.isFull()
@@ -238,6 +335,9 @@ class PassThroughFilter(MovingWindowFilter):
     def filteredValue(self):
         return self._filtering_buffer[0]
 
+    def _filterWindows(self, data):
+        return data.copy()
+
 # ------
 
 
@@ -250,9 +350,62 @@ class MedianFilter(MovingWindowFilter):
 
     def __init__(self, **kwargs):
         MovingWindowFilter.__init__(self, **kwargs)
+        # Sorted copy of the window values, so the median of the window can
+        # be updated with a binary search as each single value is added. NaN
+        # values can't be ordered, so they are counted instead, the median of
+        # a window holding one is NaN, as with np.median.
+        self._sorted_window = []
+        self._nan_count = 0
 
     def filteredValue(self):
-        return np.median(self._filtering_buffer.getElements())
+        if self._nan_count:
+            return np.nan
+        window = self._sorted_window
+        mid = len(window) // 2
+        if len(window) % 2:
+            return window[mid]
+        return (window[mid - 1] + window[mid]) / 2.0
+
+    def _filterValue(self, value):
+        fbuffer = self._filtering_buffer
+        window = self._sorted_window
+        if fbuffer.isFull():
+            oldest = fbuffer.getElements()[0]
+            if np.isnan(oldest):
+                self._nan_count -= 1
+            else:
+                del window[bisect_left(window, oldest)]
+        fbuffer.append(value)
+        newest = fbuffer.getElements()[-1]
+        if np.isnan(newest):
+            self._nan_count += 1
+        else:
+            insort(window, newest)
+        if fbuffer.isFull():
+            return self.filteredValue()
+
+    def filterBlock(self, values):
+        filtered = MovingWindowFilter.filterBlock(self, values)
+        fbuffer = self._filtering_buffer
+        elements = fbuffer.getElements()
+        # only the last len(fbuffer) elements hold values until it is full,
+        # none if it is empty (so not [-len(fbuffer):])
+        elements = elements[len(elements) - len(fbuffer):]
+        isNan = np.isnan(elements)
+        self._sorted_window = sorted(elements[~isNan])
+        self._nan_count = int(np.count_nonzero(isNan))
+        return filtered
+
+    def _filterWindows(self, data):
+        # every window of the block is a strided view of data, so the medians
+        # are calculated in one call without copying the samples per window
+        windows = np.lib.stride_tricks.sliding_window_view(data, self._length)
+        return np.median(windows, axis=1)
+
+    def clear(self):
+        MovingWindowFilter.clear(self)
+        self._sorted_window = []
+        self._nan_count = 0
 
 # ------
 
@@ -272,14 +425,14 @@ class WeightedAverageFilter(MovingWindowFilter):
         length = len(weights)
         kwargs['length'] = length
         MovingWindowFilter.__init__(self, **kwargs)
-        weights = np.asanyarray(weights)
+        weights = np.asanyarray(weights, dtype=np.float64)
         self._weights = weights / np.sum(weights)
 
     def filteredValue(self):
-        return np.convolve(
-            self._filtering_buffer.getElements(),
-            self._weights,
-            'valid')
+        return np.dot(self._filtering_buffer.getElements(), self._weights[::-1])
+
+    def _filterWindows(self, data):
+        return np.convolve(data, self._weights, 'valid')
 
 
 # ------
@@ -310,23 +463,39 @@ class StampFilter(MovingWindowFilter):
             kwargs['inplace'] = False
             kwargs['level'] = level
             self.sub_filter = StampFilter(**kwargs)
+            # Each level delays the filtered sample by one more event.
+            self._span += self.sub_filter._span - 1
+            self._delay += self.sub_filter._delay
+            if self._events is not None:
+                self._events = deque(maxlen=self._span)
 
     def filteredValue(self):
-        if self.sub_filter:
-            return self.sub_filter.filteredValue()
-
         e1, e2, e3 = self._filtering_buffer[0:3]
-        if not(e1 < e2 and e2 < e3) or not (e3 < e2 and e2 < e1):
+        if not (e1 < e2 < e3 or e3 < e2 < e1):
             return (e1 + e3) / 2.0
         return e2
 
-    def add(self, event):
+    def _filterWindows(self, data):
+        e1, e2, e3 = data[:-2], data[1:-1], data[2:]
+        monotonic = ((e1 < e2) & (e2 < e3)) | ((e3 < e2) & (e2 < e1))
+        return np.where(monotonic, e2, (e1 + e3) / 2.0)
+
+    def _filterValue(self, value):
+        if self.sub_filter:
+            value = self.sub_filter._filterValue(value)
+            if value is None:
+                return None
+        return MovingWindowFilter._filterValue(self, value)
+
+    def filterBlock(self, values):
+        if self.sub_filter:
+            values = self.sub_filter.filterBlock(values)
+        return MovingWindowFilter.filterBlock(self, values)
+
+    def clear(self):
+        MovingWindowFilter.clear(self)
         if self.sub_filter:
-            sub_result = self.sub_filter.add(event)
-            if sub_result:
-                self._filtering_buffer.append(sub_result[1])
-                self._events.append(event)
-        return MovingWindowFilter.add(self, event)
+            self.sub_filter.clear()
 
 # ------
 
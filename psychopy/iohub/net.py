@@ -3,8 +3,11 @@
 # Copyright (C) 2012-2020 iSolver Software Solutions (C) 2021 Open Science Tools Ltd.
 # Distributed under the terms of the GNU General Public License (GPL).
 import struct
+import threading
+import time
 from weakref import proxy
 
+import numpy as np
 from gevent import sleep, Greenlet
 import msgpack
 try:
@@ -155,6 +158,18 @@ class ioHubTimeSyncConnection(UDPClientConnection):
         self.sync_batch_size = 5
 
     def sync(self):
+        """Send sync_batch_size sync requests to the remote ioHub Server and
+        return the (rtt, local_time, remote_time) of the request with the
+        smallest round trip time."""
+        rtts, local_times, remote_times = self.syncSamples()
+        i = int(np.argmin(rtts))
+        return rtts[i], local_times[i], remote_times[i]
+
+    def syncSamples(self):
+        """Send sync_batch_size sync requests to the remote ioHub Server and
+        return numpy arrays of the round trip time, local time and remote time
+        of each request. The local time of a request is the mid point between
+        sending the request and receiving the reply."""
         sync_count = self.sync_batch_size
         sync_data = ['SYNC_REQ', ]
 
@@ -168,11 +183,8 @@ class ioHubTimeSyncConnection(UDPClientConnection):
         remote_address = self.remote_iohub_address
         sendto = self.sock.sendto
 
-        min_delay = 1000.0
-        min_local_time = 0.0
-        min_remote_time = 0.0
-
-        while sync_count > 0:
+        samples = np.empty((3, sync_count), dtype=np.float64)
+        for i in range(sync_count):
             # send sync request
             sync_start = Computer.getTime()
             sendto(pack(sync_data), remote_address)
@@ -182,17 +194,11 @@ class ioHubTimeSyncConnection(UDPClientConnection):
             feed(recvfrom(rcvBufferLength)[0])
             _, remote_time = unpack()
             sync_end = Computer.getTime()
-            rtt = sync_end - (sync_start + sync_start2) / 2.0
-
-            old_delay = min_delay
-            min_delay = min(min_delay, rtt)
-
-            if old_delay != min_delay:
-                min_local_time = (sync_end + sync_start) / 2.0
-                min_remote_time = remote_time
-            sync_count = sync_count - 1
+            samples[0, i] = sync_end - (sync_start + sync_start2) / 2.0
+            samples[1, i] = (sync_end + sync_start) / 2.0
+            samples[2, i] = remote_time
 
-        return min_delay, min_local_time, min_remote_time
+        return samples
 
 
 class ioHubTimeGreenSyncManager(Greenlet):
@@ -240,23 +246,11 @@ class ioHubTimeGreenSyncManager(Greenlet):
     def _sync(self, calc_drift_and_offset=True):
         try:
             if self._sync_socket:
-                r = self._sync_socket.sync()
-                min_delay, min_local_time, min_remote_time = r
-                sync_state_target = self.sync_state_target
-                sync_state_target.RTTs.append(min_delay)
-                sync_state_target.L_times.append(min_local_time)
-                sync_state_target.R_times.append(min_remote_time)
-
-                if calc_drift_and_offset is True:
-                    l1 = sync_state_target.L_times[-2]
-                    l2 = sync_state_target.L_times[-1]
-                    r1 = sync_state_target.R_times[-2]
-                    r2 = sync_state_target.R_times[-1]
-                    self.sync_state_target.drifts.append((r2 - r1) / (l2 - l1))
-
-                    l = sync_state_target.L_times[-1]
-                    r = sync_state_target.R_times[-1]
-                    self.sync_state_target.offsets = (r - l)
+                rtts, local_times, remote_times = \
+                    self._sync_socket.syncSamples()
+                self.sync_state_target.addSamples(
+                    rtts, local_times, remote_times,
+                    update_model=calc_drift_and_offset)
         except Exception: # pylint: disable=broad-except
             return False
         return True
@@ -272,37 +266,69 @@ class ioHubTimeGreenSyncManager(Greenlet):
 
 
 class ioHubTimeSyncManager():
+    """Time synchronization manager for use outside of the ioHub Server
+    process. Call sync() to add a batch of sync samples to the
+    sync_state_target, or startBackgroundSync() to keep adding samples from
+    a background thread."""
 
     def __init__(self, remote_address, sync_state_target):
         self.initial_sync_interval = 0.2
         self._remote_address = remote_address
         self._sync_socket = ioHubTimeSyncConnection(remote_address)
         self.sync_state_target = proxy(sync_state_target)
+        self._sync_thread = None
+        self._sync_thread_running = False
+        # the socket is shared by sync() calls from the background thread
+        # and the caller's thread, replies must go to the request they answer
+        self._sync_lock = threading.Lock()
 
     def sync(self, calc_drift_and_offset=True):
-        if self._sync_socket:
-            r = self._sync_socket.sync()
-            min_delay, min_local_time, min_remote_time = r
-            sync_state_target = self.sync_state_target
-            sync_state_target.RTTs.append(min_delay)
-            sync_state_target.L_times.append(min_local_time)
-            sync_state_target.R_times.append(min_remote_time)
-
-            if calc_drift_and_offset is True:
-                l1 = sync_state_target.L_times[-2]
-                l2 = sync_state_target.L_times[-1]
-                r1 = sync_state_target.R_times[-2]
-                r2 = sync_state_target.R_times[-1]
-                self.sync_state_target.drifts.append((r2 - r1) / (l2 - l1))
-
-                l = sync_state_target.L_times[-1]
-                r = sync_state_target.R_times[-1]
-                self.sync_state_target.offsets = (r - l)
+        """Add a batch of sync samples to the sync_state_target. If
+        calc_drift_and_offset is False, the drift and offset are not fitted
+        again until samples are added with it True."""
+        with self._sync_lock:
+            if not self._sync_socket:
+                return
+            rtts, local_times, remote_times = self._sync_socket.syncSamples()
+        self.sync_state_target.addSamples(
+            rtts, local_times, remote_times,
+            update_model=calc_drift_and_offset)
+
+    def startBackgroundSync(self, interval=None):
+        """Start a daemon thread that calls sync() every interval sec.msec
+        (default initial_sync_interval), so the offset and drift estimates
+        are kept up to date for the length of a recording."""
+        if self._sync_thread is not None:
+            return
+        if interval is None:
+            interval = self.initial_sync_interval
+
+        def run():
+            while self._sync_thread_running and self._sync_socket:
+                try:
+                    self.sync()
+                except Exception:  # pylint: disable=broad-except
+                    # e.g. a sync reply timed out, try again next interval
+                    pass
+                time.sleep(interval)
+
+        self._sync_thread_running = True
+        self._sync_thread = threading.Thread(target=run, daemon=True)
+        self._sync_thread.start()
+
+    def stopBackgroundSync(self):
+        self._sync_thread_running = False
+        if self._sync_thread is not None:
+            if self._sync_thread is not threading.current_thread():
+                self._sync_thread.join()
+            self._sync_thread = None
 
     def close(self):
-        if self._sync_socket:
-            self._sync_socket.close()
-            self._sync_socket = None
+        self.stopBackgroundSync()
+        with self._sync_lock:
+            if self._sync_socket:
+                self._sync_socket.close()
+                self._sync_socket = None
 
     def __del__(self):
         self.close()
@@ -311,39 +337,125 @@ class ioHubTimeSyncManager():
 class TimeSyncState():
     """Container class used by an ioHubSyncManager to hold the data necessary
     to calculate the current time base offset and drift between an ioHub Server
-    and a ioHubRemoteEventSubscriber client."""
-    RTTs = RingBuffer(10)
-    L_times = RingBuffer(10)
-    R_times = RingBuffer(10)
-    drifts = RingBuffer(20)
-    offsets = RingBuffer(20)
+    and a ioHubRemoteEventSubscriber client.
+
+    The remote time base is modelled as remote = drift * local + offset.
+    drift and offset are fitted by linear regression over the most recent
+    sample_count sync samples. Samples with a round trip time above the
+    rtt_percentile of the window are excluded from the fit, as are samples
+    whose residual is more than 3 (robust) standard deviations from the
+    initial fit.
+    """
+    def __init__(self, sample_count=600, rtt_percentile=50.0):
+        self.RTTs = RingBuffer(sample_count, dtype=np.float64)
+        self.L_times = RingBuffer(sample_count, dtype=np.float64)
+        self.R_times = RingBuffer(sample_count, dtype=np.float64)
+        self.rtt_percentile = rtt_percentile
+        self._lock = threading.Lock()
+        self._model = None
+
+    def addSamples(self, rtts, local_times, remote_times, update_model=True):
+        """Add the round trip time, local time and remote time of one or more
+        sync requests. If update_model is False, the current drift and offset
+        are kept until samples are added with update_model True (they are
+        fitted if there are none yet)."""
+        with self._lock:
+            self.RTTs.extend(rtts)
+            self.L_times.extend(local_times)
+            self.R_times.extend(remote_times)
+            if update_model:
+                self._model = None
+
+    def _getSamples(self):
+        count = len(self.RTTs)
+        if count == 0:
+            return None
+        # the most recent count elements are always valid, even when the
+        # ring buffer is not yet full
+        return (self.RTTs.getElements()[-count:].copy(),
+                self.L_times.getElements()[-count:].copy(),
+                self.R_times.getElements()[-count:].copy())
+
+    def _getModel(self):
+        # fitted and stored under the lock, so a model is never stored for
+        # samples which have been replaced in the meantime
+        with self._lock:
+            if self._model is None:
+                self._model = self._fitModel()
+            if self._model is None:
+                return 1.0, 0.0, np.nan
+            return self._model
+
+    def _fitModel(self):
+        samples = self._getSamples()
+        if samples is None:
+            return None
+        rtts, local_times, remote_times = samples
+
+        use = rtts <= np.percentile(rtts, self.rtt_percentile)
+        # Fit remote - local against local time relative to the window
+        # mean, which keeps the regression well conditioned for long
+        # recordings; the slope is then drift - 1.
+        x = local_times[use]
+        local_mean = x.mean()
+        x = x - local_mean
+        y = remote_times[use] - local_times[use]
+        slope, intercept = self._linearFit(x, y)
+
+        residuals = y - (slope * x + intercept)
+        mad = np.median(np.abs(residuals - np.median(residuals)))
+        if mad > 0:
+            inliers = np.abs(residuals) <= 3.0 * 1.4826 * mad
+            if 2 <= inliers.sum() < len(inliers):
+                slope, intercept = self._linearFit(x[inliers], y[inliers])
+
+        accuracy = np.median(rtts[use]) / 2.0
+        return 1.0 + slope, intercept - slope * local_mean, accuracy
+
+    @staticmethod
+    def _linearFit(x, y):
+        if len(x) < 2 or np.ptp(x) == 0:
+            return 0.0, float(np.mean(y))
+        slope, intercept = np.polyfit(x, y, 1)
+        return float(slope), float(intercept)
 
     def getDrift(self):
         """Current drift between two time bases."""
-        return self.drifts.mean()
+        return self._getModel()[0]
 
     def getOffset(self):
         """Current offset between two time bases."""
-        return self.offsets.mean()
+        return self._getModel()[1]
 
     def getAccuracy(self):
-        """Current accuracy of the time synchronization, as calculated as the.
-
-        average of the last 10 round trip time sync request - response delays
-        divided by two.
+        """Current accuracy of the time synchronization, calculated as the
+        median round trip time of the sync samples used by the fit divided by
+        two.
 
         """
-        return self.RTTs.mean() / 2.0
+        return self._getModel()[2]
 
     def local2RemoteTime(self, local_time=None):
         """Converts a local time (sec.msec format) to the corresponding remote
-        computer time, using the current offset and drift measures."""
+        computer time, using the current offset and drift measures.
+
+        local_time can also be a sequence or numpy array of times, in which
+        case a numpy array of the converted times is returned."""
         if local_time is None:
             local_time = Computer.getTime()
-        return self.getDrift() * local_time + self.getOffset()
+        elif not np.isscalar(local_time):
+            local_time = np.asarray(local_time, dtype=np.float64)
+        drift, offset, _ = self._getModel()
+        return drift * local_time + offset
 
     def remote2LocalTime(self, remote_time):
         """Converts a remote computer time (sec.msec format) to the
         corresponding local time, using the current offset and drift
-        measures."""
-        return (remote_time - self.getOffset()) / self.getDrift()
+        measures.
+
+        remote_time can also be a sequence or numpy array of times, in which
+        case a numpy array of the converted times is returned."""
+        if not np.isscalar(remote_time):
+            remote_time = np.asarray(remote_time, dtype=np.float64)
+        drift, offset, _ = self._getModel()
+        return (remote_time - offset) / drift
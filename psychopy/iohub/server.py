@@ -6,6 +6,7 @@ import importlib
 import os
 import sys
 import inspect
+from concurrent.futures import ThreadPoolExecutor
 from operator import itemgetter
 from collections import deque, OrderedDict
 
@@ -26,7 +27,7 @@ from . import IOHUB_DIRECTORY, EXP_SCRIPT_DIRECTORY, _DATA_STORE_AVAILABLE
 from .errors import print2err, printExceptionDetailsToStdErr, ioHubError
 from .net import MAX_PACKET_SIZE
 from .util import convertCamelToSnake, win32MessagePump
-from .util import yload, yLoader
+from .util.configcache import getConfigCache
 from .constants import DeviceConstants, EventConstants
 from .devices import DeviceEvent, import_device, importDeviceModule
 from .devices import Computer
@@ -55,6 +56,9 @@ class udpServer(DatagramServer):
         self.iohub = ioHubServer
         self.feed = None
         self._running = True
+        # condition variable rows sent without waiting for a reply which
+        # could not be saved, reported by getConditionVariableRowErrors()
+        self._cv_rows_failed = 0
         self.iohub.log('ioHub Server configuring msgpack...')
         self.coder = msgpack
         self.packer = msgpack.Packer()
@@ -108,6 +112,21 @@ class udpServer(DatagramServer):
             return self.handleExperimentDeviceRequest(request, replyTo)
         elif request_type == 'CUSTOM_TASK':
             return self.handleCustomTaskRequest(request, replyTo)
+        elif request_type == 'EXP_CV_ROWS':
+            # Condition variable rows sent by the client without waiting for
+            # a reply, so no response is sent.
+            exp_id, sess_id, rows = request
+            try:
+                saved = self.extendConditionVariableTableRows(exp_id, sess_id,
+                                                              rows)
+            except Exception:  # pylint: disable=broad-except
+                printExceptionDetailsToStdErr()
+                saved = False
+            if not saved:
+                print2err('Error saving {} condition variable rows.'.format(
+                    len(rows)))
+                self._cv_rows_failed += len(rows)
+            return True
         elif request_type == 'RPC':
             callable_name = request.pop(0)
             args = None
@@ -488,6 +507,20 @@ class udpServer(DatagramServer):
             return dsfile.extendConditionVariableTable(exp_id, sess_id, data)
         return False
 
+    def extendConditionVariableTableRows(self, exp_id, sess_id, rows):
+        dsfile = self.iohub.dsfile
+        if dsfile:
+            return dsfile.extendConditionVariableTableRows(exp_id, sess_id,
+                                                           rows)
+        return False
+
+    def getConditionVariableRowErrors(self):
+        """Number of condition variable rows sent without waiting for a reply
+        which could not be saved since the last call."""
+        failed = self._cv_rows_failed
+        self._cv_rows_failed = 0
+        return failed
+
     def clearEventBuffer(self, clear_device_level_buffers=False):
         """
 
@@ -541,6 +574,9 @@ class udpServer(DatagramServer):
     def setProcessAffinity(processorList):
         return Computer.setCurrentProcessAffinity(processorList)
 
+    def getDeviceStats(self, reset=False):
+        return self.iohub.getDeviceStats(reset)
+
     def flushIODataStoreFile(self):
         dsfile = self.iohub.dsfile
         if dsfile:
@@ -561,25 +597,113 @@ class udpServer(DatagramServer):
 
 
 class DeviceMonitor(Greenlet):
-    def __init__(self, device, sleep_interval):
+    """Greenlet that calls the _poll method of a device every sleep_interval
+    seconds.
+
+    If max_interval is greater than sleep_interval, the polling interval is
+    doubled (up to max_interval) each time idle_poll_count polls in a row
+    find no new device events, and drops back to sleep_interval as soon as a
+    poll receives an event.
+    """
+    def __init__(self, device, sleep_interval, max_interval=None,
+                 idle_poll_count=100):
         Greenlet.__init__(self)
         self.device = device
         self.sleep_interval = sleep_interval
+        self.max_interval = max(sleep_interval, max_interval or 0)
+        self.idle_poll_count = idle_poll_count
+        self.current_interval = sleep_interval
         self.running = False
+        self.resetStats()
+
+    def resetStats(self):
+        self.poll_count = 0
+        self.idle_polls = 0
+        self.polled_event_count = 0
+        self.total_poll_time = 0.0
+        self.max_poll_time = 0.0
+
+    def getStats(self):
+        poll_count = self.poll_count
+        return dict(poll_count=poll_count,
+                    poll_interval=self.current_interval,
+                    polled_event_count=self.polled_event_count,
+                    idle_polls=self.idle_polls,
+                    mean_poll_time=self.total_poll_time / max(1, poll_count),
+                    max_poll_time=self.max_poll_time)
+
+    def poll(self):
+        """Poll the device once, updating the statistics and the polling
+        interval. Returns the time the poll took."""
+        native_events = self.device._getNativeEventBuffer()
+        stime = Computer.getTime()
+        events_before = len(native_events)
+        self.device._poll()
+        poll_time = Computer.getTime() - stime
+
+        # Only events added by this poll are counted; the event
+        # processing tasklet may have emptied the buffer in between.
+        new_events = len(native_events) - events_before
+        self.poll_count += 1
+        self.total_poll_time += poll_time
+        if poll_time > self.max_poll_time:
+            self.max_poll_time = poll_time
+        if new_events > 0:
+            self.polled_event_count += new_events
+            self.idle_polls = 0
+            self.current_interval = self.sleep_interval
+        else:
+            self.idle_polls += 1
+            if self.idle_polls % self.idle_poll_count == 0:
+                self.current_interval = min(self.current_interval * 2,
+                                            self.max_interval)
+        return poll_time
 
     def _run(self):
         self.running = True
-        ctime = Computer.getTime
         while self.running is True:
-            stime = ctime()
-            self.device._poll()
-            i = self.sleep_interval - (ctime() - stime)
-            gevent.sleep(max(0,i))
+            poll_time = self.poll()
+            gevent.sleep(max(0, self.current_interval - poll_time))
 
     def __del__(self):
         self.device = None
 
 
+class DeviceProcessingStats():
+    """Event processing statistics kept by the ioServer for each device."""
+    def __init__(self):
+        self.reset()
+
+    def reset(self):
+        self.process_count = 0
+        self.skipped_count = 0
+        self.processed_event_count = 0
+        self.filtered_event_count = 0
+        self.total_process_time = 0.0
+        self.max_process_time = 0.0
+        self.max_queue_depth = 0
+
+    def update(self, event_count, filtered_count, queue_depth, dur):
+        self.process_count += 1
+        self.processed_event_count += event_count
+        self.filtered_event_count += filtered_count
+        self.total_process_time += dur
+        if dur > self.max_process_time:
+            self.max_process_time = dur
+        if queue_depth > self.max_queue_depth:
+            self.max_queue_depth = queue_depth
+
+    def getStats(self):
+        process_count = self.process_count
+        return dict(process_count=process_count,
+                    skipped_count=self.skipped_count,
+                    processed_event_count=self.processed_event_count,
+                    filtered_event_count=self.filtered_event_count,
+                    mean_process_time=self.total_process_time / max(1, process_count),
+                    max_process_time=self.max_process_time,
+                    max_queue_depth=self.max_queue_depth)
+
+
 class ioServer():
     eventBuffer = None
     deviceDict = {}
@@ -598,6 +722,7 @@ class ioServer():
         self.config = config
         self.devices = []
         self.deviceMonitors = []
+        self._deviceStats = {}
         self.custom_tasks = OrderedDict()
         self.sessionInfoDict = None
         self.experimentInfoList = None
@@ -609,15 +734,36 @@ class ioServer():
         ebuf_sz = config.get('global_event_buffer', 2048)
         ioServer.eventBuffer = deque(maxlen=ebuf_sz)
 
+        self._startup_timings = []
+
         self._running = True
         # start UDP service
+        stime = getTime()
         self.udpService = udpServer(self, ':%d' % config.get('udp_port', 9000))
+        self._addStartupTime('udp_server', stime)
+
+        stime = getTime()
         self._initDataStore(config, rootScriptPathDir)
+        self._addStartupTime('data_store', stime)
 
         self._addDevices(config)
 
         self._addPubSubListeners()
 
+        getConfigCache().save()
+        self._logStartupTimes()
+
+    def _addStartupTime(self, label, stime):
+        self._startup_timings.append((label, getTime() - stime))
+
+    def _logStartupTimes(self):
+        config_cache = getConfigCache()
+        timings = ', '.join('{0}: {1:.4f}'.format(label, dur)
+                            for label, dur in self._startup_timings)
+        self.log('ioHub Server startup times (sec): {0}'.format(timings))
+        self.log('ioHub config cache hits: {0}, misses: {1}'.format(
+            config_cache.hits, config_cache.misses))
+
     def _initDataStore(self, config, script_dir):
         try:
             # initial dataStore setup
@@ -626,8 +772,8 @@ class ioServer():
                 def_ds_conf_path = os.path.join(IOHUB_DIRECTORY,
                                                 'datastore',
                                                 'default_datastore.yaml')
-                _, def_ds_conf = yload(open(def_ds_conf_path, 'r'),
-                                       Loader=yLoader).popitem()
+                _, def_ds_conf = getConfigCache().loadYAML(
+                    def_ds_conf_path).popitem()
                 for dkey, dvalue in def_ds_conf.items():
                     if dkey not in ds_conf:
                         ds_conf[dkey] = dvalue
@@ -652,13 +798,68 @@ class ioServer():
     def _addDevices(self, config):
         # built device list and config from initial yaml config settings
         try:
-            for iodevice in config.get('monitor_devices', ()):
+            monitor_devices = config.get('monitor_devices', ())
+            stime = getTime()
+            self._prefetchDeviceModules(monitor_devices)
+            self._addStartupTime('device_module_prefetch', stime)
+            for iodevice in monitor_devices:
                 for dev_cls_name, dev_conf in iodevice.items():
+                    stime = getTime()
                     self.createNewMonitoredDevice(dev_cls_name, dev_conf)
+                    self._addStartupTime(dev_cls_name, stime)
         except Exception:
             print2err('Error during device creation ....')
             printExceptionDetailsToStdErr()
 
+    def _prefetchDeviceModules(self, monitor_devices):
+        """Import the device modules, and load their default and supported
+        config settings files, for all devices in monitor_devices using a
+        thread pool.
+
+        Devices themselves are still created one at a time, in config file
+        order, since later devices use earlier ones (e.g. the Display).
+        """
+        dev_mod_paths = []
+        for iodevice in monitor_devices:
+            for dev_cls_name in iodevice.keys():
+                dev_mod_path, dev_cls_name = self._getDeviceModulePath(
+                    dev_cls_name)
+                dev_mod_paths.append((dev_mod_path, dev_cls_name))
+
+        config_cache = getConfigCache()
+
+        def prefetch(dev_mod_path, dev_cls_name):
+            try:
+                dev_mod = importDeviceModule(dev_mod_path)
+                dev_dir = os.path.dirname(dev_mod.__file__)
+                for fname in ('default_%s.yaml' % dev_cls_name.lower(),
+                              'supported_config_settings.yaml'):
+                    fpath = os.path.join(dev_dir, fname)
+                    if os.path.exists(fpath):
+                        config_cache.loadYAML(fpath)
+            except Exception:
+                # any error is reported when the device is created
+                pass
+
+        if len(dev_mod_paths) > 1:
+            with ThreadPoolExecutor(max_workers=len(dev_mod_paths)) as pool:
+                for dev_mod_path, dev_cls_name in dev_mod_paths:
+                    pool.submit(prefetch, dev_mod_path, dev_cls_name)
+
+    @staticmethod
+    def _getDeviceModulePath(dev_cls_name):
+        """Return the module path and class name for the device class name
+        given in the iohub config, e.g. 'eyetracker.hw.mouse.EyeTracker'."""
+        dev_cls_name = str(dev_cls_name)
+        cls_name_start = dev_cls_name.rfind('.')
+        dev_mod_pth = 'psychopy.iohub.devices.'
+        if cls_name_start > 0:
+            dev_mod_pth += dev_cls_name[:cls_name_start].lower()
+            dev_cls_name = dev_cls_name[cls_name_start + 1:]
+        else:
+            dev_mod_pth += dev_cls_name.lower()
+        return dev_mod_pth, dev_cls_name
+
     def _addPubSubListeners(self):
         # Add PubSub device listeners to other event types
         try:
@@ -835,16 +1036,8 @@ class ioServer():
         self.log('Handling Device: %s' % (dev_cls_name,))
 
         DeviceClass = None
-        cls_name_start = dev_cls_name.rfind('.')
         # define subdirectory to look in
-        iohub_submod = 'psychopy.iohub.'
-        iohub_submod_len = len(iohub_submod)
-        dev_mod_pth = iohub_submod + 'devices.'
-        if cls_name_start > 0:
-            dev_mod_pth += dev_cls_name[:cls_name_start].lower()
-            dev_cls_name = dev_cls_name[cls_name_start + 1:]
-        else:
-            dev_mod_pth += dev_cls_name.lower()
+        dev_mod_pth, dev_cls_name = self._getDeviceModulePath(dev_cls_name)
         # convert subdirectory to path
         dev_mod = importDeviceModule(dev_mod_pth)
         dev_file_pth = os.path.dirname(dev_mod.__file__)
@@ -857,8 +1050,9 @@ class ioServer():
         # present, look at the directory the device interface class is located 
         # in. This additional step is required for devices which are offloaded 
         # to plugins.
+        config_cache = getConfigCache()
         try:
-            _dconf = yload(open(dev_conf_pth, 'r'), Loader=yLoader)
+            _dconf = config_cache.loadYAML(dev_conf_pth)
         except FileNotFoundError:
             # Look for the file using an alternative method, this may be due to
             # file being located in a plugin directory, for now only the 
@@ -870,8 +1064,7 @@ class ioServer():
                     inspect.getfile(dev_mod.EyeTracker))
                 dev_conf_pth = os.path.join(
                     dev_conf_pth, 'default_%s.yaml' % (dev_cls_name.lower()))
-                with open(dev_conf_pth, 'r') as conf_file:
-                    _dconf = yload(conf_file, Loader=yLoader)
+                _dconf = config_cache.loadYAML(dev_conf_pth)
             else:
                 print2err(
                     'ERROR: Device Defaults file not found: %s' % (
@@ -918,7 +1111,10 @@ class ioServer():
 
             if 'device_timer' in dev_conf:
                 interval = dev_conf['device_timer'].get('interval', 0.001)
-                dPoller = DeviceMonitor(dev_instance, interval)
+                max_scale = self.config.get('device_timer_max_scale', 1)
+                idle_count = self.config.get('device_timer_idle_polls', 100)
+                dPoller = DeviceMonitor(dev_instance, interval,
+                                        interval * max_scale, idle_count)
                 self.deviceMonitors.append(dPoller)
                 ltxt = '%s timer period: %.3f' % (dev_cls_name, interval)
                 self.log(ltxt)
@@ -982,24 +1178,37 @@ class ioServer():
             gevent.sleep(max(0, dur))
 
     def processDeviceEvents(self):
+        ctime = Computer.getTime
         for device in self.devices:
+            stats = self._deviceStats.get(device)
+            if stats is None:
+                stats = self._deviceStats[device] = DeviceProcessingStats()
             evt = []
+            events = device._getNativeEventBuffer()
+            efilters = [f for f in device._filters.values()
+                        if f._output_events]
+            queue_depth = len(events)
+            if queue_depth == 0 and not efilters:
+                # nothing arrived since the last call for this device
+                stats.skipped_count += 1
+                continue
             try:
-                events = device._getNativeEventBuffer()
+                stime = ctime()
+                iohub_events = []
                 while events:
                     evt = device._getIOHubEventObject(events.popleft())
                     if evt:
-                        etype = evt[DeviceEvent.EVENT_TYPE_ID_INDEX]
-                        for l in device._getEventListeners(etype):
-                            l._handleEvent(evt)
+                        iohub_events.append(evt)
+                self._dispatchEvents(device, iohub_events)
 
+                # filters receive input events from the device listener,
+                # so check for filter output after dispatching
                 filtered_events = []
                 for efilter in device._filters.values():
                     filtered_events.extend(efilter._removeOutputEvents())
-                for evt in filtered_events:
-                    etype = evt[DeviceEvent.EVENT_TYPE_ID_INDEX]
-                    for l in device._getEventListeners(etype):
-                        l._handleEvent(evt)
+                self._dispatchEvents(device, filtered_events)
+                stats.update(len(iohub_events), len(filtered_events),
+                             queue_depth, ctime() - stime)
 
             except Exception:
                 print2err('Error in processDeviceEvents: ', device,
@@ -1011,6 +1220,42 @@ class ioServer():
                 printExceptionDetailsToStdErr()
                 print2err('--------------------------------------')
 
+    @staticmethod
+    def _dispatchEvents(device, events):
+        # Listener lists are looked up once per event type for the batch.
+        listeners = {}
+        for evt in events:
+            etype = evt[DeviceEvent.EVENT_TYPE_ID_INDEX]
+            type_listeners = listeners.get(etype)
+            if type_listeners is None:
+                type_listeners = listeners[etype] = list(
+                    device._getEventListeners(etype))
+            for l in type_listeners:
+                l._handleEvent(evt)
+
+    def getDeviceStats(self, reset=False):
+        """Return a dict of polling and event processing statistics for each
+        device, keyed by device name. If reset is True, the statistics are
+        reset after being read.
+        """
+        monitors = {m.device: m for m in self.deviceMonitors}
+        all_stats = {}
+        for device in self.devices:
+            dev_stats = dict(queue_depth=len(device._getNativeEventBuffer()))
+            stats = self._deviceStats.get(device)
+            if stats:
+                dev_stats.update(stats.getStats())
+                if reset:
+                    stats.reset()
+            monitor = monitors.get(device)
+            if monitor is not None:
+                dev_stats.update(monitor.getStats())
+                if reset:
+                    monitor.resetStats()
+            name = device.name or device.__class__.__name__
+            all_stats[name] = dev_stats
+        return all_stats
+
     def _handleEvent(self, event):
         self.eventBuffer.append(event)
 
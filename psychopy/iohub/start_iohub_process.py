@@ -28,6 +28,8 @@ Computer.is_iohub_process = True
 from psychopy.iohub.errors import printExceptionDetailsToStdErr
 from psychopy.iohub.server import ioServer
 from psychopy.iohub.util import updateDict, yload, yLoader
+from psychopy.iohub.util.configcache import (ConfigCache, getConfigCache,
+                                             setConfigCache)
 
 
 def run(rootScriptPathDir, configFilePath):
@@ -45,9 +47,12 @@ def run(rootScriptPathDir, configFilePath):
         else:
             ioHubConfig = yload(open(configFilePath, 'r'), Loader=yLoader)
 
+        if ioHubConfig.get('config_cache', True) is False:
+            setConfigCache(ConfigCache(enabled=False))
+
         hub_config_path = os.path.join(IOHUB_DIRECTORY, 'default_config.yaml')
 
-        hub_defaults_config = yload(open(hub_config_path, 'r'), Loader=yLoader)
+        hub_defaults_config = getConfigCache().loadYAML(hub_config_path)
         updateDict(ioHubConfig, hub_defaults_config)
 
         s = ioServer(rootScriptPathDir, ioHubConfig)
@@ -64,7 +69,8 @@ def run(rootScriptPathDir, configFilePath):
             m.start()
             glets.append(m)
 
-        tlet = gevent.spawn(s.processEventsTasklet, 0.01)
+        process_interval = s.config.get('event_processing_interval', 0.01)
+        tlet = gevent.spawn(s.processEventsTasklet, process_interval)
         glets.append(tlet)
 
         if Computer.psychopy_process:
@@ -666,6 +666,27 @@ class NumPyRingBuffer():
         self._npa[(i % self.max_size) + self.max_size] = element
         self._index += 1
 
+    def extend(self, elements):
+        """Add each element of the sequence elements to the end of the
+        RingBuffer, in order. Equivalent to calling append() for each
+        element, but the buffer is updated with a single array assignment.
+
+        :param sequence elements: The elements to add to the RingBuffer.
+        :returns None:
+
+        """
+        elements = numpy.asarray(elements, dtype=self._dtype).ravel()
+        count = len(elements)
+        if count == 0:
+            return
+        # only the last max_size elements can remain in the buffer
+        keep = elements[-self.max_size:]
+        end = self._index + count
+        ix = numpy.arange(end - len(keep), end) % self.max_size
+        self._npa[ix] = keep
+        self._npa[ix + self.max_size] = keep
+        self._index = end
+
     def getElements(self):
         """Return the numpy array being used by the RingBuffer, the length of
         which will be equal to the number of elements added to the list, or the
@@ -0,0 +1,168 @@
+# -*- coding: utf-8 -*-
+# Part of the PsychoPy library
+# Copyright (C) 2012-2020 iSolver Software Solutions (C) 2021 Open Science Tools Ltd.
+# Distributed under the terms of the GNU General Public License (GPL).
+"""Disk cache for the YAML config files parsed, and the device configurations
+validated, by the ioHub Server each time it starts.
+
+Entries are keyed by a hash of the file contents, so editing a config file
+invalidates its entry. The whole cache is discarded when the PsychoPy version
+changes.
+"""
+import copy
+import hashlib
+import json
+import os
+import pickle
+import tempfile
+import threading
+
+import psychopy
+from psychopy.preferences import prefs
+from . import yload, yLoader
+from ..errors import print2err
+
+_CACHE_FORMAT = 1
+
+
+class ConfigCache():
+    """Cache of parsed YAML files and device config validation results.
+
+    Values returned by the cache are copies, so callers can modify them.
+    Call save() to write any new entries to disk.
+    """
+    def __init__(self, cache_path=None, enabled=True):
+        if cache_path is None:
+            cache_path = os.path.join(prefs.paths['userCacheDir'], 'iohub',
+                                      'config_cache.pickle')
+        self.cache_path = cache_path
+        self.enabled = enabled
+        self.hits = 0
+        self.misses = 0
+        self._entries = {}
+        self._file_digests = {}
+        self._dirty = False
+        self._lock = threading.Lock()
+        self._version = (_CACHE_FORMAT, psychopy.__version__)
+        if enabled:
+            self._read()
+
+    def _read(self):
+        try:
+            with open(self.cache_path, 'rb') as f:
+                version, entries = pickle.load(f)
+            if version == self._version:
+                self._entries = entries
+        except FileNotFoundError:
+            pass
+        except Exception:
+            # A damaged cache file is simply rebuilt.
+            print2err('Warning: ignoring unreadable ioHub config cache: ',
+                      self.cache_path)
+
+    def save(self):
+        """Write the cache to disk if any entries were added."""
+        if not (self.enabled and self._dirty):
+            return
+        cache_dir = os.path.dirname(self.cache_path)
+        try:
+            os.makedirs(cache_dir, exist_ok=True)
+            with self._lock:
+                data = pickle.dumps((self._version, self._entries))
+                self._dirty = False
+            # write then rename, so a concurrently starting server never
+            # reads a partially written file
+            fd, tmp_path = tempfile.mkstemp(dir=cache_dir)
+            with os.fdopen(fd, 'wb') as f:
+                f.write(data)
+            os.replace(tmp_path, self.cache_path)
+        except Exception:
+            print2err('Warning: could not save ioHub config cache: ',
+                      self.cache_path)
+
+    def fileDigest(self, path):
+        """Return the sha1 hex digest of the file at path."""
+        path = os.path.abspath(path)
+        digest = self._file_digests.get(path)
+        if digest is None:
+            with open(path, 'rb') as f:
+                digest = hashlib.sha1(f.read()).hexdigest()
+            self._file_digests[path] = digest
+        return digest
+
+    def _get(self, key):
+        try:
+            value = self._entries[key]
+        except KeyError:
+            self.misses += 1
+            raise
+        self.hits += 1
+        return copy.deepcopy(value)
+
+    def _set(self, key, value):
+        with self._lock:
+            self._entries[key] = copy.deepcopy(value)
+            self._dirty = True
+
+    def loadYAML(self, path):
+        """Return the contents of the YAML file at path.
+
+        Raises FileNotFoundError if the file does not exist.
+        """
+        if not self.enabled:
+            with open(path, 'r') as f:
+                return yload(f, Loader=yLoader)
+        key = ('yaml', self.fileDigest(path))
+        try:
+            return self._get(key)
+        except KeyError:
+            with open(path, 'r') as f:
+                value = yload(f, Loader=yLoader)
+            self._set(key, value)
+            return copy.deepcopy(value)
+
+    def validationKey(self, validation_file_path, device_config):
+        """Return the cache key for validating device_config against the
+        settings in validation_file_path. Must be called before validation,
+        which can modify device_config."""
+        if not self.enabled:
+            return None
+        config_str = json.dumps(device_config, sort_keys=True, default=repr)
+        return ('validation', self.fileDigest(validation_file_path),
+                hashlib.sha1(config_str.encode('utf-8')).hexdigest())
+
+    def getValidation(self, key):
+        """Return the cached (validation_results, validated_config) for key,
+        or None if not cached."""
+        if key is None:
+            return None
+        try:
+            return self._get(key)
+        except KeyError:
+            return None
+
+    def setValidation(self, key, results, validated_config):
+        """Cache the validation results and validated device config for key.
+        Only results without errors are cached, so config errors are
+        reported each time the server starts."""
+        if key is None or any(results.values()):
+            return
+        self._set(key, (results, validated_config))
+
+
+_config_cache = None
+
+
+def getConfigCache():
+    """Return the ConfigCache shared by the ioHub Server process."""
+    global _config_cache
+    if _config_cache is None:
+        _config_cache = ConfigCache()
+    return _config_cache
+
+
+def setConfigCache(cache):
+    """Replace the ConfigCache shared by the ioHub Server process, e.g. with
+    ConfigCache(enabled=False) to turn caching off."""
+    global _config_cache
+    _config_cache = cache
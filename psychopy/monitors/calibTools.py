@@ -24,8 +24,8 @@ import sys
 from copy import deepcopy, copy
 
 import numpy as np
-from scipy import interpolate
-import json_tricks  # allows json to dump/load np.arrays and dates
+# scipy.interpolate and json_tricks (which allows json to dump/load np.arrays
+# and dates) are slow to import, so they're imported when needed
 
 DEBUG = False
 
@@ -425,6 +425,7 @@ class Monitor:
         if not os.path.exists(thisFileName):
             self.calibNames = []
         else:
+            import json_tricks
             with open(thisFileName, 'r') as thisFile:
                 # Passing encoding parameter to json.loads has been
                 # deprecated and removed in Python 3.9
@@ -529,6 +530,7 @@ class Monitor:
             calib = self.calibs[calibName]
             if isinstance(calib['calibDate'], time.struct_time):
                 calib['calibDate'] = time.mktime(calib['calibDate'])
+        import json_tricks
         with open(thisFileName, 'w') as outfile:
             json_tricks.dump(self.calibs, outfile, indent=2,
                              allow_nan=True)
@@ -561,6 +563,7 @@ class Monitor:
             elif lumsPre is not None:
                 if self.autoLog:
                     logging.info('Creating linear interpolation for gamma')
+                from scipy import interpolate
                 # we can make an interpolator
                 self._gammaInterpolator = []
                 self._gammaInterpolator2 = []
@@ -758,6 +761,7 @@ class GammaCalculator:
 def makeDKL2RGB(nm, powerRGB):
     """Creates a 3x3 DKL->RGB conversion matrix from the spectral input powers
     """
+    from scipy import interpolate
     interpolateCones = interpolate.interp1d(wavelength_5nm,
                                             cones_SmithPokorny)
     interpolateJudd = interpolate.interp1d(wavelength_5nm,
@@ -799,6 +803,7 @@ def makeDKL2RGB(nm, powerRGB):
 def makeLMS2RGB(nm, powerRGB):
     """Creates a 3x3 LMS->RGB conversion matrix from the spectral input powers
     """
+    from scipy import interpolate
 
     interpolateCones = interpolate.interp1d(wavelength_5nm,
                                             cones_SmithPokorny)
@@ -21,7 +21,9 @@ __all__ = [
     'activatePlugins',
     'discoverModuleClasses',
     'getBundleInstallTarget',
-    'refreshBundlePaths'
+    'refreshBundlePaths',
+    'getEntryPointGroup',
+    'getPluginRegistry'
 ]
 
 import os
@@ -33,6 +35,7 @@ import hashlib
 import importlib, importlib.metadata
 from psychopy import logging
 from psychopy.preferences import prefs
+from psychopy.plugins.registry import EntryPointRegistry
 
 # Configure the environment to use our custom site-packages location for
 # user-installed packages (i.e. plugins).
@@ -56,11 +59,37 @@ _installed_plugins_ = collections.OrderedDict()
 # Keep track of plugins that failed to load here
 _failed_plugins_ = []
 
+# Entry points of the packages in each folder of the search path, kept between
+# sessions so that only folders which have changed are scanned again. Created
+# by `getPluginRegistry`.
+_registry_ = None
+
 
 # ------------------------------------------------------------------------------
 # Functions
 #
 
+def getPluginRegistry():
+    """Get the registry of entry points advertised by installed packages.
+
+    The registry is saved in the user cache folder when plugins are scanned,
+    so later sessions only read the metadata of packages in folders which have
+    changed.
+
+    Returns
+    -------
+    :class:`~psychopy.plugins.registry.EntryPointRegistry`
+        The registry for this session.
+
+    """
+    global _registry_
+    if _registry_ is None:
+        _registry_ = EntryPointRegistry(
+            os.path.join(prefs.paths['userCacheDir'], 'entryPoints.pickle'))
+
+    return _registry_
+
+
 def getEntryPointGroup(group, subgroups=False):
     """
     Get all entry points which target a specific group.
@@ -81,16 +110,11 @@ def getEntryPointGroup(group, subgroups=False):
     # start off with no entry points or sections
     entryPoints = []
 
-    if subgroups:
-        # if searching subgroups, iterate through entry point groups
-        for thisGroup, eps in importlib.metadata.entry_points().items():
-            # get entry points within matching group
-            if thisGroup.startswith(group):
-                # add to list of all entry points
-                entryPoints += eps
-    else:
-        # otherwise, just get the requested group
-        entryPoints += importlib.metadata.entry_points().get(group, [])
+    # iterate through matching entry point groups
+    groups = getPluginRegistry().getEntryPoints(group, subgroups=subgroups)
+    for thisGroup, eps in groups.items():
+        # add to list of all entry points
+        entryPoints += eps
 
     return entryPoints
 
@@ -417,6 +441,10 @@ def scanPlugins():
     called automatically when PsychoPy starts, so you do not need to call this
     unless packages have been added since the session began.
 
+    Entry points are read from the plugin registry (see
+    :func:`getPluginRegistry`), so only the metadata of packages in folders
+    which have changed since the last scan is read.
+
     Returns
     -------
     int
@@ -426,26 +454,27 @@ def scanPlugins():
     """
     global _installed_plugins_
     _installed_plugins_ = {}  # clear the cache
+    registry = getPluginRegistry()
     # iterate through installed packages
-    for dist in importlib.metadata.distributions(path=sys.path + [USER_PACKAGES_PATH]):
+    for distName, entryPoints in registry.getDistributions(
+            sys.path + [USER_PACKAGES_PATH]):
         # map all entry points
-        for ep in dist.entry_points:
+        for name, value, group in entryPoints:
             # skip entry points which don't target PsychoPy
-            if not ep.group.startswith("psychopy"):
+            if not group.startswith("psychopy"):
                 continue
             # make sure we have an entry for this distribution
-            if sys.version.startswith("3.8"):
-                distName = dist.metadata['name']
-            else:
-                distName = dist.name
             if distName not in _installed_plugins_:
                 _installed_plugins_[distName] = {}
             # make sure we have an entry for this group
-            if ep.group not in _installed_plugins_[distName]:
-                _installed_plugins_[distName][ep.group] = {}
+            if group not in _installed_plugins_[distName]:
+                _installed_plugins_[distName][group] = {}
             # map entry point
-            _installed_plugins_[distName][ep.group][ep.name] = ep
-    
+            _installed_plugins_[distName][group][name] = \
+                importlib.metadata.EntryPoint(name, value, group)
+    # keep what was found for the next session
+    registry.save()
+
     return len(_installed_plugins_)
 
 
@@ -0,0 +1,280 @@
+#!/usr/bin/env python
+# -*- coding: utf-8 -*-
+
+# Part of the PsychoPy library
+# Copyright (C) 2002-2018 Jonathan Peirce (C) 2019-2024 Open Science Tools Ltd.
+# Distributed under the terms of the GNU General Public License (GPL).
+"""Registry of the entry points advertised by installed packages.
+
+Finding plugins means reading the metadata of every distribution on the search
+path, which takes seconds in environments with hundreds of packages. The
+registry keeps the entry points found in each folder of the search path, in
+memory and in the user cache folder, and only reads the metadata again for
+folders (or distributions) which have been modified since. Entry point objects
+are only created for the groups which are asked for.
+"""
+
+__all__ = [
+    'EntryPointRegistry',
+    'REGISTRY_VERSION'
+]
+
+import os
+import re
+import sys
+import pickle
+import threading
+import importlib.metadata
+
+from psychopy import logging
+
+# version of the saved registry format, registries saved in another format
+# are ignored
+REGISTRY_VERSION = 1
+
+
+def _getStamp(path):
+    """Modification time of a file or folder, or None if it doesn't exist."""
+    try:
+        return os.stat(path).st_mtime_ns
+    except OSError:
+        return None
+
+
+def _getDistName(dist):
+    if sys.version.startswith("3.8"):
+        return dist.metadata['name']
+
+    return dist.name
+
+
+def _normalizeName(name):
+    """Normalise a distribution name the way `importlib.metadata` does when
+    removing duplicate distributions."""
+    return re.sub(r"[-_.]+", "-", name or "").lower().replace('-', '_')
+
+
+class EntryPointRegistry:
+    """Entry points of the distributions found in each folder of the search
+    path.
+
+    Each folder is scanned again when it is modified (e.g. a package is
+    installed or removed), and each distribution when its metadata is.
+
+    Parameters
+    ----------
+    filename : str or None
+        File the registry is loaded from and saved to. If `None`, the registry
+        is kept in memory only.
+
+    """
+    def __init__(self, filename=None):
+        self.filename = filename
+        # folder -> (stamp, distributions), each distribution is a tuple of
+        # name, metadata path, metadata stamps and entry points (as tuples of
+        # name, value and group)
+        self._folders = {}
+        self._modified = False
+        # entry points by group, created as they are asked for
+        self._entryPoints = {}
+        self._lock = threading.RLock()
+        # number of folders read from the cache and scanned, for profiling
+        self.hits = 0
+        self.misses = 0
+        if filename is not None:
+            self.load()
+
+    def load(self):
+        """Load the folders saved by an earlier session."""
+        try:
+            with open(self.filename, 'rb') as f:
+                version, folders = pickle.load(f)
+        except FileNotFoundError:
+            return
+        except Exception:
+            logging.warning(
+                "Ignoring unreadable plugin registry '{}'.".format(
+                    self.filename))
+            return
+
+        if version == REGISTRY_VERSION:
+            with self._lock:
+                for folder, record in folders.items():
+                    self._folders.setdefault(folder, record)
+
+    def save(self):
+        """Save the registry, if any folder has been scanned since it was
+        loaded."""
+        if self.filename is None or not self._modified:
+            return
+        with self._lock:
+            folders = dict(self._folders)
+            self._modified = False
+        try:
+            os.makedirs(os.path.dirname(self.filename), exist_ok=True)
+            tmpFile = '{}.{}.tmp'.format(self.filename, os.getpid())
+            with open(tmpFile, 'wb') as f:
+                pickle.dump((REGISTRY_VERSION, folders), f,
+                            protocol=pickle.HIGHEST_PROTOCOL)
+            os.replace(tmpFile, self.filename)
+        except OSError as err:
+            logging.warning("Cannot write plugin registry '{}': {}".format(
+                self.filename, err))
+
+    def clear(self):
+        """Forget all folders scanned so far."""
+        with self._lock:
+            self._folders.clear()
+            self._entryPoints.clear()
+            self._modified = True
+
+    @staticmethod
+    def _getMetadataStamp(metadataPath):
+        if metadataPath is None:
+            return None
+        return (_getStamp(metadataPath),
+                _getStamp(os.path.join(metadataPath, 'entry_points.txt')))
+
+    def _isCurrent(self, record):
+        stamp, dists = record
+        if stamp is None:
+            return False  # didn't exist, check again
+        for name, metadataPath, metadataStamp, entryPoints in dists:
+            if self._getMetadataStamp(metadataPath) != metadataStamp:
+                return False
+
+        return True
+
+    def _scanFolder(self, folder):
+        """Read the entry points of the distributions in a folder."""
+        stamp = _getStamp(folder)
+        dists = []
+        for dist in importlib.metadata.distributions(path=[folder]):
+            try:
+                name = _getDistName(dist)
+                entryPoints = tuple(
+                    (ep.name, ep.value, ep.group) for ep in dist.entry_points)
+            except Exception as err:
+                logging.debug(
+                    "Cannot read distribution metadata in '{}': {}".format(
+                        folder, err))
+                continue
+            # path to the metadata folder, to notice when it changes
+            metadataPath = getattr(dist, '_path', None)
+            if metadataPath is not None:
+                metadataPath = str(metadataPath)
+            dists.append((name, metadataPath,
+                          self._getMetadataStamp(metadataPath), entryPoints))
+
+        return stamp, tuple(dists)
+
+    def getFolder(self, folder):
+        """Get the distributions in a folder of the search path, scanning it
+        if it has changed since it was last scanned.
+
+        Parameters
+        ----------
+        folder : str
+            Folder (or zip file) on the search path.
+
+        Returns
+        -------
+        tuple
+            Tuples of distribution name and entry points, each entry point
+            being a tuple of name, value and group.
+
+        """
+        folder = os.path.abspath(folder or os.curdir)
+        with self._lock:
+            record = self._folders.get(folder)
+        if record is not None and record[0] == _getStamp(folder) and \
+                self._isCurrent(record):
+            self.hits += 1
+        else:
+            self.misses += 1
+            record = self._scanFolder(folder)
+            with self._lock:
+                if self._folders.get(folder) != record:
+                    self._folders[folder] = record
+                    self._entryPoints.clear()
+                    self._modified = True
+
+        return tuple((name, entryPoints)
+                     for name, metadataPath, metadataStamp, entryPoints
+                     in record[1])
+
+    def getDistributions(self, paths=None):
+        """Get the distributions on a search path, like
+        `importlib.metadata.distributions`.
+
+        Parameters
+        ----------
+        paths : list of str or None
+            Folders to search, defaults to `sys.path`.
+
+        Returns
+        -------
+        list
+            Tuples of distribution name and entry points, in the order they
+            are found.
+
+        """
+        if paths is None:
+            paths = sys.path
+
+        dists = []
+        for folder in paths:
+            dists.extend(self.getFolder(folder))
+
+        return dists
+
+    def getEntryPoints(self, group=None, subgroups=False):
+        """Get the entry points of the distributions on `sys.path`, like
+        `importlib.metadata.entry_points`.
+
+        Parameters
+        ----------
+        group : str or None
+            Group to get entry points for, or `None` to get all groups.
+        subgroups : bool
+            If `True`, also get the entry points of groups starting with
+            `group`.
+
+        Returns
+        -------
+        dict
+            Lists of `importlib.metadata.EntryPoint` objects by group, with
+            the groups in alphabetical order.
+
+        """
+        # only the first distribution with a given name is used by importlib
+        found = set()
+        byGroup = {}
+        for name, entryPoints in self.getDistributions():
+            key = _normalizeName(name)
+            if key in found:
+                continue
+            found.add(key)
+            for epName, value, epGroup in entryPoints:
+                if group is not None and epGroup != group and not (
+                        subgroups and epGroup.startswith(group)):
+                    continue
+                byGroup.setdefault(epGroup, []).append((epName, value))
+
+        # create entry point objects once per group, when they are needed
+        entryPoints = {}
+        with self._lock:
+            for epGroup in sorted(byGroup):
+                cached = self._entryPoints.get(epGroup)
+                if cached is None or cached[0] != byGroup[epGroup]:
+                    cached = self._entryPoints[epGroup] = (
+                        byGroup[epGroup],
+                        [importlib.metadata.EntryPoint(epName, value, epGroup)
+                         for epName, value in byGroup[epGroup]])
+                entryPoints[epGroup] = list(cached[1])
+
+        return entryPoints
+
+
+if __name__ == "__main__":
+    pass
@@ -1,6 +1,3 @@
-import importlib.metadata
-
-
 def getEntryPoints(module, submodules=True, flatten=True):
     """
     Get entry points which target a particular module.
@@ -18,20 +15,16 @@ def getEntryPoints(module, submodules=True, flatten=True):
         False, will return a dict arranged by target group. By
         default True.
     """
+    from psychopy.plugins import getPluginRegistry
     # start off with a blank list/dict
     entryPointsList = []
     entryPointsDict = {}
-    # iterate through groups
-    for group, points in importlib.metadata.entry_points().items():
-        # does this group correspond to the requested module?
-        if submodules:
-            targeted = group.startswith(module)
-        else:
-            targeted = group == module
-        # if group is targeted, add entry points
-        if targeted:
-            entryPointsList += points
-            entryPointsDict[group] = points
+    # iterate through groups corresponding to the requested module
+    groups = getPluginRegistry().getEntryPoints(module, subgroups=submodules)
+    for group, points in groups.items():
+        # add entry points
+        entryPointsList += points
+        entryPointsDict[group] = points
     # return list or dict according to flatten arg
     if flatten:
         return entryPointsList
@@ -0,0 +1,182 @@
+#!/usr/bin/env python
+# -*- coding: utf-8 -*-
+
+# Part of the PsychoPy library
+# Copyright (C) 2002-2018 Jonathan Peirce (C) 2019-2024 Open Science Tools Ltd.
+# Distributed under the terms of the GNU General Public License (GPL).
+"""Time loading and saving Builder experiments.
+
+By default the largest of the Builder demos are used. Each experiment is
+loaded from a file which hasn't been parsed yet, loaded again (from the files
+parsed already) and saved, and the best of several repeats is reported. Run
+as::
+
+    python -m psychopy.scripts.benchmarkExperiments
+    python -m psychopy.scripts.benchmarkExperiments myExperiment.psyexp
+
+"""
+
+import os
+import sys
+import json
+import time
+import argparse
+import tempfile
+from pathlib import Path
+
+__all__ = [
+    'findLargestExperiments',
+    'benchmarkExperiment',
+    'formatBenchmarkReport'
+]
+
+parser = argparse.ArgumentParser(
+    description='Time loading and saving Builder experiments')
+parser.add_argument('files', nargs='*',
+                    help='Experiments to time (defaults to the largest demos)')
+parser.add_argument('--number', '-n', type=int, default=5,
+                    help='Number of demos to time, if no files are given')
+parser.add_argument('--repeats', '-r', type=int, default=5,
+                    help='Number of times to repeat each measurement')
+parser.add_argument('--json', dest='jsonFile',
+                    help='JSON file to write the results to')
+
+
+def findLargestExperiments(folder=None, n=5):
+    """Find the largest experiment files in a folder.
+
+    Parameters
+    ----------
+    folder : str, Path or None
+        Folder to search (including subfolders), defaults to the Builder
+        demos.
+    n : int
+        Number of files to return.
+
+    Returns
+    -------
+    list of str
+        The files, largest first.
+
+    """
+    if folder is None:
+        folder = Path(__file__).parent.parent / 'demos' / 'builder'
+    files = sorted(Path(folder).glob('**/*.psyexp'),
+                   key=lambda path: -path.stat().st_size)
+
+    return [str(path) for path in files[:n]]
+
+
+def _bestTime(func, repeats):
+    times = []
+    for i in range(repeats):
+        t0 = time.perf_counter()
+        func()
+        times.append(time.perf_counter() - t0)
+
+    return min(times)
+
+
+def benchmarkExperiment(filename, repeats=5):
+    """Time loading and saving an experiment.
+
+    Parameters
+    ----------
+    filename : str
+        The `.psyexp` file.
+    repeats : int
+        Number of times to repeat each measurement, the fastest is reported.
+
+    Returns
+    -------
+    dict
+        The file, its size (bytes), the number of routines, components and
+        params in it, and the time taken (seconds) to load it from a file
+        which hasn't been parsed yet (`load`), to load it again (`reload`),
+        and to save it (`save`).
+
+    """
+    from psychopy import experiment
+    from psychopy.experiment.xmltools import clearParseCache
+
+    exp = experiment.Experiment()
+    exp.loadFromXML(filename)  # import the components it uses
+
+    def load():
+        clearParseCache()
+        experiment.Experiment().loadFromXML(filename)
+
+    def reload():
+        experiment.Experiment().loadFromXML(filename)
+
+    outFolder = tempfile.mkdtemp()
+    outFile = os.path.join(outFolder, 'benchmark.psyexp')
+
+    def save():
+        exp.saveToXML(outFile, makeLegacy=False)
+
+    try:
+        result = {
+            'file': str(filename),
+            'size': os.path.getsize(filename),
+            'routines': len(exp.routines),
+            'components': sum(
+                len(routine) for routine in exp.routines.values()
+                if isinstance(routine, list)),
+            'params': sum(
+                len(comp.params) for routine in exp.routines.values()
+                if isinstance(routine, list) for comp in routine),
+            'load': _bestTime(load, repeats),
+            'reload': _bestTime(reload, repeats),
+            'save': _bestTime(save, repeats),
+        }
+    finally:
+        if os.path.isfile(outFile):
+            os.remove(outFile)
+        os.rmdir(outFolder)
+
+    return result
+
+
+def formatBenchmarkReport(results):
+    """Format the results of `benchmarkExperiment` as text.
+
+    Parameters
+    ----------
+    results : list of dict
+        Results of `benchmarkExperiment`.
+
+    Returns
+    -------
+    str
+        The report.
+
+    """
+    lines = ["{:>8} {:>6} {:>9} {:>9} {:>9}  {}".format(
+        "size", "params", "load", "reload", "save", "experiment")]
+    for result in results:
+        lines.append(
+            "{:>6}kB {:>6} {:>7.1f}ms {:>7.1f}ms {:>7.1f}ms  {}".format(
+                result['size'] // 1024, result['params'],
+                result['load'] * 1000, result['reload'] * 1000,
+                result['save'] * 1000, os.path.basename(result['file'])))
+
+    return "\n".join(lines)
+
+
+def main(args=None):
+    args = parser.parse_args(args)
+    from psychopy import logging
+    logging.console.setLevel(logging.ERROR)
+
+    files = args.files or findLargestExperiments(n=args.number)
+    results = [benchmarkExperiment(filename, repeats=args.repeats)
+               for filename in files]
+    print(formatBenchmarkReport(results), file=sys.stderr)
+    if args.jsonFile:
+        with open(args.jsonFile, 'w') as f:
+            json.dump(results, f, indent=2)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,217 @@
+#!/usr/bin/env python
+# -*- coding: utf-8 -*-
+
+# Part of the PsychoPy library
+# Copyright (C) 2002-2018 Jonathan Peirce (C) 2019-2024 Open Science Tools Ltd.
+# Distributed under the terms of the GNU General Public License (GPL).
+"""Report where starting PsychoPy spends its time.
+
+Each module is imported in a fresh interpreter with `python -X importtime`, and
+the time spent importing each module is summarised by package, along with the
+time taken to scan for plugins. Run as::
+
+    python -m psychopy.scripts.profileStartup psychopy psychopy.app
+
+"""
+
+import sys
+import json
+import time
+import argparse
+import subprocess
+
+__all__ = [
+    'profileImport',
+    'profilePluginScan',
+    'formatStartupReport'
+]
+
+parser = argparse.ArgumentParser(
+    description='Report where importing PsychoPy spends its time')
+parser.add_argument('modules', nargs='*', default=['psychopy', 'psychopy.app'],
+                    help='Modules to import (defaults to psychopy and psychopy.app)')
+parser.add_argument('--top', '-n', type=int, default=15,
+                    help='Number of modules and packages to list for each import')
+parser.add_argument('--json', dest='jsonFile',
+                    help='JSON file to write the full report to')
+
+
+def _parseImportTimes(text):
+    """Parse the output of `python -X importtime`.
+
+    Returns
+    -------
+    list
+        Tuples of module name, time spent importing the module itself and
+        time including its imports (in seconds), in the order imports finish.
+
+    """
+    modules = []
+    for line in text.splitlines():
+        if not line.startswith('import time:'):
+            continue
+        fields = line[len('import time:'):].split('|')
+        if len(fields) != 3:
+            continue
+        try:
+            selfTime, cumulative = int(fields[0]), int(fields[1])
+        except ValueError:
+            continue  # header
+        modules.append((fields[2].strip(), selfTime / 1e6, cumulative / 1e6))
+
+    return modules
+
+
+def _getPackage(name, depth=2):
+    return '.'.join(name.split('.')[:depth])
+
+
+def profileImport(module, python=None):
+    """Import a module in a new interpreter and time every import.
+
+    Parameters
+    ----------
+    module : str
+        Module to import, e.g. `'psychopy.visual'`.
+    python : str or None
+        Python interpreter to use, defaults to the current one.
+
+    Returns
+    -------
+    dict
+        The module, the time taken by the interpreter to import it (`total`,
+        seconds), the times of each module imported (`modules`, tuples of
+        name, self time and cumulative time), the self time summed by
+        package (`packages`) and the error raised if it couldn't be imported.
+
+    """
+    if python is None:
+        python = sys.executable
+    code = ("import time; t0 = time.perf_counter(); import {}; "
+            "print(time.perf_counter() - t0)").format(module)
+    t0 = time.perf_counter()
+    proc = subprocess.run([python, '-X', 'importtime', '-c', code],
+                          capture_output=True, text=True)
+    wallTime = time.perf_counter() - t0
+
+    modules = _parseImportTimes(proc.stderr)
+    packages = {}
+    for name, selfTime, cumulative in modules:
+        package = _getPackage(name)
+        packages[package] = packages.get(package, 0) + selfTime
+
+    error = None
+    total = None
+    if proc.returncode:
+        lines = [line for line in proc.stderr.splitlines()
+                 if line.strip() and not line.startswith('import time:')]
+        error = lines[-1] if lines else 'exit code {}'.format(proc.returncode)
+    else:
+        try:
+            total = float(proc.stdout.strip().splitlines()[-1])
+        except (IndexError, ValueError):
+            pass
+
+    return {
+        'module': module,
+        'total': total,
+        'wallTime': wallTime,
+        'modules': modules,
+        'packages': sorted(packages.items(), key=lambda item: -item[1]),
+        'error': error,
+    }
+
+
+def profilePluginScan():
+    """Time scanning for plugins, once as at startup and once more to show
+    the time taken when the plugin registry is up to date.
+
+    Returns
+    -------
+    dict
+        Times of the scans (seconds), the number of plugins found and the
+        number of search path folders read from the registry (`hits`) or
+        scanned (`misses`).
+
+    """
+    from psychopy import plugins
+    registry = plugins.getPluginRegistry()
+    times = []
+    for i in range(2):
+        t0 = time.perf_counter()
+        nPlugins = plugins.scanPlugins()
+        times.append(time.perf_counter() - t0)
+
+    return {
+        'first': times[0],
+        'again': times[1],
+        'plugins': nPlugins,
+        'hits': registry.hits,
+        'misses': registry.misses,
+    }
+
+
+def formatStartupReport(profiles, pluginScan=None, nTop=15):
+    """Format the results of `profileImport` (and `profilePluginScan`) as
+    text.
+
+    Parameters
+    ----------
+    profiles : list of dict
+        Results of `profileImport`.
+    pluginScan : dict or None
+        Results of `profilePluginScan`.
+    nTop : int
+        Number of modules and packages to list for each import.
+
+    Returns
+    -------
+    str
+        The report.
+
+    """
+    lines = []
+    for profile in profiles:
+        lines.append("import {}".format(profile['module']))
+        if profile['error']:
+            lines.append("  FAILED: {}".format(profile['error']))
+        if profile['total'] is not None:
+            lines.append("  import took {:.3f}s ({:.3f}s including "
+                         "interpreter start)".format(profile['total'],
+                                                     profile['wallTime']))
+        if not profile['modules']:
+            lines.append("")
+            continue
+
+        lines.append("  slowest packages (time in their own modules):")
+        for name, selfTime in profile['packages'][:nTop]:
+            lines.append("    {:8.3f}s  {}".format(selfTime, name))
+        lines.append("  slowest modules (including their imports):")
+        slowest = sorted(profile['modules'], key=lambda mod: -mod[2])
+        for name, selfTime, cumulative in slowest[:nTop]:
+            lines.append("    {:8.3f}s  {:8.3f}s self  {}".format(
+                cumulative, selfTime, name))
+        lines.append("")
+
+    if pluginScan is not None:
+        lines.append(
+            "scanning for plugins took {first:.3f}s, {again:.3f}s when "
+            "repeated ({plugins} plugins found, {hits} folders read from "
+            "the plugin registry and {misses} scanned)".format(**pluginScan))
+
+    return "\n".join(lines)
+
+
+def main(args=None):
+    args = parser.parse_args(args)
+    profiles = [profileImport(module) for module in args.modules]
+    pluginScan = profilePluginScan()
+    print(formatStartupReport(profiles, pluginScan, nTop=args.top))
+    if args.jsonFile:
+        with open(args.jsonFile, 'w') as f:
+            json.dump({'imports': profiles, 'pluginScan': pluginScan}, f,
+                      indent=2)
+
+
+if __name__ == "__main__":
+    main()
@@ -7,8 +7,13 @@
 
 import io
 import sys
+import atexit
 import os
+import time
+import json
 import argparse
+import multiprocessing
+from concurrent.futures import ProcessPoolExecutor
 from subprocess import PIPE, Popen
 from pathlib import Path
 
@@ -17,15 +22,67 @@ from psychopy import __version__
 # DO NOT IMPORT ANY OTHER PSYCHOPY SUB-PACKAGES OR THEY WON'T SWITCH VERSIONS
 
 parser = argparse.ArgumentParser(description='Compile your python file from here')
-parser.add_argument('infile', help='The input (psyexp) file to be compiled')
+parser.add_argument('infile', help='The input (psyexp) file to be compiled, or a folder of '
+                                   'them or a text file listing them to compile them all')
 parser.add_argument('--version', '-v', help='The PsychoPy version to use for compiling the script. e.g. 1.84.1')
 parser.add_argument('--outfile', '-o', help='The output (py) file to be generated (defaults to the ')
+parser.add_argument('--cache-stats', action='store_true', dest='cacheStats',
+                    help='Report how much of the script was reused from the script cache')
+parser.add_argument('--jobs', '-j', type=int, default=None,
+                    help='Number of processes compiling a folder or list of experiments '
+                         '(defaults to the number of CPUs)')
+parser.add_argument('--report', help='JSON file to write the report of compiling a folder or '
+                                     'list of experiments to')
 
 
 class LegacyScriptError(ChildProcessError):
     pass
 
 
+def _compileInVersion(infile, outfile, version):
+    """
+    Compile an experiment with another version of PsychoPy, in a new process.
+
+    Parameters
+    ----------
+    infile : str or Path
+        The input (psyexp) file to be compiled
+    outfile : str or Path
+        File to write to, a .js file also writes the legacy browsers script
+    version : str
+        The PsychoPy version to compile with
+
+    Returns
+    -------
+    tuple
+        The output and error output of the compiler.
+    """
+    # get name of executable
+    if sys.platform == 'win32':
+        pythonExec = sys.executable
+    else:
+        pythonExec = sys.executable.replace(' ', r'\ ')
+    # compile script from command line using version
+    compiler = 'psychopy.scripts.psyexpCompile'
+    cmd = [
+        pythonExec, '-m', compiler, str(infile), '-o', str(outfile),
+        '-v', version
+    ]
+    output = Popen(cmd,
+                   stdout=PIPE,
+                   stderr=PIPE,
+                   universal_newlines=True)
+    stdout, stderr = output.communicate()
+
+    # we got a non-zero error code, raise an error
+    if output.returncode != 0:
+        raise LegacyScriptError(
+            'Error: Script compile exited with code {}. Traceback:\n'
+            '{}'.format(output.returncode, stderr))
+
+    return stdout, stderr
+
+
 def generateScript(exp, outfile, target="PsychoPy"):
     """
     Generate python script from the current builder experiment.
@@ -44,13 +101,6 @@ def generateScript(exp, outfile, target="PsychoPy"):
     """
     import logging  # import here not at top of script (or useVersion fails)
     print("Generating {} script...\n".format(target))
-    # get name of executable
-    if sys.platform == 'win32':
-        pythonExec = sys.executable
-    else:
-        pythonExec = sys.executable.replace(' ', r'\ ')
-    # compile script from command line using version
-    compiler = 'psychopy.scripts.psyexpCompile'
     # if version is not specified then don't touch useVersion at all
     version = exp.settings.params['Use version'].val
     # if useVersion is different to installed version...
@@ -58,34 +108,20 @@ def generateScript(exp, outfile, target="PsychoPy"):
         # make sure we have a legacy save file
         if not Path(exp.legacyFilename).is_file():
             exp.saveToXML(filename=exp.filename)
-        # generate command to run compile from requested version
-        cmd = [
-            pythonExec, '-m', compiler, str(exp.legacyFilename), '-o', outfile
-        ]
-        # run command
-        cmd.extend(['-v', version])
-        logging.info(' '.join(cmd))
-        output = Popen(cmd,
-                       stdout=PIPE,
-                       stderr=PIPE,
-                       universal_newlines=True)
-        stdout, stderr = output.communicate()
+        # compile from requested version
+        logging.info("Compiling {} with PsychoPy {}".format(
+            exp.legacyFilename, version))
+        stdout, stderr = _compileInVersion(exp.legacyFilename, outfile, version)
         sys.stdout.write(stdout)
         sys.stderr.write(stderr)
 
-        # we got a non-zero error code, raise an error
-        if output.returncode != 0:
-            raise LegacyScriptError(
-                'Error: Script compile exited with code {}. Traceback:\n'
-                '{}'.format(output.returncode, stderr))
-
     else:
         compileScript(infile=exp, version=None, outfile=outfile)
 
     return outfile
 
 
-def compileScript(infile=None, version=None, outfile=None):
+def compileScript(infile=None, version=None, outfile=None, cacheStats=False):
     """
     Compile either Python or JS PsychoPy script from .psyexp file.
 
@@ -100,6 +136,9 @@ def compileScript(infile=None, version=None, outfile=None):
         command line interface only.
     outfile: string
         The output file to be generated (defaults to Python script).
+    cacheStats: bool
+        Print how many routine code sections were reused from the script
+        cache, and how many were generated.
     """
     def _setVersion(version):
         """
@@ -175,7 +214,33 @@ def compileScript(infile=None, version=None, outfile=None):
 
         return targetOutput
 
-    def _makeTarget(thisExp, outfile, targetOutput):
+    def _getCache(infile, thisExp):
+        """
+        Get the cache of generated code to compile with.
+
+        Parameters
+        ----------
+        infile: string, experiment.Experiment object
+            The input (psyexp) file to be compiled
+        thisExp : experiment.Experiment object
+            The experiment being compiled
+        Returns
+        -------
+        ScriptCache or None
+            Cache kept with the experiment object or, for files, in the user
+            cache directory. None if the version compiling has no cache.
+        """
+        try:
+            from psychopy.experiment.scriptcache import ScriptCache
+        except ImportError:
+            # versions from before the script cache
+            return None
+        if infile is thisExp:
+            return thisExp.scriptCache
+
+        return ScriptCache.forExperimentFile(infile)
+
+    def _makeTarget(thisExp, outfile, targetOutput, cache=None):
         """
         Generate the actual scripts for Python and/or JS.
 
@@ -187,18 +252,23 @@ def compileScript(infile=None, version=None, outfile=None):
              The output file to be generated (defaults to Python script).
         targetOutput : string
             The Python or JavaScript target type
+        cache : ScriptCache or None
+            Cache of generated code to compile with
         """
+        kwargs = {}
+        if cache is not None:
+            kwargs['cache'] = cache
         # Write script
         if targetOutput == "PsychoJS":
             # Write module JS code
-            script = thisExp.writeScript(outfile, target=targetOutput, modular=True)
+            script = thisExp.writeScript(outfile, target=targetOutput, modular=True, **kwargs)
             # Write no module JS code
             outfileNoModule = outfile.replace('.js', '-legacy-browsers.js')  # For no JS module script
-            scriptNoModule = thisExp.writeScript(outfileNoModule, target=targetOutput, modular=False)
+            scriptNoModule = thisExp.writeScript(outfileNoModule, target=targetOutput, modular=False, **kwargs)
             # Store scripts in list
             scriptDict = [(outfile, script), (outfileNoModule, scriptNoModule)]
         else:
-            script = thisExp.writeScript(outfile, target=targetOutput)
+            script = thisExp.writeScript(outfile, target=targetOutput, **kwargs)
             scriptDict = [(outfile, script)]
 
         # Output script to file
@@ -218,12 +288,291 @@ def compileScript(infile=None, version=None, outfile=None):
     version = _setVersion(version)
     thisExp = _getExperiment(infile, version)
     targetOutput = _setTarget(outfile)
-    _makeTarget(thisExp, outfile, targetOutput)
+    cache = _getCache(infile, thisExp)
+    if cache is not None:
+        hits, misses = cache.hits, cache.misses
+    _makeTarget(thisExp, outfile, targetOutput, cache)
+    if cacheStats:
+        if cache is None:
+            print("Script cache: not available in this version")
+        else:
+            print("Script cache: {} routine sections reused, {} generated".format(
+                cache.hits - hits, cache.misses - misses))
+
+
+def findExperimentFiles(source):
+    """
+    Find the experiment files to compile from a folder or a manifest.
+
+    Parameters
+    ----------
+    source : str or Path
+        A folder, searched recursively for .psyexp files, or a text file
+        listing one .psyexp file per line. Relative paths in a list are
+        relative to the folder it is in, blank lines and lines starting with
+        '#' are skipped.
+
+    Returns
+    -------
+    list of str
+        Paths of the experiment files, in order.
+    """
+    source = Path(source)
+    if source.is_dir():
+        return sorted(str(path) for path in source.rglob('*.psyexp'))
+
+    infiles = []
+    with io.open(source, 'r', encoding='utf-8-sig') as f:
+        for line in f:
+            line = line.strip()
+            if not line or line.startswith('#'):
+                continue
+            infiles.append(str(source.parent / line))
+
+    return infiles
+
+
+def _initBatchWorker(loadPlugins=True, useCache=True, saveAtExit=False):
+    """
+    Prepare a process for compiling experiments, so that plugins and
+    components are found once for all the experiments it compiles.
+
+    Parameters
+    ----------
+    loadPlugins : bool
+        Activate installed plugins, so their components can be compiled.
+    useCache : bool
+        Load the Python to JS translations saved by earlier compiles.
+    saveAtExit : bool
+        Save the Python to JS translations made by the process when it exits,
+        for worker processes (if `useCache` is True).
+    """
+    if loadPlugins:
+        from psychopy.plugins import activatePlugins
+        activatePlugins()
+    from psychopy import experiment
+    experiment.getComponentCatalogue()
+    experiment.getStandaloneRoutineCatalogue()
+    if useCache:
+        from psychopy.experiment.py2js_transpiler import (
+            loadTranslationCache, saveTranslationCache)
+        loadTranslationCache()
+        if saveAtExit:
+            atexit.register(saveTranslationCache)
+
+
+def _compileBatchItem(infile, targets=("PsychoPy", "PsychoJS"), useCache=True):
+    """
+    Compile one experiment of a batch, to every target.
+
+    Parameters
+    ----------
+    infile : str
+        The input (psyexp) file to be compiled
+    targets : list or tuple
+        'PsychoPy' and/or 'PsychoJS'
+    useCache : bool
+        Reuse code generated by previous compiles of the file.
+
+    Returns
+    -------
+    dict
+        Report of compiling the file, see `compileBatch`.
+    """
+    from psychopy import experiment
+    from psychopy.alerts import addAlertHandler, removeAlertHandler
+    from psychopy.experiment.scriptcache import ScriptCache
+
+    class _AlertRecorder:
+        def __init__(self):
+            self.alerts = []
+
+        def receiveAlert(self, alert):
+            self.alerts.append({'code': alert.code, 'msg': alert.msg})
+
+    report = {'infile': infile, 'outfiles': [], 'times': {}, 'alerts': [],
+              'useVersion': None, 'error': None}
+    recorder = _AlertRecorder()
+    addAlertHandler(recorder)
+    t0 = time.perf_counter()
+    try:
+        thisExp = experiment.Experiment()
+        thisExp.loadFromXML(infile)
+        version = thisExp.settings.params['Use version'].val
+        if version not in [None, 'None', '', __version__]:
+            # compiled by the requested version, in a process per script, from
+            # the legacy save file as in `generateScript`
+            report['useVersion'] = version
+            if not Path(thisExp.legacyFilename).is_file():
+                thisExp.saveToXML(filename=thisExp.filename)
+        report['times']['load'] = time.perf_counter() - t0
+        cache = ScriptCache.forExperimentFile(infile) if useCache else False
+
+        root = os.path.splitext(infile)[0]
+        outputs = []
+        if "PsychoPy" in targets:
+            outputs.append(("PsychoPy", root + '.py', True))
+        if "PsychoJS" in targets:
+            outputs.append(("PsychoJS", root + '.js', True))
+            outputs.append(("PsychoJS", root + '-legacy-browsers.js', False))
+        for target, outfile, modular in outputs:
+            t1 = time.perf_counter()
+            if report['useVersion']:
+                if not modular:
+                    continue  # written along with the modular JS script
+                _compileInVersion(
+                    thisExp.legacyFilename, outfile, report['useVersion'])
+            else:
+                script = thisExp.writeScript(
+                    outfile, target=target, modular=modular, cache=cache)
+                with io.open(outfile, 'w', encoding='utf-8-sig') as f:
+                    f.write(script)
+            report['outfiles'].append(outfile)
+            if target == "PsychoJS" and report['useVersion']:
+                report['outfiles'].append(root + '-legacy-browsers.js')
+            report['times'][os.path.basename(outfile)] = time.perf_counter() - t1
+    except Exception as err:
+        report['error'] = "{}: {}".format(type(err).__name__, err)
+    finally:
+        removeAlertHandler(recorder)
+    report['times']['total'] = time.perf_counter() - t0
+    report['alerts'] = recorder.alerts
+
+    return report
+
+
+def compileBatch(infiles, targets=("PsychoPy", "PsychoJS"), nProcesses=None,
+                 useCache=True, loadPlugins=True):
+    """
+    Compile many experiments to Python and/or JS in a pool of processes.
+
+    Each script is written next to its experiment file, as when compiling from
+    Builder. Every process finds the plugins and components once and then
+    compiles its share of the experiments, so this is much faster than calling
+    `compileScript` once per file. Experiments which request another version
+    of PsychoPy in their settings are compiled by that version, in a new
+    process for each script, as when compiling a single file.
+
+    Parameters
+    ----------
+    infiles : list of str, str or Path
+        The input (psyexp) files to be compiled, or a folder or list of them
+        (see `findExperimentFiles`)
+    targets : list or tuple
+        'PsychoPy' and/or 'PsychoJS'
+    nProcesses : int or None
+        Number of processes to compile with, defaults to the number of CPUs.
+        If 1, the experiments are compiled in this process.
+    useCache : bool
+        Reuse code generated, and Python code translated to JS, by previous
+        compiles.
+    loadPlugins : bool
+        Activate installed plugins, so their components can be compiled.
+
+    Returns
+    -------
+    list of dict
+        A report for each file, in order, with keys `infile`, `outfiles` (the
+        scripts written), `times` (seconds taken to load the file, write each
+        script and in total), `alerts` (the code and message of each alert
+        raised), `useVersion` (the version requested in the settings, if it
+        is not the installed one, in which case it compiled the scripts) and
+        `error` (why compiling failed, or None).
+    """
+    if isinstance(infiles, (str, Path)):
+        infiles = findExperimentFiles(infiles)
+    infiles = [str(infile) for infile in infiles]
+    if nProcesses is None:
+        nProcesses = os.cpu_count() or 1
+    nProcesses = max(1, min(int(nProcesses), len(infiles)))
+
+    if nProcesses == 1:
+        _initBatchWorker(loadPlugins, useCache)
+        report = [_compileBatchItem(infile, targets, useCache)
+                  for infile in infiles]
+        if useCache:
+            from psychopy.experiment.py2js_transpiler import \
+                saveTranslationCache
+            saveTranslationCache()
+        return report
+
+    # spawn workers, so they start from a clean session
+    with ProcessPoolExecutor(
+            max_workers=nProcesses,
+            mp_context=multiprocessing.get_context('spawn'),
+            initializer=_initBatchWorker,
+            initargs=(loadPlugins, useCache, True)) as pool:
+        futures = [pool.submit(_compileBatchItem, infile, targets, useCache)
+                   for infile in infiles]
+        return [future.result() for future in futures]
+
+
+def formatBatchReport(report, elapsed=None):
+    """
+    Summarise the report of a batch compile as text.
+
+    Parameters
+    ----------
+    report : list of dict
+        As returned by `compileBatch`.
+    elapsed : float or None
+        Wall-clock time taken by the batch compile (seconds), to report with
+        the totals. Files compiled in parallel overlap, so this is less than
+        the sum of their times.
+
+    Returns
+    -------
+    str
+        A line for each file with its status and time, followed by its alerts
+        and errors, and the totals.
+    """
+    lines = []
+    nFailed = 0
+    for item in report:
+        if item['error']:
+            status = "FAILED"
+            nFailed += 1
+        elif item['alerts']:
+            status = "ALERTS"
+        else:
+            status = "OK"
+        lines.append("{:<7}{:>8.2f}s  {}".format(
+            status, item['times']['total'], item['infile']))
+        if item['useVersion']:
+            lines.append("    compiled with version {}".format(
+                item['useVersion']))
+        for alert in item['alerts']:
+            lines.append("    Alert {}: {}".format(alert['code'], alert['msg']))
+        if item['error']:
+            lines.append("    " + item['error'])
+    summary = "Compiled {} of {} experiments".format(
+        len(report) - nFailed, len(report))
+    if elapsed is not None:
+        summary += " in {:.2f}s".format(elapsed)
+    lines.append(summary)
+
+    return "\n".join(lines)
 
 
 if __name__ == "__main__":
     # define args
     args = parser.parse_args()
+    if not args.infile.endswith(".psyexp"):
+        # a folder or list of experiments
+        for value, option in ((args.version, "--version"),
+                              (args.outfile, "--outfile"),
+                              (args.cacheStats, "--cache-stats")):
+            if value:
+                parser.error(
+                    "{} cannot be used to compile many experiments".format(
+                        option))
+        t0 = time.perf_counter()
+        batchReport = compileBatch(args.infile, nProcesses=args.jobs)
+        print(formatBatchReport(batchReport, time.perf_counter() - t0))
+        if args.report:
+            with io.open(args.report, 'w', encoding='utf-8') as f:
+                json.dump(batchReport, f, indent=2)
+        sys.exit(any(item['error'] for item in batchReport))
     if args.outfile is None:
         args.outfile = args.infile.replace(".psyexp", ".py")
-    compileScript(args.infile, args.version, args.outfile)
+    compileScript(args.infile, args.version, args.outfile, args.cacheStats)
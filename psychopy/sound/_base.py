@@ -16,6 +16,7 @@ from psychopy.tools.audiotools import knownNoteNames, stepsFromA
 from psychopy.tools.attributetools import AttributeGetSetMixin
 from sys import platform
 from .audioclip import AudioClip
+from .tonebank import getToneBank, WAVEFORM_SINE
 from ..hardware import DeviceManager
 from ..preferences.preferences import prefs
 
@@ -272,12 +273,11 @@ class _SoundBase(AttributeGetSetMixin):
         if not self.sampleRate:
             self.sampleRate = self._getDefaultSampleRate()
         nSamples = int(secs * self.sampleRate)
-        outArr = numpy.arange(0.0, 1.0, 1.0 / nSamples)
-        outArr *= 2 * numpy.pi * thisFreq * secs
-        outArr = numpy.sin(outArr)
-        if hamming and nSamples > 30:
-            outArr = apodize(outArr, self.sampleRate)
-        self._setSndFromArray(outArr)
+        # tones are shared through the bank, so give the backend a copy
+        outArr = getToneBank().tone(
+            WAVEFORM_SINE, nSamples, thisFreq, self.sampleRate,
+            hamming=hamming)
+        self._setSndFromArray(numpy.array(outArr[:, 0]))
 
     def _getDefaultSampleRate(self):
         """For backends this might depend on what streams are open"""
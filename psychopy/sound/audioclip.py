@@ -33,6 +33,8 @@ from psychopy import logging
 from psychopy.tools.audiotools import *
 from psychopy.tools import filetools as ft
 from .exceptions import *
+from .tonebank import (
+    getToneBank, WAVEFORM_SINE, WAVEFORM_SQUARE, WAVEFORM_SAWTOOTH)
 
 
 # constants for specifying the number of channels
@@ -44,6 +46,33 @@ AUDIO_CHANNEL_LEFT = AUDIO_EAR_LEFT = 0
 AUDIO_CHANNEL_RIGHT = AUDIO_EAR_RIGHT = 1
 AUDIO_CHANNEL_COUNT = AUDIO_EAR_COUNT = 2
 
+# number of samples processed at a time by methods which work on blocks of
+# samples, keeps temporary arrays small for long clips
+AUDIO_BLOCK_SIZE = 1 << 18
+
+
+def _iterBlocks(nSamples, blockSize=AUDIO_BLOCK_SIZE):
+    """Iterate over slices covering `nSamples` samples in blocks."""
+    for start in range(0, nSamples, blockSize):
+        yield slice(start, min(start + blockSize, nSamples))
+
+
+def _wavDataOffset(filename):
+    """Get the byte offset of the sample data in a WAV file."""
+    with open(filename, 'rb') as f:
+        header = f.read(12)
+        if header[:4] != b'RIFF' or header[8:12] != b'WAVE':
+            raise ValueError("File '{}' is not a WAV file.".format(filename))
+        while True:
+            chunk = f.read(8)
+            if len(chunk) < 8:
+                raise ValueError(
+                    "No sample data in WAV file '{}'.".format(filename))
+            chunkSize = int.from_bytes(chunk[4:], 'little')
+            if chunk[:4] == b'data':
+                return f.tell()
+            f.seek(chunkSize + (chunkSize & 1), 1)
+
 
 class AudioClip:
     """Class for storing audio clip data.
@@ -105,7 +134,6 @@ class AudioClip:
         # samples should be a 2D array where columns represent channels
         self._samples = np.atleast_2d(
             np.asarray(samples, dtype=np.float32, order='C'))
-        self._samples.clip(-1, 1)  # force values to be clipped
 
         # set the sample rate of the clip
         self._sampleRateHz = int(sampleRateHz)
@@ -190,6 +218,87 @@ class AudioClip:
             samples=samples,
             sampleRateHz=sampleRateHz)
 
+    @staticmethod
+    def open(filename, mmap=True):
+        """Open an audio file without reading all its samples into memory.
+        Note that this is a static method!
+
+        With `mmap=True`, the samples of the returned clip are memory-mapped,
+        so only the parts that are used are read from disk. WAV files of
+        32-bit float samples (such as recordings streamed to disk by the
+        microphone) are mapped directly. Other
+        files are decoded a block at a time into an unnamed temporary file
+        which is then mapped, so memory use stays low for files of any length.
+
+        Memory-mapped samples are read-only. Methods which change samples
+        inplace (e.g. `gain()`) first copy them into memory.
+
+        Parameters
+        ----------
+        filename : str
+            File name to open.
+        mmap : bool
+            Memory-map the samples. If `False`, this is the same as `load()`.
+
+        Returns
+        -------
+        AudioClip
+            Audio clip containing samples from the file.
+
+        Examples
+        --------
+        Get the RMS of each 20 ms window of a long recording::
+
+            clip = AudioClip.open('session.wav')
+            envelope = clip.rmsEnvelope(0.02)
+
+        """
+        if not mmap:
+            return AudioClip.load(filename)
+
+        info = sf.info(filename)
+        frames, channels = info.frames, info.channels
+        if info.format in ('WAV', 'WAVEX') and info.subtype == 'FLOAT' and \
+                info.endian in ('FILE', 'LITTLE') and frames > 0:
+            samples = np.memmap(
+                filename, dtype='<f4', mode='r',
+                offset=_wavDataOffset(filename), shape=(frames, channels))
+        else:
+            # decode to raw float32 samples on disk
+            with tempfile.TemporaryFile(prefix='psychopy-audio-') as f:
+                with sf.SoundFile(filename) as sndFile:
+                    for block in sndFile.blocks(
+                            AUDIO_BLOCK_SIZE, dtype='float32', always_2d=True):
+                        f.write(block.tobytes())
+                    frames = sndFile.tell()
+                if not frames:
+                    return AudioClip(
+                        np.zeros((0, channels), dtype=np.float32),
+                        sampleRateHz=info.samplerate)
+                f.flush()
+                # the mapping stays valid after the file is closed
+                samples = np.memmap(
+                    f, dtype=np.float32, mode='r', shape=(frames, channels))
+
+        return AudioClip(samples=samples, sampleRateHz=info.samplerate)
+
+    @property
+    def isMapped(self):
+        """`True` if the samples are memory-mapped from a file (`bool`)."""
+        base = self._samples
+        while base is not None:
+            if isinstance(base, np.memmap):
+                return True
+            base = base.base
+        return False
+
+    def _makeWriteable(self):
+        """Copy read-only (e.g. memory-mapped) samples into memory."""
+        if not self._samples.flags.writeable:
+            logging.info("Copying read-only audio samples into memory.")
+            self._samples = np.array(self._samples, dtype=np.float32,
+                                     order='C')
+
     def save(self, filename, codec=None):
         """Save an audio clip to file.
 
@@ -333,10 +442,13 @@ class AudioClip:
             fullInstr.save('/path/to/instructions_with_tone.wav')  # save it
 
         """
-        samples = sinetone(duration, freqHz, gain, sampleRateHz)
+        assert 0.0 <= gain <= 1.0  # check if gain range is valid
+        samples = getToneBank().tone(
+            WAVEFORM_SINE, np.ceil(sampleRateHz * duration), freqHz,
+            sampleRateHz, gain)
 
-        if channels > 1:
-            samples = np.tile(samples, (1, channels)).astype(np.float32)
+        # copy the shared samples from the bank
+        samples = np.tile(samples, (1, max(channels, 1)))
 
         return AudioClip(samples, sampleRateHz=sampleRateHz)
 
@@ -366,10 +478,13 @@ class AudioClip:
         AudioClip
 
         """
-        samples = squaretone(duration, freqHz, dutyCycle, gain, sampleRateHz)
+        assert 0.0 <= gain <= 1.0  # check if gain range is valid
+        samples = getToneBank().tone(
+            WAVEFORM_SQUARE, np.ceil(sampleRateHz * duration), freqHz,
+            sampleRateHz, gain, dutyCycle=dutyCycle)
 
-        if channels > 1:
-            samples = np.tile(samples, (1, channels)).astype(np.float32)
+        # copy the shared samples from the bank
+        samples = np.tile(samples, (1, max(channels, 1)))
 
         return AudioClip(samples, sampleRateHz=sampleRateHz)
 
@@ -401,10 +516,13 @@ class AudioClip:
         AudioClip
 
         """
-        samples = sawtone(duration, freqHz, peak, gain, sampleRateHz)
+        assert 0.0 <= gain <= 1.0  # check if gain range is valid
+        samples = getToneBank().tone(
+            WAVEFORM_SAWTOOTH, np.ceil(sampleRateHz * duration), freqHz,
+            sampleRateHz, gain, peak=peak)
 
-        if channels > 1:
-            samples = np.tile(samples, (1, channels)).astype(np.float32)
+        # copy the shared samples from the bank
+        samples = np.tile(samples, (1, max(channels, 1)))
 
         return AudioClip(samples, sampleRateHz=sampleRateHz)
 
@@ -636,8 +754,9 @@ class AudioClip:
     def gain(self, factor, channel=None):
         """Apply gain the audio samples.
 
-        This will modify the internal store of samples inplace. Clipping is
-        automatically applied to samples after applying gain.
+        This will modify the internal store of samples inplace, a block at a
+        time. Clipping is automatically applied to samples after applying gain.
+        Read-only (e.g. memory-mapped) samples are copied into memory first.
 
         Parameters
         ----------
@@ -648,6 +767,7 @@ class AudioClip:
             channels.
 
         """
+        self._makeWriteable()
         try:
             arrview = self._samples[:, :] \
                 if channel is None else self._samples[:, channel]
@@ -655,8 +775,11 @@ class AudioClip:
             raise ValueError('Invalid value for `channel`.')
 
         # multiply and clip range
-        arrview *= float(factor)
-        arrview.clip(-1, 1)
+        factor = np.float32(factor)
+        for block in _iterBlocks(len(arrview)):
+            chunk = arrview[block]
+            np.multiply(chunk, factor, out=chunk)
+            np.clip(chunk, -1, 1, out=chunk)
 
     def resample(self, targetSampleRateHz, resampleType='default', 
             equalEnergy=False, copy=False):
@@ -672,8 +795,11 @@ class AudioClip:
         resampleType : str
             Fitler (or method) to use for resampling. The methods available
             depend on the packages installed. The 'default' method uses 
-            `scipy.signal.resample` to resample the audio. Other methods require 
-            the user to install `librosa` or `resampy`. Default is 'default'.
+            `scipy.signal.resample` to resample the audio. The 'poly' method
+            uses polyphase filtering (`scipy.signal.resample_poly`) applied a
+            block at a time, which is much faster and uses less memory for long
+            clips. Other methods require the user to install `librosa` or
+            `resampy`. Default is 'default'.
         equalEnergy : bool
             Make the output have similar energy to the input. Option not
             available for the 'default' method. Default is `False`.
@@ -754,6 +880,14 @@ class AudioClip:
                     'The `equalEnergy` option is not available for the '
                     'default resampling method.')
 
+        elif resampleType == 'poly':  # scipy polyphase, in blocks
+            newSamples = self._resamplePoly(targetSampleRateHz)
+
+            if equalEnergy:
+                logging.warning(
+                    'The `equalEnergy` option is not available for the '
+                    'poly resampling method.')
+
         elif resampleType in ('kaiser_best', 'kaiser_fast'):  # resampy
             try:
                 import resampy
@@ -806,6 +940,48 @@ class AudioClip:
 
         return self
 
+    def _resamplePoly(self, targetSampleRateHz, blockSize=AUDIO_BLOCK_SIZE):
+        """Resample using a polyphase filter applied to blocks of samples.
+
+        Gives the same result as applying `scipy.signal.resample_poly` to all
+        samples at once. Each block is filtered with enough neighbouring
+        samples for the filter to be fully supported, and blocks start on
+        samples which align exactly with an output sample.
+        """
+        import math
+        import scipy.signal
+
+        gcd = math.gcd(targetSampleRateHz, self._sampleRateHz)
+        up = targetSampleRateHz // gcd
+        down = self._sampleRateHz // gcd
+        nIn = len(self._samples)
+        nOut = -(-nIn * up // down)  # ceil
+        # the filter used by `resample_poly`, computed once for all blocks
+        maxRate = max(up, down)
+        halfLen = 10 * maxRate
+        window = scipy.signal.firwin(
+            2 * halfLen + 1, 1. / maxRate, window=('kaiser', 5.0))
+        # input samples on either side of a block the filter reaches, rounded
+        # up to a multiple of `down` so blocks stay aligned with the output
+        context = -(-(halfLen // up + 2) // down) * down
+        blockSize = max(down, blockSize // down * down)
+
+        newSamples = np.empty((nOut, self.channels), dtype=np.float32)
+        for start in range(0, nIn, blockSize):
+            stop = min(start + blockSize, nIn)
+            padStart = max(start - context, 0)
+            padStop = min(stop + context, nIn)
+            resampled = scipy.signal.resample_poly(
+                self._samples[padStart:padStop], up, down, axis=0,
+                window=window)
+            outStart = start * up // down
+            outStop = nOut if stop == nIn else stop * up // down
+            skip = (start - padStart) * up // down
+            newSamples[outStart:outStop] = \
+                resampled[skip:skip + outStop - outStart]
+
+        return newSamples
+
     # --------------------------------------------------------------------------
     # Audio analysis methods
     #
@@ -833,13 +1009,75 @@ class AudioClip:
 
         """
         if channel is not None:
-            assert 0 < channel < self.channels
+            assert 0 <= channel < self.channels
         # get samples
-        arr = self._samples if channel is None else self._samples[:, channel]
-        # calculate rms
-        rms = np.nan_to_num(np.sqrt(np.nanmean(np.square(arr), axis=0)), nan=0)
+        arr = self._samples if channel is None else \
+            self._samples[:, channel:channel + 1]
+        # calculate rms a block at a time, ignoring NaNs
+        sumSquares = np.zeros((arr.shape[1],), dtype=np.float64)
+        count = np.zeros((arr.shape[1],), dtype=np.int64)
+        for block in _iterBlocks(len(arr)):
+            chunk = arr[block]
+            sumSquares += np.nansum(
+                np.square(chunk, dtype=np.float64), axis=0)
+            count += np.count_nonzero(~np.isnan(chunk), axis=0)
+        with np.errstate(invalid='ignore', divide='ignore'):
+            rms = np.nan_to_num(
+                np.sqrt(sumSquares / count), nan=0).astype(np.float32)
+
+        return rms if channel is None and len(rms) > 1 else rms[0]
+
+    def rmsEnvelope(self, windowSecs=0.02, hopSecs=None, channel=None):
+        """Compute the RMS of successive windows of samples.
+
+        Windows are processed a block at a time, so this can be used on long
+        (e.g. memory-mapped) clips without loading them into memory.
+
+        Parameters
+        ----------
+        windowSecs : float
+            Duration of each window in seconds.
+        hopSecs : float or None
+            Time between the starts of successive windows in seconds. If
+            `None`, windows do not overlap (``hopSecs=windowSecs``).
+        channel : int or None
+            Channel to compute RMS (zero-indexed). If `None`, channels are
+            averaged.
+
+        Returns
+        -------
+        ndarray
+            RMS of each window. Window `i` starts at ``i * hopSecs`` seconds.
+            Incomplete windows at the end of the clip are ignored.
+
+        """
+        winSize = max(1, int(round(windowSecs * self._sampleRateHz)))
+        hopSize = winSize if hopSecs is None else max(
+            1, int(round(hopSecs * self._sampleRateHz)))
+        nWindows = max(0, (len(self._samples) - winSize) // hopSize + 1)
+        envelope = np.zeros((nWindows,), dtype=np.float32)
+        if not nWindows:
+            return envelope
+
+        # windows per block, each block also reads the overlap it needs
+        perBlock = max(1, AUDIO_BLOCK_SIZE // hopSize)
+        for first in range(0, nWindows, perBlock):
+            last = min(first + perBlock, nWindows)
+            start = first * hopSize
+            stop = (last - 1) * hopSize + winSize
+            chunk = self._samples[start:stop]
+            if channel is None:
+                chunk = np.mean(chunk, axis=1, dtype=np.float64)
+            else:
+                chunk = chunk[:, channel].astype(np.float64)
+            # running sum of squares gives the sum over each window
+            cumSum = np.concatenate(([0.], np.cumsum(np.square(chunk))))
+            starts = np.arange(last - first) * hopSize
+            windowSums = cumSum[starts + winSize] - cumSum[starts]
+            envelope[first:last] = np.sqrt(
+                np.maximum(windowSums, 0) / winSize)
 
-        return rms if len(rms) > 1 else rms[0]
+        return envelope
 
     # --------------------------------------------------------------------------
     # Properties
@@ -970,8 +1208,12 @@ class AudioClip:
         """
         samples = np.atleast_2d(self._samples)  # enforce 2D
         if samples.shape[1] > 1:
-            samplesMixed = np.atleast_2d(
-                np.sum(samples, axis=1, dtype=np.float32) / np.float32(2.)).T
+            # mix a block at a time to avoid temporary copies of all samples
+            samplesMixed = np.empty((len(samples), 1), dtype=np.float32)
+            for block in _iterBlocks(len(samples)):
+                np.sum(samples[block], axis=1, dtype=np.float32,
+                       out=samplesMixed[block, 0])
+            samplesMixed /= np.float32(2.)
         else:
             samplesMixed = samples.copy()
 
@@ -1003,7 +1245,7 @@ class AudioClip:
             return self
 
         samples = np.atleast_2d(self._samples)  # enforce 2D
-        samples = np.hstack((samples, samples))
+        samples = np.repeat(samples, 2, axis=1)
 
         if copy:
             return AudioClip(samples, self.sampleRateHz)
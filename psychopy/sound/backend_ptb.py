@@ -18,6 +18,7 @@ from psychopy.tools import systemtools
 from psychopy.tools import filetools as ft
 from .exceptions import SoundFormatError, DependencyError
 from ._base import _SoundBase, HammingWindow
+from .samplecache import loadSoundFile, preload
 from ..hardware import DeviceManager
 
 try:
@@ -451,16 +452,36 @@ class SoundPTB(_SoundBase):
         # alias default names (so it always points to default.png)
         if filename in ft.defaultStim:
             filename = Path(prefs.paths['assets']) / ft.defaultStim[filename]
-        self.sndFile = f = sf.SoundFile(filename)
         self.sourceType = 'file'
-        self.sampleRate = f.samplerate
-        if self.channels == -1:  # if channels was auto then set to file val
-            self.channels = f.channels
-        fileDuration = float(len(f)) / f.samplerate  # needed for duration?
+        if self.preBuffer == -1:
+            # full pre-buffer. Use the samples in the shared cache if this
+            # section of the file was decoded before
+            sndArr, self.sampleRate, fileDuration = loadSoundFile(
+                filename, self.startTime, self.stopTime)
+            self.sndFile = None
+            if self.channels == -1:  # if channels was auto then set to file val
+                self.channels = sndArr.shape[1]
+            self._setFileSection(fileDuration)
+            self._setSndFromArray(sndArr)
+        else:
+            self.sndFile = f = sf.SoundFile(filename)
+            self.sampleRate = f.samplerate
+            if self.channels == -1:  # if channels was auto then set to file val
+                self.channels = f.channels
+            fileDuration = float(len(f)) / f.samplerate  # needed for duration?
+            self._setFileSection(fileDuration)
+            if self.t:
+                self.sndFile.seek(int(self.t * self.sampleRate))
+            # preBuffer == 0: no buffer - stream from disk on each call to
+            # nextBlock
+        self._channelCheck(
+            self.sndArr)  # Check for fewer channels in stream vs data array
+
+    def _setFileSection(self, fileDuration):
+        """Set the start time and duration of the part of a sound file to
+        play from the `startTime` and `stopTime` attributes."""
         # process start time
         if self.startTime and self.startTime > 0:
-            startFrame = self.startTime * self.sampleRate
-            self.sndFile.seek(int(startFrame))
             self.t = self.startTime
         else:
             self.t = 0
@@ -472,18 +493,6 @@ class SoundPTB(_SoundBase):
             self.duration = fileDuration - self.t
         # can now calculate duration in frames
         self.durationFrames = int(round(self.duration * self.sampleRate))
-        # are we preloading or streaming?
-        if self.preBuffer == 0:
-            # no buffer - stream from disk on each call to nextBlock
-            pass
-        elif self.preBuffer == -1:
-            # full pre-buffer. Load requested duration to memory
-            sndArr = self.sndFile.read(
-                frames=int(self.sampleRate * self.duration))
-            self.sndFile.close()
-            self._setSndFromArray(sndArr)
-        self._channelCheck(
-            self.sndArr)  # Check for fewer channels in stream vs data array
 
     def _setSndFromArray(self, thisArray):
 
@@ -31,6 +31,8 @@ class Microphone:
             name="mic",
             recordingFolder=Path.home(),
             recordingExt="wav",
+            streamToDisk=False,
+            recordingCodec="wav",
     ):
         # store name
         self.name = name
@@ -56,7 +58,9 @@ class Microphone:
                 maxRecordingSize=maxRecordingSize,
                 policyWhenFull=policyWhenFull,
                 audioLatencyMode=audioLatencyMode,
-                audioRunMode=audioRunMode
+                audioRunMode=audioRunMode,
+                streamToDisk=streamToDisk,
+                recordingCodec=recordingCodec
             )
         # set policy when full (in case device already existed)
         self.device.policyWhenFull = policyWhenFull
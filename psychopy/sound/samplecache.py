@@ -0,0 +1,325 @@
+#!/usr/bin/env python
+# -*- coding: utf-8 -*-
+
+"""Cache of decoded sound file samples, shared by all sounds in the process.
+
+Decoding a sound file each time a sound is set is slow for trial loops that
+cycle through the same few hundred stimulus files. Sound backends can use
+:func:`getSampleCache` to store the decoded `float32` samples so each file is
+only read from disk once. The least recently used samples are dropped
+when the cache exceeds its memory budget.
+"""
+
+# Part of the PsychoPy library
+# Copyright (C) 2002-2018 Jonathan Peirce (C) 2019-2024 Open Science Tools Ltd.
+# Distributed under the terms of the GNU General Public License (GPL).
+
+__all__ = [
+    'SampleCache',
+    'getSampleCache',
+    'setSampleCacheSize',
+    'loadSoundFile',
+    'preload'
+]
+
+import os
+import threading
+from collections import OrderedDict
+
+import numpy as np
+import soundfile as sf
+
+# default memory budget for cached samples, in bytes
+DEFAULT_CACHE_SIZE = 256 * 1024 ** 2
+
+
+class SampleCache:
+    """Least recently used cache of decoded sound samples.
+
+    Entries are keyed on the absolute path, size and modification time of the
+    sound file, so an edited file is decoded again, and on the section of the
+    file that was decoded.
+
+    Parameters
+    ----------
+    maxBytes : int
+        Memory budget for the cached sample arrays. The least recently used
+        entries are removed when this is exceeded. Arrays larger than the
+        whole budget are not cached. A value of 0 disables caching.
+
+    """
+    def __init__(self, maxBytes=DEFAULT_CACHE_SIZE):
+        self._maxBytes = int(maxBytes)
+        self._entries = OrderedDict()
+        self._nBytes = 0
+        self._lock = threading.Lock()
+        self.hits = 0
+        self.misses = 0
+
+    @property
+    def maxBytes(self):
+        """Memory budget for cached samples in bytes (`int`). Reducing this
+        removes entries until the cache fits the new budget."""
+        return self._maxBytes
+
+    @maxBytes.setter
+    def maxBytes(self, value):
+        with self._lock:
+            self._maxBytes = int(value)
+            self._evict()
+
+    @property
+    def nBytes(self):
+        """Memory used by the cached samples in bytes (`int`)."""
+        return self._nBytes
+
+    def __len__(self):
+        return len(self._entries)
+
+    def __contains__(self, key):
+        return key in self._entries
+
+    @staticmethod
+    def makeKey(filename, startTime=0, stopTime=-1):
+        """Make the cache key for the samples of a sound file.
+
+        Parameters
+        ----------
+        filename : str
+            Path to the sound file.
+        startTime, stopTime : float
+            Section of the file that was decoded, in seconds.
+
+        Returns
+        -------
+        tuple
+            Key for the samples.
+
+        """
+        filename = os.path.abspath(filename)
+        stat = os.stat(filename)
+        return (filename, stat.st_mtime_ns, stat.st_size,
+                float(startTime or 0), float(stopTime or -1))
+
+    def get(self, key):
+        """Get the entry cached for `key`.
+
+        Returns
+        -------
+        tuple or None
+            `(samples, sampleRate, fileDuration)` or `None` if `key` is not
+            in the cache. The samples array is read-only and shared, so copy
+            it before modifying it.
+
+        """
+        with self._lock:
+            try:
+                entry = self._entries[key]
+            except KeyError:
+                self.misses += 1
+                return None
+            self._entries.move_to_end(key)
+            self.hits += 1
+            return entry
+
+    def put(self, key, samples, sampleRate, fileDuration):
+        """Add decoded samples to the cache.
+
+        Parameters
+        ----------
+        key : tuple
+            Key made by :meth:`makeKey`.
+        samples : ArrayLike
+            Decoded samples. Stored as a read-only `float32` array.
+        sampleRate : int
+            Sample rate of the samples in Hz.
+        fileDuration : float
+            Duration of the whole sound file in seconds.
+
+        Returns
+        -------
+        tuple
+            The entry as returned by :meth:`get`.
+
+        """
+        samples = np.array(samples, dtype=np.float32, order='C')
+        samples.flags.writeable = False
+        entry = (samples, sampleRate, fileDuration)
+        with self._lock:
+            if samples.nbytes > self._maxBytes:
+                return entry
+            old = self._entries.pop(key, None)
+            if old is not None:
+                self._nBytes -= old[0].nbytes
+            self._entries[key] = entry
+            self._nBytes += samples.nbytes
+            self._evict()
+        return entry
+
+    def _evict(self):
+        while self._nBytes > self._maxBytes and self._entries:
+            _, (samples, _, _) = self._entries.popitem(last=False)
+            self._nBytes -= samples.nbytes
+
+    def clear(self):
+        """Remove all entries from the cache."""
+        with self._lock:
+            self._entries.clear()
+            self._nBytes = 0
+
+
+_sampleCache = None
+
+
+def getSampleCache():
+    """Get the sample cache shared by all sounds.
+
+    Returns
+    -------
+    SampleCache
+        The shared cache.
+
+    """
+    global _sampleCache
+    if _sampleCache is None:
+        _sampleCache = SampleCache()
+    return _sampleCache
+
+
+def setSampleCacheSize(maxBytes):
+    """Set the memory budget of the shared sample cache.
+
+    Parameters
+    ----------
+    maxBytes : int
+        Memory budget in bytes. Use 0 to disable caching.
+
+    """
+    getSampleCache().maxBytes = maxBytes
+
+
+def loadSoundFile(filename, startTime=0, stopTime=-1):
+    """Decode a section of a sound file, using the shared sample cache.
+
+    Parameters
+    ----------
+    filename : str
+        Path to the sound file.
+    startTime : float
+        Start of the section to decode in seconds.
+    stopTime : float
+        End of the section to decode in seconds, or -1 for the end of the
+        file.
+
+    Returns
+    -------
+    tuple
+        `(samples, sampleRate, fileDuration)`, where `samples` is a read-only
+        Nx`channels` `float32` array shared with other sounds using the file.
+
+    """
+    cache = getSampleCache()
+    key = cache.makeKey(filename, startTime, stopTime)
+    entry = cache.get(key)
+    if entry is not None:
+        return entry
+
+    with sf.SoundFile(filename) as f:
+        sampleRate = f.samplerate
+        fileDuration = float(len(f)) / sampleRate
+        t = startTime if startTime and startTime > 0 else 0
+        if t:
+            f.seek(int(t * sampleRate))
+        if stopTime and stopTime > 0:
+            duration = min(stopTime - t, fileDuration)
+        else:
+            duration = fileDuration - t
+        samples = f.read(frames=int(sampleRate * duration), dtype='float32',
+                         always_2d=True)
+
+    return cache.put(key, samples, sampleRate, fileDuration)
+
+
+def _findSoundFile(value):
+    """Get the path of the sound file `value` refers to, or `None`."""
+    from ._base import mediaLocation
+    from psychopy.tools.filetools import defaultStim, defaultStimRoot
+
+    if isinstance(value, os.PathLike):
+        value = os.fspath(value)
+    if not isinstance(value, str) or not value:
+        return None
+    if value in defaultStim:
+        return str(defaultStimRoot / defaultStim[value])
+    for filePath in ['', mediaLocation]:
+        p = os.path.join(filePath, value)
+        if os.path.isfile(p):
+            return p
+        elif os.path.isfile(p + '.wav'):
+            return p + '.wav'
+    return None
+
+
+def preload(sounds, startTime=0, stopTime=-1):
+    """Decode sound files into the shared sample cache ahead of time, e.g.
+    before the first trial, so setting them later does not read from disk.
+
+    Parameters
+    ----------
+    sounds : str or list
+        A conditions file (any format supported by
+        :func:`~psychopy.data.importConditions`), a list of sound file names,
+        or a list of conditions dicts. Every value that names an existing
+        sound file is decoded; other values are ignored.
+    startTime, stopTime : float
+        Section of the files that the sounds will play, in seconds. These
+        must match the sound's `startTime` and `stopTime` for the cached
+        samples to be used.
+
+    Returns
+    -------
+    list
+        Paths of the sound files decoded.
+
+    Examples
+    --------
+    Decode the sounds named in a conditions file::
+
+        from psychopy.sound import samplecache
+        samplecache.preload('conditions.xlsx')
+
+    """
+    if isinstance(sounds, (str, os.PathLike)) and \
+            os.path.splitext(sounds)[1].lower() in ('.csv', '.xlsx', '.xls',
+                                                   '.pkl'):
+        from psychopy.data import importConditions
+        sounds = importConditions(os.fspath(sounds))
+    elif isinstance(sounds, (str, os.PathLike)):
+        sounds = [sounds]
+
+    values = []
+    for item in sounds:
+        if isinstance(item, dict):
+            values.extend(item.values())
+        else:
+            values.append(item)
+
+    readable = {fmt.lower() for fmt in sf.available_formats()} | {'aif'}
+    loaded = []
+    seen = set()  # files named in many rows are only looked at once
+    for value in values:
+        filename = _findSoundFile(value)
+        if filename is None or filename in seen:
+            continue
+        seen.add(filename)
+        ext = os.path.splitext(filename)[1][1:].lower()
+        if ext not in readable:
+            continue
+        loadSoundFile(filename, startTime, stopTime)
+        loaded.append(filename)
+
+    return loaded
+
+
+if __name__ == "__main__":
+    pass
@@ -0,0 +1,287 @@
+#!/usr/bin/env python
+# -*- coding: utf-8 -*-
+
+"""Bank of synthesized tones, shared by all sounds in the process.
+
+Paradigms such as adaptive frequency staircases create thousands of short
+tones, and computing every waveform from scratch each time a sound is set adds
+up. :class:`ToneBank` caches generated tones (including their onset and offset
+ramps) by their parameters, and synthesizes phase-continuous tones of any
+frequency from cached tables holding a single period of each waveform.
+"""
+
+# Part of the PsychoPy library
+# Copyright (C) 2002-2018 Jonathan Peirce (C) 2019-2024 Open Science Tools Ltd.
+# Distributed under the terms of the GNU General Public License (GPL).
+
+__all__ = [
+    'ToneBank',
+    'getToneBank',
+    'WAVEFORM_SINE',
+    'WAVEFORM_SQUARE',
+    'WAVEFORM_SAWTOOTH'
+]
+
+import threading
+
+import numpy as np
+from scipy import signal
+
+from .samplecache import SampleCache
+
+# waveforms the bank can generate
+WAVEFORM_SINE = 'sine'
+WAVEFORM_SQUARE = 'square'
+WAVEFORM_SAWTOOTH = 'sawtooth'
+
+# default memory budget for cached tones, in bytes
+DEFAULT_BANK_SIZE = 64 * 1024 ** 2
+
+# number of samples in each single period table
+PERIOD_TABLE_SIZE = 4096
+
+
+def _waveform(waveform, phases, dutyCycle=0.5, peak=1.0):
+    """Compute a waveform at `phases` (in radians)."""
+    if waveform == WAVEFORM_SINE:
+        return np.sin(phases)
+    elif waveform == WAVEFORM_SQUARE:
+        return signal.square(phases, duty=dutyCycle)
+    elif waveform == WAVEFORM_SAWTOOTH:
+        return signal.sawtooth(phases, width=peak)
+    raise ValueError(
+        "Waveform must be one of 'sine', 'square' or 'sawtooth', not "
+        "{!r}".format(waveform))
+
+
+def _shapeKey(waveform, dutyCycle, peak):
+    """Waveform and the shape parameters which apply to it."""
+    if waveform == WAVEFORM_SQUARE:
+        return waveform, float(dutyCycle)
+    elif waveform == WAVEFORM_SAWTOOTH:
+        return waveform, float(peak)
+    return waveform,
+
+
+class ToneBank:
+    """Cache of synthesized tones and single period waveform tables.
+
+    Tones returned by :meth:`tone` are read-only arrays shared with every
+    other sound using the same parameters, so copy them before modifying
+    them. The least recently used tones are dropped when the bank exceeds its
+    memory budget.
+
+    Parameters
+    ----------
+    maxBytes : int
+        Memory budget for cached tones. A value of 0 disables caching of whole
+        tones, period tables are always kept.
+
+    Examples
+    --------
+    Get a 100 ms, 1 kHz tone with onset and offset ramps::
+
+        from psychopy.sound.tonebank import getToneBank
+        samples = getToneBank().tone('sine', 4800, 1000., 48000, hamming=True)
+
+    Generate a tone in blocks, changing frequency without clicks::
+
+        bank = getToneBank()
+        first, phase = bank.synthesize('sine', 480, 440., 48000)
+        second, phase = bank.synthesize('sine', 480, 450., 48000, phase)
+
+    """
+    def __init__(self, maxBytes=DEFAULT_BANK_SIZE):
+        self._tones = SampleCache(maxBytes)
+        self._tables = {}
+        self._lock = threading.Lock()
+
+    @property
+    def maxBytes(self):
+        """Memory budget for cached tones in bytes (`int`)."""
+        return self._tones.maxBytes
+
+    @maxBytes.setter
+    def maxBytes(self, value):
+        self._tones.maxBytes = value
+
+    @property
+    def nBytes(self):
+        """Memory used by cached tones in bytes (`int`)."""
+        return self._tones.nBytes
+
+    @property
+    def hits(self):
+        """Number of tones found in the bank (`int`)."""
+        return self._tones.hits
+
+    @property
+    def misses(self):
+        """Number of tones which had to be generated (`int`)."""
+        return self._tones.misses
+
+    def __len__(self):
+        return len(self._tones)
+
+    def tone(self, waveform, nSamples, freqHz, sampleRateHz, gain=1.0,
+             hamming=False, dutyCycle=0.5, peak=1.0):
+        """Get the samples of a tone, generating them if needed.
+
+        Parameters
+        ----------
+        waveform : str
+            Shape of the tone, one of 'sine', 'square' or 'sawtooth'.
+        nSamples : int
+            Length of the tone in samples.
+        freqHz : float
+            Frequency of the tone in Hertz (Hz).
+        sampleRateHz : int
+            Sample rate of the tone in Hertz (Hz).
+        gain : float
+            Gain factor applied to the samples.
+        hamming : bool
+            Apply a 5 ms Hanning window to the onset and offset of the tone
+            to avoid clicks.
+        dutyCycle : float
+            Duty cycle of a square waveform between 0.0 and 1.0.
+        peak : float
+            Location of the peak of a sawtooth waveform between 0.0 and 1.0.
+
+        Returns
+        -------
+        ndarray
+            Read-only Nx1 `float32` array of samples.
+
+        """
+        nSamples = int(nSamples)
+        key = _shapeKey(waveform, dutyCycle, peak) + (
+            nSamples, float(freqHz), int(sampleRateHz), float(gain),
+            bool(hamming))
+        entry = self._tones.get(key)
+        if entry is not None:
+            return entry[0]
+
+        phases = np.arange(nSamples, dtype=np.float64)
+        phases *= 2 * np.pi * freqHz / sampleRateHz
+        samples = _waveform(waveform, phases, dutyCycle, peak)
+        if hamming and nSamples > 30:  # too short to ramp
+            from ._base import apodize
+            samples = apodize(samples, sampleRateHz)
+        if gain != 1.0:
+            samples *= gain
+
+        return self._tones.put(
+            key, samples.reshape(-1, 1), int(sampleRateHz),
+            nSamples / float(sampleRateHz))[0]
+
+    def periodTable(self, waveform, dutyCycle=0.5, peak=1.0):
+        """Get a table of samples holding a single period of a waveform.
+
+        Parameters
+        ----------
+        waveform : str
+            Shape of the waveform, one of 'sine', 'square' or 'sawtooth'.
+        dutyCycle : float
+            Duty cycle of a square waveform between 0.0 and 1.0.
+        peak : float
+            Location of the peak of a sawtooth waveform between 0.0 and 1.0.
+
+        Returns
+        -------
+        ndarray
+            Read-only `float32` array of ``PERIOD_TABLE_SIZE + 1`` samples,
+            the last repeating the first for interpolation.
+
+        """
+        key = _shapeKey(waveform, dutyCycle, peak)
+        with self._lock:
+            table = self._tables.get(key)
+            if table is None:
+                phases = np.arange(PERIOD_TABLE_SIZE + 1, dtype=np.float64)
+                phases *= 2 * np.pi / PERIOD_TABLE_SIZE
+                table = _waveform(waveform, phases, dutyCycle, peak).astype(
+                    np.float32)
+                table[-1] = table[0]
+                table.flags.writeable = False
+                self._tables[key] = table
+        return table
+
+    def synthesize(self, waveform, nSamples, freqHz, sampleRateHz, phase=0.0,
+                   gain=1.0, dutyCycle=0.5, peak=1.0):
+        """Synthesize a tone from a single period table.
+
+        Successive blocks of a tone are continuous when the phase returned for
+        one block is passed when synthesizing the next, even if the frequency
+        changes between blocks.
+
+        Parameters
+        ----------
+        waveform : str
+            Shape of the tone, one of 'sine', 'square' or 'sawtooth'.
+        nSamples : int
+            Number of samples to synthesize.
+        freqHz : float
+            Frequency of the tone in Hertz (Hz).
+        sampleRateHz : int
+            Sample rate of the tone in Hertz (Hz).
+        phase : float
+            Phase of the first sample, as a fraction of a period.
+        gain : float
+            Gain factor applied to the samples.
+        dutyCycle : float
+            Duty cycle of a square waveform between 0.0 and 1.0.
+        peak : float
+            Location of the peak of a sawtooth waveform between 0.0 and 1.0.
+
+        Returns
+        -------
+        tuple
+            `(samples, phase)`, where `samples` is an Nx1 `float32` array and
+            `phase` is the phase of the sample following the last one.
+
+        """
+        table = self.periodTable(waveform, dutyCycle, peak)
+        step = float(freqHz) / sampleRateHz  # periods per sample
+        positions = np.arange(int(nSamples), dtype=np.float64)
+        positions *= step
+        positions += phase
+        positions -= np.floor(positions)
+        positions *= PERIOD_TABLE_SIZE
+        # linear interpolation between table entries
+        index = positions.astype(np.intp)
+        frac = (positions - index).astype(np.float32)
+        samples = table[index]
+        samples += frac * (table[index + 1] - samples)
+        if gain != 1.0:
+            samples *= np.float32(gain)
+
+        nextPhase = (phase + step * int(nSamples)) % 1.0
+        return samples.reshape(-1, 1), nextPhase
+
+    def clear(self):
+        """Remove all tones and period tables from the bank."""
+        self._tones.clear()
+        with self._lock:
+            self._tables.clear()
+
+
+_toneBank = None
+
+
+def getToneBank():
+    """Get the tone bank shared by all sounds.
+
+    Returns
+    -------
+    ToneBank
+        The shared bank.
+
+    """
+    global _toneBank
+    if _toneBank is None:
+        _toneBank = ToneBank()
+    return _toneBank
+
+
+if __name__ == "__main__":
+    pass
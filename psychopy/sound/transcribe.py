@@ -21,13 +21,17 @@ __all__ = [
     'setupTranscriber',
     'getActiveTranscriber',
     'getActiveTranscriberEngine',
-    'submit'
+    'submit',
+    'TranscriptionPool'
 ]
 
 import importlib
 import json
 import sys
 import os
+import threading
+import multiprocessing
+from concurrent.futures import ProcessPoolExecutor
 import psychopy.logging as logging
 from psychopy.alerts import alert
 from pathlib import Path
@@ -105,6 +109,13 @@ class TranscriberNotSetupError(TranscriberError):
     pass
 
 
+class TranscriptionPoolFullError(TranscriberError):
+    """Exception raised when a clip is submitted to a `TranscriptionPool`
+    which already has its maximum number of pending transcriptions.
+    """
+    pass
+
+
 # ------------------------------------------------------------------------------
 # Classes and functions for speech-to-text transcription
 #
@@ -942,6 +953,185 @@ def submit(audioClip, config=None):
     return _activeTranscriber.transcribe(audioClip, config=config)
 
 
+def _initTranscriptionWorker(engine, config, loadPlugins):
+    """Setup the transcriber of a `TranscriptionPool` worker process."""
+    if loadPlugins:
+        from psychopy.plugins import activatePlugins
+        activatePlugins()
+    setupTranscriber(engine, config=config)
+
+
+def _transcribeInWorker(samples, sampleRateHz, kwargs):
+    """Transcribe samples with the transcriber of a `TranscriptionPool` worker
+    process."""
+    return _activeTranscriber.transcribe(
+        AudioClip(samples, sampleRateHz), **kwargs)
+
+
+class TranscriptionPool:
+    """Pool of worker processes which transcribe audio in the background.
+
+    Unlike `transcribe()` and `submit()`, submitting a clip to the pool returns
+    immediately with a :class:`~concurrent.futures.Future` for its
+    `TranscriptionResult`, so recordings can be transcribed during an
+    experiment (e.g. between trials) without blocking the main thread. Each
+    worker sets up its own transcriber when the pool is created, so the model
+    is only loaded once per worker.
+
+    Parameters
+    ----------
+    engine : str
+        Name of the transcriber interface to use, or a path to the backend
+        class (e.g. `psychopy_whisper.transcribe:WhisperTranscriber`). See
+        `setupTranscriber()`.
+    config : dict or None
+        Options to configure the speech-to-text engine during initialization.
+    workers : int
+        Number of worker processes. Each worker loads its own copy of the
+        model, so consider memory use before adding more.
+    maxPending : int
+        Maximum number of clips which can be waiting for or undergoing
+        transcription. Further calls to `submit()` wait for a transcription to
+        finish, or fail, depending on the `block` argument.
+    loadPlugins : bool
+        Activate plugins in the worker processes so transcribers provided by
+        plugins can be found by name.
+
+    Examples
+    --------
+    Transcribe each trial's recording while the next trial runs::
+
+        pool = TranscriptionPool('whisper', {'model_name': 'tiny.en'})
+        futures = []
+        for trial in trials:
+            ...  # run the trial
+            futures.append(pool.submit(mic.getRecording(), language='en'))
+
+        results = [future.result() for future in futures]
+        pool.shutdown()
+
+    """
+    def __init__(self, engine, config=None, workers=1, maxPending=16,
+                 loadPlugins=True):
+        self._engine = engine
+        self._maxPending = int(maxPending)
+        self._slots = threading.BoundedSemaphore(self._maxPending)
+        self._futures = set()
+        self._lock = threading.Lock()
+        # spawn workers, forking a process with open windows and audio streams
+        # is not safe
+        self._executor = ProcessPoolExecutor(
+            max_workers=workers,
+            mp_context=multiprocessing.get_context('spawn'),
+            initializer=_initTranscriptionWorker,
+            initargs=(engine, config, loadPlugins))
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, exc_type, exc_val, exc_tb):
+        self.shutdown()
+
+    @property
+    def engine(self):
+        """Transcription engine used by the workers (`str`)."""
+        return self._engine
+
+    @property
+    def maxPending(self):
+        """Maximum number of pending transcriptions (`int`)."""
+        return self._maxPending
+
+    @property
+    def pending(self):
+        """Number of clips waiting for or undergoing transcription (`int`)."""
+        return len(self._futures)
+
+    def _release(self, future):
+        with self._lock:
+            self._futures.discard(future)
+        self._slots.release()
+
+    def submit(self, audioClip, block=True, timeout=None, **kwargs):
+        """Submit an audio clip for transcription by a worker.
+
+        Parameters
+        ----------
+        audioClip : :class:`~psychopy.sound.AudioClip` or tuple
+            Audio clip containing speech to transcribe, or a tuple of samples
+            (`ndarray`) and sample rate in Hertz (`int`).
+        block : bool
+            If the pool already has `maxPending` transcriptions, wait for one
+            to finish. If `False`, raise `TranscriptionPoolFullError` instead.
+        timeout : float or None
+            Maximum time in seconds to wait if `block` is `True`, after which
+            `TranscriptionPoolFullError` is raised. Wait indefinitely if
+            `None`.
+        **kwargs
+            Passed to the `transcribe()` method of the worker's transcriber
+            (e.g. `language`, `expectedWords` or `config`).
+
+        Returns
+        -------
+        :class:`~concurrent.futures.Future`
+            Future for the `TranscriptionResult`. Call its `cancel()` method to
+            cancel a transcription which has not started yet.
+
+        """
+        if isinstance(audioClip, (tuple, list,)):
+            samples, sampleRateHz = audioClip
+        else:
+            samples, sampleRateHz = audioClip.samples, audioClip.sampleRateHz
+
+        if not self._slots.acquire(blocking=block, timeout=timeout):
+            raise TranscriptionPoolFullError(
+                "Transcription pool already has {} pending clips.".format(
+                    self._maxPending))
+
+        try:
+            future = self._executor.submit(
+                _transcribeInWorker, samples, sampleRateHz, kwargs)
+        except Exception:
+            self._slots.release()
+            raise
+
+        with self._lock:
+            self._futures.add(future)
+        # called immediately if the future is already done
+        future.add_done_callback(self._release)
+
+        return future
+
+    def cancelPending(self):
+        """Cancel all transcriptions which have not started yet.
+
+        Returns
+        -------
+        int
+            Number of transcriptions cancelled.
+
+        """
+        with self._lock:
+            futures = list(self._futures)
+
+        return sum(future.cancel() for future in futures)
+
+    def shutdown(self, wait=True, cancelPending=False):
+        """Stop the worker processes.
+
+        Parameters
+        ----------
+        wait : bool
+            Wait for pending transcriptions to finish and the workers to exit.
+        cancelPending : bool
+            Cancel transcriptions which have not started yet first.
+
+        """
+        if cancelPending:
+            self.cancelPending()
+        self._executor.shutdown(wait=wait)
+
+
 def transcribe(audioClip, engine='whisper', language='en-US', expectedWords=None,
                config=None):
     """Convert speech in audio to text.
@@ -953,7 +1143,8 @@ def transcribe(audioClip, engine='whisper', language='en-US', expectedWords=None
     Speech-to-text conversion blocks the main application thread when used on
     Python. Don't transcribe audio during time-sensitive parts of your
     experiment! Instead, initialize the transcriber before the experiment
-    begins by calling this function with `audioClip=None`.
+    begins by calling this function with `audioClip=None`, or transcribe in
+    background processes using a `TranscriptionPool`.
 
     Parameters
     ----------
@@ -0,0 +1,236 @@
+#!/usr/bin/env python
+# -*- coding: utf-8 -*-
+
+"""Detect the onset and offset of speech in a stream of audio samples.
+"""
+
+# Part of the PsychoPy library
+# Copyright (C) 2002-2018 Jonathan Peirce (C) 2019-2024 Open Science Tools Ltd.
+# Distributed under the terms of the GNU General Public License (GPL).
+
+__all__ = [
+    'VoiceOnsetDetector',
+    'VoiceEvent',
+    'VOICE_DETECT_RMS',
+    'VOICE_DETECT_FLUX'
+]
+
+from collections import namedtuple
+
+import numpy as np
+
+# methods for computing the level of each frame
+VOICE_DETECT_RMS = 'rms'
+VOICE_DETECT_FLUX = 'flux'
+
+VoiceEvent = namedtuple('VoiceEvent', ['onset', 'sample', 'level'])
+VoiceEvent.__doc__ = """Voice onset or offset found by `VoiceOnsetDetector`.
+
+`onset` is `True` for an onset and `False` for an offset, `sample` is the index
+of the first sample of the onset or offset in the stream and `level` is the
+level of the frame that triggered the event relative to the baseline.
+"""
+
+
+class VoiceOnsetDetector:
+    """Streaming voice onset and offset detector.
+
+    Blocks of samples passed to :meth:`process` are split into short frames and
+    a level is computed for every frame at once, either the RMS amplitude or
+    the spectral flux (the increase in the magnitude spectrum since the last
+    frame). A frame is voiced if its level is over `threshold` times a rolling
+    baseline of the level, which is updated with unvoiced frames so it follows
+    the background noise. An onset is reported once `minOnsetSecs` of
+    consecutive voiced frames are found, and an offset after `minOffsetSecs` of
+    consecutive unvoiced frames. When using spectral flux, which only rises at
+    the start of a sound, the frames following the first voiced frame of an
+    onset and offsets are found using the RMS amplitude. Onsets are
+    refined to the first sample in the onset frame whose amplitude exceeds the
+    threshold. The baseline starts as the mean level of the first 50 ms of the
+    stream, which should not contain speech.
+
+    Parameters
+    ----------
+    sampleRateHz : int
+        Sample rate of the stream in Hz.
+    threshold : float
+        Level relative to the baseline a frame must exceed to be voiced.
+    method : str
+        Level to compute for each frame, either 'rms' or 'flux'.
+    frameSecs : float
+        Length of each analysis frame in seconds.
+    minOnsetSecs : float
+        Minimum duration of voicing before an onset is reported.
+    minOffsetSecs : float
+        Minimum duration of silence before an offset is reported.
+    baselineSecs : float
+        Time constant of the rolling baseline in seconds.
+    minLevel : float
+        Floor for the baseline, so digital silence does not make every frame
+        voiced.
+
+    """
+    def __init__(self, sampleRateHz, threshold=4.0, method=VOICE_DETECT_RMS,
+                 frameSecs=0.01, minOnsetSecs=0.03, minOffsetSecs=0.25,
+                 baselineSecs=1.0, minLevel=1e-4):
+        if method not in (VOICE_DETECT_RMS, VOICE_DETECT_FLUX):
+            raise ValueError(
+                "Voice detection method must be 'rms' or 'flux', not "
+                "{!r}".format(method))
+        self._sampleRateHz = int(sampleRateHz)
+        self._method = method
+        self.threshold = float(threshold)
+        self._frameSize = max(1, int(round(frameSecs * self._sampleRateHz)))
+        frameSecs = self._frameSize / self._sampleRateHz
+        self._onsetFrames = max(1, int(round(minOnsetSecs / frameSecs)))
+        self._offsetFrames = max(1, int(round(minOffsetSecs / frameSecs)))
+        self._alpha = min(1.0, frameSecs / baselineSecs)
+        self._warmupFrames = max(1, int(round(0.05 / frameSecs)))
+        self.minLevel = float(minLevel)
+        if method == VOICE_DETECT_FLUX:
+            self._window = np.hanning(self._frameSize).astype(np.float32)
+        self.reset()
+
+    def reset(self):
+        """Reset the detector for a new stream."""
+        self._carry = np.zeros((0,), dtype=np.float32)
+        self._nextSample = 0  # index in the stream of the first carried sample
+        self._baseline = None
+        self._rmsBaseline = None
+        self._warmup = []  # levels of the first frames, to set the baseline
+        self._lastSpectrum = None
+        self._isVoiced = False
+        self._runLength = 0  # consecutive frames disagreeing with state
+        self._runStart = 0  # first sample of that run
+        self._runLevel = 0.0
+        self._runFrame = None  # samples of the first frame of the run
+
+    @property
+    def isVoiced(self):
+        """`True` if the stream is currently voiced (`bool`)."""
+        return self._isVoiced
+
+    @property
+    def method(self):
+        """Level computed for each frame (`str`)."""
+        return self._method
+
+    @property
+    def baseline(self):
+        """Current baseline level (`float` or `None`)."""
+        return self._baseline
+
+    def _frameLevels(self, frames):
+        """Compute the level of each frame (row) of samples."""
+        rms = np.sqrt(np.mean(np.square(frames, dtype=np.float64), axis=1))
+        if self._method == VOICE_DETECT_RMS:
+            return rms, rms
+        spectra = np.abs(np.fft.rfft(frames * self._window, axis=1))
+        if self._lastSpectrum is None:
+            # no previous frame for the first frame, it has no flux
+            previous = np.vstack((spectra[:1], spectra[:-1]))
+        else:
+            previous = np.vstack((self._lastSpectrum[None, :], spectra[:-1]))
+        flux = np.sum(np.maximum(spectra - previous, 0.0), axis=1)
+        flux /= self._frameSize
+        if self._lastSpectrum is None:
+            flux[0] = np.nan
+        self._lastSpectrum = spectra[-1]
+        return flux, rms
+
+    def process(self, samples, startSample=None):
+        """Process a block of samples from the stream.
+
+        Parameters
+        ----------
+        samples : ArrayLike
+            Block of samples, either 1D or Nx`channels`. Channels are averaged.
+        startSample : int or None
+            Index in the stream of the first sample of the block. If `None`,
+            the block is assumed to follow the last block processed.
+
+        Returns
+        -------
+        list of VoiceEvent
+            Onsets and offsets found in the block, in order.
+
+        """
+        samples = np.asarray(samples, dtype=np.float32)
+        if samples.ndim > 1:
+            samples = samples.mean(axis=1)
+        if startSample is not None and \
+                startSample != self._nextSample + len(self._carry):
+            # samples were skipped, start framing from this block
+            self._carry = samples[:0]
+            self._nextSample = startSample
+
+        samples = np.concatenate((self._carry, samples))
+        nFrames = len(samples) // self._frameSize
+        used = nFrames * self._frameSize
+        self._carry = samples[used:]
+        firstSample = self._nextSample
+        self._nextSample += used
+        if not nFrames:
+            return []
+
+        frames = samples[:used].reshape((nFrames, self._frameSize))
+        levels, rmsLevels = self._frameLevels(frames)
+
+        events = []
+        for i in range(nFrames):
+            level = levels[i]
+            if self._baseline is None:
+                # the first frames set the baseline
+                if not np.isnan(level):
+                    self._warmup.append((level, rmsLevels[i]))
+                if len(self._warmup) >= self._warmupFrames:
+                    level, rms = np.mean(self._warmup, axis=0)
+                    self._baseline = max(level, self.minLevel)
+                    self._rmsBaseline = max(rms, self.minLevel)
+                continue
+
+            if self._isVoiced or self._runLength:
+                # offsets, and the voicing after a possible onset, are found
+                # from the RMS level as spectral flux only rises at the start
+                # of a sound
+                voiced = rmsLevels[i] > self.threshold * self._rmsBaseline
+            else:
+                voiced = level > self.threshold * self._baseline
+            if voiced == self._isVoiced:
+                self._runLength = 0
+            else:
+                if not self._runLength:
+                    self._runStart = firstSample + i * self._frameSize
+                    self._runLevel = level / self._baseline
+                    self._runFrame = frames[i]
+                self._runLength += 1
+                needed = self._offsetFrames if self._isVoiced \
+                    else self._onsetFrames
+                if self._runLength >= needed:
+                    self._isVoiced = voiced
+                    self._runLength = 0
+                    events.append(self._makeEvent())
+
+            if not voiced:
+                # follow the background level
+                self._baseline += self._alpha * (level - self._baseline)
+                self._baseline = max(self._baseline, self.minLevel)
+                self._rmsBaseline += self._alpha * (
+                    rmsLevels[i] - self._rmsBaseline)
+                self._rmsBaseline = max(self._rmsBaseline, self.minLevel)
+
+        return events
+
+    def _makeEvent(self):
+        sample = self._runStart
+        if self._isVoiced:
+            # refine the onset to the first loud sample of its first frame
+            loud = np.flatnonzero(
+                np.abs(self._runFrame) > self.threshold * self._rmsBaseline)
+            if len(loud):
+                sample += int(loud[0])
+        return VoiceEvent(self._isVoiced, sample, float(self._runLevel))
+
+
+if __name__ == "__main__":
+    pass
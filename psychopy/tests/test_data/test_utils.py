@@ -153,6 +153,47 @@ class Test_utilsClass:
         assert len(conds) == 6
         assert len(list(conds[0].keys())) == 6
 
+    def test_importConditions_cached(self, tmp_path, monkeypatch):
+        from psychopy import prefs
+        monkeypatch.chdir(tmp_path)
+        monkeypatch.setitem(prefs.paths, 'userCacheDir', str(tmp_path / "cache"))
+        monkeypatch.setattr(utils, '_parsedConditions', utils.OrderedDict())
+        fileName = tmp_path / "conds.csv"
+        fileName.write_text("word;size\nhello\\nworld;1,5\nbye;[1, 2]\n")
+        conds, names = utils.importConditions(str(fileName), returnFieldNames=True)
+        assert names == ['word', 'size']
+        assert conds == [{'word': "hello\nworld", 'size': 1.5},
+                         {'word': "bye", 'size': [1, 2]}]
+        assert len(list((tmp_path / "cache" / "conditions").iterdir())) == 1
+
+        # read again from memory or from disk, each caller gets its own copy
+        conds[0]['word'] = "edited"
+        assert utils.importConditions(str(fileName))[0]['word'] == "hello\nworld"
+        monkeypatch.setattr(utils, '_parsedConditions', utils.OrderedDict())
+        assert utils.importConditions(str(fileName), selection=[1]) == [
+            {'word': "bye", 'size': [1, 2]}]
+
+        # editing the file invalidates the cache
+        fileName.write_text("word\tsize\nagain\t2.5\n")
+        os.utime(fileName, ns=(0, os.stat(fileName).st_mtime_ns + 1000))
+        assert utils.importConditions(str(fileName)) == [
+            {'word': "again", 'size': 2.5}]
+
+    def test_importConditions_cacheSize(self, tmp_path, monkeypatch):
+        from psychopy import prefs
+        monkeypatch.chdir(tmp_path)
+        monkeypatch.setitem(prefs.paths, 'userCacheDir', str(tmp_path / "cache"))
+        monkeypatch.setattr(utils, '_parsedConditions', utils.OrderedDict())
+        monkeypatch.setattr(utils, 'CONDITIONS_CACHE_SIZE', 3)
+        for i in range(5):
+            fileName = tmp_path / "conds{}.csv".format(i)
+            fileName.write_text("val\n{}\n".format(i))
+            assert utils.importConditions(str(fileName)) == [{'val': i}]
+        # only the most recently parsed files are kept
+        assert list(utils._parsedConditions) == [
+            str(tmp_path / "conds{}.csv".format(i)) for i in (2, 3, 4)]
+        assert len(list((tmp_path / "cache" / "conditions").iterdir())) == 3
+
 def test_listFromString():
     assert ['yes', 'no'] == utils.listFromString("yes, no")
     assert ['yes', 'no'] == utils.listFromString("[yes, no]")
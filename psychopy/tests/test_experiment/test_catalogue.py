@@ -0,0 +1,67 @@
+"""Tests for the catalogue of Builder components and standalone routines
+"""
+import os
+import sys
+import subprocess
+from pathlib import Path
+
+from psychopy import experiment
+from psychopy.experiment.catalogue import ElementCatalogue, importElement
+from psychopy.experiment.routines import _importRoutines
+from psychopy.experiment.routines.counterbalance import CounterbalanceRoutine
+from psychopy.tests.utils import TESTS_DATA_PATH
+
+
+def test_catalogue(tmp_path):
+    filename = str(tmp_path / 'catalogue.pickle')
+    folder = str(Path(experiment.__file__).parent / 'routines')
+    pkg = 'psychopy.experiment.routines'
+
+    catalogue = ElementCatalogue(filename)
+    entries = catalogue.getFolder(folder, pkg, _importRoutines)
+    assert (catalogue.hits, catalogue.misses) == (0, 1)
+    entry = entries['CounterbalanceRoutine']
+    assert entry['module'] == 'psychopy.experiment.routines.counterbalance'
+    assert entry['categories'] == CounterbalanceRoutine.categories
+    assert 'conditionsFile' in entry['params']
+    assert entry['params']['name']['valType'] == 'code'
+
+    # a new session reads the folder from the file, without importing it
+    def scan(folder, pkg):
+        raise AssertionError("folder shouldn't be imported again")
+    catalogue = ElementCatalogue(filename)
+    saved = catalogue.getFolder(folder, pkg, scan)
+    assert (catalogue.hits, catalogue.misses) == (1, 0)
+    assert set(saved) == set(entries)
+    assert 'class' not in saved['CounterbalanceRoutine']
+    assert importElement(saved['CounterbalanceRoutine']) is CounterbalanceRoutine
+
+
+def test_getComponentClass():
+    from psychopy.experiment.components.text import TextComponent
+    assert experiment.getComponentClass('TextComponent') is TextComponent
+    assert experiment.getComponentClass('NotAComponent') is None
+    catalogue = experiment.getComponentCatalogue()
+    assert catalogue['TextComponent']['targets'] == TextComponent.targets
+    assert experiment.getStandaloneRoutineClass('CounterbalanceRoutine') \
+        is CounterbalanceRoutine
+
+
+def test_loadImportsUsedComponents():
+    # make sure the catalogue is saved, then load an experiment in a new
+    # session
+    experiment.getComponentCatalogue()
+    experiment.getStandaloneRoutineCatalogue()
+    code = (
+        "import sys; from psychopy import experiment; "
+        "exp = experiment.Experiment(); exp.loadFromXML({!r}); "
+        "print(' '.join(sys.modules))"
+    ).format(os.path.join(TESTS_DATA_PATH, 'ghost_stroop.psyexp'))
+    proc = subprocess.run([sys.executable, '-c', code],
+                          capture_output=True, text=True)
+    assert proc.returncode == 0, proc.stderr
+    modules = proc.stdout.split()
+    for used in ('text', 'keyboard', 'code'):
+        assert 'psychopy.experiment.components.' + used in modules
+    for unused in ('grating', 'movie', 'slider', 'camera', 'form'):
+        assert 'psychopy.experiment.components.' + unused not in modules
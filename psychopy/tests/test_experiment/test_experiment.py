@@ -1,6 +1,8 @@
 from psychopy import experiment
 from psychopy.tests.utils import TESTS_DATA_PATH
 from pathlib import Path
+import os
+import collections
 import esprima
 
 
@@ -101,3 +103,87 @@ class TestExperiment:
             else:
                 assert case['value'] not in unhandledResources
 
+    def test_resources_in_conditions(self, tmp_path, monkeypatch):
+        from psychopy.experiment import resourceindex
+        # a conditions file of blocks, each with a conditions file of images
+        (tmp_path / "stim").mkdir()
+        for i in range(150):
+            (tmp_path / "stim" / f"img{i}.png").write_bytes(b"")
+        (tmp_path / "blocks.csv").write_text("block\nblock1.csv\nblock2.csv\n")
+        for name, images in (("block1.csv", range(0, 100)),
+                             ("block2.csv", range(50, 150))):
+            rows = "".join(f"stim/img{i}.png,{i}\n" for i in images)
+            (tmp_path / name).write_text("image,n\n" + rows)
+
+        exp = experiment.Experiment()
+        exp.filename = str(tmp_path / "exp.psyexp")
+        exp.addRoutine('trial', experiment.routines.Routine('trial', exp))
+        exp.flow.addRoutine(exp.routines['trial'], 0)
+        loop = experiment.loops.TrialHandler(
+            exp, 'trials', conditionsFile='blocks.csv')
+        exp.flow.addLoop(loop, 0, 2)
+
+        def getNames():
+            return [res['rel'] for res in exp.getResourceFiles()]
+
+        names = getNames()
+        # each file is listed once, in the order it is found
+        assert names[:3] == ["blocks.csv", "block1.csv", "stim/img0.png"]
+        assert names.index("block2.csv") == 102
+        assert len(names) == len(set(names)) == 153
+
+        # conditions files are only read again when they change
+        monkeypatch.setattr(resourceindex, '_readConditionsStrings', None)
+        assert getNames() == names
+        monkeypatch.undo()
+        (tmp_path / "block2.csv").write_text("image,n\nstim/img149.png,1\n")
+        stamp = os.stat(tmp_path / "block1.csv").st_mtime_ns + 10 ** 9
+        os.utime(tmp_path / "block2.csv", ns=(stamp, stamp))
+        assert len(getNames()) == 104
+
+    def test_conditions_cache_size(self, tmp_path, monkeypatch):
+        from psychopy.data import utils as dataUtils
+        from psychopy.experiment import resourceindex
+        monkeypatch.setattr(dataUtils, 'CONDITIONS_CACHE_SIZE', 2)
+        monkeypatch.setattr(resourceindex, '_conditionsCache',
+                            collections.OrderedDict())
+        filenames = []
+        for i in range(3):
+            filename = tmp_path / f"conds{i}.csv"
+            filename.write_text(f"image\nimg{i}.png\n")
+            filenames.append(str(filename))
+
+        index = resourceindex.ResourceIndex()
+        for filename in filenames[:2] + filenames[:1] + filenames[2:]:
+            index.getConditionsStrings(filename)
+        # the least recently used file is forgotten
+        assert list(resourceindex._conditionsCache) == [
+            filenames[0], filenames[2]]
+
+
+def test_legacyXMLParams_complete():
+    # params named in the conversions of _getXMLparam must skip its fast path
+    import ast
+    import inspect
+    import textwrap
+    from psychopy.experiment import _experiment
+
+    source = textwrap.dedent(
+        inspect.getsource(_experiment.Experiment._getXMLparam))
+    func = ast.parse(source).body[0]
+    # the chain of conversions after the fast path
+    fastPath, = [node for node in func.body if isinstance(node, ast.If) and
+                 '_legacyXMLParams' in ast.unparse(node.test)]
+    names = set()
+    for node in ast.walk(ast.Module(body=fastPath.orelse, type_ignores=[])):
+        if isinstance(node, ast.Compare) and \
+                isinstance(node.left, ast.Name) and node.left.id == 'name':
+            for comparator in node.comparators:
+                if isinstance(comparator, ast.Constant):
+                    names.add(comparator.value)
+                elif isinstance(comparator, (ast.Tuple, ast.List, ast.Set)):
+                    names.update(elt.value for elt in comparator.elts
+                                 if isinstance(elt, ast.Constant))
+    assert len(names) > 20
+    assert names <= _experiment._legacyXMLParams, sorted(
+        names - _experiment._legacyXMLParams)
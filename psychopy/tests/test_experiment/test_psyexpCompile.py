@@ -0,0 +1,116 @@
+"""Tests for compiling many experiments with psychopy.scripts.psyexpCompile
+"""
+import shutil
+from pathlib import Path
+
+from psychopy.scripts.psyexpCompile import compileBatch, findExperimentFiles, \
+    formatBatchReport
+from psychopy.tests.utils import TESTS_DATA_PATH
+
+
+def _makeExperiments(folder):
+    """Copy some experiments into a folder, with one that cannot be loaded."""
+    for name in ("ghost_stroop.psyexp", "TextComponent_disabled.psyexp"):
+        sub = folder / name.split('.')[0]
+        sub.mkdir()
+        shutil.copy(Path(TESTS_DATA_PATH) / name, sub / name)
+    (folder / "broken.psyexp").write_text("<PsychoPy2experiment")
+
+
+def test_findExperimentFiles(tmp_path):
+    _makeExperiments(tmp_path)
+    infiles = findExperimentFiles(tmp_path)
+    assert [Path(infile).name for infile in infiles] == [
+        "TextComponent_disabled.psyexp", "broken.psyexp", "ghost_stroop.psyexp"]
+
+    manifest = tmp_path / "manifest.txt"
+    manifest.write_text(
+        "# experiments to compile\n\nghost_stroop/ghost_stroop.psyexp\n")
+    assert findExperimentFiles(manifest) == [
+        str(tmp_path / "ghost_stroop" / "ghost_stroop.psyexp")]
+
+
+def test_compileBatch(tmp_path, monkeypatch):
+    from psychopy import prefs
+    monkeypatch.setitem(prefs.paths, 'userCacheDir', str(tmp_path / "cache"))
+    _makeExperiments(tmp_path)
+    report = compileBatch(tmp_path, nProcesses=1, loadPlugins=False)
+    assert len(report) == 3
+
+    disabled, broken, stroop = report
+    assert broken['error'] and not broken['outfiles']
+    for item in (disabled, stroop):
+        assert item['error'] is None
+        assert [Path(outfile).name for outfile in item['outfiles']] == [
+            name.format(Path(item['infile']).stem)
+            for name in ("{}.py", "{}.js", "{}-legacy-browsers.js")]
+        assert all(Path(outfile).is_file() for outfile in item['outfiles'])
+        assert item['times']['total'] >= item['times']['load']
+    # alerts are kept with the file raising them
+    assert 4052 in [alert['code'] for alert in stroop['alerts']]
+
+    # generated code and translations are kept for the next compile
+    assert (tmp_path / "cache" / "py2js.pickle").is_file()
+    assert len(list((tmp_path / "cache" / "scriptCache").iterdir())) == 2
+
+    summary = formatBatchReport(report)
+    assert summary.splitlines()[-1] == "Compiled 2 of 3 experiments"
+    assert "FAILED" in summary
+    summary = formatBatchReport(report, elapsed=1.5)
+    assert summary.splitlines()[-1] == "Compiled 2 of 3 experiments in 1.50s"
+
+
+def test_compileBatch_processes(tmp_path):
+    _makeExperiments(tmp_path)
+    report = compileBatch(
+        [tmp_path / "ghost_stroop" / "ghost_stroop.psyexp",
+         tmp_path / "TextComponent_disabled" / "TextComponent_disabled.psyexp"],
+        targets=("PsychoPy",), nProcesses=2, useCache=False, loadPlugins=False)
+    assert [item['error'] for item in report] == [None, None]
+    assert [Path(item['outfiles'][0]).name for item in report] == [
+        "ghost_stroop.py", "TextComponent_disabled.py"]
+
+
+def test_compileBatch_useVersion(tmp_path, monkeypatch):
+    from psychopy import experiment
+    from psychopy.scripts import psyexpCompile
+    exp = experiment.Experiment.fromFile(
+        Path(TESTS_DATA_PATH) / "ghost_stroop.psyexp")
+    exp.settings.params['Use version'].val = "2022.2.5"
+    infile = exp.saveToXML(str(tmp_path / "pinned.psyexp"), makeLegacy=False)
+
+    # experiments requesting another version are compiled by that version,
+    # from a legacy save file made as when compiling a single file
+    legacyFile = tmp_path / "pinned_legacy.psyexp"
+    assert not legacyFile.exists()
+    calls = []
+
+    def _compileInVersion(infile, outfile, version):
+        calls.append((Path(infile).name, Path(outfile).name, version))
+        return "", ""
+
+    monkeypatch.setattr(psyexpCompile, '_compileInVersion', _compileInVersion)
+    item, = compileBatch([infile], nProcesses=1, useCache=False,
+                         loadPlugins=False)
+    assert item['error'] is None
+    assert item['useVersion'] == "2022.2.5"
+    assert legacyFile.is_file()
+    assert calls == [
+        ("pinned_legacy.psyexp", "pinned.py", "2022.2.5"),
+        ("pinned_legacy.psyexp", "pinned.js", "2022.2.5")]
+    assert [Path(outfile).name for outfile in item['outfiles']] == [
+        "pinned.py", "pinned.js", "pinned-legacy-browsers.js"]
+    # no script is written by the installed version
+    assert not (tmp_path / "pinned.py").exists()
+    assert "compiled with version 2022.2.5" in formatBatchReport([item])
+
+    # scripts aren't reported if the requested version fails
+    def _failToCompile(infile, outfile, version):
+        raise psyexpCompile.LegacyScriptError("no such version")
+
+    monkeypatch.setattr(psyexpCompile, '_compileInVersion', _failToCompile)
+    item, = compileBatch([infile], nProcesses=1, useCache=False,
+                         loadPlugins=False)
+    assert item['error'] == "LegacyScriptError: no such version"
+    assert item['outfiles'] == []
+    assert "FAILED" in formatBatchReport([item])
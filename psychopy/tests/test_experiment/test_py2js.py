@@ -1,3 +1,11 @@
+import os
+import time
+
+import esprima
+
+import pytest
+
+from psychopy.experiment import py2js_transpiler
 from psychopy.experiment.py2js_transpiler import translatePythonToJavaScript
 import psychopy.experiment.py2js as py2js
 from psychopy.experiment import Experiment
@@ -11,6 +19,63 @@ class TestTranspiler:
         transpiledCode = translatePythonToJavaScript(py)
         assert (js == transpiledCode)
 
+    def test_cached(self, tmp_path):
+        py2js_transpiler.clearTranslationCache()
+        js = translatePythonToJavaScript("a = 1\nb = a + 1")
+        assert js == "var a, b;\na = 1;\nb = (a + 1);\n"
+        assert py2js_transpiler.getCachedTranslation(
+            ('python', "a = 1\nb = a + 1")) is not None
+        # variables defined already are left out of cached translations too
+        assert translatePythonToJavaScript(
+            "a = 1\nb = a + 1", namespace=['a']) == "var b;\na = 1;\nb = (a + 1);\n"
+        assert translatePythonToJavaScript("a = 1\nb = a + 1") == js
+        # failures aren't cached
+        for i in range(2):
+            with pytest.raises(Exception, match="abstract syntax tree"):
+                translatePythonToJavaScript("a = (")
+        assert py2js_transpiler.getCachedTranslation(('python', "a = (")) is None
+
+        # translations can be kept between sessions
+        filename = tmp_path / "py2js.pickle"
+        py2js_transpiler.saveTranslationCache(filename)
+        assert not os.path.exists(str(filename) + ".lock")
+        py2js_transpiler.clearTranslationCache()
+        py2js_transpiler.loadTranslationCache(filename)
+        assert py2js_transpiler.getCachedTranslation(
+            ('python', "a = 1\nb = a + 1")) is not None
+
+        # saving keeps the translations saved by other processes meanwhile,
+        # and only writes the file if there are new translations
+        translatePythonToJavaScript("c = 2")
+        py2js_transpiler.clearTranslationCache()
+        translatePythonToJavaScript("d = 3")
+        py2js_transpiler.saveTranslationCache(filename)
+        mtime = os.path.getmtime(filename)
+        py2js_transpiler.clearTranslationCache()
+        py2js_transpiler.loadTranslationCache(filename)
+        py2js_transpiler.saveTranslationCache(filename)
+        assert os.path.getmtime(filename) == mtime
+        for code in ("a = 1\nb = a + 1", "d = 3"):
+            assert py2js_transpiler.getCachedTranslation(
+                ('python', code)) is not None
+
+    def test_cache_lock(self, tmp_path, monkeypatch):
+        filename = tmp_path / "py2js.pickle"
+        lockFile = str(filename) + ".lock"
+        monkeypatch.setattr(
+            py2js_transpiler, 'TRANSLATION_CACHE_LOCK_TIMEOUT', 0.1)
+        py2js_transpiler.clearTranslationCache()
+        translatePythonToJavaScript("a = 1")
+        # not saved while another process holds the lock
+        open(lockFile, 'w').close()
+        py2js_transpiler.saveTranslationCache(filename)
+        assert not filename.exists()
+        # locks left by crashed processes are taken over
+        os.utime(lockFile, (time.time() - 1, time.time() - 1))
+        py2js_transpiler.saveTranslationCache(filename)
+        assert filename.exists()
+        assert not os.path.exists(lockFile)
+
     def test_assignment(self):
         py = ("a = 1")
         js = ("var a;\na = 1;\n")
@@ -228,3 +293,74 @@ class Test_PY2JS_Compile:
             # check whether direct match or at least a match when spaces removed
             assert (py2js.expression2js(expr) == output[idx] or
             py2js.expression2js(expr).replace(" ", "") == output[idx].replace(" ", ""))
+
+    def test_Py2js_Expression2js_cached(self):
+        py2js_transpiler.clearTranslationCache()
+        assert py2js.expression2js('(3, sin(t))') == '[3, Math.sin(t)]'
+        assert py2js_transpiler.getCachedTranslation(
+            ('expression', '(3, sin(t))')) == '[3, Math.sin(t)]'
+        assert py2js.expression2js('(3, sin(t))') == '[3, Math.sin(t)]'
+
+    def test_addVariableDeclarations(self):
+        program = ("import * as util from './lib/util-2024.1.0.js';\n"
+                   "const msg = `\nfunction notAFunction() {`;\n"
+                   "function aBegin() {\n"
+                   "  a = 1;\n"
+                   "  if (a) {\n"
+                   "    b = 2;\n"
+                   "  }\n"
+                   "}\n"
+                   "async function bBegin() {\n"
+                   "  a = 2;\n"
+                   "  c = 3;\n"
+                   "}\n")
+        declared = program.replace(
+            "function aBegin", "\nvar a;\nvar b;\nfunction aBegin").replace(
+            "async function bBegin", "\nvar c;\nasync function bBegin")
+        assert py2js.addVariableDeclarations(program, "test.js") == declared
+        # without a template string spanning functions the functions are
+        # parsed one by one, with the same result
+        program = program.replace("`\nfunction notAFunction() {`", "''")
+        declared = declared.replace("`\nfunction notAFunction() {`", "''")
+        assert py2js.addVariableDeclarations(program, "test.js") == declared
+
+    def test_addVariableDeclarations_large(self):
+        """Benchmark declaring variables in a script with many functions"""
+        functions = []
+        for i in range(400):
+            functions.append(
+                f"function routine{i}RoutineBegin(snapshot) {{\n"
+                f"  return async function () {{\n"
+                f"    routine{i}Clock = new util.Clock();\n"
+                f"    t = 0;\n"
+                f"    if (t > {i}) {{\n"
+                f"      key_resp_{i} = t;\n"
+                f"    }}\n"
+                f"    return Scheduler.Event.NEXT;\n"
+                f"  }}\n"
+                f"}}\n\n")
+        program = "const psychoJS = new PsychoJS({debug: true});\n\n" + "".join(functions)
+
+        # declarations spliced into the program one by one, as they used to be
+        tree = esprima.parseScript(program, {'range': True, 'tolerant': True})
+        expected = program
+        offset = 0
+        allUndeclaredVariables = []
+        for expression in tree.body:
+            if expression.type == 'FunctionDeclaration':
+                undeclaredVariables = py2js.findUndeclaredVariables(
+                    expression.body.body, allUndeclaredVariables)
+                declaration = ['', '\n'][len(undeclaredVariables) > 0] + '\n'.join(
+                    ['var ' + variable + ';' for variable in undeclaredVariables]) + '\n'
+                startIndex = expression.range[0] + offset
+                expected = expected[:startIndex] + declaration + expected[startIndex:]
+                offset += len(declaration)
+
+        py2js._scanFunctions.cache_clear()
+        assert py2js.addVariableDeclarations(program, "test.js") == expected
+        cacheInfo = py2js._scanFunctions.cache_info()
+        assert cacheInfo.hits == 0
+        # functions which haven't changed aren't parsed again
+        assert py2js.addVariableDeclarations(program, "test.js") == expected
+        assert py2js._scanFunctions.cache_info().hits == 401
+        assert py2js._scanFunctions.cache_info().misses == cacheInfo.misses
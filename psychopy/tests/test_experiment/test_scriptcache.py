@@ -0,0 +1,80 @@
+"""Tests for psychopy.experiment.scriptcache
+"""
+from pathlib import Path
+
+import pytest
+
+from psychopy import data, experiment
+from psychopy.experiment.scriptcache import ScriptCache
+from psychopy.tests.utils import TESTS_DATA_PATH
+
+
+def _loadExperiment(name="ghost_stroop.psyexp"):
+    exp = experiment.Experiment()
+    exp.loadFromXML(Path(TESTS_DATA_PATH) / name)
+
+    return exp
+
+
+class TestScriptCache:
+    @pytest.fixture(autouse=True)
+    def fixedDate(self, monkeypatch):
+        # scripts are stamped with the time they were written
+        monkeypatch.setattr(data, 'getDateStr', lambda *args, **kwargs: "now")
+
+    def test_recompile(self, tmp_path):
+        exp = _loadExperiment()
+        expPath = str(tmp_path / "ghost_stroop.py")
+        uncached = exp.writeScript(expPath, cache=False)
+
+        cache = ScriptCache()
+        assert exp.writeScript(expPath, cache=cache) == uncached
+        assert cache.hits == 0 and cache.misses > 0
+        misses = cache.misses
+        # nothing changed, so every routine comes from the cache
+        assert exp.writeScript(expPath, cache=cache) == uncached
+        assert cache.hits == misses and cache.misses == misses
+
+        # changing a component only regenerates its routine
+        word = exp.routines['trial'].getComponentFromName('word')
+        word.params['text'].val = 'edited text'
+        edited = exp.writeScript(expPath, cache=cache)
+        assert edited == exp.writeScript(expPath, cache=False)
+        assert 'edited text' in edited
+        assert misses < cache.misses < 2 * misses
+
+    def test_disabled_restored(self, tmp_path):
+        exp = _loadExperiment("TextComponent_disabled.psyexp")
+        components = {name: list(routine)
+                      for name, routine in exp.routines.items()}
+        flow = list(exp.flow)
+        settings = {name: param.val
+                    for name, param in exp.settings.params.items()}
+
+        exp.writeScript(str(tmp_path / "exp.py"))
+        # removing disabled components happens on the experiment itself, so
+        # everything must be put back afterwards
+        assert {name: list(routine)
+                for name, routine in exp.routines.items()} == components
+        assert list(exp.flow) == flow
+        assert {name: param.val
+                for name, param in exp.settings.params.items()} == settings
+
+    def test_on_disk(self, tmp_path):
+        filename = str(tmp_path / "cache.pickle")
+        expPath = str(tmp_path / "ghost_stroop.py")
+        cache = ScriptCache(filename)
+        script = _loadExperiment().writeScript(expPath, cache=cache)
+        assert len(cache) == cache.misses
+
+        # a new session picks up the code generated by the last one
+        cache = ScriptCache(filename)
+        assert _loadExperiment().writeScript(expPath, cache=cache) == script
+        assert cache.misses == 0 and cache.hits > 0
+
+        # fragments not used for a number of compiles are dropped
+        nFragments = len(cache)
+        cache.maxAge = 0
+        _loadExperiment("TextComponent_disabled.psyexp").writeScript(
+            str(tmp_path / "exp.py"), cache=cache)
+        assert len(cache) == cache.misses < nFragments
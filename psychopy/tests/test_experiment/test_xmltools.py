@@ -0,0 +1,69 @@
+"""Tests for psychopy.experiment.xmltools
+"""
+import os
+import xml.etree.ElementTree as xml
+from xml.dom import minidom
+
+from psychopy import experiment
+from psychopy.experiment.xmltools import (
+    parseExperimentFile, getSettingFromFile, prettyXML, clearParseCache)
+from psychopy.tests.utils import TESTS_DATA_PATH
+
+
+def _minidomXML(root):
+    """How experiments used to be written."""
+    return minidom.parseString(
+        xml.tostring(root, 'utf-8')).toprettyxml(indent="  ")
+
+
+def test_prettyXML():
+    exp = experiment.Experiment.fromFile(
+        os.path.join(TESTS_DATA_PATH, 'ghost_stroop.psyexp'))
+    root = exp._xml
+    assert prettyXML(root) == _minidomXML(root)
+
+    # awkward values
+    root = xml.Element('Root')
+    child = xml.SubElement(root, 'Param')
+    child.set('val', 'a & b < c > "d" \'e\' \t&#10;')
+    xml.SubElement(child, 'Empty')
+    assert prettyXML(root) == _minidomXML(root)
+    # text is left to minidom
+    child.text = "text"
+    assert prettyXML(root) == _minidomXML(root)
+
+
+def test_parseExperimentFile(tmp_path):
+    source = os.path.join(TESTS_DATA_PATH, 'TextComponent_disabled.psyexp')
+    filename = str(tmp_path / 'exp.psyexp')
+    with open(source, 'rb') as f:
+        contents = f.read()
+    with open(filename, 'wb') as f:
+        f.write(contents)
+
+    clearParseCache()
+    root = parseExperimentFile(filename)
+    assert root.tag == 'PsychoPy2experiment'
+    assert parseExperimentFile(filename) is root
+    # files with the same contents are only parsed once
+    assert parseExperimentFile(source) is root
+
+    # files are parsed again when they change
+    with open(filename, 'ab') as f:
+        f.write(b'<!-- changed -->\n')
+    changed = parseExperimentFile(filename)
+    assert changed is not root
+    assert xml.tostring(changed) == xml.tostring(root)
+
+
+def test_getSettingFromFile(tmp_path):
+    exp = experiment.Experiment()
+    exp.settings.params['runMode'].val = 0
+    filename = exp.saveToXML(str(tmp_path / 'exp.psyexp'), makeLegacy=False)
+    assert getSettingFromFile(filename, 'runMode') == '0'
+    assert experiment.Experiment.getRunModeFromFile(filename) == 0
+    assert getSettingFromFile(filename, 'notASetting', default='x') == 'x'
+
+    # files from before run modes are run
+    oldFile = os.path.join(TESTS_DATA_PATH, 'TextComponent_disabled.psyexp')
+    assert experiment.Experiment.getRunModeFromFile(oldFile) == 1
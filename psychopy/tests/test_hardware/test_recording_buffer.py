@@ -0,0 +1,101 @@
+import os
+import numpy as np
+import pytest
+
+try:
+    from psychopy.hardware.microphone import StreamingRecordingBuffer
+    from psychopy.sound.exceptions import AudioStreamError
+except ImportError:  # psychtoolbox audio not available on this machine
+    pytest.skip("requires psychtoolbox audio", allow_module_level=True)
+
+
+class TestStreamingRecordingBuffer:
+    sampleRate = 48000
+
+    def _record(self, codec):
+        # window of 10000 stereo samples
+        buff = StreamingRecordingBuffer(
+            self.sampleRate, 2, maxRecordingSize=80, codec=codec)
+        data = np.random.uniform(-0.5, 0.5, (100000, 2))
+        # quantise so samples survive 24-bit FLAC encoding
+        data = (np.round(data * 2 ** 23) / 2 ** 23).astype(np.float32)
+        buff.seek(0, absolute=True)
+        for i in range(0, len(data), 480):
+            buff.write(data[i:i + 480])
+        return buff, data
+
+    @pytest.mark.parametrize("codec", ["wav", "flac"])
+    def test_recording(self, codec):
+        buff, data = self._record(codec)
+        assert not buff.isFull
+        assert buff.lastSample == len(data)
+        assert buff.totalSamples == 10000
+        # recent samples come from the memory window
+        recent = buff.getSegment(buff.lastSample / self.sampleRate - 0.1)
+        assert np.allclose(recent.samples, data[-4800:])
+
+        buff.flush()
+        full = buff.getSegment()
+        assert full.samples.shape == data.shape
+        assert np.allclose(full.samples, data)
+
+        # a new recording goes to a new file
+        lastFile = buff.filename
+        buff.seek(0, absolute=True)
+        buff.write(data[:10])
+        buff.flush()
+        assert buff.filename != lastFile
+        assert len(buff.getSegment().samples) == 10
+
+        folder = buff._folder
+        buff.close()
+        assert not os.path.exists(folder)
+
+    def test_wav_while_recording(self):
+        buff, data = self._record("wav")
+        # samples no longer in memory are mapped from the file
+        clip = buff.getSegment(0.5, 1.0)
+        assert np.allclose(clip.samples, data[24000:48000])
+        buff.close()
+
+    def test_record_after_close(self):
+        buff, data = self._record("wav")
+        buff.close()
+        # the file was finished, recording again uses a new temporary folder
+        assert buff._writer is None
+        buff.seek(0, absolute=True)
+        buff.write(data[:10])
+        buff.flush()
+        assert os.path.isfile(buff.filename)
+        folder = buff._folder
+        buff.close()
+        assert not os.path.exists(folder)
+
+    def test_write_error(self):
+        buff, data = self._record("flac")
+
+        def fail(*args, **kwargs):
+            raise OSError("disk full")
+
+        # finishing the file fails, the writer thread still exits
+        buff._file.close = fail
+        with pytest.raises(AudioStreamError):
+            buff.flush()
+        assert buff._writer is None
+        with pytest.raises(AudioStreamError):
+            buff.getSegment()
+
+        # samples that could not be written are reported too
+        buff.seek(0, absolute=True)
+        buff.write(data[:10])
+        buff._file.write = fail
+        buff.write(data[10:20])
+        with pytest.raises(AudioStreamError):
+            buff.flush()
+
+        # a new recording starts without the error
+        buff.seek(0, absolute=True)
+        buff.write(data[:10])
+        buff.flush()
+        assert len(buff.getSegment().samples) == 10
+        buff.close()
@@ -0,0 +1,49 @@
+""" Test the ioHub Server config file cache
+"""
+import os
+
+from psychopy.iohub.util.configcache import ConfigCache
+
+
+def test_yaml_cache(tmp_path):
+    yamlPath = tmp_path / 'default_test.yaml'
+    yamlPath.write_text("Test:\n    interval: 0.001\n    names: [a, b]\n")
+    cachePath = str(tmp_path / 'cache' / 'config_cache.pickle')
+
+    cache = ConfigCache(cachePath)
+    conf = cache.loadYAML(str(yamlPath))
+    assert conf == {'Test': {'interval': 0.001, 'names': ['a', 'b']}}
+    # returned values are copies
+    conf['Test']['interval'] = 1
+    assert cache.loadYAML(str(yamlPath))['Test']['interval'] == 0.001
+    cache.save()
+    assert os.path.exists(cachePath)
+
+    # a new cache instance, as created by the next server process
+    cache = ConfigCache(cachePath)
+    assert cache.loadYAML(str(yamlPath))['Test']['interval'] == 0.001
+    assert (cache.hits, cache.misses) == (1, 0)
+
+    # changing the file invalidates the entry
+    yamlPath.write_text("Test:\n    interval: 0.002\n")
+    cache = ConfigCache(cachePath)
+    assert cache.loadYAML(str(yamlPath))['Test']['interval'] == 0.002
+    assert cache.misses == 1
+
+
+def test_validation_cache(tmp_path):
+    settingsPath = tmp_path / 'supported_config_settings.yaml'
+    settingsPath.write_text("Test:\n    interval: IOHUB_FLOAT\n")
+    cache = ConfigCache(str(tmp_path / 'config_cache.pickle'))
+
+    key = cache.validationKey(str(settingsPath), {'interval': 1})
+    assert cache.getValidation(key) is None
+    # results with errors are never cached
+    cache.setValidation(key, dict(errors=[('interval', 1)], not_found=[]),
+                        {'interval': 1})
+    assert cache.getValidation(key) is None
+    cache.setValidation(key, dict(errors=[], not_found=[]),
+                        {'interval': 1.0})
+    assert cache.getValidation(key) == (dict(errors=[], not_found=[]),
+                                        {'interval': 1.0})
+    assert cache.validationKey(str(settingsPath), {'interval': 2}) != key
@@ -0,0 +1,102 @@
+""" Test adaptive device polling and the device statistics of the ioHub Server
+"""
+from collections import deque
+
+from psychopy.iohub.devices import DeviceEvent
+from psychopy.iohub.server import DeviceMonitor, ioServer
+
+
+class FakeDevice:
+    """Device whose polls find the events queued in `pending`."""
+    def __init__(self, name):
+        self.name = name
+        self.pending = []
+        self.received = []
+        self._native_event_buffer = deque()
+        self._filters = {}
+
+    def _getNativeEventBuffer(self):
+        return self._native_event_buffer
+
+    def _poll(self):
+        self._native_event_buffer.extend(self.pending)
+        self.pending = []
+
+    def _getIOHubEventObject(self, native_event):
+        evt = [0] * (DeviceEvent.EVENT_TYPE_ID_INDEX + 1)
+        evt[DeviceEvent.EVENT_TYPE_ID_INDEX] = native_event
+        return evt
+
+    def _getEventListeners(self, event_type):
+        return [self]
+
+    def _handleEvent(self, evt):
+        self.received.append(evt)
+
+
+def test_poll_interval():
+    device = FakeDevice('kb')
+    monitor = DeviceMonitor(device, 0.001, max_interval=0.008,
+                            idle_poll_count=10)
+    # the interval doubles every 10 idle polls, up to max_interval
+    intervals = []
+    for i in range(50):
+        monitor.poll()
+        intervals.append(monitor.current_interval)
+    assert intervals[8] == 0.001
+    assert intervals[9] == 0.002
+    assert intervals[19] == 0.004
+    assert intervals[29] == 0.008
+    assert intervals[49] == 0.008
+
+    # a poll receiving an event goes back to sleep_interval
+    device.pending = [1, 2]
+    monitor.poll()
+    assert monitor.current_interval == 0.001
+    assert monitor.idle_polls == 0
+
+    # no backing off unless max_interval is given
+    monitor = DeviceMonitor(device, 0.001, idle_poll_count=10)
+    for i in range(50):
+        monitor.poll()
+    assert monitor.current_interval == 0.001
+
+
+def test_device_stats():
+    device = FakeDevice('kb')
+    monitor = DeviceMonitor(device, 0.001)
+    server = ioServer.__new__(ioServer)
+    server.devices = [device]
+    server.deviceMonitors = [monitor]
+    server._deviceStats = {}
+
+    for events in ([1, 2, 3], [], [4]):
+        device.pending = list(events)
+        monitor.poll()
+    server.processDeviceEvents()  # processes the 4 queued events
+    server.processDeviceEvents()  # nothing to process
+    assert len(device.received) == 4
+
+    stats = server.getDeviceStats()['kb']
+    assert stats['queue_depth'] == 0
+    assert stats['poll_count'] == 3
+    assert stats['polled_event_count'] == 4
+    assert stats['idle_polls'] == 0
+    assert stats['poll_interval'] == 0.001
+    assert 0 <= stats['mean_poll_time'] <= stats['max_poll_time']
+    assert stats['process_count'] == 1
+    assert stats['skipped_count'] == 1
+    assert stats['processed_event_count'] == 4
+    assert stats['filtered_event_count'] == 0
+    assert stats['max_queue_depth'] == 4
+
+    # events waiting to be processed are counted, stats are reset on request
+    device.pending = [5, 6]
+    monitor.poll()
+    stats = server.getDeviceStats(reset=True)['kb']
+    assert stats['queue_depth'] == 2
+    assert stats['poll_count'] == 4
+    stats = server.getDeviceStats()['kb']
+    assert stats['poll_count'] == 0
+    assert stats['process_count'] == 0
+    assert stats['queue_depth'] == 2
@@ -0,0 +1,59 @@
+""" Test the ioHub time base offset and drift model
+"""
+import numpy as np
+
+from psychopy.iohub.net import TimeSyncState
+
+
+def makeSyncSamples(drift, offset, duration=7200., count=600, seed=1):
+    rng = np.random.default_rng(seed)
+    localTimes = np.sort(rng.uniform(0, duration, count))
+    rtts = rng.exponential(0.0003, count) + 0.0001
+    # every 20th request is delayed, e.g. by the OS scheduler
+    rtts[::20] += 0.05
+    # a delayed reply puts the remote time stamp anywhere in the round trip
+    jitter = (rtts - 0.0001) * rng.uniform(-0.5, 0.5, count)
+    remoteTimes = drift * localTimes + offset + jitter
+    return rtts, localTimes, remoteTimes
+
+
+def test_drift_and_offset():
+    state = TimeSyncState()
+    rtts, localTimes, remoteTimes = makeSyncSamples(1.00002, 12.5)
+    for i in range(0, len(rtts), 5):
+        state.addSamples(rtts[i:i + 5], localTimes[i:i + 5],
+                         remoteTimes[i:i + 5])
+    assert abs(state.getDrift() - 1.00002) < 1e-7
+    assert abs(state.getOffset() - 12.5) < 1e-4
+    assert state.getAccuracy() < 0.001
+
+
+def test_vectorised_conversion():
+    state = TimeSyncState()
+    state.addSamples(*makeSyncSamples(0.99999, -3.0))
+    localTimes = np.linspace(0, 7200, 1000)
+    remoteTimes = state.local2RemoteTime(localTimes)
+    assert isinstance(remoteTimes, np.ndarray)
+    assert remoteTimes.shape == localTimes.shape
+    assert np.allclose(remoteTimes[10], state.local2RemoteTime(localTimes[10]))
+    assert np.allclose(state.remote2LocalTime(remoteTimes), localTimes)
+    assert np.allclose(state.local2RemoteTime(list(localTimes[:3])),
+                       remoteTimes[:3])
+
+
+def test_no_samples():
+    state = TimeSyncState()
+    assert state.local2RemoteTime(2.5) == 2.5
+    assert state.remote2LocalTime(2.5) == 2.5
+
+
+def test_update_model():
+    state = TimeSyncState()
+    state.addSamples(*makeSyncSamples(1.0, 5.0, seed=2), update_model=False)
+    # the first model is fitted regardless
+    assert abs(state.getOffset() - 5.0) < 1e-4
+    # samples added without updating the model keep the last fit
+    state.addSamples(*makeSyncSamples(1.0, 8.0, seed=3), update_model=False)
+    assert abs(state.getOffset() - 5.0) < 1e-4
+    state.addSamples(*makeSyncSamples(1.0, 8.0, seed=4))
+    assert abs(state.getOffset() - 8.0) < 1e-4
@@ -0,0 +1,118 @@
+""" Test sending trial handler records to the ioHub Server in batches
+"""
+import sys
+import types
+
+import pytest
+
+from psychopy import data
+from psychopy.iohub.client import ioHubConnection
+from psychopy.iohub.devices.computer import Computer
+from psychopy.iohub.errors import ioHubError
+
+
+class FakeServer:
+    """Stands in for the ioHub Server process, keeping the rows it saves."""
+    def __init__(self):
+        self.tables = []
+        self.requests = 0
+        self.failRows = False
+        self.failedRows = 0
+
+    def _saveRows(self, rows):
+        if self.failRows:
+            return False
+        self.tables[-1].extend(rows)
+        return True
+
+    def sendToHubServer(self, request):
+        self.requests += 1
+        _, name, args = (request + (None,))[:3]
+        if name == 'initConditionVariableTable':
+            self.tables.append([])
+            result = True
+        elif name == 'extendConditionVariableTable':
+            result = self._saveRows([args[2]])
+        elif name == 'extendConditionVariableTableRows':
+            result = self._saveRows(args[2])
+        elif name == 'getConditionVariableRowErrors':
+            result, self.failedRows = self.failedRows, 0
+        else:
+            result = None
+        return 'RPC_RESULT', name, result
+
+    def sendTo(self, request):
+        # rows sent without waiting for a reply
+        if request[0] == 'EXP_CV_ROWS':
+            self.requests += 1
+            if not self._saveRows(request[3]):
+                self.failedRows += len(request[3])
+
+    def close(self):
+        pass
+
+
+@pytest.fixture
+def io(monkeypatch):
+    """Connection to a fake ioHub Server."""
+    server = FakeServer()
+    conn = ioHubConnection.__new__(ioHubConnection)
+    conn.experimentID = conn.experimentSessionID = 1
+    conn._cv_order = None
+    conn._cv_batch_size = 1
+    conn._cv_record_cache = []
+    conn._message_cache = []
+    conn._shutdown_attempted = False
+    conn._sendToHubServer = server.sendToHubServer
+    conn.udp_client = server
+    conn.server = server
+    # shutting down sets a flag on PsychoPy windows, no display is needed
+    monkeypatch.setitem(sys.modules, 'psychopy.visual',
+                        types.SimpleNamespace(window=types.SimpleNamespace()))
+    monkeypatch.setattr(Computer, 'iohub_process', None)
+    monkeypatch.setattr(Computer, 'iohub_process_id', None)
+    monkeypatch.setattr(ioHubConnection, 'ACTIVE_CONNECTION', None)
+    yield conn
+    conn._shutdown_attempted = True  # nothing to shut down when collected
+
+
+def makeTrials():
+    return data.TrialHandler([{'word': 'a', 'n': 1}, {'word': 'b', 'n': 2}],
+                             nReps=5, method='sequential')
+
+
+def test_batched_records(io):
+    trials = makeTrials()
+    io.createTrialHandlerRecordTable(trials, batch_size=4)
+    for trial in trials:
+        io.addTrialHandlerRecord(trial)
+    # two batches of 4 sent, 2 records still cached
+    assert len(io.server.tables[0]) == 8
+    assert io.server.requests == 3
+
+    # the rest are sent when the connection is shut down
+    io.shutdown()
+    assert io.server.tables[0] == [[b'a', 1], [b'b', 2]] * 5
+
+
+def test_new_table_flushes_records(io):
+    io.createTrialHandlerRecordTable(makeTrials(), batch_size=4)
+    io.addTrialHandlerRecord({'word': 'a', 'n': 1})
+    # records cached for the first table are saved to it
+    io.createTrialHandlerRecordTable(makeTrials(), batch_size=4)
+    assert io.server.tables == [[[b'a', 1]], []]
+
+    io.addTrialHandlerRecord({'word': 'b', 'n': 2})
+    io.server.failRows = True
+    with pytest.raises(ioHubError):
+        io.createTrialHandlerRecordTable(makeTrials())
+
+
+def test_failed_records_are_reported(io):
+    io.createTrialHandlerRecordTable(makeTrials(), batch_size=2)
+    io.server.failRows = True
+    io.addTrialHandlerRecord({'word': 'a', 'n': 1})
+    io.addTrialHandlerRecord({'word': 'b', 'n': 2})  # sent without waiting
+    io.server.failRows = False
+    assert io.flushTrialHandlerRecords() is False
+    assert io.flushTrialHandlerRecords() is True
@@ -0,0 +1,20 @@
+"""Tests for psychopy.scripts.benchmarkExperiments
+"""
+import os
+
+from psychopy.scripts.benchmarkExperiments import (
+    findLargestExperiments, benchmarkExperiment, formatBenchmarkReport)
+from psychopy.tests.utils import TESTS_DATA_PATH
+
+
+def test_benchmarkExperiment():
+    files = findLargestExperiments(TESTS_DATA_PATH, n=2)
+    assert len(files) == 2
+    assert os.path.getsize(files[0]) >= os.path.getsize(files[1])
+
+    filename = os.path.join(TESTS_DATA_PATH, 'ghost_stroop.psyexp')
+    result = benchmarkExperiment(filename, repeats=1)
+    assert result['components'] > 0 and result['params'] > 0
+    assert all(result[key] > 0 for key in ('load', 'reload', 'save'))
+    report = formatBenchmarkReport([result])
+    assert report.splitlines()[1].endswith('ghost_stroop.psyexp')
@@ -0,0 +1,62 @@
+"""Benchmark of the time taken to import PsychoPy packages, guarding against
+slow imports creeping back in.
+
+Each package is imported in a fresh interpreter. Heavy dependencies which the
+package only needs in some functions must not be imported with it, and the
+import must finish within a (generous) time budget.
+"""
+import os
+from pathlib import Path
+
+import pytest
+
+import psychopy
+from psychopy.scripts.profileStartup import profileImport
+
+# package, modules it must not import, time budget (seconds)
+cases = [
+    ("psychopy",
+     ["psychopy.tools.versionchooser", "psychopy.web", "pandas", "pyglet.gl"],
+     2),
+    ("psychopy.tools.filetools",
+     ["json_tricks", "pandas"],
+     3),
+    ("psychopy.data",
+     ["openpyxl", "scipy.interpolate", "matplotlib", "psychopy.visual"],
+     5),
+    ("psychopy.monitors",
+     ["scipy.interpolate", "json_tricks", "psychopy.visual"],
+     5),
+    ("psychopy.experiment",
+     ["esprima", "matplotlib", "openpyxl", "scipy.interpolate",
+      "psychopy.visual"],
+     10),
+    # psychopy.event (and so pyglet.window) is still imported with it
+    ("psychopy.visual",
+     ["psychopy.visual.window", "psychopy.visual.textbox2",
+      "psychopy.visual.basevisual", "psychopy.visual.text",
+      "psychopy.visual.image", "psychopy.visual.shape",
+      "psychopy.visual.grating", "psychopy.visual.movies"],
+     5),
+]
+
+
+@pytest.mark.parametrize("module, unwanted, budget", cases)
+def test_importTime(module, unwanted, budget, tmp_path, monkeypatch):
+    # the interpreter runs in a temporary folder, so nothing is left behind,
+    # importing this copy of PsychoPy
+    monkeypatch.chdir(tmp_path)
+    paths = [str(Path(psychopy.__file__).parent.parent)]
+    if os.environ.get('PYTHONPATH'):
+        paths.append(os.environ['PYTHONPATH'])
+    monkeypatch.setenv('PYTHONPATH', os.pathsep.join(paths))
+    profile = profileImport(module)
+    if profile['error'] and 'NoSuchDisplayException' in profile['error']:
+        pytest.skip("importing {} needs a display".format(module))
+    assert profile['error'] is None
+    imported = {name for name, selfTime, cumulative in profile['modules']}
+    assert imported.isdisjoint(unwanted), (
+        "importing {} imports {}".format(
+            module, sorted(imported.intersection(unwanted))))
+    assert profile['total'] < budget, (
+        "importing {} took {:.2f}s".format(module, profile['total']))
@@ -0,0 +1,75 @@
+"""Tests for psychopy.plugins.registry
+"""
+import os
+import sys
+
+from psychopy import plugins
+from psychopy.plugins.registry import EntryPointRegistry
+
+
+def _makeDistribution(folder, name, entryPoints):
+    """Write the metadata of a distribution advertising some entry points."""
+    distInfo = folder / "{}-1.0.dist-info".format(name.replace('-', '_'))
+    distInfo.mkdir()
+    (distInfo / "METADATA").write_text(
+        "Metadata-Version: 2.1\nName: {}\nVersion: 1.0\n".format(name))
+    (distInfo / "entry_points.txt").write_text(entryPoints)
+
+    return distInfo
+
+
+def test_registry(tmp_path):
+    folder = tmp_path / "site-packages"
+    folder.mkdir()
+    distInfo = _makeDistribution(
+        folder, "psychopy-fake",
+        "[psychopy.visual]\nFakeStim = psychopy_fake:FakeStim\n")
+    filename = str(tmp_path / "entryPoints.pickle")
+
+    registry = EntryPointRegistry(filename)
+    assert registry.getDistributions([str(folder)]) == [
+        ("psychopy-fake",
+         (("FakeStim", "psychopy_fake:FakeStim", "psychopy.visual"),))]
+    assert registry.misses == 1
+    registry.save()
+
+    # a new session reads the folder from the registry
+    registry = EntryPointRegistry(filename)
+    registry.getDistributions([str(folder)])
+    assert registry.hits == 1 and registry.misses == 0
+
+    # changing the entry points of a distribution scans the folder again
+    (distInfo / "entry_points.txt").write_text(
+        "[psychopy.hardware]\nFakeDevice = psychopy_fake:FakeDevice\n")
+    stamp = os.stat(distInfo / "entry_points.txt").st_mtime_ns + 1000
+    os.utime(distInfo / "entry_points.txt", ns=(stamp, stamp))
+    assert registry.getDistributions([str(folder)])[0][1] == (
+        ("FakeDevice", "psychopy_fake:FakeDevice", "psychopy.hardware"),)
+
+    # as does installing another distribution
+    _makeDistribution(folder, "other", "[console_scripts]\nother = other:main\n")
+    assert sorted(name for name, eps in
+                  registry.getDistributions([str(folder)])) == [
+        "other", "psychopy-fake"]
+    assert registry.misses == 2
+
+
+def test_scanPlugins(tmp_path, monkeypatch):
+    _makeDistribution(
+        tmp_path, "psychopy-fake",
+        "[psychopy.visual]\nFakeStim = psychopy_fake:FakeStim\n")
+    monkeypatch.setattr(sys, 'path', [str(tmp_path)] + sys.path)
+    monkeypatch.setattr(plugins, '_registry_', EntryPointRegistry(
+        str(tmp_path / "cache" / "entryPoints.pickle")))
+    # put back the plugins found before
+    monkeypatch.setattr(plugins, '_installed_plugins_',
+                        plugins._installed_plugins_)
+    plugins.scanPlugins()
+    assert "psychopy-fake" in plugins.listPlugins()
+    entryPoint = plugins.pluginEntryPoints("psychopy-fake")[
+        "psychopy.visual"]["FakeStim"]
+    assert entryPoint.value == "psychopy_fake:FakeStim"
+    assert (tmp_path / "cache" / "entryPoints.pickle").is_file()
+
+    assert "FakeStim" in [ep.name for ep in plugins.getEntryPointGroup(
+        "psychopy", subgroups=True)]
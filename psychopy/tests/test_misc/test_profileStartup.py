@@ -0,0 +1,16 @@
+"""Tests for psychopy.scripts.profileStartup
+"""
+from psychopy.scripts.profileStartup import profileImport, formatStartupReport
+
+
+def test_profileImport():
+    profile = profileImport('json')
+    assert profile['error'] is None and profile['total'] > 0
+    assert 'json.decoder' in [name for name, selfTime, cumulative
+                              in profile['modules']]
+    report = formatStartupReport([profile], nTop=3)
+    assert report.startswith("import json\n  import took")
+
+    profile = profileImport('notAModule')
+    assert "ModuleNotFoundError" in profile['error']
+    assert "FAILED" in formatStartupReport([profile])
@@ -4,6 +4,7 @@ import os
 from tempfile import mkdtemp
 import pytest
 import numpy as np
+import soundfile as sf
 import psychopy
 from psychopy.sound import (
     AudioClip,
@@ -321,6 +322,76 @@ def test_audioclip_rms():
     assert isinstance(rmsResultMono, np.float32)
 
 
+@pytest.mark.audioclip
+def test_audioclip_open():
+    """Test opening audio files as memory-mapped clips."""
+    tempDir = mkdtemp(prefix='psychopy-tests-test_audioclip')
+    clip = AudioClip.sine(
+        duration=0.5, freqHz=440, gain=0.5, sampleRateHz=SAMPLE_RATE_48kHz,
+        channels=AUDIO_CHANNELS_STEREO)
+
+    # float WAV files are mapped directly
+    fname = os.path.join(tempDir, 'test_audioclip_open.wav')
+    sf.write(fname, clip.samples, clip.sampleRateHz, subtype='FLOAT')
+    mapped = AudioClip.open(fname)
+    assert mapped.isMapped and not clip.isMapped
+    assert mapped.sampleRateHz == clip.sampleRateHz
+    assert np.array_equal(mapped.samples, clip.samples)
+
+    # other files are decoded to a temporary mapped file
+    fname = os.path.join(tempDir, 'test_audioclip_open.flac')
+    clip.save(fname)
+    mapped = AudioClip.open(fname)
+    assert mapped.isMapped
+    assert np.allclose(
+        mapped.samples, AudioClip.load(fname).samples)
+    assert not AudioClip.open(fname, mmap=False).isMapped
+
+    # samples are copied into memory before changing them
+    mapped.gain(0.5)
+    assert not mapped.isMapped
+
+
+@pytest.mark.audioclip
+def test_audioclip_blocks(monkeypatch):
+    """Test block-wise processing gives the same results as processing all
+    samples at once.
+    """
+    import scipy.signal
+    from psychopy.sound import audioclip
+    monkeypatch.setattr(audioclip, 'AUDIO_BLOCK_SIZE', 1000)
+
+    rng = np.random.default_rng(0)
+    samples = rng.uniform(-0.5, 0.5, (12345, 2)).astype(np.float32)
+    clip = AudioClip(samples, sampleRateHz=SAMPLE_RATE_48kHz)
+
+    for targetRate in (SAMPLE_RATE_16kHz, 44100, SAMPLE_RATE_96kHz):
+        expected = scipy.signal.resample_poly(
+            samples, targetRate, SAMPLE_RATE_48kHz, axis=0)
+        resampled = clip._resamplePoly(targetRate, blockSize=1000)
+        assert resampled.shape == expected.shape
+        assert np.allclose(resampled, expected, atol=1e-6)
+    assert AudioClip(samples, SAMPLE_RATE_48kHz).resample(
+        SAMPLE_RATE_16kHz, resampleType='poly').sampleRateHz == \
+        SAMPLE_RATE_16kHz
+
+    assert np.allclose(
+        clip.rms(), np.sqrt(np.mean(np.square(samples), axis=0)))
+    assert np.isclose(clip.rms(1), np.sqrt(np.mean(np.square(samples[:, 1]))))
+
+    envelope = clip.rmsEnvelope(0.01, hopSecs=0.005, channel=0)
+    assert len(envelope) == (len(samples) - 480) // 240 + 1
+    assert np.isclose(envelope[3], np.sqrt(
+        np.mean(np.square(samples[720:1200, 0].astype(np.float64)))))
+
+    assert np.allclose(clip.asMono().samples[:, 0], samples.sum(axis=1) / 2)
+
+    # gain clips samples to range
+    expected = np.clip(samples * 4, -1, 1)
+    clip.gain(4.0)
+    assert np.allclose(clip.samples, expected)
+
+
 if __name__ == "__main__":
     # runs if this script is directly executed
     test_audioclip_create()
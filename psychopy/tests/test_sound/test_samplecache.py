@@ -0,0 +1,92 @@
+"""Tests for the shared cache of decoded sound file samples.
+"""
+import os
+import numpy as np
+import pytest
+import soundfile as sf
+from psychopy.sound import samplecache
+from psychopy.sound.samplecache import SampleCache
+
+
+def _writeWav(folder, name, nSamples=4800, sampleRate=48000, channels=1):
+    samples = np.sin(np.linspace(0, 100, nSamples * channels)) * 0.5
+    samples = samples.reshape((nSamples, channels))
+    filename = os.path.join(folder, name)
+    sf.write(filename, samples, sampleRate)
+    return filename
+
+
+class TestSampleCache:
+    @pytest.fixture(autouse=True)
+    def cache(self, tmp_path):
+        self.folder = str(tmp_path)
+        samplecache._sampleCache = SampleCache()
+        yield
+        samplecache._sampleCache = None
+
+    def test_load_uses_cache(self):
+        filename = _writeWav(self.folder, 'tone.wav', channels=2)
+        samples, rate, duration = samplecache.loadSoundFile(filename)
+        assert samples.shape == (4800, 2)
+        assert samples.dtype == np.float32
+        assert rate == 48000
+        assert np.isclose(duration, 0.1)
+        assert not samples.flags.writeable
+
+        again = samplecache.loadSoundFile(filename)
+        assert again[0] is samples
+        cache = samplecache.getSampleCache()
+        assert (cache.hits, cache.misses) == (1, 1)
+
+    def test_section(self):
+        filename = _writeWav(self.folder, 'tone.wav')
+        full = samplecache.loadSoundFile(filename)[0]
+        part = samplecache.loadSoundFile(filename, startTime=0.025,
+                                         stopTime=0.075)[0]
+        assert part.shape == (2400, 1)
+        assert np.allclose(part, full[1200:3600])
+
+    def test_modified_file_is_reloaded(self):
+        filename = _writeWav(self.folder, 'tone.wav')
+        first = samplecache.loadSoundFile(filename)[0]
+        os.utime(filename, ns=(0, 0))
+        second = samplecache.loadSoundFile(filename)[0]
+        assert second is not first
+        assert samplecache.getSampleCache().misses == 2
+
+    def test_lru_eviction(self):
+        cache = SampleCache(maxBytes=3 * 400)
+        arr = np.zeros((100, 1))  # 400 bytes as float32
+        for key in 'abc':
+            cache.put(key, arr, 48000, 0.1)
+        assert cache.get('a') is not None  # 'b' is now least recently used
+        cache.put('d', arr, 48000, 0.1)
+        assert 'b' not in cache
+        assert all(key in cache for key in 'acd')
+        assert cache.nBytes == 3 * 400
+
+        cache.maxBytes = 400
+        assert len(cache) == 1 and 'd' in cache
+
+        cache.maxBytes = 0
+        cache.put('e', arr, 48000, 0.1)
+        assert len(cache) == 0
+
+    def test_preload_conditions(self):
+        names = [_writeWav(self.folder, 'snd{}.wav'.format(i))
+                 for i in range(3)]
+        conditions = [{'sound': names[0], 'corr': 'left'},
+                      {'sound': names[1], 'corr': 'right'},
+                      {'sound': names[0], 'corr': 'right'},
+                      {'sound': 'A', 'corr': 'left'}]
+        loaded = samplecache.preload(conditions)
+        assert loaded == names[:2]
+        assert len(samplecache.getSampleCache()) == 2
+
+        condsFile = os.path.join(self.folder, 'conds.csv')
+        with open(condsFile, 'w') as f:
+            f.write('sound,corr\n')
+            for name in names:
+                f.write('{},1\n'.format(name))
+        assert samplecache.preload(condsFile) == names
+        assert len(samplecache.getSampleCache()) == 3
@@ -0,0 +1,67 @@
+"""Tests for the bank of synthesized tones.
+"""
+import numpy as np
+import pytest
+from scipy import signal
+from psychopy.sound import AudioClip
+from psychopy.sound.tonebank import ToneBank
+
+
+class TestToneBank:
+    def setup_method(self):
+        self.bank = ToneBank()
+
+    def test_tone_cached(self):
+        samples = self.bank.tone('sine', 4800, 1000., 48000, gain=0.5)
+        assert samples.shape == (4800, 1)
+        assert samples.dtype == np.float32
+        assert not samples.flags.writeable
+        expected = 0.5 * np.sin(2 * np.pi * 1000. * np.arange(4800) / 48000)
+        assert np.allclose(samples[:, 0], expected, atol=1e-6)
+
+        assert self.bank.tone('sine', 4800, 1000., 48000, gain=0.5) is samples
+        assert (self.bank.hits, self.bank.misses) == (1, 1)
+        # any change in parameters is a different tone
+        self.bank.tone('sine', 4800, 1000., 48000, gain=0.5, hamming=True)
+        self.bank.tone('square', 4800, 1000., 48000, gain=0.5)
+        self.bank.tone('square', 4800, 1000., 48000, gain=0.5, dutyCycle=0.2)
+        assert len(self.bank) == 4
+
+        with pytest.raises(ValueError):
+            self.bank.tone('triangle', 4800, 1000., 48000)
+
+    def test_hamming(self):
+        samples = self.bank.tone('sine', 4800, 1000., 48000, hamming=True)
+        plain = self.bank.tone('sine', 4800, 1000., 48000)
+        # 5 ms ramps at each end, untouched in between
+        assert samples[0, 0] == 0
+        assert np.all(np.abs(samples[:240]) <= np.abs(plain[:240]) + 1e-7)
+        assert np.array_equal(samples[240:-240], plain[240:-240])
+
+    @pytest.mark.parametrize("waveform", ["sine", "square", "sawtooth"])
+    def test_synthesize_continuous(self, waveform):
+        # blocks synthesized one after another match one long block
+        whole, phase = self.bank.synthesize(waveform, 1000, 441., 44100)
+        first, nextPhase = self.bank.synthesize(waveform, 300, 441., 44100)
+        second, lastPhase = self.bank.synthesize(
+            waveform, 700, 441., 44100, nextPhase)
+        assert np.allclose(np.vstack((first, second)), whole, atol=1e-5)
+        assert np.isclose(lastPhase, phase)
+
+        phases = 2 * np.pi * 441. * np.arange(1000) / 44100
+        if waveform == 'sine':
+            assert np.allclose(whole[:, 0], np.sin(phases), atol=1e-5)
+        elif waveform == 'sawtooth':
+            assert np.allclose(
+                whole[1:-1, 0], signal.sawtooth(phases[1:-1]), atol=1e-3)
+
+    def test_audioclip_tones(self):
+        clip = AudioClip.sine(0.25, 440, gain=1.0, sampleRateHz=16000,
+                              channels=2)
+        assert clip.samples.shape == (4000, 2)
+        assert clip.samples.flags.writeable
+        # clips get their own copy of the samples
+        clip.gain(0.5)
+        again = AudioClip.sine(0.25, 440, gain=1.0, sampleRateHz=16000,
+                               channels=1)
+        assert np.allclose(again.samples[:, 0], clip.samples[:, 0] * 2)
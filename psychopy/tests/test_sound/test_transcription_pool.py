@@ -0,0 +1,95 @@
+"""Tests for transcribing audio in background worker processes.
+"""
+import time
+from concurrent.futures import CancelledError
+import numpy as np
+import pytest
+from psychopy.sound.transcribe import (
+    BaseTranscriber, TranscriptionPool, TranscriptionResult)
+from psychopy.sound.transcribe import TranscriptionPoolFullError
+
+ENGINE = 'psychopy.tests.test_sound.test_transcription_pool:CountTranscriber'
+
+
+class CountTranscriber(BaseTranscriber):
+    """Transcriber which 'transcribes' the number of samples in a clip."""
+    _engine = 'count'
+    _longName = "Sample counter"
+
+    def __init__(self, initConfig=None):
+        BaseTranscriber.__init__(self, initConfig)
+        self._delay = (initConfig or {}).get('delay', 0)
+
+    def transcribe(self, audioClip, language='en-US', **kwargs):
+        time.sleep(self._delay)
+        return TranscriptionResult(
+            words=[str(len(audioClip.samples))],
+            unknownValue=False,
+            requestFailed=False,
+            engine=self._engine,
+            language=language)
+
+
+def waitForPending(pool, n=0, timeout=5.0):
+    """Wait for the pool to count `n` pending clips. Futures wake the callers
+    of `result()` before the pool's done callback runs, so the count can lag
+    behind for a moment.
+    """
+    tEnd = time.monotonic() + timeout
+    while pool.pending != n and time.monotonic() < tEnd:
+        time.sleep(0.001)
+    return pool.pending
+
+
+def test_pool_results():
+    with TranscriptionPool(ENGINE, workers=2, loadPlugins=False) as pool:
+        futures = [
+            pool.submit((np.zeros((n, 1)), 16000), language='fr')
+            for n in (10, 20, 30)]
+        results = [future.result(timeout=60) for future in futures]
+    assert [result.words for result in results] == [['10'], ['20'], ['30']]
+    assert results[0].language == 'fr'
+    assert waitForPending(pool) == 0
+
+
+def test_pool_backpressure_and_cancel():
+    pool = TranscriptionPool(
+        ENGINE, config={'delay': 0.5}, workers=1, maxPending=6,
+        loadPlugins=False)
+    try:
+        clip = (np.zeros((10, 1)), 16000)
+        futures = [pool.submit(clip) for i in range(6)]
+        assert pool.pending == 6
+        # clips past maxPending are refused
+        nRefused = 0
+        for i in range(3):
+            try:
+                pool.submit(clip, block=False)
+            except TranscriptionPoolFullError:
+                nRefused += 1
+        assert nRefused == 3
+        with pytest.raises(TranscriptionPoolFullError):
+            pool.submit(clip, timeout=0.01)
+        assert pool.pending == 6
+
+        # once the first clip is done the second is running, and those the
+        # executor hasn't handed to the worker yet can be cancelled
+        futures[0].result(timeout=60)
+        time.sleep(0.1)
+        queued = [future for future in futures
+                  if not future.running() and not future.done()]
+        assert queued
+        assert pool.cancelPending() == len(queued)
+        assert all(future.cancelled() for future in queued)
+        for future in queued:
+            with pytest.raises(CancelledError):
+                future.result()
+        assert pool.pending == 5 - len(queued)
+        for future in futures[1:]:
+            if future not in queued:
+                assert future.result(timeout=60).words == ['10']
+        assert waitForPending(pool) == 0
+        # freed slots can be used again
+        assert pool.submit(clip).result(timeout=60).words == ['10']
+    finally:
+        pool.shutdown()
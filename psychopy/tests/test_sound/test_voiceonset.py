@@ -0,0 +1,74 @@
+"""Tests for streaming voice onset detection.
+"""
+import numpy as np
+import pytest
+from psychopy.sound.voiceonset import VoiceOnsetDetector
+
+SAMPLE_RATE = 16000
+
+
+def _makeStream(onset, offset, duration=2.0, seed=0):
+    """Background noise with a loud tone between `onset` and `offset` secs."""
+    rng = np.random.default_rng(seed)
+    nSamples = int(duration * SAMPLE_RATE)
+    stream = rng.normal(0, 0.002, nSamples)
+    t = np.arange(nSamples) / SAMPLE_RATE
+    voiced = (t >= onset) & (t < offset)
+    stream[voiced] += 0.3 * np.sin(2 * np.pi * 220 * t[voiced])
+    return np.column_stack((stream, stream)).astype(np.float32)
+
+
+def _run(detector, stream, blockSize):
+    events = []
+    for start in range(0, len(stream), blockSize):
+        events.extend(
+            detector.process(stream[start:start + blockSize], start))
+    return events
+
+
+@pytest.mark.parametrize("method", ["rms", "flux"])
+@pytest.mark.parametrize("blockSize", [100, 256, 1600])
+def test_onset_offset(method, blockSize):
+    stream = _makeStream(0.5013, 1.2)
+    detector = VoiceOnsetDetector(SAMPLE_RATE, method=method)
+    events = _run(detector, stream, blockSize)
+
+    assert [event.onset for event in events] == [True, False]
+    onset, offset = events
+    # onset is refined to the first loud sample
+    assert abs(onset.sample - int(0.5013 * SAMPLE_RATE)) <= 3
+    assert onset.level > detector.threshold
+    # offset is reported at the start of the silent frames
+    assert abs(offset.sample - 1.2 * SAMPLE_RATE) <= 160
+    assert not detector.isVoiced
+
+
+def test_block_size_independent():
+    stream = _makeStream(0.3, 0.9)
+    results = []
+    for blockSize in (37, 480, 5000):
+        detector = VoiceOnsetDetector(SAMPLE_RATE)
+        results.append(
+            [(e.onset, e.sample) for e in _run(detector, stream, blockSize)])
+    assert results[0] == results[1] == results[2]
+
+
+def test_short_click_ignored():
+    stream = _makeStream(0.5, 0.51)  # 10 ms, shorter than minOnsetSecs
+    detector = VoiceOnsetDetector(SAMPLE_RATE)
+    assert _run(detector, stream, 512) == []
+
+
+def test_gap_in_stream():
+    stream = _makeStream(1.0, 1.5)
+    detector = VoiceOnsetDetector(SAMPLE_RATE)
+    # drop the first half second of samples
+    start = SAMPLE_RATE // 2
+    events = []
+    for i in range(start, len(stream), 320):
+        events.extend(detector.process(stream[i:i + 320], i))
+    assert [event.onset for event in events] == [True, False]
+    assert abs(events[0].sample - SAMPLE_RATE) <= 3
+
+    detector.reset()
+    assert detector.baseline is None
@@ -0,0 +1,50 @@
+# -*- coding: utf-8 -*-
+"""Tests for psychopy.tools.lazytools
+"""
+import sys
+import types
+
+import pytest
+
+from psychopy.tools.lazytools import lazyImport, UnavailableAttribute
+
+
+@pytest.fixture
+def module(tmp_path, monkeypatch):
+    """A package made lazy, removed from sys.modules afterwards."""
+    # anything imported writes into a temporary folder, not the working one
+    monkeypatch.chdir(tmp_path)
+    mod = types.ModuleType('lazyTestPackage')
+    mod.__path__ = []
+    sys.modules[mod.__name__] = mod
+    yield mod
+    del sys.modules[mod.__name__]
+
+
+def test_lazyImport(module):
+    names = lazyImport(vars(module), """
+    # comments are ignored
+    from collections import OrderedDict
+    from json import decoder
+    import wave
+    from notAModule import Missing
+    """)
+    assert names == ['OrderedDict', 'decoder', 'wave', 'Missing']
+    # nothing is imported yet
+    assert 'OrderedDict' not in vars(module)
+    assert 'OrderedDict' in dir(module)
+
+    # the real objects are imported on first use, and kept
+    from collections import OrderedDict
+    assert module.OrderedDict is OrderedDict
+    assert vars(module)['OrderedDict'] is OrderedDict
+    assert isinstance(module.decoder, types.ModuleType)
+    assert module.wave.__name__ == 'wave'
+
+    # names which can't be imported raise the error when they're used
+    assert isinstance(module.Missing, UnavailableAttribute)
+    with pytest.raises(ImportError):
+        module.Missing()
+
+    with pytest.raises(AttributeError):
+        module.notAName
@@ -0,0 +1,386 @@
+"""Tests for psychopy.tools.movietools
+"""
+import os
+import subprocess
+import threading
+import time
+import numpy as np
+import pytest
+from psychopy.tools import movietools
+from psychopy.tools.movietools import FramePool, MovieFileWriter, \
+    MovieSeekIndex, getMovieSeekIndex, muxAudioToMovie, _getFFmpegExecutable
+
+
+class TestFramePool:
+    def test_all_frames(self):
+        pool = FramePool((4, 2), nBuffers=2)
+        assert pool.bufferSize == 24
+        for i in range(3):
+            index = pool.acquire()
+            pool.getBuffer(index)[:] = i
+            pool.publish(index, absTime=i / 30.)
+        # every frame is kept, the pool grows when it runs out of buffers
+        assert pool.nBuffers == 3
+        assert pool.framesWaiting == 3
+
+        frames = [pool.getNext() for _ in range(3)]
+        assert pool.getNext() is None
+        assert [absTime for _, absTime, _ in frames] == [0., 1 / 30., 2 / 30.]
+        assert [pool.getBuffer(index)[0] for index, _, _ in frames] == [0, 1, 2]
+
+        # released buffers are reused without allocating
+        pool.release(frames[0][0])
+        assert pool.acquire() == frames[0][0]
+        pool.clear()
+        assert pool.framesPublished == 0
+        assert pool.nBuffers == 3
+
+    def test_latest_only(self):
+        pool = FramePool((4, 2), nBuffers=3, latestOnly=True)
+        buffers = {id(pool.getBuffer(i)) for i in range(3)}
+        for i in range(10):
+            index = pool.acquire()
+            pool.getBuffer(index)[:] = i
+            pool.publish(index, absTime=i)
+        assert pool.framesWaiting == 1
+        assert pool.framesDropped == 9
+        assert pool.framesPublished == 10
+
+        index, absTime, _ = pool.getLatest()
+        assert absTime == 9 and pool.getBuffer(index)[0] == 9
+        assert pool.getLatest() is None
+
+        # the ring never grows, the frame taken last is released on the next
+        # call
+        for i in range(10, 20):
+            newIndex = pool.acquire()
+            assert newIndex != index
+            pool.publish(newIndex, absTime=i)
+            index = pool.getLatest()[0]
+        assert pool.nBuffers == 3
+        assert {id(pool.getBuffer(i)) for i in range(3)} == buffers
+
+    def test_max_buffers(self):
+        pool = FramePool((4, 2), nBuffers=2, maxBuffers=3)
+        indices = [pool.acquire() for _ in range(3)]
+        # full, the next frame is dropped
+        assert pool.acquire() is None
+        assert pool.framesDropped == 1
+        assert pool.nBuffers == 3
+        for index in indices:
+            pool.publish(index)
+        frame = pool.getNext()
+        pool.release(frame[0])
+        assert pool.acquire() == frame[0]
+
+        with pytest.raises(ValueError):
+            FramePool((4, 2), policyWhenFull='roll')
+        # by default, the pool grows to a fixed amount of memory
+        pool = FramePool((1920, 1080))
+        assert pool.maxBuffers == movietools.DEFAULT_FRAME_POOL_BYTES // (
+            1920 * 1080 * 3)
+
+    def test_max_buffers_grow(self, monkeypatch):
+        warnings = []
+        monkeypatch.setattr(movietools.logging, 'warning', warnings.append)
+        # like a recording, every frame is held until the recording is saved
+        pool = FramePool((4, 2), nBuffers=2, maxBuffers=3,
+                         policyWhenFull='grow')
+        for i in range(10):
+            index = pool.acquire()
+            assert index is not None
+            pool.getBuffer(index)[:] = i
+            pool.publish(index)
+            assert pool.getNext()[0] == index
+        assert pool.framesDropped == 0
+        assert pool.framesPublished == 10
+        assert pool.nBuffers == 10
+        assert [pool.getBuffer(i)[0] for i in range(10)] == list(range(10))
+        # warned once on growing past the cap
+        assert len(warnings) == 1
+
+        # dropping frames is warned about too
+        warnings.clear()
+        pool = FramePool((4, 2), nBuffers=2, maxBuffers=2)
+        for _ in range(2):
+            pool.publish(pool.acquire())
+        assert pool.acquire() is None and pool.acquire() is None
+        assert pool.framesDropped == 2
+        assert len(warnings) == 1
+
+    def test_max_buffers_block(self):
+        pool = FramePool((4, 2), nBuffers=2, maxBuffers=2,
+                         policyWhenFull='block')
+        for _ in range(2):
+            pool.publish(pool.acquire())
+        assert pool.acquire(timeout=0.01) is None
+        assert pool.framesDropped == 1
+
+        # waits until a consumer releases a frame
+        index = pool.getNext()[0]
+        releaser = threading.Timer(0.05, pool.release, args=(index,))
+        releaser.start()
+        assert pool.acquire() == index
+        releaser.join()
+
+    def test_resize(self):
+        pool = FramePool((4, 2), nBuffers=3)
+        index = pool.acquire()
+        pool.getBuffer(index)[:] = 7
+        pool.publish(index)
+        held = pool.getNext()[0]
+        waiting = pool.acquire()
+        pool.getBuffer(waiting)[:] = 8
+        pool.publish(waiting)
+
+        # frames taken or waiting are kept at their size until released
+        pool.resize((8, 2))
+        assert pool.bufferSize == 48
+        assert np.all(pool.getBuffer(held) == 7)
+        assert pool.getBuffer(held).nbytes == 24
+        index, _, _ = pool.getNext()
+        assert index == waiting and np.all(pool.getBuffer(index) == 8)
+        pool.release(held)
+        pool.release(waiting)
+        # every buffer has the new size once reused
+        indices = [pool.acquire() for _ in range(3)]
+        assert sorted(indices) == [0, 1, 2]
+        assert all(pool.getBuffer(i).nbytes == 48 for i in indices)
+
+    def test_threaded(self):
+        pool = FramePool((8, 8), nBuffers=4, latestOnly=True)
+        nFrames = 2000
+
+        def _produce():
+            for i in range(nFrames):
+                index = pool.acquire()
+                pool.getBuffer(index)[:] = i % 256
+                pool.publish(index, absTime=i)
+
+        producer = threading.Thread(target=_produce)
+        producer.start()
+        lastTime = -1
+        while producer.is_alive() or pool.framesWaiting:
+            frame = pool.getLatest()
+            if frame is None:
+                continue
+            index, absTime, _ = frame
+            assert absTime > lastTime  # frames arrive in order
+            # the frame is never overwritten while held
+            assert np.all(pool.getBuffer(index) == absTime % 256)
+            lastTime = absTime
+        producer.join()
+        assert lastTime == nFrames - 1
+        assert pool.nBuffers == 4
+
+
+def _probeStreams(ffmpeg, filename):
+    """Get the descriptions of the streams in a movie file."""
+    result = subprocess.run(
+        [ffmpeg, '-hide_banner', '-i', filename],
+        stdout=subprocess.PIPE, stderr=subprocess.STDOUT)
+    return [line.split(': ', 2)[-1]
+            for line in result.stdout.decode().splitlines()
+            if line.strip().startswith('Stream #')]
+
+
+@pytest.mark.parametrize("useThreads", [True, False])
+def test_muxAudioToMovie(tmp_path, useThreads):
+    ffmpeg = _getFFmpegExecutable()
+    if ffmpeg is None:
+        pytest.skip("FFmpeg is not available")
+    sf = pytest.importorskip("soundfile")
+
+    videoFile = str(tmp_path / 'video.mp4')
+    audioFile = str(tmp_path / 'audio.wav')
+    outputFile = str(tmp_path / 'output.mp4')
+    subprocess.run(
+        [ffmpeg, '-loglevel', 'error', '-f', 'lavfi',
+         '-i', 'testsrc=duration=1:size=64x48:rate=10',
+         '-c:v', 'mpeg4', videoFile],
+        check=True)
+    t = np.arange(48000) / 48000.
+    sf.write(audioFile, 0.5 * np.sin(2 * np.pi * 440 * t), 48000)
+
+    muxThread = muxAudioToMovie(
+        outputFile, videoFile, audioFile, useThreads=useThreads,
+        removeFiles=True)
+    if useThreads:
+        muxThread.join()
+    else:
+        assert muxThread is None
+
+    video, audio = _probeStreams(ffmpeg, outputFile)
+    assert video.startswith('mpeg4')  # copied, not encoded again
+    assert audio.startswith('aac')
+    assert not os.path.exists(videoFile) and not os.path.exists(audioFile)
+
+
+def test_muxAudioToMovie_failure(tmp_path):
+    if _getFFmpegExecutable() is None:
+        pytest.skip("FFmpeg is not available")
+    videoFile = tmp_path / 'video.mp4'
+    videoFile.write_bytes(b'not a movie')
+    with pytest.raises(RuntimeError):
+        muxAudioToMovie(
+            str(tmp_path / 'output.mp4'), str(videoFile),
+            str(tmp_path / 'missing.wav'), useThreads=False, removeFiles=True)
+    assert videoFile.exists()  # inputs are kept when combining fails
+
+
+class TestMovieFileWriter:
+    def test_policy(self):
+        writer = MovieFileWriter('movie.mp4', (64, 48), 30, maxQueueSize=4,
+                                 policyWhenFull='drop')
+        assert writer.maxQueueSize == 4 and writer.policyWhenFull == 'drop'
+        assert writer.getMetrics() == {
+            'encodeRate': 0.0, 'framesWaiting': 0, 'framesOut': 0,
+            'framesDropped': 0, 'bytesOut': 0}
+        with pytest.raises(ValueError):
+            MovieFileWriter('movie.mp4', (64, 48), 30, policyWhenFull='roll')
+
+    @pytest.mark.parametrize("useProcess", [False, True])
+    @pytest.mark.parametrize("policyWhenFull", ["block", "drop"])
+    def test_write(self, tmp_path, useProcess, policyWhenFull):
+        pytest.importorskip("ffpyplayer")
+        writer = MovieFileWriter(
+            str(tmp_path / 'movie.mp4'), (64, 48), 30, useProcess=useProcess,
+            maxQueueSize=2, policyWhenFull=policyWhenFull)
+        writer.open()
+        added = 0
+        for i in range(60):
+            frame = np.full((48, 64, 3), i * 4, dtype=np.uint8)
+            if writer.addFrame(frame) is not None:
+                added += 1
+            assert writer.framesWaiting <= 2  # memory stays bounded
+        writer.close()
+
+        assert not writer.isOpen
+        assert writer.framesOut == added
+        assert writer.framesDropped == 60 - added
+        if policyWhenFull == 'block':
+            assert added == 60
+        assert writer.bytesOut > 0
+        assert writer.encodeRate > 0.0
+        assert os.path.getsize(str(tmp_path / 'movie.mp4')) > 0
+
+    def test_slowEncoder(self, monkeypatch):
+        # a camera in liveEncode mode adds frames as fast as they are captured,
+        # the queue must not grow when the encoder can't keep up
+        def _openSlowEncoder(writer):
+            def _encode():
+                while True:
+                    frame = writer._frameQueue.get()
+                    if frame is None:
+                        break
+                    time.sleep(0.01)
+                    with writer._dataLock:
+                        writer._framesOut += 1
+            writer._writerThread = threading.Thread(target=_encode)
+            writer._writerThread.start()
+
+        monkeypatch.setattr(MovieFileWriter, '_openOpenCV', _openSlowEncoder)
+        pool = FramePool((64, 48))
+        nBuffers = pool.nBuffers
+        writer = MovieFileWriter('movie.mp4', (64, 48), 30,
+                                 encoderLib='opencv', maxQueueSize=4,
+                                 policyWhenFull='drop')
+        writer.open()
+        try:
+            added = 0
+            for i in range(200):
+                index = pool.acquire()
+                pool.getBuffer(index)[:] = i % 256
+                pool.publish(index)
+                index, _, _ = pool.getNext()
+                if writer.addFrame(pool.getBuffer(index)) is not None:
+                    added += 1
+                pool.release(index)  # the writer keeps a copy
+                assert writer.framesWaiting <= 4
+        finally:
+            writer.close()
+        assert writer.framesOut == added
+        assert writer.framesDropped == 200 - added > 0
+        assert pool.nBuffers == nBuffers  # the pool didn't grow either
+
+    def test_convertPoolBuffer(self):
+        # cameras pass the flat buffers of their frame pool to the writer
+        pool = FramePool((64, 48))
+        index = pool.acquire()
+        frame = np.random.randint(0, 255, (48, 64, 3), dtype=np.uint8)
+        pool.getBuffer(index)[:] = frame.reshape(-1)
+        writer = MovieFileWriter('movie.mp4', (64, 48), 30,
+                                 encoderLib='opencv')
+        image = writer._convertImage(pool.getBuffer(index))
+        assert np.array_equal(image, frame)
+        # the writer keeps a copy, the buffer can be reused
+        pool.getBuffer(index)[:] = 0
+        assert np.array_equal(image, frame)
+
+    @pytest.mark.parametrize("encoderLib", ["ffpyplayer", "opencv"])
+    def test_writePoolBuffers(self, tmp_path, encoderLib):
+        pytest.importorskip({'ffpyplayer': 'ffpyplayer', 'opencv': 'cv2'}[
+            encoderLib])
+        pool = FramePool((64, 48))
+        writer = MovieFileWriter(str(tmp_path / 'movie.mp4'), (64, 48), 30,
+                                 encoderLib=encoderLib)
+        writer.open()
+        for i in range(30):
+            index = pool.acquire()
+            pool.getBuffer(index)[:] = i * 8
+            writer.addFrame(pool.getBuffer(index))
+            pool.release(index)
+        writer.close()
+        assert writer.framesOut == 30
+        assert os.path.getsize(str(tmp_path / 'movie.mp4')) > 0
+
+
+class TestMovieSeekIndex:
+    def test_lookup(self):
+        seekIndex = MovieSeekIndex([0.08, 0., 0.04, 0.12], [0., 0.08])
+        assert seekIndex.nFrames == 4
+        assert list(seekIndex.framePts) == [0., 0.04, 0.08, 0.12]
+        assert seekIndex.frameIndexAt(0.05) == 1
+        assert seekIndex.frameIndexAt(0.04 - 1e-9) == 1  # rounding
+        assert seekIndex.frameIndexAt(-1.) == 0
+        assert seekIndex.framePtsAt(0.5) == 0.12
+        assert seekIndex.keyframePtsAt(0.05) == 0.
+        assert seekIndex.keyframePtsAt(0.1) == 0.08
+
+    def test_build(self, tmp_path, monkeypatch):
+        ffmpeg = _getFFmpegExecutable()
+        if ffmpeg is None:
+            pytest.skip("FFmpeg is not available")
+        movieFile = str(tmp_path / 'movie.mp4')
+        subprocess.run(
+            [ffmpeg, '-loglevel', 'error', '-f', 'lavfi',
+             '-i', 'testsrc=duration=2:size=64x48:rate=25',
+             '-c:v', 'mpeg4', '-g', '10', movieFile],
+            check=True)
+
+        seekIndex = MovieSeekIndex.build(movieFile)
+        assert seekIndex.nFrames == 50
+        assert np.allclose(seekIndex.framePts, np.arange(50) / 25.)
+        assert np.allclose(seekIndex.keyframePts, np.arange(0, 50, 10) / 25.)
+        assert seekIndex.framePtsAt(1.03) == pytest.approx(1.0)
+        assert seekIndex.keyframePtsAt(1.5) == pytest.approx(1.2)
+
+        # indexes are cached in memory and on disk
+        from psychopy import prefs
+        monkeypatch.setitem(prefs.paths, 'userCacheDir', str(tmp_path))
+        monkeypatch.setattr(movietools, '_movieSeekIndexes', {})
+        cached = getMovieSeekIndex(movieFile)
+        assert getMovieSeekIndex(movieFile) is cached
+        assert len(os.listdir(str(tmp_path / 'movieIndex'))) == 1
+        movietools._movieSeekIndexes.clear()
+        monkeypatch.setattr(MovieSeekIndex, 'build', None)  # must not scan
+        assert np.array_equal(
+            getMovieSeekIndex(movieFile).framePts, seekIndex.framePts)
+
+    def test_build_failure(self, tmp_path):
+        if _getFFmpegExecutable() is None:
+            pytest.skip("FFmpeg is not available")
+        movieFile = tmp_path / 'movie.mp4'
+        movieFile.write_bytes(b'not a movie')
+        with pytest.raises(RuntimeError):
+            MovieSeekIndex.build(str(movieFile))
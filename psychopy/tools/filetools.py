@@ -15,7 +15,6 @@ import atexit
 import codecs
 import numpy as np
 import json
-import json_tricks
 
 try:
     import cPickle as pickle
@@ -139,6 +138,8 @@ def fromFile(filename, encoding='utf-8-sig'):
         return contents
     elif filename.endswith('.json'):
         with codecs.open(filename, 'r', encoding=encoding) as f:
+            # json_tricks imports pandas, so only import it when needed
+            import json_tricks
             contents = json_tricks.load(f)
 
         # Restore RNG if we load a TrialHandler2 object.
@@ -0,0 +1,178 @@
+#!/usr/bin/env python
+# -*- coding: utf-8 -*-
+
+# Part of the PsychoPy library
+# Copyright (C) 2002-2018 Jonathan Peirce (C) 2019-2024 Open Science Tools Ltd.
+# Distributed under the terms of the GNU General Public License (GPL).
+
+"""Tools for importing modules and their contents when they are first used.
+
+`lazyImport` takes the same import statements as
+:func:`psychopy.contrib.lazy_import.lazy_import`, but instead of putting proxy
+objects in the module namespace, it gives the module a `__getattr__` function
+(PEP 562) which imports each name the first time it is asked for. The names
+then refer to the real objects, so they can be subclassed and used with
+`isinstance`.
+
+Note that only access from outside the module is lazy, code within the module
+itself must import the names it uses.
+"""
+
+__all__ = [
+    'lazyImport',
+    'parseImports',
+    'UnavailableAttribute'
+]
+
+import importlib
+import importlib.util
+
+from psychopy.contrib.lazy_import import ImportProcessor
+
+
+class UnavailableAttribute:
+    """Stands in for a lazily imported name which could not be imported,
+    raising the import error when it is used.
+
+    Parameters
+    ----------
+    name : str
+        Name which could not be imported.
+    error : Exception
+        Error raised when importing it.
+
+    """
+    def __init__(self, name, error):
+        self._name = name
+        self._error = error
+
+    def __repr__(self):
+        return "<unavailable {!r}: {}>".format(self._name, self._error)
+
+    def __call__(self, *args, **kwargs):
+        raise self._error
+
+    def __getattr__(self, attr):
+        if attr.startswith('__'):
+            raise AttributeError(attr)
+        raise self._error
+
+
+def parseImports(text):
+    """Parse import statements into the names they define.
+
+    Parameters
+    ----------
+    text : str
+        Import statements, e.g. `'from psychopy.visual.dot import DotStim'`.
+
+    Returns
+    -------
+    dict
+        Names mapped to a tuple of module path (list of str), member (`None`
+        if the name is a module) and children (modules imported within it,
+        mapped in the same way).
+
+    """
+    processor = ImportProcessor()
+    processor._build_map(text)
+
+    return processor.imports
+
+
+def _resolve(path, member, children):
+    """Import what a name parsed by `parseImports` refers to."""
+    module = importlib.import_module('.'.join(path))
+    for child in children.values():
+        _resolve(*child)
+    if member is None:
+        return module
+
+    attrs = vars(module)
+    if member in attrs:
+        return attrs[member]
+    # `from package import submodule`, the package may be lazy itself
+    subName = '.'.join(path + [member])
+    try:
+        spec = importlib.util.find_spec(subName)
+    except (ImportError, ValueError):
+        spec = None
+    if spec is not None:
+        return importlib.import_module(subName)
+
+    return getattr(module, member)
+
+
+def lazyImport(scope, text):
+    """Import names into a module when they are first used.
+
+    This is used like :func:`psychopy.contrib.lazy_import.lazy_import`::
+
+        from psychopy.tools.lazytools import lazyImport
+        lazyImport(globals(), '''
+        from psychopy.visual.dot import DotStim
+        ''')
+
+    after which `psychopy.visual.DotStim` imports the `dot` module the first
+    time it's used. Submodules of a package are also imported when they are
+    first used as an attribute of it. Names which cannot be imported refer to
+    an :class:`UnavailableAttribute`, raising the error when they are used.
+
+    Parameters
+    ----------
+    scope : dict
+        Namespace of the module (i.e. `globals()`).
+    text : str
+        Import statements.
+
+    Returns
+    -------
+    list
+        The names which are imported lazily.
+
+    """
+    imports = parseImports(text)
+    moduleName = scope['__name__']
+    isPackage = scope.get('__path__') is not None
+    # keep any previous __getattr__ (e.g. from an earlier call)
+    nextGetattr = scope.get('__getattr__')
+
+    def __getattr__(name):
+        if name in imports:
+            try:
+                value = _resolve(*imports[name])
+            except Exception as err:
+                from psychopy import logging
+                logging.debug("Could not import {} into {}: {}".format(
+                    name, moduleName, err))
+                value = UnavailableAttribute(name, err)
+            scope[name] = value
+
+            return value
+
+        if isPackage and not name.startswith('__'):
+            # submodules are imported when they are first used
+            subName = moduleName + '.' + name
+            try:
+                spec = importlib.util.find_spec(subName)
+            except (ImportError, ValueError):
+                spec = None
+            if spec is not None:
+                return importlib.import_module(subName)
+
+        if nextGetattr is not None:
+            return nextGetattr(name)
+        raise AttributeError(
+            "module {!r} has no attribute {!r}".format(moduleName, name))
+
+    def __dir__():
+        return sorted(set(scope) | set(imports))
+
+    scope['__getattr__'] = __getattr__
+    scope['__dir__'] = __dir__
+
+    return list(imports)
+
+
+if __name__ == "__main__":
+    pass
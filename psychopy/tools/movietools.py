@@ -8,9 +8,13 @@
 # Distributed under the terms of the GNU General Public License (GPL).
 
 __all__ = [
+    'FramePool',
     'MovieFileWriter',
     'closeAllMovieWriters',
     'addAudioToMovie',
+    'muxAudioToMovie',
+    'MovieSeekIndex',
+    'getMovieSeekIndex',
     'MOVIE_WRITER_FFPYPLAYER',
     'MOVIE_WRITER_OPENCV',
     'MOVIE_WRITER_NULL',
@@ -18,10 +22,15 @@ __all__ = [
 ]
 
 import os
+import shutil
+import subprocess
 import time
 import threading
 import queue
 import atexit
+import multiprocessing
+import hashlib
+from collections import deque
 import numpy as np
 import psychopy.logging as logging
 
@@ -30,6 +39,15 @@ MOVIE_WRITER_FFPYPLAYER = u'ffpyplayer'
 MOVIE_WRITER_OPENCV = u'opencv'
 MOVIE_WRITER_NULL = u'null'   # use prefs for default
 
+# number of frames shared with an encoder process if `maxQueueSize` is not set
+DEFAULT_PROCESS_QUEUE_SIZE = 16
+
+# number of recently encoded frames the encode rate is computed over
+ENCODE_RATE_WINDOW = 30
+
+# memory (bytes) frame pools may grow to if `maxBuffers` is not set
+DEFAULT_FRAME_POOL_BYTES = 2 * 1024 ** 3
+
 # Common video resolutions in pixels (width, height). Users should be able to
 # pass any of these strings to fields that require a video resolution. Setters
 # should uppercase the string before comparing it to the keys in this dict.
@@ -60,6 +78,354 @@ VIDEO_RESOLUTIONS = {
 _openMovieWriters = set()
 
 
+class FramePool:
+    """Preallocated frame buffers shared by a capture thread and the threads
+    consuming its frames.
+
+    A producer (e.g., a camera capture thread) calls `acquire()` to get a free
+    buffer, writes the frame into the array from `getBuffer()` and hands it
+    over with `publish()`. Consumers take published frames with `getNext()` or
+    `getLatest()` and give buffers back with `release()` once they are done
+    with them. No memory is allocated while frames are passed around, so the
+    pool avoids churning the allocator and garbage collector at high frame
+    rates and resolutions.
+
+    In 'latest frame only' mode, the pool is a fixed ring of buffers. Frames
+    which have not been taken when a newer one is published are dropped and
+    their buffers reused without copying, and the frame returned by
+    `getLatest()` is released on the next call. Otherwise, every frame is
+    kept until released and the pool allocates more buffers if it runs out,
+    which is needed when recording, up to `maxBuffers`. Once that many
+    buffers are in use, `policyWhenFull` decides whether `acquire()` waits
+    for a buffer to be released, drops the new frame or keeps allocating
+    buffers. A warning is logged the first time a frame is dropped or the
+    pool grows past `maxBuffers`.
+
+    Parameters
+    ----------
+    frameSize : ArrayLike
+        Size of frames (width, height) in pixels.
+    nBuffers : int
+        Number of buffers to preallocate.
+    channels : int
+        Number of bytes per pixel, 3 for RGB.
+    latestOnly : bool
+        Keep only the most recent frame, dropping others.
+    maxBuffers : int or None
+        Maximum number of buffers the pool may grow to. If `None`, as many as
+        fit in `DEFAULT_FRAME_POOL_BYTES`.
+    policyWhenFull : str
+        What `acquire()` does when all `maxBuffers` buffers are in use, either
+        'drop' (return `None`, dropping the frame), 'block' (wait for a
+        buffer to be released) or 'grow' (allocate another buffer, so no
+        frames are dropped).
+
+    Examples
+    --------
+    Pass frames from a capture thread::
+
+        pool = FramePool((1920, 1080), latestOnly=True)
+
+        # in the capture thread
+        index = pool.acquire()
+        pool.getBuffer(index)[:] = frameData
+        pool.publish(index, absTime=pts)
+
+        # in the main thread
+        frame = pool.getLatest()
+        if frame is not None:
+            index, absTime, metadata = frame
+            colorData = pool.getBuffer(index)
+
+    """
+    def __init__(self, frameSize, nBuffers=8, channels=3, latestOnly=False,
+                 maxBuffers=None, policyWhenFull='drop'):
+        if policyWhenFull not in ('block', 'drop', 'grow'):
+            raise ValueError(
+                "Invalid value for `policyWhenFull`, expected 'block', 'drop' "
+                "or 'grow'.")
+        self._lock = threading.Lock()
+        self._released = threading.Condition(self._lock)
+        self._channels = int(channels)
+        self._latestOnly = bool(latestOnly)
+        self._nInitial = max(int(nBuffers), 2)
+        self._maxBuffers = maxBuffers
+        self._policyWhenFull = policyWhenFull
+        self._buffers = []
+        self._free = deque()
+        self._ready = deque()  # published (index, absTime, metadata)
+        self._held = set()  # indices taken by consumers
+        self._stale = set()  # indices of buffers of the size before `resize`
+        self._lastTaken = None  # frame released by the next `getLatest()`
+        self._framesDropped = 0
+        self._framesPublished = 0
+        self._warnedFull = False  # warned about dropping or growing past cap
+        self._setFrameSize(frameSize)
+        self._buffers = [self._newBuffer() for _ in range(self._nInitial)]
+        self._free = deque(range(self._nInitial))
+
+    def _setFrameSize(self, frameSize):
+        self._frameSize = (int(frameSize[0]), int(frameSize[1]))
+        self._bufferSize = \
+            self._frameSize[0] * self._frameSize[1] * self._channels
+
+    def _newBuffer(self):
+        return np.empty((self._bufferSize,), dtype=np.uint8)
+
+    def _recycle(self, index):
+        """Buffer to reuse, reallocated if it was made for the size before
+        the last `resize()`."""
+        if index in self._stale:
+            self._stale.discard(index)
+            self._buffers[index] = self._newBuffer()
+        return index
+
+    def _putFree(self, index):
+        """Return a buffer to the free list, waking a blocked `acquire()`."""
+        self._free.append(self._recycle(index))
+        self._released.notify()
+
+    @property
+    def frameSize(self):
+        """Size of frames (width, height) in pixels (`tuple`)."""
+        return self._frameSize
+
+    @property
+    def bufferSize(self):
+        """Size of each buffer in bytes (`int`)."""
+        return self._bufferSize
+
+    @property
+    def nBuffers(self):
+        """Number of buffers allocated (`int`)."""
+        return len(self._buffers)
+
+    @property
+    def latestOnly(self):
+        """`True` if only the most recent frame is kept (`bool`)."""
+        return self._latestOnly
+
+    @property
+    def maxBuffers(self):
+        """Maximum number of buffers the pool may grow to (`int`)."""
+        if self._maxBuffers is not None:
+            return max(int(self._maxBuffers), self._nInitial)
+        return max(DEFAULT_FRAME_POOL_BYTES // max(self._bufferSize, 1),
+                   self._nInitial)
+
+    @property
+    def policyWhenFull(self):
+        """What `acquire()` does when all buffers are in use, 'drop',
+        'block' or 'grow' (`str`)."""
+        return self._policyWhenFull
+
+    @property
+    def framesWaiting(self):
+        """Number of published frames not yet taken by a consumer (`int`)."""
+        with self._lock:
+            return len(self._ready)
+
+    @property
+    def framesDropped(self):
+        """Number of frames dropped since the pool was last cleared (`int`).
+        """
+        return self._framesDropped
+
+    @property
+    def framesPublished(self):
+        """Number of frames published since the pool was last cleared
+        (`int`)."""
+        return self._framesPublished
+
+    def getBuffer(self, index):
+        """Get the array of a buffer.
+
+        Parameters
+        ----------
+        index : int
+            Index of the buffer.
+
+        Returns
+        -------
+        ndarray
+            Flat array of `bufferSize` bytes. This is a view of the buffer, so
+            its contents change if the buffer is reused after being released.
+
+        """
+        return self._buffers[index]
+
+    def acquire(self, timeout=None):
+        """Get a free buffer to write a frame into.
+
+        If all buffers are in use, the oldest waiting frame is dropped in
+        'latest frame only' mode, otherwise a new buffer is allocated. Once
+        the pool has `maxBuffers` buffers, the frame is dropped, this waits
+        for a buffer to be released or another buffer is allocated, depending
+        on `policyWhenFull`.
+
+        Parameters
+        ----------
+        timeout : float or None
+            Longest time to wait for a buffer (seconds) if `policyWhenFull`
+            is 'block'. If `None`, wait until one is released.
+
+        Returns
+        -------
+        int or None
+            Index of the buffer, or `None` if the frame was dropped since no
+            buffer was free.
+
+        """
+        with self._lock:
+            while True:
+                if self._free:
+                    return self._recycle(self._free.popleft())
+                if self._latestOnly and self._ready:
+                    self._framesDropped += 1
+                    return self._recycle(self._ready.popleft()[0])
+                if len(self._buffers) < self.maxBuffers or \
+                        self._policyWhenFull == 'grow':
+                    if len(self._buffers) >= self.maxBuffers:
+                        self._warnFull(
+                            "Frame pool grew past {} buffers, frames are not "
+                            "being released.".format(self.maxBuffers))
+                    self._buffers.append(self._newBuffer())
+                    return len(self._buffers) - 1
+                if self._policyWhenFull == 'drop' or \
+                        not self._released.wait(timeout):
+                    self._framesDropped += 1
+                    self._warnFull(
+                        "Frame pool is full ({} buffers), dropping "
+                        "frames.".format(self.maxBuffers))
+                    return None
+
+    def _warnFull(self, msg):
+        """Log a warning about the pool being full, once until the pool is
+        cleared."""
+        if not self._warnedFull:
+            self._warnedFull = True
+            logging.warning(msg)
+
+    def publish(self, index, absTime=0.0, metadata=None):
+        """Hand a buffer holding a new frame over to consumers.
+
+        Parameters
+        ----------
+        index : int
+            Index of the buffer from `acquire()`.
+        absTime : float
+            Presentation time of the frame.
+        metadata : Any
+            Metadata for the frame.
+
+        """
+        with self._lock:
+            if self._latestOnly:  # drop frames nobody took
+                while self._ready:
+                    self._putFree(self._ready.popleft()[0])
+                    self._framesDropped += 1
+            self._ready.append((index, absTime, metadata))
+            self._framesPublished += 1
+
+    def getNext(self):
+        """Take the oldest waiting frame.
+
+        Returns
+        -------
+        tuple or None
+            `(index, absTime, metadata)` of the frame, or `None` if no frames
+            are waiting. Call `release(index)` when done with the frame.
+
+        """
+        with self._lock:
+            if not self._ready:
+                return None
+            frame = self._ready.popleft()
+            self._held.add(frame[0])
+            return frame
+
+    def getLatest(self):
+        """Take the most recent frame, dropping any older waiting frames.
+
+        The frame previously returned by this method is released, so its
+        buffer stays valid until the next call.
+
+        Returns
+        -------
+        tuple or None
+            `(index, absTime, metadata)` of the frame, or `None` if no new
+            frames are waiting.
+
+        """
+        with self._lock:
+            if not self._ready:
+                return None
+            while len(self._ready) > 1:
+                self._putFree(self._ready.popleft()[0])
+                self._framesDropped += 1
+            frame = self._ready.popleft()
+            if self._lastTaken is not None and self._lastTaken in self._held:
+                self._held.discard(self._lastTaken)
+                self._putFree(self._lastTaken)
+            self._held.add(frame[0])
+            self._lastTaken = frame[0]
+            return frame
+
+    def release(self, index):
+        """Return a buffer taken by a consumer to the pool.
+
+        Parameters
+        ----------
+        index : int
+            Index of the buffer.
+
+        """
+        with self._lock:
+            if index in self._held:
+                self._held.discard(index)
+                self._putFree(index)
+
+    def clear(self):
+        """Release all waiting and taken frames and reset the counters.
+
+        Buffers acquired by the producer but not yet published are left alone.
+
+        """
+        with self._lock:
+            for index in [frame[0] for frame in self._ready] + \
+                    list(self._held):
+                self._putFree(index)
+            self._ready.clear()
+            self._held.clear()
+            self._lastTaken = None
+            self._framesDropped = self._framesPublished = 0
+            self._warnedFull = False
+
+    def resize(self, frameSize):
+        """Reallocate the buffers for frames of a different size.
+
+        This should be called by the producer when the frame size of the
+        stream changes. Free buffers are reallocated straight away. Frames
+        waiting or taken by consumers are kept as they are, their buffers are
+        reallocated when they are released, and so are buffers acquired but
+        not yet published.
+
+        Parameters
+        ----------
+        frameSize : ArrayLike
+            New size of frames (width, height) in pixels.
+
+        """
+        with self._lock:
+            self._setFrameSize(frameSize)
+            free = set(self._free)
+            for index in range(len(self._buffers)):
+                if index in free:
+                    self._buffers[index] = self._newBuffer()
+                else:
+                    self._stale.add(index)
+
+
 class MovieFileWriter:
     """Create movies from a sequence of images.
 
@@ -76,6 +442,15 @@ class MovieFileWriter:
     track to the file. The :func:`addAudioToMovie` function can be used to do 
     this after the video and audio files have been saved to disk.
 
+    If frames are added faster than they can be encoded, they wait in a queue
+    which grows without limit by default. Setting `maxQueueSize` bounds the
+    memory used, and `policyWhenFull` decides whether `addFrame()` then waits
+    for the encoder or drops the frame. Use `encodeRate` and `framesWaiting` 
+    (or `getMetrics()`) to check whether the encoder keeps up. Encoding can 
+    also be done in a separate process (`useProcess=True`), which receives
+    frames through shared memory, so it does not compete with the main thread
+    for the Python interpreter.
+
     Parameters
     ----------
     filename : str
@@ -105,6 +480,19 @@ class MovieFileWriter:
         to control the quality of the movie, for example. The options depend on
         the `encoderLib` in use. If `None`, the writer will use the default
         options for the backend.
+    useProcess : bool
+        Encode frames in a separate process instead of a thread. Frames are
+        copied into shared memory by `addFrame()`, so only NumPy arrays and
+        images in `pixelFormat` can be added. Default is `False`.
+    maxQueueSize : int
+        Maximum number of frames waiting to be encoded. If 0, the queue is
+        unbounded when encoding in a thread, and `DEFAULT_PROCESS_QUEUE_SIZE`
+        frames are shared with an encoder process. Default is 0.
+    policyWhenFull : str
+        What `addFrame()` does when `maxQueueSize` frames are waiting. Either
+        'block' to wait until the encoder has taken a frame, or 'drop' to
+        discard the new frame, which is counted in `framesDropped`. Default is
+        'block'.
 
     Examples
     --------
@@ -156,6 +544,20 @@ class MovieFileWriter:
             fps=30,
             encoderLib='opencv',
             encoderOpts=cvOpts)
+
+    Recording a long screen capture in bounded memory, encoding in another 
+    process and dropping frames rather than falling behind::
+
+        writer = movietools.MovieFileWriter(
+            filename='myMovie.mp4', 
+            size=win.size, 
+            fps=60,
+            useProcess=True,
+            maxQueueSize=30,
+            policyWhenFull='drop')
+        writer.open()
+        ...
+        print(writer.getMetrics())  # check how the encoder is doing
         
     """
     # supported pixel formats as constants
@@ -163,14 +565,33 @@ class MovieFileWriter:
     PIXEL_FORMAT_RGBA32 = 'rgb32'
 
     def __init__(self, filename, size, fps, codec=None, pixelFormat='rgb24',
-                 encoderLib='ffpyplayer', encoderOpts=None):
+                 encoderLib='ffpyplayer', encoderOpts=None, useProcess=False,
+                 maxQueueSize=0, policyWhenFull='block'):
         
+        if policyWhenFull not in ('block', 'drop'):
+            raise ValueError(
+                "Invalid value for `policyWhenFull`, expected 'block' or "
+                "'drop'.")
+        self._policyWhenFull = policyWhenFull
+        self._maxQueueSize = max(int(maxQueueSize), 0)
+        self._useProcess = bool(useProcess)
+
         # objects needed to build up the asynchronous movie writer interface
         self._writerThread = None  # thread for writing the movie file
-        self._frameQueue = queue.Queue()  # queue for frames to be written
+        # queue for frames to be written
+        self._frameQueue = queue.Queue(self._maxQueueSize)
         self._dataLock = threading.Lock()  # lock for accessing shared data
         self._lastVideoFile = None  # last video file we wrote to
 
+        # encoder process and the frame slots it shares with us, see
+        # `_openProcess()`
+        self._writerProcess = None
+        self._sharedFrames = None  # `SharedMemory` holding the slots
+        self._frameSlots = None  # array view of the slots
+        self._freeSlots = []
+        self._sendQueue = None  # (slot, pts) to the process
+        self._doneQueue = None  # messages from the process
+
         # set the file name
         self._filename = None
         self._absPath = None  # use for generating a hash of the filename
@@ -203,6 +624,9 @@ class MovieFileWriter:
         self._pts = 0.0  # most recent presentation timestamp
         self._bytesOut = 0
         self._framesOut = 0
+        self._framesSent = 0  # frames passed to an encoder process
+        self._framesDropped = 0
+        self._encodeTimes = deque(maxlen=ENCODE_RATE_WINDOW)
 
     def __hash__(self):
         """Use the absolute file path as the hash value since we only allow one 
@@ -394,6 +818,26 @@ class MovieFileWriter:
         """
         return self._lastVideoFile
     
+    @property
+    def useProcess(self):
+        """`True` if frames are encoded in a separate process (`bool`).
+        """
+        return self._useProcess
+
+    @property
+    def maxQueueSize(self):
+        """Maximum number of frames waiting to be encoded, 0 if unbounded 
+        (`int`).
+        """
+        return self._maxQueueSize
+
+    @property
+    def policyWhenFull(self):
+        """What `addFrame()` does when the queue is full, either 'block' or 
+        'drop' (`str`).
+        """
+        return self._policyWhenFull
+
     @property
     def isOpen(self):
         """Whether the movie file is open (`bool`).
@@ -402,6 +846,9 @@ class MovieFileWriter:
         `False`, the movie file is closed and no more frames can be added to it.
         
         """
+        if self._writerProcess is not None:
+            return self._writerProcess.is_alive()
+
         if self._writerThread is None:
             return False
         
@@ -419,6 +866,7 @@ class MovieFileWriter:
         when a new movie file is opened.
 
         """
+        self._collectEncoded()
         with self._dataLock:
             return self._framesOut
 
@@ -435,6 +883,7 @@ class MovieFileWriter:
         when a new movie file is opened.
 
         """
+        self._collectEncoded()
         with self._dataLock:
             return self._bytesOut
 
@@ -444,10 +893,64 @@ class MovieFileWriter:
 
         This value increases when you call `addFrame()` and decreases when the
         frame is written to disk. This number can be reduced to zero by calling
-        `flush()`.
+        `flush()`. If it keeps growing, the encoder is not keeping up with the
+        frames being added.
 
         """
+        if self._writerProcess is not None:
+            self._collectEncoded()
+            with self._dataLock:
+                return self._framesSent - self._framesOut
+
         return self._frameQueue.qsize()
+
+    @property
+    def framesDropped(self):
+        """Number of frames dropped because the queue was full (`int`).
+
+        Frames are only dropped if `maxQueueSize` is set and `policyWhenFull`
+        is 'drop'. This value is cleared when a new movie file is opened.
+
+        """
+        with self._dataLock:
+            return self._framesDropped
+
+    @property
+    def encodeRate(self):
+        """Number of frames the encoder can write per second (`float`).
+
+        This is computed from the time taken to encode the most recent frames,
+        excluding time spent waiting for frames. If it is lower than `fps`, 
+        frames are added faster than they are written and will pile up in the
+        queue (or be dropped). This is 0.0 if no frames have been written yet.
+
+        """
+        self._collectEncoded()
+        with self._dataLock:
+            totalTime = sum(self._encodeTimes)
+            if totalTime <= 0.0:
+                return 0.0
+            return len(self._encodeTimes) / totalTime
+
+    def getMetrics(self):
+        """Get the performance of the movie writer.
+
+        Returns
+        -------
+        dict
+            Dictionary with the encode rate in frames per second 
+            (`'encodeRate'`), the number of frames waiting to be encoded 
+            (`'framesWaiting'`), written (`'framesOut'`) and dropped 
+            (`'framesDropped'`), and the number of bytes written 
+            (`'bytesOut'`).
+
+        """
+        return {
+            'encodeRate': self.encodeRate,
+            'framesWaiting': self.framesWaiting,
+            'framesOut': self.framesOut,
+            'framesDropped': self.framesDropped,
+            'bytesOut': self.bytesOut}
     
     @property
     def totalFrames(self):
@@ -542,6 +1045,7 @@ class MovieFileWriter:
 
                 # get the frame data
                 colorData, pts = frame
+                encodeStart = time.perf_counter()
                 
                 # do color conversion
                 frameWidth, frameHeight = colorData.get_size()
@@ -560,6 +1064,8 @@ class MovieFileWriter:
                 with dataLock:
                     self._bytesOut += bytesOut
                     self._framesOut += 1
+                    self._encodeTimes.append(
+                        time.perf_counter() - encodeStart)
 
             writer.close()
 
@@ -643,6 +1149,7 @@ class MovieFileWriter:
                     break
 
                 colorData, _ = frame  # get the frame data
+                encodeStart = time.perf_counter()
                 
                 # Resize and color conversion, this puts the data in the correct 
                 # format for OpenCV's frame writer
@@ -660,6 +1167,8 @@ class MovieFileWriter:
                 with dataLock:
                     self._bytesOut = bytesOut
                     self._framesOut += 1
+                    self._encodeTimes.append(
+                        time.perf_counter() - encodeStart)
 
             writer.release()
 
@@ -710,11 +1219,134 @@ class MovieFileWriter:
         self._syncBarrier.wait()  # wait for the thread to start
         logging.debug("Movie writer thread started.")
         
+    @property
+    def _frameChannels(self):
+        """Number of color channels of frames in `pixelFormat`."""
+        return 3 if self._pixelFormat == self.PIXEL_FORMAT_RGB24 else 4
+
+    def _openProcess(self):
+        """Open a movie writer in a separate process.
+
+        This is called by `open()` if `useProcess` is `True`. Frames are passed
+        to the process through a ring of slots in shared memory, the process
+        returns each slot once the frame in it has been encoded. This method is 
+        not intended to be called directly.
+
+        """
+        from multiprocessing import shared_memory
+
+        frameWidth, frameHeight = self._size
+        slotSize = frameWidth * frameHeight * self._frameChannels
+        nSlots = self._maxQueueSize or DEFAULT_PROCESS_QUEUE_SIZE
+
+        self._sharedFrames = shared_memory.SharedMemory(
+            create=True, size=slotSize * nSlots)
+        self._frameSlots = np.ndarray(
+            (nSlots, slotSize), dtype=np.uint8, buffer=self._sharedFrames.buf)
+        self._freeSlots = list(range(nSlots))
+
+        # spawn rather than fork, the parent may be running other threads
+        context = multiprocessing.get_context('spawn')
+        self._sendQueue = context.Queue()
+        self._doneQueue = context.Queue()
+        self._writerProcess = context.Process(
+            target=_encodeFramesInProcess,
+            args=(self._encoderLib,
+                  self._filename,
+                  self._size,
+                  self._fps,
+                  self._codec,
+                  self._pixelFormat,
+                  self._encoderOpts,
+                  self._sharedFrames.name,
+                  (nSlots, slotSize),
+                  self._sendQueue,
+                  self._doneQueue),
+            daemon=True)
+        try:
+            self._writerProcess.start()
+        except Exception:
+            self._closeProcess()
+            raise
+
+        logging.debug("Waiting for movie writer process to start...")
+        message = None
+        while message is None:  # blocks until the encoder is open
+            try:
+                message = self._doneQueue.get(timeout=0.1)
+            except queue.Empty:
+                if not self._writerProcess.is_alive():
+                    message = ('error', 'process exited')
+        if message[0] == 'error':
+            self._writerProcess.join()
+            self._closeProcess()
+            raise RuntimeError(
+                "Failed to open movie file: {}".format(message[1]))
+        logging.debug("Movie writer process started.")
+
+    def _collectEncoded(self, block=False):
+        """Process messages from the encoder process.
+
+        Slots of frames which have been encoded are returned to the free list
+        and the counters are updated.
+
+        Parameters
+        ----------
+        block : bool
+            Wait for at least one message to arrive.
+
+        Returns
+        -------
+        bool
+            `True` if the encoder process has exited.
+
+        """
+        if self._doneQueue is None:
+            return True
+
+        while True:
+            try:
+                message = self._doneQueue.get(block=block, timeout=0.1)
+            except queue.Empty:
+                if block and self._writerProcess.is_alive():
+                    continue
+                return not self._writerProcess.is_alive()
+
+            block = False  # got what we waited for, drain the rest
+            kind = message[0]
+            if kind == 'done':
+                _, slot, bytesOut, encodeTime = message
+                with self._dataLock:
+                    self._freeSlots.append(slot)
+                    self._bytesOut = bytesOut
+                    self._framesOut += 1
+                    self._encodeTimes.append(encodeTime)
+            elif kind == 'closed':
+                return True
+            elif kind == 'error':
+                logging.error(
+                    "Movie writer process for '{}' failed: {}".format(
+                        self._filename, message[1]))
+
+    def _closeProcess(self):
+        """Release the shared memory and queues of the encoder process."""
+        self._frameSlots = None
+        if self._sharedFrames is not None:
+            self._sharedFrames.close()
+            self._sharedFrames.unlink()
+            self._sharedFrames = None
+        for q in (self._sendQueue, self._doneQueue):
+            if q is not None:
+                q.close()
+        self._sendQueue = self._doneQueue = None
+        self._writerProcess = None
+        self._freeSlots = []
+
     def open(self):
         """Open the movie file for writing.
 
-        This creates a new thread that will write the movie file to disk in
-        the background.
+        This creates a new thread (or process, if `useProcess` is `True`) that 
+        will write the movie file to disk in the background.
 
         After calling this method, you can add frames to the movie using
         `addFrame()`. When you are done adding frames, call `close()` to
@@ -736,11 +1368,18 @@ class MovieFileWriter:
 
         # reset counters
         self._bytesOut = self._framesOut = 0
+        self._framesSent = self._framesDropped = 0
+        self._encodeTimes.clear()
         self._pts = 0.0
 
         # eventually we'll want to support other encoder libraries, for now
         # we're just going to hardcode the encoder libraries we support
-        if self._encoderLib == 'ffpyplayer':
+        if self._encoderLib not in ('ffpyplayer', 'opencv'):
+            raise ValueError(
+                "Unknown encoder library '{}'.".format(self._encoderLib))
+        elif self._useProcess:
+            self._openProcess()
+        elif self._encoderLib == 'ffpyplayer':
             self._openFFPyPlayer()
         elif self._encoderLib == 'opencv':
             self._openOpenCV()
@@ -764,6 +1403,13 @@ class MovieFileWriter:
         if not self.isOpen:
             raise RuntimeError('Movie writer is not open.')
 
+        if self._writerProcess is not None:
+            # block until the process has returned every slot
+            while self.framesWaiting > 0:
+                if self._collectEncoded(block=True):
+                    break  # process exited
+            return
+
         # block until the queue is empty
         nWaitingAtStart = self.framesWaiting
         while not self._frameQueue.empty():
@@ -789,13 +1435,27 @@ class MovieFileWriter:
         any time-critical code.
 
         """
-        if self._writerThread is None:
+        if self._writerThread is None and self._writerProcess is None:
             return
         
         logging.debug("Closing movie file '{}'.".format(self.filename))
 
+        if self._writerProcess is not None:
+            nWaiting = self.framesWaiting
+            if nWaiting > 0:
+                logging.warning(
+                    "File '{}' still has {} frame(s) queued to be written to "
+                    "disk, waiting to complete.".format(
+                        self.filename, nWaiting))
+            if self._writerProcess.is_alive():
+                self._sendQueue.put(None)  # signal the process to exit
+                # messages must be drained for the process to exit
+                while not self._collectEncoded(block=True):
+                    pass
+            self._writerProcess.join()
+            self._closeProcess()
         # if the writer thread is alive still, then we need to shut it down
-        if self._writerThread.is_alive():
+        elif self._writerThread.is_alive():
             self._frameQueue.put(None)  # signal the thread to exit
             # flush remaining frames, if any
             msg = ("File '{}' still has {} frame(s) queued to be written to "
@@ -864,14 +1524,59 @@ class MovieFileWriter:
                     '`MediaWriter.write_frame().')
         elif self._encoderLib == 'opencv':  # OpenCV `VideoWriter`
             if isinstance(image, np.ndarray):
-                image = image.reshape(self._size[0], self._size[1], 3)
-                return np.ascontiguousarray(image, dtype=np.uint8)
+                # rows of pixels, e.g. flat frame pool buffers
+                image = image.reshape(self._size[1], self._size[0], 3)
+                # always copy, callers may reuse the buffer once it's queued
+                return np.array(image, dtype=np.uint8, order='C')
             else:
                 raise TypeError(
                     'Unsupported `image` type for OpenCV `VideoWriter.write().')
         else:
             raise RuntimeError('Unsupported encoder library specified.')
 
+    def _sendFrame(self, image, pts):
+        """Copy a frame into a free shared memory slot and pass it to the 
+        encoder process.
+
+        Returns
+        -------
+        bool
+            `False` if the frame was dropped since no slot was free.
+
+        """
+        if isinstance(image, np.ndarray):
+            frameData = np.asarray(image, dtype=np.uint8).reshape(-1)
+        elif hasattr(image, 'to_memoryview'):  # `ffpyplayer.pic.Image`
+            if image.get_pixel_format() != self._pixelFormat:
+                raise ValueError('Invalid pixel format for `image`.')
+            frameData = np.frombuffer(image.to_memoryview()[0], dtype=np.uint8)
+        else:
+            raise TypeError(
+                'Unsupported `image` type for movie writer process.')
+
+        if frameData.size != self._frameSlots.shape[1]:
+            raise ValueError(
+                'Size of `image` does not match the size of the movie.')
+
+        self._collectEncoded()
+        if not self._freeSlots:
+            if self._policyWhenFull == 'drop':
+                with self._dataLock:
+                    self._framesDropped += 1
+                return False
+            while not self._freeSlots:  # wait for the encoder
+                if self._collectEncoded(block=True):
+                    raise RuntimeError(
+                        'Movie writer process exited unexpectedly.')
+
+        with self._dataLock:
+            slot = self._freeSlots.pop()
+            self._framesSent += 1
+        self._frameSlots[slot] = frameData
+        self._sendQueue.put((slot, pts))
+
+        return True
+
     def addFrame(self, image, pts=None):
         """Add a frame to the movie.
 
@@ -882,6 +1587,10 @@ class MovieFileWriter:
         Any color space conversion or resizing will be performed in the caller's 
         thread. This may be threaded too in the future.
 
+        If `maxQueueSize` frames are already waiting, this blocks until the 
+        encoder takes a frame, or drops the frame if `policyWhenFull` is 
+        'drop'.
+
         Parameters
         ----------
         image : numpy.ndarray or ffpyplayer.pic.Image
@@ -898,10 +1607,10 @@ class MovieFileWriter:
 
         Returns
         -------
-        float
+        float or None
             Presentation timestamp assigned to the frame. Should match the value 
             passed in as `pts` if provided, otherwise it will be the computed
-            presentation timestamp.
+            presentation timestamp. Returns `None` if the frame was dropped.
 
         """
         if not self.isOpen:
@@ -910,18 +1619,28 @@ class MovieFileWriter:
             # commence writing
             raise RuntimeError('Movie file not open for writing.')
         
-        # convert to a format for the selected writer library
-        colorData = self._convertImage(image)
-
         # get computed presentation timestamp if not provided
         pts = self._pts if pts is None else pts
 
+        # update the presentation timestamp after adding the frame, dropped
+        # frames leave a gap
+        self._pts += self._frameInterval
+
+        if self._writerProcess is not None:
+            return pts if self._sendFrame(image, pts) else None
+
+        # drop the frame before spending time converting it
+        if self._policyWhenFull == 'drop' and self._frameQueue.full():
+            with self._dataLock:
+                self._framesDropped += 1
+            return None
+
+        # convert to a format for the selected writer library
+        colorData = self._convertImage(image)
+
         # pass the image data to the writer thread
         self._frameQueue.put((colorData, pts))
 
-        # update the presentation timestamp after adding the frame
-        self._pts += self._frameInterval
-
         return pts
 
     def __del__(self):
@@ -933,6 +1652,103 @@ class MovieFileWriter:
             pass
 
 
+def _encodeFramesInProcess(encoderLib, filename, size, fps, codec, pixelFormat,
+                           encoderOpts, sharedName, slotShape, frameQueue,
+                           doneQueue):
+    """Encode frames passed through shared memory to a movie file.
+
+    This is run in a separate process by `MovieFileWriter` when `useProcess` is
+    `True`. Each item taken from `frameQueue` is a `(slot, pts)` tuple giving
+    the shared memory slot holding a frame, `None` finishes the file. Messages
+    put on `doneQueue` are `('ready',)` once the file is open, `('done', slot, 
+    bytesOut, encodeTime)` once a frame is encoded and its slot can be reused,
+    `('error', message)` and finally `('closed',)`.
+
+    """
+    from multiprocessing import shared_memory
+
+    frameWidth, frameHeight = size
+    channels = 3 if pixelFormat == MovieFileWriter.PIXEL_FORMAT_RGB24 else 4
+    encoderOpts = {} if encoderOpts is None else encoderOpts
+    bytesOut = 0
+
+    try:
+        if encoderLib == 'ffpyplayer':
+            from ffpyplayer.writer import MediaWriter
+            from ffpyplayer.pic import Image, SWScale
+
+            writerOptions = {
+                'pix_fmt_in': 'yuv420p',
+                'width_in': frameWidth,
+                'height_in': frameHeight,
+                'codec': codec,
+                'frame_rate': (int(fps), 1)}
+            writer = MediaWriter(filename, [writerOptions], libOpts=encoderOpts)
+            sws = SWScale(frameWidth, frameHeight, pixelFormat, ofmt='yuv420p')
+
+            def _writeFrame(frameData, pts):
+                image = Image(
+                    plane_buffers=[frameData.tobytes()],
+                    pix_fmt=pixelFormat,
+                    size=(frameWidth, frameHeight))
+                return bytesOut + writer.write_frame(
+                    img=sws.scale(image), pts=pts, stream=0)
+
+            _closeWriter = writer.close
+        else:
+            import cv2
+
+            writer = cv2.VideoWriter(
+                filename,
+                cv2.CAP_FFMPEG,  # use ffmpeg
+                cv2.VideoWriter_fourcc(*codec),
+                float(fps),
+                (frameWidth, frameHeight),
+                1)  # is color image?
+            quality = encoderOpts.get('VIDEOWRITER_PROP_QUALITY', None) \
+                or encoderOpts.get('quality', None)
+            if quality is not None:
+                writer.set(cv2.VIDEOWRITER_PROP_QUALITY, float(quality))
+            if not writer.isOpened():
+                raise RuntimeError("Failed to open movie file.")
+            conversion = cv2.COLOR_RGB2BGR if channels == 3 \
+                else cv2.COLOR_RGBA2BGR
+
+            def _writeFrame(frameData, pts):
+                colorData = frameData.reshape(frameHeight, frameWidth, channels)
+                writer.write(cv2.cvtColor(colorData, conversion))
+                return os.stat(filename).st_size
+
+            _closeWriter = writer.release
+
+        sharedFrames = shared_memory.SharedMemory(name=sharedName)
+    except Exception as err:  # report why the file could not be opened
+        doneQueue.put(('error', str(err)))
+        return
+
+    frameSlots = np.ndarray(slotShape, dtype=np.uint8, buffer=sharedFrames.buf)
+    doneQueue.put(('ready',))
+
+    while True:
+        frame = frameQueue.get()
+        if frame is None:
+            break
+
+        slot, pts = frame
+        encodeStart = time.perf_counter()
+        try:
+            bytesOut = _writeFrame(frameSlots[slot], pts)
+        except Exception as err:
+            doneQueue.put(('error', str(err)))
+        doneQueue.put(
+            ('done', slot, bytesOut, time.perf_counter() - encodeStart))
+
+    _closeWriter()
+    del frameSlots  # release the buffer before closing the shared memory
+    sharedFrames.close()
+    doneQueue.put(('closed',))
+
+
 def closeAllMovieWriters():
     """Signal all movie writers to close.
 
@@ -1067,5 +1883,371 @@ def addAudioToMovie(outputFile, videoFile, audioFile, useThreads=True,
     compositorThread.start()
 
 
+def _getFFmpegExecutable():
+    """Get the path to an FFmpeg executable, or `None` if there is none."""
+    try:
+        from imageio_ffmpeg import get_ffmpeg_exe
+        return get_ffmpeg_exe()
+    except (ImportError, RuntimeError):
+        return shutil.which('ffmpeg')
+
+
+def muxAudioToMovie(outputFile, videoFile, audioFile, useThreads=True,
+                    removeFiles=False, audioCodec='aac'):
+    """Combine a video file and an audio file without re-encoding the video.
+
+    Unlike :func:`addAudioToMovie`, the video track is copied as-is to 
+    `outputFile` and only the audio is encoded, which takes a fraction of the 
+    time. This is done by a separate FFmpeg process, so the work is not 
+    competing with the Python interpreter for CPU time.
+
+    Parameters
+    ----------
+    outputFile : str
+        Path to the output video file where audio and video will be merged.
+    videoFile : str
+        Path to the input video file.
+    audioFile : str
+        Path to the audio file to add to the video file.
+    useThreads : bool
+        If `True`, this function returns immediately and the files are 
+        combined in the background. The program will not exit until this is 
+        done. If `False`, this function blocks until the files are combined.
+        Defaults to `True`.
+    removeFiles : bool
+        If `True`, the input video (`videoFile`) and audio (`audioFile`) files 
+        will be removed (i.e. deleted from disk) after they have been combined. 
+        Defaults to `False`.
+    audioCodec : str
+        FFmpeg name of the codec to encode the audio track with. Defaults to 
+        `'aac'`.
+
+    Returns
+    -------
+    threading.Thread or None
+        Thread combining the files if `useThreads` is `True`, join it to wait 
+        until the output file is complete.
+
+    Examples
+    --------
+    Combine a video file and an audio file into a single video file::
+
+        from psychopy.tools.movietools import muxAudioToMovie
+        muxAudioToMovie('output.mp4', 'video.mp4', 'audio.wav')
+
+    """
+    ffmpeg = _getFFmpegExecutable()
+    if ffmpeg is None:
+        raise RuntimeError(
+            "Cannot find an FFmpeg executable to combine audio and video, "
+            "install package `imageio-ffmpeg`.")
+
+    command = [
+        ffmpeg, '-y', '-loglevel', 'error',
+        '-i', videoFile, '-i', audioFile,
+        '-map', '0:v:0', '-map', '1:a:0',
+        '-c:v', 'copy', '-c:a', audioCodec,
+        outputFile]
+
+    def _muxFiles():
+        """Run FFmpeg and clean up after it."""
+        result = subprocess.run(
+            command, stdout=subprocess.DEVNULL, stderr=subprocess.PIPE)
+        if result.returncode != 0:
+            # keep the input files so nothing is lost
+            logging.error(
+                "Failed to combine '{}' and '{}' into '{}': {}".format(
+                    videoFile, audioFile, outputFile,
+                    result.stderr.decode(errors='replace').strip()))
+            return False
+
+        if removeFiles:
+            os.remove(videoFile)
+            os.remove(audioFile)
+
+        logging.debug("Combined audio and video into '{}'.".format(outputFile))
+        return True
+
+    if not useThreads:
+        logging.debug('Combining audio and video files in main thread')
+        if not _muxFiles():
+            raise RuntimeError(
+                "Failed to combine audio and video into '{}'.".format(
+                    outputFile))
+        return None
+
+    # not a daemon thread, so the interpreter waits for the file to complete
+    logging.debug('Combining audio and video files in separate thread')
+    muxThread = threading.Thread(target=_muxFiles)
+    muxThread.start()
+
+    return muxThread
+
+
+class MovieSeekIndex:
+    """Index of the presentation timestamps (PTS) of the frames in a movie.
+
+    The index lists the PTS of every frame in the first video stream of a file
+    and which of those frames are keyframes. Players can use it to snap a seek
+    target to the exact timestamp of the frame shown at that time, so a single
+    accurate seek lands on it, and to find the keyframe decoding must start
+    from. Indexes are built by reading the packets of the file with FFmpeg
+    without decoding them, use :func:`getMovieSeekIndex` to get an index cached
+    on disk.
+
+    Parameters
+    ----------
+    framePts : ArrayLike
+        Presentation timestamps of each frame in seconds.
+    keyframePts : ArrayLike
+        Presentation timestamps of the keyframes in seconds.
+
+    """
+    def __init__(self, framePts, keyframePts):
+        self._framePts = np.unique(np.asarray(framePts, dtype=np.float64))
+        self._keyframePts = np.unique(
+            np.asarray(keyframePts, dtype=np.float64))
+
+    @classmethod
+    def build(cls, filename):
+        """Build an index by scanning a movie file.
+
+        Parameters
+        ----------
+        filename : str
+            Path to the movie file.
+
+        Returns
+        -------
+        MovieSeekIndex
+            Index of the frames in the first video stream of the file.
+
+        """
+        ffmpeg = _getFFmpegExecutable()
+        if ffmpeg is None:
+            raise RuntimeError(
+                "Cannot find an FFmpeg executable to index movies, install "
+                "package `imageio-ffmpeg`.")
+
+        # packets are copied, not decoded, so this reads the file at disk speed
+        result = subprocess.run(
+            [ffmpeg, '-hide_banner', '-loglevel', 'error', '-i', filename,
+             '-map', '0:v:0', '-c', 'copy', '-f', 'framecrc', '-'],
+            stdout=subprocess.PIPE, stderr=subprocess.PIPE)
+        if result.returncode != 0:
+            raise RuntimeError(
+                "Failed to index movie file '{}': {}".format(
+                    filename, result.stderr.decode(errors='replace').strip()))
+
+        timeBase = None
+        framePts = []
+        keyframePts = []
+        for line in result.stdout.decode(errors='replace').splitlines():
+            if line.startswith('#tb'):
+                numer, denom = line.split(':', 1)[1].strip().split('/')
+                timeBase = int(numer) / float(int(denom))
+                continue
+            elif not line or line.startswith('#'):
+                continue
+
+            # stream, dts, pts, duration, size, checksum[, flags]
+            fields = [field.strip() for field in line.split(',')]
+            pts = int(fields[2]) * timeBase
+            framePts.append(pts)
+            # the flags are omitted when they only mark a keyframe
+            flags = 1
+            if len(fields) > 6 and fields[6].startswith('F='):
+                flags = int(fields[6][2:], 16)
+            if flags & 1:
+                keyframePts.append(pts)
+
+        if not framePts:
+            raise RuntimeError(
+                "Movie file '{}' has no video frames to index.".format(
+                    filename))
+
+        return cls(framePts, keyframePts)
+
+    @classmethod
+    def load(cls, filename):
+        """Load an index previously written with :meth:`save`.
+
+        Parameters
+        ----------
+        filename : str
+            Path to the index file.
+
+        Returns
+        -------
+        MovieSeekIndex
+            Loaded index.
+
+        """
+        with np.load(filename) as data:
+            return cls(data['framePts'], data['keyframePts'])
+
+    def save(self, filename):
+        """Write the index to a file.
+
+        Parameters
+        ----------
+        filename : str
+            Path to the index file, should end with `.npz`.
+
+        """
+        np.savez(filename, framePts=self._framePts,
+                 keyframePts=self._keyframePts)
+
+    @property
+    def framePts(self):
+        """Presentation timestamps of each frame in seconds, in order
+        (`ndarray`).
+        """
+        return self._framePts
+
+    @property
+    def keyframePts(self):
+        """Presentation timestamps of the keyframes in seconds, in order
+        (`ndarray`).
+        """
+        return self._keyframePts
+
+    @property
+    def nFrames(self):
+        """Number of frames in the movie (`int`)."""
+        return len(self._framePts)
+
+    def frameIndexAt(self, pts):
+        """Get the index of the frame shown at a given time.
+
+        Parameters
+        ----------
+        pts : float
+            Movie time in seconds.
+
+        Returns
+        -------
+        int
+            Index of the last frame with a timestamp at or before `pts`, or 0
+            if `pts` is before the first frame.
+
+        """
+        # allow for rounding in timestamps computed by the caller
+        index = np.searchsorted(self._framePts, pts + 1e-6, side='right') - 1
+        return int(max(index, 0))
+
+    def framePtsAt(self, pts):
+        """Get the timestamp of the frame shown at a given time.
+
+        Parameters
+        ----------
+        pts : float
+            Movie time in seconds.
+
+        Returns
+        -------
+        float
+            Presentation timestamp of the frame in seconds.
+
+        """
+        return float(self._framePts[self.frameIndexAt(pts)])
+
+    def keyframePtsAt(self, pts):
+        """Get the timestamp of the keyframe decoding must start from to show
+        the frame at a given time.
+
+        Parameters
+        ----------
+        pts : float
+            Movie time in seconds.
+
+        Returns
+        -------
+        float
+            Presentation timestamp of the keyframe in seconds.
+
+        """
+        if not len(self._keyframePts):
+            return float(self._framePts[0])
+        index = np.searchsorted(
+            self._keyframePts, self.framePtsAt(pts), side='right') - 1
+        return float(self._keyframePts[max(index, 0)])
+
+
+# indexes loaded this session, by path
+_movieSeekIndexes = {}
+_movieSeekIndexLock = threading.Lock()
+
+
+def getMovieSeekIndex(filename, useCache=True):
+    """Get the seek index for a movie file, building it if needed.
+
+    Indexes are kept for the rest of the session and written to the user cache
+    directory, so a file is only scanned once. An index is rebuilt when its
+    file is modified.
+
+    Parameters
+    ----------
+    filename : str
+        Path to the movie file.
+    useCache : bool
+        Read and write the index from the cache directory. If `False`, the file
+        is scanned again.
+
+    Returns
+    -------
+    MovieSeekIndex
+        Index of the frames in the movie.
+
+    Examples
+    --------
+    Get the timestamp of the frame on screen 1.5 seconds into a movie::
+
+        from psychopy.tools.movietools import getMovieSeekIndex
+        pts = getMovieSeekIndex('movie.mp4').framePtsAt(1.5)
+
+    """
+    filename = os.path.abspath(filename)
+    stat = os.stat(filename)
+    key = (filename, stat.st_size, stat.st_mtime_ns)
+
+    with _movieSeekIndexLock:
+        seekIndex = _movieSeekIndexes.get(key) if useCache else None
+    if seekIndex is not None:
+        return seekIndex
+
+    cacheFile = None
+    if useCache:
+        from psychopy import prefs
+        digest = hashlib.sha1(repr(key).encode('utf-8')).hexdigest()
+        cacheFile = os.path.join(
+            prefs.paths['userCacheDir'], 'movieIndex', digest + '.npz')
+        if os.path.isfile(cacheFile):
+            try:
+                seekIndex = MovieSeekIndex.load(cacheFile)
+            except Exception:
+                # a damaged index is simply built again
+                logging.warning(
+                    "Ignoring unreadable movie index '{}'.".format(cacheFile))
+
+    if seekIndex is None:
+        seekIndex = MovieSeekIndex.build(filename)
+        logging.debug("Indexed {} frames of movie '{}'.".format(
+            seekIndex.nFrames, filename))
+        if cacheFile is not None:
+            try:
+                os.makedirs(os.path.dirname(cacheFile), exist_ok=True)
+                seekIndex.save(cacheFile)
+            except OSError as err:
+                logging.warning(
+                    "Cannot write movie index '{}': {}".format(cacheFile, err))
+
+    if useCache:
+        with _movieSeekIndexLock:
+            _movieSeekIndexes[key] = seekIndex
+
+    return seekIndex
+
+
 if __name__ == "__main__":
     pass
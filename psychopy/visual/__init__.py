@@ -25,37 +25,36 @@ if sys.platform == 'win32':
                 pass
 
 from psychopy import event  # import before visual or
-from psychopy.visual import filters
-from psychopy.visual.backends import gamma
-# absolute essentials (nearly all experiments will need these)
-from .basevisual import BaseVisualStim
-# non-private helpers
-from .helpers import pointInPolygon, polygonsOverlap
-from .image import ImageStim
-from .text import TextStim
-from .form import Form
-from .brush import Brush
-from .textbox2.textbox2 import TextBox2
-from .button import ButtonStim
-from .roi import ROI
-from .target import TargetStim
-# window, should always be loaded first
-from .window import Window, getMsPerFrame, openWindows
 
 # needed for backwards-compatibility
 
 # need absolute imports within lazyImports
 
-# A newer alternative lib is apipkg but then we have to specify all the vars
-# that will be included, not just the lazy ones? Syntax is:
-# import apipkg
-# apipkg.initpkg(__name__, {
-#        'GratingStim': "psychopy.visual.grating:GratingStim",
-# })
+# Stimuli, and the modules they need (GL backends, colours, layout, fonts), are
+# only imported when they are first used, e.g. as `visual.Window`, see
+# `psychopy.tools.lazytools.lazyImport`
 
 from psychopy.constants import STOPPED, FINISHED, PLAYING, NOT_STARTED
 
 lazyImports = """
+# window
+from psychopy.visual.window import Window, getMsPerFrame, openWindows
+from psychopy.visual import filters
+from psychopy.visual.backends import gamma
+
+# absolute essentials (nearly all experiments will need these)
+from psychopy.visual.basevisual import BaseVisualStim
+# non-private helpers
+from psychopy.visual.helpers import pointInPolygon, polygonsOverlap
+from psychopy.visual.image import ImageStim
+from psychopy.visual.text import TextStim
+from psychopy.visual.form import Form
+from psychopy.visual.brush import Brush
+from psychopy.visual.textbox2.textbox2 import TextBox2
+from psychopy.visual.button import ButtonStim
+from psychopy.visual.roi import ROI
+from psychopy.visual.target import TargetStim
+
 # stimuli derived from object or MinimalStim
 from psychopy.visual.aperture import Aperture  # uses BaseShapeStim, ImageStim
 from psychopy.visual.custommouse import CustomMouse
@@ -117,8 +116,28 @@ from psychopy.visual.stim3d import PlaneStim
 from psychopy.visual.stim3d import ObjMeshStim
 
 """
-try:
-    from psychopy.contrib.lazy_import import lazy_import
-    lazy_import(globals(), lazyImports)
-except Exception:
-    exec(lazyImports)
+from psychopy.tools.lazytools import lazyImport
+lazyImport(globals(), lazyImports)
+
+# names imported by `from psychopy.visual import *`, which imports all of them,
+# including those the star import exposed before stimuli were imported lazily
+__all__ = [
+    'sys', 'event',
+    # submodules
+    'aperture', 'backends', 'basevisual', 'brush', 'button', 'form',
+    'globalVars', 'grating', 'helpers', 'image', 'rect', 'roi', 'shaders',
+    'shape', 'target', 'text', 'textbox2', 'window',
+    # stimuli and helpers
+    'Window', 'getMsPerFrame', 'openWindows', 'filters', 'gamma',
+    'BaseVisualStim', 'pointInPolygon', 'polygonsOverlap', 'ImageStim',
+    'TextStim', 'Form', 'Brush', 'TextBox2', 'ButtonStim', 'ROI', 'TargetStim',
+    'Aperture', 'CustomMouse', 'ElementArrayStim', 'RatingScale', 'Slider',
+    'Progress', 'SimpleImageStim', 'DotStim', 'GratingStim', 'EnvelopeGrating',
+    'MovieStim', 'MovieStim2', 'MovieStim3', 'VlcMovieStim', 'BaseShapeStim',
+    'BufferImageStim', 'PatchStim', 'RadialStim', 'NoiseStim', 'ShapeStim',
+    'Line', 'Polygon', 'Rect', 'Pie', 'CheckBoxStim', 'Circle', 'TextBox',
+    'DropDownCtrl', 'Rift', 'VisualSystemHD', 'PanoramicImageStim',
+    'LightSource', 'SceneSkybox', 'BlinnPhongMaterial', 'RigidBodyPose',
+    'BoundingBox', 'SphereStim', 'BoxStim', 'PlaneStim', 'ObjMeshStim',
+    'STOPPED', 'FINISHED', 'PLAYING', 'NOT_STARTED'
+]
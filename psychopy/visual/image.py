@@ -77,6 +77,7 @@ class ImageStim(BaseVisualStim, DraggingMixin, ContainerMixin, ColorMixin,
         GL.glGenTextures(1, ctypes.byref(self._maskID))
         self._pixbuffID = GL.GLuint()
         GL.glGenBuffers(1, ctypes.byref(self._pixbuffID))
+        self._lastVideoFrame = None  # movie frame presently in the texture
         self.__dict__['maskParams'] = maskParams
         self.__dict__['mask'] = mask
         # Not pretty (redefined later) but it works!
@@ -219,8 +220,11 @@ class ImageStim(BaseVisualStim, DraggingMixin, ContainerMixin, ColorMixin,
         # recent frame and write it to the memory
         if hasattr(self.image, 'getVideoFrame'):
             videoFrame = self.image.getVideoFrame()
-            if videoFrame is not None:
+            # only upload if we got a new frame since the last draw
+            if videoFrame is not None and \
+                    videoFrame is not self._lastVideoFrame:
                 self._movieFrameToTexture(videoFrame)
+                self._lastVideoFrame = videoFrame
 
         GL.glPushMatrix()  # push before the list, pop after
         win.setScale('pix')
@@ -256,48 +260,32 @@ class ImageStim(BaseVisualStim, DraggingMixin, ContainerMixin, ColorMixin,
         vidWidth, vidHeight = movieSrc.size
         nBufferBytes = vidWidth * vidHeight * 3
 
-        # bind pixel unpack buffer
-        GL.glBindBuffer(GL.GL_PIXEL_UNPACK_BUFFER, self._pixbuffID)
-
-        # Free last storage buffer before mapping and writing new frame
-        # data. This allows the GPU to process the extant buffer in VRAM
-        # uploaded last cycle without being stalled by the CPU accessing it.
-        GL.glBufferData(
-            GL.GL_PIXEL_UNPACK_BUFFER,
-            nBufferBytes * ctypes.sizeof(GL.GLubyte),
-            None,
-            GL.GL_STREAM_DRAW)
-
-        # Map the buffer to client memory, `GL_WRITE_ONLY` to tell the
-        # driver to optimize for a one-way write operation if it can.
-        bufferPtr = GL.glMapBuffer(
-            GL.GL_PIXEL_UNPACK_BUFFER,
-            GL.GL_WRITE_ONLY)
-
-        bufferArray = numpy.ctypeslib.as_array(
-            ctypes.cast(bufferPtr, ctypes.POINTER(GL.GLubyte)),
-            shape=(nBufferBytes,))
-
-        # copy data
-        bufferArray[:] = colorData[:]
-
-        # Very important that we unmap the buffer data after copying, but
-        # keep the buffer bound for setting the texture.
-        GL.glUnmapBuffer(GL.GL_PIXEL_UNPACK_BUFFER)
+        # Frames in contiguous arrays (e.g., buffers from a camera frame pool)
+        # are uploaded straight from their memory, otherwise they are copied to
+        # a pixel buffer first.
+        isDirect = (
+            isinstance(colorData, numpy.ndarray) and
+            colorData.dtype == numpy.uint8 and
+            colorData.flags.c_contiguous and
+            colorData.nbytes == nBufferBytes)
+        if isDirect:
+            pixelData = colorData.ctypes.data_as(ctypes.POINTER(GL.GLubyte))
+        else:
+            pixelData = self._copyToPixelBuffer(colorData, nBufferBytes)
 
         # bind the texture in OpenGL
         GL.glEnable(GL.GL_TEXTURE_2D)
         GL.glActiveTexture(GL.GL_TEXTURE0)
         GL.glBindTexture(GL.GL_TEXTURE_2D, self._texID)
 
-        # copy the PBO to the texture
+        # copy the pixel data to the texture
         GL.glPixelStorei(GL.GL_UNPACK_ALIGNMENT, 1)
         GL.glTexSubImage2D(
             GL.GL_TEXTURE_2D, 0, 0, 0,
             vidWidth, vidHeight,
             GL.GL_RGB,
             GL.GL_UNSIGNED_BYTE,
-            0)  # point to the presently bound buffer
+            pixelData)
 
         # update texture filtering only if needed
         if self.interpolate:
@@ -319,6 +307,54 @@ class ImageStim(BaseVisualStim, DraggingMixin, ContainerMixin, ColorMixin,
         GL.glBindTexture(GL.GL_TEXTURE_2D, 0)
         GL.glDisable(GL.GL_TEXTURE_2D)
 
+    def _copyToPixelBuffer(self, colorData, nBufferBytes):
+        """Copy color data to the pixel unpack buffer, leaving it bound.
+
+        Parameters
+        ----------
+        colorData : ArrayLike
+            Pixel data to copy.
+        nBufferBytes : int
+            Size of the pixel data in bytes.
+
+        Returns
+        -------
+        int
+            Offset of the data in the bound buffer to pass to the texture
+            upload.
+
+        """
+        # bind pixel unpack buffer
+        GL.glBindBuffer(GL.GL_PIXEL_UNPACK_BUFFER, self._pixbuffID)
+
+        # Free last storage buffer before mapping and writing new frame
+        # data. This allows the GPU to process the extant buffer in VRAM
+        # uploaded last cycle without being stalled by the CPU accessing it.
+        GL.glBufferData(
+            GL.GL_PIXEL_UNPACK_BUFFER,
+            nBufferBytes * ctypes.sizeof(GL.GLubyte),
+            None,
+            GL.GL_STREAM_DRAW)
+
+        # Map the buffer to client memory, `GL_WRITE_ONLY` to tell the
+        # driver to optimize for a one-way write operation if it can.
+        bufferPtr = GL.glMapBuffer(
+            GL.GL_PIXEL_UNPACK_BUFFER,
+            GL.GL_WRITE_ONLY)
+
+        bufferArray = numpy.ctypeslib.as_array(
+            ctypes.cast(bufferPtr, ctypes.POINTER(GL.GLubyte)),
+            shape=(nBufferBytes,))
+
+        # copy data
+        bufferArray[:] = colorData[:]
+
+        # Very important that we unmap the buffer data after copying, but
+        # keep the buffer bound for setting the texture.
+        GL.glUnmapBuffer(GL.GL_PIXEL_UNPACK_BUFFER)
+
+        return 0  # point to the presently bound buffer
+
     @attributeSetter
     def image(self, value):
         """The image file to be presented (most formats supported).
@@ -360,6 +396,7 @@ class ImageStim(BaseVisualStim, DraggingMixin, ContainerMixin, ColorMixin,
 
         if hasattr(value, 'getVideoFrame'):  # make sure we invert vertices
             self.flipVert = True
+        self._lastVideoFrame = None  # texture needs a new frame
 
         # if we switched to/from lum image then need to update shader rule
         if wasLumImage != self.isLumImage:
@@ -239,6 +239,30 @@ class MovieStim(BaseVisualStim, DraggingMixin, ColorMixin, ContainerMixin):
         """
         self.loadMovie(filename=filename)
 
+    def prefetch(self, filename):
+        """Prepare the next movie file to be loaded so its first frame is ready
+        as soon as it is loaded.
+
+        Call this while the present movie plays, for instance during the trial
+        before the one showing `filename`. The file is opened and its first
+        frames are decoded in the background, the next call to `loadMovie()`
+        with the same file then returns without waiting for the decoder.
+
+        Parameters
+        ----------
+        filename : str
+            Path to movie file. Must be a format that FFMPEG supports.
+
+        """
+        if isinstance(filename, str) and filename in defaultStim:
+            filename = Path(prefs.paths['assets']) / defaultStim[filename]
+
+        if not os.path.isfile(filename):
+            raise FileNotFoundError("Cannot open movie file `{}`".format(
+                filename))
+
+        self._player.prefetch(filename)
+
     def unload(self, log=True):
         """Stop and unload the movie.
 
@@ -228,6 +228,19 @@ class BaseMoviePlayer(ABC):
         """
         pass
 
+    def prefetch(self, pathToMovie):
+        """Prepare a movie file to be loaded later, so it starts without delay.
+
+        Players which cannot prepare a movie ahead of time ignore this.
+
+        Parameters
+        ----------
+        pathToMovie : str
+            Path to the movie file to be loaded next.
+
+        """
+        pass
+
     @abstractmethod
     def seek(self, timestamp, log=True):
         """Skip to some position in the video.
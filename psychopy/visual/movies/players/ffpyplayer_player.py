@@ -9,9 +9,11 @@
 # Distributed under the terms of the GNU General Public License (GPL).
 
 __all__ = [
-    'FFPyPlayer'
+    'FFPyPlayer',
+    'clearPrefetchedMovies'
 ]
 
+import os
 import sys
 
 from ffpyplayer.player import MediaPlayer  # very first thing to import
@@ -21,6 +23,7 @@ import math
 import numpy as np
 import threading
 import queue
+import collections
 from psychopy.core import getTime
 from ._base import BaseMoviePlayer
 from ..metadata import MovieMetadata
@@ -28,6 +31,7 @@ from ..frame import MovieFrame, NULL_MOVIE_FRAME_INFO
 from psychopy.constants import (
     FINISHED, NOT_STARTED, PAUSED, PLAYING, STOPPED, STOPPING, INVALID, SEEKING)
 from psychopy.tools.filetools import pathToString
+from psychopy.tools.movietools import getMovieSeekIndex
 import atexit
 
 
@@ -43,6 +47,20 @@ DEFAULT_FF_OPTS = {
 # default queue size for the stream reader
 DEFAULT_FRAME_QUEUE_SIZE = 1
 
+# time to wait for the frame at the target of a seek before giving up (seconds)
+SEEK_TIMEOUT = 1.0
+
+# most movies prefetched and not loaded yet, the oldest are closed first
+MAX_PREFETCHED_MOVIES = 4
+
+# time after which prefetched movies which weren't loaded are closed (seconds)
+PREFETCH_TIMEOUT = 60.0
+
+# stream reader threads started ahead of being loaded, by file and options, as
+# (thread, time prefetched, window)
+_prefetchedStreams = collections.OrderedDict()
+_prefetchLock = threading.Lock()
+
 # event to close all opened movie reader threads
 _evtCleanUpMovieEvent = threading.Event()
 _evtCleanUpMovieEvent.clear()
@@ -230,10 +248,20 @@ class MovieStreamThreadFFPyPlayer(threading.Thread):
     bufferFrames : int
         Number of frames to buffer. Sets the frame queue size for the thread.
         Use a queue size >1 for video recorded with a framerate above 60Hz.
+        The queue is filled with the first frames of the movie before the
+        thread is ready.
+    seekIndex : MovieSeekIndex or None
+        Index of the frames in the movie, used to seek to exact frames. May be
+        set later with the `seekIndex` property.
+    indexFile : str or None
+        Movie file to index on the first seek, if `seekIndex` is `None`.
+        Indexing scans the whole file, so it is only done if the movie is
+        seeked.
 
     """
 
-    def __init__(self, player, bufferFrames=DEFAULT_FRAME_QUEUE_SIZE):
+    def __init__(self, player, bufferFrames=DEFAULT_FRAME_QUEUE_SIZE,
+                 seekIndex=None, indexFile=None):
         threading.Thread.__init__(self)
         # Make this thread daemonic since we don't yet have a way of tracking
         # them down. Since we're only reading resources, it's unlikely that
@@ -243,6 +271,8 @@ class MovieStreamThreadFFPyPlayer(threading.Thread):
         self.daemon = True
 
         self._player = player  # player interface to FFMPEG
+        self._seekIndex = seekIndex
+        self._indexFile = indexFile
         self._frameQueue = queue.Queue(maxsize=bufferFrames)
         self._cmdQueue = queue.Queue()  # queue for player commands
 
@@ -305,6 +335,33 @@ class MovieStreamThreadFFPyPlayer(threading.Thread):
             player.set_pause(False)
             player.set_mute(True)
 
+            seekIndex = self._seekIndex
+            if seekIndex is not None:
+                # The index has the exact timestamp of the frame shown at the
+                # target, so a single accurate seek lands on it and the first
+                # frame at or past that timestamp is the one we want.
+                ptsTarget = seekIndex.framePtsAt(ptsTarget)
+                player.seek(ptsTarget, relative=False, accurate=True)
+                tTimeout = getTime() + SEEK_TIMEOUT
+                while getTime() < tTimeout:
+                    frameData_, val_ = player.get_frame(show=True)
+                    if val_ == 'eof':
+                        break
+                    elif frameData_ is None:
+                        time.sleep(0.0025)
+                        continue
+
+                    _, pts_ = frameData_
+                    if pts_ >= ptsTarget - 1e-6:
+                        break  # frames decoded before the seek are skipped
+                else:
+                    frameData_, val_ = None, ''
+
+                player.set_mute(False)
+                player.set_pause(wasPaused)
+
+                return frameData_, val_
+
             # issue seek command to the player
             player.seek(ptsTarget, relative=False, accurate=True)
             # wait until we are at the seek position
@@ -441,6 +498,27 @@ class MovieStreamThreadFFPyPlayer(threading.Thread):
         # Pass the object to the main thread using the frame queue.
         self._frameQueue.put(lastFrame)  # put frame data in here
 
+        # Fill the rest of the queue with the frames that follow, so they are
+        # ready as soon as playback starts.
+        while not self._frameQueue.full():
+            frameData, val = self._player.get_frame(show=True)
+            if val == 'eof':
+                break
+            elif frameData is None or val == 'not ready':
+                time.sleep(0.0025)
+                continue
+
+            colorData, pts = frameData
+            self._frameQueue.put(StreamData(
+                metadata,
+                colorData,
+                StreamStatus(
+                    status=statusFlag,
+                    streamTime=pts,
+                    frameIndex=calcFrameIndex(pts, frameInterval),
+                    loopCount=loopCount),
+                u'ffpyplayer'))
+
         # Rewind back to the beginning of the file, we should have the first
         # frame and metadata from the file by now.
         self._player.set_pause(True)  # start paused
@@ -548,11 +626,37 @@ class MovieStreamThreadFFPyPlayer(threading.Thread):
                     self._player.set_pause(True)
                 elif cmdOpCode == 'seek':
                     seekToPts, seekRel = cmdVal
-                    self._player.seek(
-                        seekToPts,
-                        relative=seekRel,
-                        accurate=True)
-                    time.sleep(0.1)  # long wait for seeking
+                    if self._loadSeekIndex() is None:
+                        self._player.seek(
+                            seekToPts,
+                            relative=seekRel,
+                            accurate=True)
+                        time.sleep(0.1)  # long wait for seeking
+                    else:
+                        if seekRel:
+                            seekToPts += self._player.get_pts()
+                        frameData, val = seekTo(
+                            self._player, max(seekToPts, 0.0))
+                        if frameData is not None:
+                            # replace frames from before the seek with the
+                            # one at the new position
+                            while not self._frameQueue.empty():
+                                try:
+                                    self._frameQueue.get_nowait()
+                                except queue.Empty:
+                                    break
+                            colorData, pts = frameData
+                            lastFrame = StreamData(
+                                metadata,
+                                colorData,
+                                StreamStatus(
+                                    status=statusFlag,
+                                    streamTime=pts,
+                                    frameIndex=calcFrameIndex(
+                                        pts, frameInterval),
+                                    loopCount=loopCount),
+                                u'ffpyplayer')
+                            self._frameQueue.put_nowait(lastFrame)
                 elif cmdOpCode == 'stop':  # stop playback, return to start
                     self._player.set_mute(True)
                     self._player.seek(
@@ -599,11 +703,62 @@ class MovieStreamThreadFFPyPlayer(threading.Thread):
         """
         return not self._warmUpLock.locked()
 
-    def begin(self):
+    @property
+    def seekIndex(self):
+        """Index of the frames in the movie used for seeking
+        (`MovieSeekIndex` or `None`). If `None`, seeks are not frame accurate.
+        """
+        return self._seekIndex
+
+    @seekIndex.setter
+    def seekIndex(self, value):
+        self._seekIndex = value
+
+    @property
+    def isSeekable(self):
+        """`True` if seeks are frame accurate (`bool`), or will be once the
+        movie is indexed by the first seek.
+        """
+        return self._seekIndex is not None or self._indexFile is not None
+
+    def _loadSeekIndex(self):
+        """Index the movie file, if it hasn't been tried already.
+
+        Returns
+        -------
+        MovieSeekIndex or None
+            The index, or `None` if the movie cannot be indexed.
+
+        """
+        if self._seekIndex is None and self._indexFile is not None:
+            filename, self._indexFile = self._indexFile, None  # only try once
+            try:
+                self._seekIndex = getMovieSeekIndex(filename)
+            except Exception as err:
+                logging.warning(
+                    "Seeking in movie '{}' will not be frame accurate, "
+                    "failed to index it: {}".format(filename, err))
+
+        return self._seekIndex
+
+    def begin(self, wait=True):
         """Call this to start the thread and begin reading frames. This will
         block until we get a valid frame.
+
+        Parameters
+        ----------
+        wait : bool
+            Block until the first frames are decoded. If `False`, call
+            `waitUntilReady()` before using the thread.
+
         """
         self.start()  # start the thread, will begin decoding frames
+        if wait:
+            self.waitUntilReady()
+
+    def waitUntilReady(self):
+        """Block until the thread has decoded the first frames of the movie.
+        """
         # hold until the lock is released when the thread gets a valid frame
         # this will prevent the main loop for executing until we're ready
         self._warmUpLock.acquire(blocking=True)
@@ -760,10 +915,6 @@ class FFPyPlayer(BaseMoviePlayer):
         self._lastFrame = None
         self._frameIndex = -1
 
-        # open the media player
-        handle = MediaPlayer(self._filename, ff_opts=self._lastPlayerOpts)
-        handle.set_pause(True)
-
         # Pull the first frame to get metadata. NB - `_enqueueFrame` should be
         # able to do this but the logic in there depends on having access to
         # metadata first. That may be rewritten at some point to reduce all of
@@ -771,13 +922,83 @@ class FFPyPlayer(BaseMoviePlayer):
         #
         self._status = NOT_STARTED
 
-        # hand off the player interface to the thread
-        self._tStream = MovieStreamThreadFFPyPlayer(handle)
-        self._tStream.begin()
+        # use the reader thread started by `prefetch()` if there is one
+        with _prefetchLock:
+            prefetched = _prefetchedStreams.pop(self._streamKey(), None)
+        _closeExpiredPrefetches()  # in the background, loading doesn't wait
+
+        if prefetched is None:
+            # open the media player and hand it off to the thread
+            tStream = self._openStream(self._filename)
+            tStream.begin()
+        else:
+            tStream = prefetched[0]
+            tStream.waitUntilReady()
+
+        self._tStream = tStream
 
         # make sure we have metadata
         self.update()
 
+    def _streamKey(self, filename=None):
+        """Key for streams of a file opened with the present player options.
+        """
+        if filename is None:
+            filename = self._filename
+
+        return filename, tuple(sorted(self._lastPlayerOpts.items()))
+
+    def _openStream(self, filename, bufferFrames=DEFAULT_FRAME_QUEUE_SIZE):
+        """Open a media player for a file and create the thread which reads
+        it. Files are indexed for seeking when they are first seeked.
+        """
+        handle = MediaPlayer(filename, ff_opts=self._lastPlayerOpts)
+        handle.set_pause(True)
+        # streams (URIs) and cameras cannot be indexed
+        indexFile = filename if os.path.isfile(filename) else None
+
+        return MovieStreamThreadFFPyPlayer(
+            handle, bufferFrames, indexFile=indexFile)
+
+    def prefetch(self, pathToMovie, bufferFrames=DEFAULT_FRAME_QUEUE_SIZE):
+        """Open a movie file and decode its first frames in the background, so
+        it starts without delay when loaded.
+
+        Call this for the next movie to be shown while the present one plays,
+        for instance during the trial before it. The next call to `load()`
+        with the same file uses the prefetched stream. Movies which aren't
+        loaded are closed after `PREFETCH_TIMEOUT` seconds, when more than
+        `MAX_PREFETCHED_MOVIES` are prefetched, or when the window closes.
+
+        Parameters
+        ----------
+        pathToMovie : str
+            Path to movie file. Must be a format that FFMPEG supports.
+        bufferFrames : int
+            Number of frames to decode ahead of loading the movie. This also
+            sets the size of the frame queue while it plays.
+
+        """
+        filename = pathToString(pathToMovie)
+        key = self._streamKey(filename)
+        with _prefetchLock:
+            if key in _prefetchedStreams:
+                return  # already prefetched
+
+        tStream = self._openStream(filename, bufferFrames)
+        tStream.begin(wait=False)  # warms up without blocking
+
+        win = getattr(self.parent, 'win', None)
+        with _prefetchLock:
+            _prefetchedStreams[key] = (tStream, getTime(), win)
+            evicted = []
+            while len(_prefetchedStreams) > MAX_PREFETCHED_MOVIES:
+                evicted.append(_prefetchedStreams.popitem(last=False)[1][0])
+
+        logging.debug("Prefetching movie '{}'.".format(filename))
+        _closeStreams(evicted, background=True)
+        _closeExpiredPrefetches()
+
     def load(self, pathToMovie):
         """Load a movie file from disk.
 
@@ -1272,7 +1493,8 @@ class FFPyPlayer(BaseMoviePlayer):
         """Is seeking allowed for the video stream (`bool`)? If `False` then
         `frameIndex` will increase monotonically.
         """
-        return False  # fixed for now
+        # frame accurate seeking needs an index of the movie
+        return self._tStream is not None and self._tStream.isSeekable
 
     @property
     def frameInterval(self):
@@ -1398,5 +1620,60 @@ class FFPyPlayer(BaseMoviePlayer):
                     self._tStream.join()
 
 
+def _closeStreams(streams, background=False):
+    """Shut down prefetched stream reader threads.
+
+    Parameters
+    ----------
+    streams : list of MovieStreamThreadFFPyPlayer
+        Reader threads to shut down.
+    background : bool
+        Shut them down in another thread, so movies being loaded don't wait
+        for them.
+
+    """
+    if background:
+        if streams:
+            threading.Thread(
+                target=_closeStreams, args=(streams,), daemon=True).start()
+        return
+
+    for tStream in streams:
+        tStream.waitUntilReady()  # commands are only read once warmed up
+        tStream.shutdown()
+        tStream.join()
+
+
+def _closeExpiredPrefetches():
+    """Close movies prefetched more than `PREFETCH_TIMEOUT` seconds ago which
+    were never loaded, in a background thread.
+    """
+    tExpired = getTime() - PREFETCH_TIMEOUT
+    with _prefetchLock:
+        expired = [key for key, (_, tPrefetched, _) in
+                   _prefetchedStreams.items() if tPrefetched < tExpired]
+        streams = [_prefetchedStreams.pop(key)[0] for key in expired]
+
+    _closeStreams(streams, background=True)
+
+
+def clearPrefetchedMovies(win=None):
+    """Close movies which were prefetched but never loaded.
+
+    Parameters
+    ----------
+    win : :class:`~psychopy.visual.Window` or None
+        Only close the movies prefetched for stimuli in this window. If `None`,
+        all prefetched movies are closed.
+
+    """
+    with _prefetchLock:
+        keys = [key for key, (_, _, streamWin) in _prefetchedStreams.items()
+                if win is None or streamWin is win]
+        streams = [_prefetchedStreams.pop(key)[0] for key in keys]
+
+    _closeStreams(streams)
+
+
 if __name__ == "__main__":
     pass
@@ -2656,6 +2656,15 @@ class Window():
         except Exception:
             pass
 
+        # close movies prefetched for the window which were never loaded
+        ffpyplayerPlayer = sys.modules.get(
+            'psychopy.visual.movies.players.ffpyplayer_player')
+        if ffpyplayerPlayer is not None:
+            try:
+                ffpyplayerPlayer.clearPrefetchedMovies(win=self)
+            except Exception:
+                pass
+
         self.backend.close()  # moved here, dereferencing the window prevents
                               # backend specific actions to take place
 